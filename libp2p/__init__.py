@@ -1,10 +1,12 @@
 from importlib.metadata import version as __version
 
 from libp2p.abc import (
+    IConnectionGater,
     IHost,
     INetworkService,
     IPeerRouting,
     IPeerStore,
+    ITransport,
 )
 from libp2p.crypto.keys import (
     KeyPair,
@@ -23,6 +25,9 @@ from libp2p.host.basic_host import (
 from libp2p.host.routed_host import (
     RoutedHost,
 )
+from libp2p.network.reaper import (
+    IdleTimeouts,
+)
 from libp2p.network.swarm import (
     Swarm,
 )
@@ -32,6 +37,9 @@ from libp2p.peer.id import (
 from libp2p.peer.peerstore import (
     PeerStore,
 )
+from libp2p.rcmgr.manager import (
+    ResourceManager,
+)
 from libp2p.security.insecure.transport import (
     PLAINTEXT_PROTOCOL_ID,
     InsecureTransport,
@@ -41,11 +49,18 @@ from libp2p.stream_muxer.mplex.mplex import (
     MPLEX_PROTOCOL_ID,
     Mplex,
 )
+from libp2p.transport.quic.utils import (
+    QUIC_PROTOCOL,
+)
+from libp2p.transport.registry import (
+    TransportRegistry,
+)
 from libp2p.transport.tcp.tcp import (
     TCP,
 )
 from libp2p.transport.upgrader import (
     TransportUpgrader,
+    UpgraderOptions,
 )
 
 
@@ -63,6 +78,13 @@ def new_swarm(
     muxer_opt: TMuxerOptions = None,
     sec_opt: TSecurityOptions = None,
     peerstore_opt: IPeerStore = None,
+    resource_manager_opt: ResourceManager = None,
+    transport_opt: ITransport = None,
+    enable_quic: bool = False,
+    transports_opt: TransportRegistry = None,
+    gater_opt: IConnectionGater = None,
+    upgrader_opt: UpgraderOptions = None,
+    idle_timeouts_opt: IdleTimeouts = None,
 ) -> INetworkService:
     """
     Create a swarm instance based on the parameters.
@@ -71,6 +93,19 @@ def new_swarm(
     :param muxer_opt: optional choice of stream muxer
     :param sec_opt: optional choice of security upgrade
     :param peerstore_opt: optional peerstore
+    :param resource_manager_opt: optional resource manager
+    :param transport_opt: optional transport, e.g. a ``TCP`` with ``TCPOptions``
+    :param enable_quic: also dial and listen on ``/quic-v1`` addresses, which
+        needs the ``quic`` extra
+    :param transports_opt: optional transports by multiaddr protocol, which
+        take precedence over the ones above
+    :param gater_opt: optional connection gater, also consulted by the ``TCP``
+        transport when connections are accepted
+    :raise ValueError: if ``transport_opt`` is a ``TCP`` with another gater
+        than ``gater_opt``
+    :param upgrader_opt: optional handshake timeouts and limits on inbound
+        connections upgraded at once
+    :param idle_timeouts_opt: optional timeouts of idle streams and connections
     :return: return a default swarm instance
     """
     if key_pair is None:
@@ -78,8 +113,23 @@ def new_swarm(
 
     id_opt = generate_peer_id_from(key_pair)
 
-    # TODO: Parse `listen_addrs` to determine transport
-    transport = TCP()
+    transports = transports_opt if transports_opt is not None else TransportRegistry()
+    if transport_opt is None:
+        transport_opt = TCP(gater=gater_opt)
+    elif isinstance(transport_opt, TCP) and gater_opt is not None:
+        if transport_opt.gater is None:
+            transport_opt.gater = gater_opt
+        elif transport_opt.gater is not gater_opt:
+            raise ValueError("transport_opt already has another connection gater")
+    if "tcp" not in transports:
+        transports.register("tcp", transport_opt)
+    if enable_quic and QUIC_PROTOCOL not in transports:
+        # Imported here, as `aioquic` is an optional dependency.
+        from libp2p.transport.quic.transport import (
+            QUICTransport,
+        )
+
+        transports.register(QUIC_PROTOCOL, QUICTransport(key_pair))
 
     muxer_transports_by_protocol = muxer_opt or {MPLEX_PROTOCOL_ID: Mplex}
     security_transports_by_protocol = sec_opt or {
@@ -87,14 +137,22 @@ def new_swarm(
         TProtocol(secio.ID): secio.Transport(key_pair),
     }
     upgrader = TransportUpgrader(
-        security_transports_by_protocol, muxer_transports_by_protocol
+        security_transports_by_protocol, muxer_transports_by_protocol, upgrader_opt
     )
 
     peerstore = peerstore_opt or PeerStore()
     # Store our key pair in peerstore
     peerstore.add_key_pair(id_opt, key_pair)
 
-    return Swarm(id_opt, peerstore, upgrader, transport)
+    return Swarm(
+        id_opt,
+        peerstore,
+        upgrader,
+        resource_manager=resource_manager_opt,
+        transports=transports,
+        gater=gater_opt,
+        idle_timeouts=idle_timeouts_opt,
+    )
 
 
 def new_host(
@@ -103,6 +161,13 @@ def new_host(
     sec_opt: TSecurityOptions = None,
     peerstore_opt: IPeerStore = None,
     disc_opt: IPeerRouting = None,
+    resource_manager_opt: ResourceManager = None,
+    transport_opt: ITransport = None,
+    enable_quic: bool = False,
+    transports_opt: TransportRegistry = None,
+    gater_opt: IConnectionGater = None,
+    upgrader_opt: UpgraderOptions = None,
+    idle_timeouts_opt: IdleTimeouts = None,
 ) -> IHost:
     """
     Create a new libp2p host based on the given parameters.
@@ -112,6 +177,13 @@ def new_host(
     :param sec_opt: optional choice of security upgrade
     :param peerstore_opt: optional peerstore
     :param disc_opt: optional discovery
+    :param resource_manager_opt: optional resource manager
+    :param transport_opt: optional transport
+    :param enable_quic: also dial and listen on ``/quic-v1`` addresses
+    :param transports_opt: optional transports by multiaddr protocol
+    :param gater_opt: optional connection gater
+    :param upgrader_opt: optional handshake timeouts and inbound upgrade limits
+    :param idle_timeouts_opt: optional timeouts of idle streams and connections
     :return: return a host instance
     """
     swarm = new_swarm(
@@ -119,6 +191,13 @@ def new_host(
         muxer_opt=muxer_opt,
         sec_opt=sec_opt,
         peerstore_opt=peerstore_opt,
+        resource_manager_opt=resource_manager_opt,
+        transport_opt=transport_opt,
+        enable_quic=enable_quic,
+        transports_opt=transports_opt,
+        gater_opt=gater_opt,
+        upgrader_opt=upgrader_opt,
+        idle_timeouts_opt=idle_timeouts_opt,
     )
     host: IHost
     if disc_opt:
@@ -4,14 +4,18 @@ from abc import (
 )
 from collections.abc import (
     AsyncIterable,
+    Container,
     Iterable,
     KeysView,
+    Mapping,
     Sequence,
 )
+import math
 from typing import (
     TYPE_CHECKING,
     Any,
     AsyncContextManager,
+    Optional,
 )
 
 from multiaddr import (
@@ -27,6 +31,7 @@ from libp2p.crypto.keys import (
 from libp2p.custom_types import (
     StreamHandlerFn,
     THandler,
+    TMuxedConnHandler,
     TProtocol,
     ValidatorFn,
 )
@@ -40,11 +45,21 @@ from libp2p.peer.id import (
 from libp2p.peer.peerinfo import (
     PeerInfo,
 )
+from libp2p.rcmgr.limits import (
+    Direction,
+)
+from libp2p.stream_muxer.scheduler import (
+    StreamPriority,
+)
 
 if TYPE_CHECKING:
     from libp2p.pubsub.pubsub import (
         Pubsub,
     )
+    from libp2p.rcmgr.manager import (
+        ConnectionScope,
+        StreamScope,
+    )
 
 from libp2p.pubsub.pb import (
     rpc_pb2,
@@ -104,16 +119,24 @@ class IMuxedConn(ABC):
     """
 
     peer_id: ID
+    resource_scope: Optional["ConnectionScope"]
     event_started: trio.Event
 
     @abstractmethod
-    def __init__(self, conn: ISecureConn, peer_id: ID) -> None:
+    def __init__(
+        self,
+        conn: ISecureConn,
+        peer_id: ID,
+        resource_scope: "ConnectionScope" = None,
+    ) -> None:
         """
         Create a new muxed connection.
 
         :param conn: an instance of secured connection
         for new muxed streams
         :param peer_id: peer_id of peer the connection is to
+        :param resource_scope: optional scope the connection and its streams
+            are accounted in
         """
 
     @property
@@ -153,17 +176,46 @@ class IMuxedConn(ABC):
 
 class IMuxedStream(ReadWriteCloser):
     muxed_conn: IMuxedConn
+    resource_scope: Optional["StreamScope"]
+    # `trio.current_time()` of the last read, write or data received.
+    last_activity: float
 
     @abstractmethod
     async def reset(self) -> None:
         """Close both ends of the stream tells this remote side to hang up."""
 
     @abstractmethod
-    def set_deadline(self, ttl: int) -> bool:
+    def set_deadline(self, ttl: Optional[float]) -> bool:
         """
         Set deadline for muxed stream.
 
-        :return: a new stream
+        :param ttl: seconds from now until reads and writes time out, ``None``
+            to remove the deadline
+        :return: True if successful
+        """
+
+    @abstractmethod
+    def set_read_deadline(self, ttl: Optional[float]) -> bool:
+        """
+        Set read deadline for muxed stream.
+
+        :return: True if successful
+        """
+
+    @abstractmethod
+    def set_write_deadline(self, ttl: Optional[float]) -> bool:
+        """
+        Set write deadline for muxed stream.
+
+        :return: True if successful
+        """
+
+    @abstractmethod
+    def set_priority(self, priority: StreamPriority, weight: float = 1) -> None:
+        """
+        :param priority: class of the messages of the stream, the classes are
+            sent in order
+        :param weight: share of the stream within its class
         """
 
 
@@ -189,6 +241,34 @@ class INetStream(ReadWriteCloser):
     async def reset(self) -> None:
         """Close both ends of the stream."""
 
+    @abstractmethod
+    def set_deadline(self, ttl: Optional[float]) -> bool:
+        """
+        Make reads and writes raise ``StreamTimeout`` once ``ttl`` seconds
+        have passed, ``None`` removes the deadline.
+
+        :return: True if successful
+        """
+
+    @abstractmethod
+    def set_read_deadline(self, ttl: Optional[float]) -> bool:
+        """
+        :return: True if successful
+        """
+
+    @abstractmethod
+    def set_write_deadline(self, ttl: Optional[float]) -> bool:
+        """
+        :return: True if successful
+        """
+
+    @abstractmethod
+    def set_priority(self, priority: StreamPriority, weight: float = 1) -> None:
+        """
+        Order the messages of the stream against those of the other streams of
+        its connection.
+        """
+
 
 # -------------------------- net_connection interface.py --------------------------
 
@@ -196,6 +276,8 @@ class INetStream(ReadWriteCloser):
 class INetConn(Closer):
     muxed_conn: IMuxedConn
     event_started: trio.Event
+    # `trio.current_time()` of the last stream opened or removed.
+    last_activity: float
 
     @abstractmethod
     async def new_stream(self) -> INetStream:
@@ -229,6 +311,64 @@ class IPeerMetadata(ABC):
         """
 
 
+# -------------------------- peermetrics interface.py --------------------------
+
+
+class IPeerMetrics(ABC):
+    @abstractmethod
+    def record_latency(
+        self, peer_id: ID, rtt: float, addr: Optional[Multiaddr] = None
+    ) -> None:
+        """
+        :param peer_id: peer ID the round trip was made to
+        :param rtt: round trip time, in seconds
+        :param addr: address the round trip was made over, if known
+        """
+
+    @abstractmethod
+    def latency_ewma(self, peer_id: ID) -> Optional[float]:
+        """
+        :param peer_id: peer ID to get the latency of
+        :return: moving average of the round trip time in seconds, ``None`` if
+            none was recorded
+        """
+
+    @abstractmethod
+    def addr_latency_ewma(self, peer_id: ID, addr: Multiaddr) -> Optional[float]:
+        """
+        :param peer_id: peer ID to get the latency of
+        :param addr: address to get the latency over
+        :return: moving average of the round trip time in seconds, ``None`` if
+            none was recorded
+        """
+
+    @abstractmethod
+    def record_dial(self, peer_id: ID, addr: Multiaddr, success: bool) -> None:
+        """
+        :param peer_id: peer ID which was dialed
+        :param addr: address which was dialed
+        :param success: whether a connection was established
+        """
+
+    @abstractmethod
+    def dial_success_rate(
+        self, peer_id: ID, addr: Optional[Multiaddr] = None
+    ) -> Optional[float]:
+        """
+        :param peer_id: peer ID to get the rate of
+        :param addr: address to get the rate of, rather than of the whole peer
+        :return: moving average of the share of dials which succeeded
+        """
+
+    @abstractmethod
+    def rank_addrs(self, peer_id: ID, addrs: Iterable[Multiaddr]) -> list[Multiaddr]:
+        """
+        :param peer_id: peer ID the addresses are of
+        :param addrs: addresses to order
+        :return: ``addrs``, the ones expected to connect the soonest first
+        """
+
+
 # -------------------------- addrbook interface.py --------------------------
 
 
@@ -257,7 +397,30 @@ class IAddrBook(ABC):
         """  # noqa: E501
 
     @abstractmethod
-    def addrs(self, peer_id: ID) -> list[Multiaddr]:
+    def set_addrs(self, peer_id: ID, addrs: Sequence[Multiaddr], ttl: int) -> None:
+        """
+        Sets the time-to-live of addresses, whether it is longer or shorter
+        than their current one, adding those not known yet. A ttl of zero or
+        less removes the addresses.
+
+        :param peer_id: the peer to set addresses for
+        :param addrs: multiaddresses of the peer
+        :param ttl: time-to-live for the addresses
+        """
+
+    @abstractmethod
+    def update_addrs(self, peer_id: ID, old_ttl: int, new_ttl: int) -> None:
+        """
+        Gives the addresses of a peer stored with ``old_ttl`` the time-to-live
+        ``new_ttl`` from now, e.g. once a connection to the peer closes.
+
+        :param peer_id: the peer to update addresses for
+        :param old_ttl: time-to-live of the addresses to update
+        :param new_ttl: their new time-to-live
+        """
+
+    @abstractmethod
+    def addrs(self, peer_id: ID) -> Sequence[Multiaddr]:
         """
         :param peer_id: peer to get addresses of
         :return: all known (and valid) addresses for the given peer
@@ -281,7 +444,7 @@ class IAddrBook(ABC):
 # -------------------------- peerstore interface.py --------------------------
 
 
-class IPeerStore(IAddrBook, IPeerMetadata):
+class IPeerStore(IAddrBook, IPeerMetadata, IPeerMetrics):
     @abstractmethod
     def peer_info(self, peer_id: ID) -> PeerInfo:
         """
@@ -290,10 +453,10 @@ class IPeerStore(IAddrBook, IPeerMetadata):
         """
 
     @abstractmethod
-    def get_protocols(self, peer_id: ID) -> list[str]:
+    def get_protocols(self, peer_id: ID) -> Sequence[str]:
         """
         :param peer_id: peer ID to get protocols for
-        :return: protocols (as list of strings)
+        :return: read-only view of the protocols
         :raise PeerStoreError: if peer ID not found
         """
 
@@ -311,12 +474,60 @@ class IPeerStore(IAddrBook, IPeerMetadata):
         :param protocols: protocols to set
         """
 
+    @abstractmethod
+    def remove_protocols(self, peer_id: ID, protocols: Sequence[str]) -> None:
+        """
+        :param peer_id: peer ID to remove protocols for
+        :param protocols: protocols to remove
+        """
+
+    @abstractmethod
+    def bulk_add_protocols(self, peer_protocols: Mapping[ID, Sequence[str]]) -> None:
+        """
+        Add the protocols of many peers at once, e.g. after a discovery round.
+
+        :param peer_protocols: protocols to add, by peer ID
+        """
+
+    @abstractmethod
+    def peers_supporting(self, protocol: str) -> list[ID]:
+        """
+        :param protocol: protocol to look peers up for
+        :return: the peers known to support ``protocol``
+        """
+
+    @abstractmethod
+    def supports(self, peer_id: ID, protocols: Sequence[str]) -> list[str]:
+        """
+        :param peer_id: peer ID to check protocols for
+        :param protocols: protocols to check
+        :return: those of ``protocols`` which the peer supports, in that order
+        :raise PeerStoreError: if peer ID not found
+        """
+
     @abstractmethod
     def peer_ids(self) -> list[ID]:
         """
         :return: all of the peer IDs stored in peer store
         """
 
+    @abstractmethod
+    def gc_peers(self, keep: Container[ID] = ()) -> list[ID]:
+        """
+        Remove the peers left without addresses, e.g. once their last
+        connection closed and its addresses expired.
+
+        :param keep: peers to keep anyway, e.g. those still connected
+        :return: the peer IDs removed
+        """
+
+    @abstractmethod
+    async def run_maintenance(self) -> None:
+        """
+        Background work of the peerstore, e.g. writing it behind to disk. The
+        swarm runs it until it stops, and cancels it then.
+        """
+
     @abstractmethod
     def get(self, peer_id: ID, key: str) -> Any:
         """
@@ -351,10 +562,21 @@ class IPeerStore(IAddrBook, IPeerMetadata):
         """
 
     @abstractmethod
-    def addrs(self, peer_id: ID) -> list[Multiaddr]:
+    def bulk_add_addrs(
+        self, peer_addrs: Mapping[ID, Sequence[Multiaddr]], ttl: int
+    ) -> None:
+        """
+        Add the addresses of many peers at once, all with the same ttl.
+
+        :param peer_addrs: addresses to add, by peer ID
+        :param ttl: time-to-live for the addresses
+        """
+
+    @abstractmethod
+    def addrs(self, peer_id: ID) -> Sequence[Multiaddr]:
         """
         :param peer_id: peer ID to get addrs for
-        :return: list of addrs
+        :return: read-only view of the addrs
         """
 
     @abstractmethod
@@ -436,6 +658,56 @@ class IListener(ABC):
         ...
 
 
+# -------------------------- connection_gater interface.py --------------------------
+
+
+class IConnectionGater(ABC):
+    """
+    Decides which connections to accept, at each stage of their setup. A
+    connection is rejected as soon as a hook returns ``False``, so the cheaper
+    the stage, the less is spent on unwanted peers.
+
+    reference: https://github.com/libp2p/go-libp2p/tree/master/core/connmgr
+    """
+
+    @abstractmethod
+    def intercept_peer_dial(self, peer_id: ID) -> bool:
+        """
+        :return: whether ``peer_id`` may be dialed
+        """
+
+    @abstractmethod
+    def intercept_addr_dial(self, peer_id: ID, maddr: Multiaddr) -> bool:
+        """
+        :return: whether ``peer_id`` may be dialed at ``maddr``
+        """
+
+    @abstractmethod
+    def intercept_accept(self, remote_maddr: Multiaddr) -> bool:
+        """
+        Called when an inbound connection is accepted, before any handshake.
+
+        :param remote_maddr: address of the remote side, e.g. ``/ip4/.../tcp/...``
+        :return: whether to go on with the connection
+        """
+
+    @abstractmethod
+    def intercept_secured(self, direction: Direction, peer_id: ID) -> bool:
+        """
+        Called when the security handshake authenticated the remote peer.
+
+        :return: whether to go on with the connection
+        """
+
+    @abstractmethod
+    def intercept_upgraded(self, muxed_conn: IMuxedConn) -> bool:
+        """
+        Called when the connection is multiplexed, before it is used.
+
+        :return: whether to keep the connection
+        """
+
+
 # -------------------------- network interface.py --------------------------
 
 
@@ -574,6 +846,12 @@ class IHost(ABC):
         :return: network instance of host
         """
 
+    @abstractmethod
+    def get_peerstore(self) -> IPeerStore:
+        """
+        :return: peerstore of the host (same one as in its network instance)
+        """
+
     # FIXME: Replace with correct return type
     @abstractmethod
     def get_mux(self) -> Any:
@@ -603,24 +881,32 @@ class IHost(ABC):
 
     @abstractmethod
     def set_stream_handler(
-        self, protocol_id: TProtocol, stream_handler: StreamHandlerFn
+        self,
+        protocol_id: TProtocol,
+        stream_handler: StreamHandlerFn,
+        priority: StreamPriority = None,
     ) -> None:
         """
         Set stream handler for host.
 
         :param protocol_id: protocol id used on stream
         :param stream_handler: a stream handler function
+        :param priority: optional priority of the accepted streams
         """
 
     # protocol_id can be a list of protocol_ids
     # stream will decide which protocol_id to run on
     @abstractmethod
     async def new_stream(
-        self, peer_id: ID, protocol_ids: Sequence[TProtocol]
+        self,
+        peer_id: ID,
+        protocol_ids: Sequence[TProtocol],
+        priority: StreamPriority = None,
     ) -> INetStream:
         """
         :param peer_id: peer_id that host is connecting
         :param protocol_ids: available protocol ids to use for stream
+        :param priority: optional priority of the stream
         :return: stream: new stream created
         """
 
@@ -650,16 +936,19 @@ class IHost(ABC):
 
 
 class IPeerData(ABC):
+    __slots__ = ()
+
     @abstractmethod
-    def get_protocols(self) -> list[str]:
+    def get_protocols(self) -> Sequence[str]:
         """
         :return: all protocols associated with given peer
         """
 
     @abstractmethod
-    def add_protocols(self, protocols: Sequence[str]) -> None:
+    def add_protocols(self, protocols: Sequence[str]) -> list[str]:
         """
         :param protocols: protocols to add
+        :return: the protocols which were not known yet
         """
 
     @abstractmethod
@@ -669,13 +958,28 @@ class IPeerData(ABC):
         """
 
     @abstractmethod
-    def add_addrs(self, addrs: Sequence[Multiaddr]) -> None:
+    def remove_protocols(self, protocols: Sequence[str]) -> list[str]:
+        """
+        :param protocols: protocols to remove
+        :return: the protocols which were removed
+        """
+
+    @abstractmethod
+    def add_addrs(
+        self,
+        addrs: Sequence[Multiaddr],
+        ttl: Optional[int] = None,
+        expiry: float = math.inf,
+    ) -> list[bytes]:
         """
         :param addrs: multiaddresses to add
+        :param ttl: time-to-live the addresses were added with
+        :param expiry: when the addresses expire, extending earlier expiries
+        :return: the packed addresses whose expiry changed
         """
 
     @abstractmethod
-    def get_addrs(self) -> list[Multiaddr]:
+    def get_addrs(self) -> Sequence[Multiaddr]:
         """
         :return: all multiaddresses
         """
@@ -838,7 +1142,7 @@ class IMultiselectMuxer(ABC):
 
 class IContentRouting(ABC):
     @abstractmethod
-    def provide(self, cid: bytes, announce: bool = True) -> None:
+    async def provide(self, cid: bytes, announce: bool = True) -> None:
         """
         Provide adds the given cid to the content routing system.
 
@@ -848,19 +1152,20 @@ class IContentRouting(ABC):
         """
 
     @abstractmethod
-    def find_provider_iter(self, cid: bytes, count: int) -> Iterable[PeerInfo]:
+    def find_provider_iter(self, cid: bytes, count: int) -> AsyncIterable[PeerInfo]:
         """
         Search for peers who are able to provide a given key returns an
-        iterator of peer.PeerInfo.
+        asynchronous iterator of peer.PeerInfo, yielded as they are found.
         """
 
 
 class IPeerRouting(ABC):
     @abstractmethod
-    async def find_peer(self, peer_id: ID) -> PeerInfo:
+    async def find_peer(self, peer_id: ID) -> Optional[PeerInfo]:
         """
         Find specific Peer FindPeer searches for a peer with given peer_id,
-        returns a peer.PeerInfo with relevant addresses.
+        returns a peer.PeerInfo with relevant addresses, or ``None`` if the
+        peer was not found.
         """
 
 
@@ -921,6 +1226,33 @@ class ITransport(ABC):
         """
 
 
+class IMuxedTransport(ABC):
+    """
+    A transport which secures and multiplexes its connections itself, like
+    QUIC. Its connections skip the ``TransportUpgrader``.
+    """
+
+    @abstractmethod
+    async def dial(self, maddr: Multiaddr, peer_id: ID) -> IMuxedConn:
+        """
+        Dial the peer ``peer_id`` listening on ``maddr``.
+
+        :param maddr: multiaddr of peer
+        :param peer_id: peer the handshake must authenticate
+        :return: the secured and multiplexed connection
+        """
+
+    @abstractmethod
+    def create_listener(self, handler_function: TMuxedConnHandler) -> IListener:
+        """
+        Create listener on transport.
+
+        :param handler_function: a function called with each new connection,
+            once it is secured and multiplexed
+        :return: a listener object that implements listener_interface.py
+        """
+
+
 # -------------------------- pubsub abc.py --------------------------
 
 
@@ -40,6 +40,7 @@ from libp2p.pubsub.pb import (
 TProtocol = NewType("TProtocol", str)
 StreamHandlerFn = Callable[["INetStream"], Awaitable[None]]
 THandler = Callable[[ReadWriteCloser], Awaitable[None]]
+TMuxedConnHandler = Callable[["IMuxedConn"], Awaitable[None]]
 TSecurityOptions = Mapping[TProtocol, "ISecureTransport"]
 TMuxerClass = type["IMuxedConn"]
 TMuxerOptions = Mapping[TProtocol, TMuxerClass]
@@ -11,6 +11,7 @@ from typing import (
 )
 
 import multiaddr
+import trio
 
 from libp2p.abc import (
     IHost,
@@ -28,6 +29,7 @@ from libp2p.custom_types import (
 )
 from libp2p.host.defaults import (
     get_default_protocols,
+    get_default_stream_priorities,
 )
 from libp2p.host.exceptions import (
     StreamFailure,
@@ -38,6 +40,9 @@ from libp2p.peer.id import (
 from libp2p.peer.peerinfo import (
     PeerInfo,
 )
+from libp2p.peer.peerstore import (
+    TEMP_ADDR_TTL,
+)
 from libp2p.protocol_muxer.exceptions import (
     MultiselectClientError,
     MultiselectError,
@@ -51,6 +56,12 @@ from libp2p.protocol_muxer.multiselect_client import (
 from libp2p.protocol_muxer.multiselect_communicator import (
     MultiselectCommunicator,
 )
+from libp2p.rcmgr.exceptions import (
+    ResourceLimitExceeded,
+)
+from libp2p.stream_muxer.scheduler import (
+    StreamPriority,
+)
 from libp2p.tools.async_service import (
     background_trio_service,
 )
@@ -82,6 +93,8 @@ class BasicHost(IHost):
 
     multiselect: Multiselect
     multiselect_client: MultiselectClient
+    # Priorities of the streams accepted by protocol.
+    stream_priorities: dict[TProtocol, StreamPriority]
 
     def __init__(
         self,
@@ -95,6 +108,7 @@ class BasicHost(IHost):
         default_protocols = default_protocols or get_default_protocols(self)
         self.multiselect = Multiselect(default_protocols)
         self.multiselect_client = MultiselectClient()
+        self.stream_priorities = get_default_stream_priorities()
 
     def get_id(self) -> ID:
         """
@@ -160,27 +174,42 @@ class BasicHost(IHost):
             yield
 
     def set_stream_handler(
-        self, protocol_id: TProtocol, stream_handler: StreamHandlerFn
+        self,
+        protocol_id: TProtocol,
+        stream_handler: StreamHandlerFn,
+        priority: StreamPriority = None,
     ) -> None:
         """
         Set stream handler for given `protocol_id`
 
         :param protocol_id: protocol id used on stream
         :param stream_handler: a stream handler function
+        :param priority: optional priority of the accepted streams, e.g.
+            ``StreamPriority.BULK`` for transfers, once the protocol is agreed
         """
         self.multiselect.add_handler(protocol_id, stream_handler)
+        if priority is not None:
+            self.stream_priorities[protocol_id] = priority
 
     async def new_stream(
-        self, peer_id: ID, protocol_ids: Sequence[TProtocol]
+        self,
+        peer_id: ID,
+        protocol_ids: Sequence[TProtocol],
+        priority: StreamPriority = None,
     ) -> INetStream:
         """
         :param peer_id: peer_id that host is connecting
         :param protocol_ids: available protocol ids to use for stream
+        :param priority: optional priority of the stream, the negotiation of
+            the protocol included
         :return: stream: new stream created
         """
         net_stream = await self._network.new_stream(peer_id)
+        if priority is not None:
+            net_stream.set_priority(priority)
 
         # Perform protocol muxing to determine protocol to use
+        negotiation_started = trio.current_time()
         try:
             selected_protocol = await self.multiselect_client.select_one_of(
                 list(protocol_ids), MultiselectCommunicator(net_stream)
@@ -189,8 +218,22 @@ class BasicHost(IHost):
             logger.debug("fail to open a stream to peer %s, error=%s", peer_id, error)
             await net_stream.reset()
             raise StreamFailure(f"failed to open a stream to peer {peer_id}") from error
+        # A round trip for the multistream header, and one per protocol tried.
+        round_trips = 2 + list(protocol_ids).index(selected_protocol)
+        self.peerstore.record_latency(
+            peer_id, (trio.current_time() - negotiation_started) / round_trips
+        )
 
-        net_stream.set_protocol(selected_protocol)
+        try:
+            net_stream.set_protocol(selected_protocol)
+        except ResourceLimitExceeded as error:
+            logger.debug(
+                "resource limit reached for protocol %s to peer %s",
+                selected_protocol,
+                peer_id,
+            )
+            await net_stream.reset()
+            raise StreamFailure(f"failed to open a stream to peer {peer_id}") from error
         return net_stream
 
     async def connect(self, peer_info: PeerInfo) -> None:
@@ -204,7 +247,7 @@ class BasicHost(IHost):
         :param peer_info: peer_info of the peer we want to connect to
         :type peer_info: peer.peerinfo.PeerInfo
         """
-        self.peerstore.add_addrs(peer_info.peer_id, peer_info.addrs, 10)
+        self.peerstore.add_addrs(peer_info.peer_id, peer_info.addrs, TEMP_ADDR_TTL)
 
         # there is already a connection to this peer
         if peer_info.peer_id in self._network.connections:
@@ -232,5 +275,18 @@ class BasicHost(IHost):
             )
             await net_stream.reset()
             return
-        net_stream.set_protocol(protocol)
+        try:
+            net_stream.set_protocol(protocol)
+        except ResourceLimitExceeded as error:
+            peer_id = net_stream.muxed_conn.peer_id
+            logger.debug(
+                "rejected a stream of protocol %s from peer %s, error=%s",
+                protocol,
+                peer_id,
+                error,
+            )
+            await net_stream.reset()
+            return
+        if protocol in self.stream_priorities:
+            net_stream.set_priority(self.stream_priorities[protocol])
         await handler(net_stream)
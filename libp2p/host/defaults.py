@@ -16,6 +16,9 @@ from libp2p.identity.identify.protocol import (
     identify_handler_for,
 )
 from libp2p.identity.identify.protocol import ID as IdentifyID
+from libp2p.stream_muxer.scheduler import (
+    StreamPriority,
+)
 
 if TYPE_CHECKING:
     from libp2p.custom_types import (
@@ -28,3 +31,7 @@ def get_default_protocols(host: IHost) -> "OrderedDict[TProtocol, StreamHandlerF
     return OrderedDict(
         ((IdentifyID, identify_handler_for(host)), (PingID, handle_ping))
     )
+
+
+def get_default_stream_priorities() -> "dict[TProtocol, StreamPriority]":
+    return {IdentifyID: StreamPriority.CONTROL, PingID: StreamPriority.CONTROL}
@@ -17,6 +17,9 @@ from libp2p.network.stream.exceptions import (
     StreamReset,
 )
 from libp2p.peer.id import ID as PeerID
+from libp2p.stream_muxer.scheduler import (
+    StreamPriority,
+)
 
 ID = TProtocol("/ipfs/ping/1.0.0")
 PING_LENGTH = 32
@@ -98,10 +101,16 @@ class PingService:
         self._host = host
 
     async def ping(self, peer_id: PeerID, ping_amt: int = 1) -> list[int]:
-        stream = await self._host.new_stream(peer_id, [ID])
+        stream = await self._host.new_stream(
+            peer_id, [ID], priority=StreamPriority.CONTROL
+        )
 
         try:
-            rtts = [await _ping(stream) for _ in range(ping_amt)]
+            rtts = []
+            for _ in range(ping_amt):
+                rtt = await _ping(stream)
+                self._host.get_peerstore().record_latency(peer_id, rtt / 10**6)
+                rtts.append(rtt)
             await stream.close()
             return rtts
         except Exception:
@@ -8,18 +8,33 @@ from libp2p.host.basic_host import (
 from libp2p.host.exceptions import (
     ConnectionFailure,
 )
+from libp2p.host.routing_cache import (
+    CachedPeerRouting,
+)
+from libp2p.network.exceptions import (
+    SwarmException,
+)
 from libp2p.peer.peerinfo import (
     PeerInfo,
 )
+from libp2p.peer.peerstore import (
+    TEMP_ADDR_TTL,
+)
 
 
 # RoutedHost is a p2p Host that includes a routing system.
 # This allows the Host to find the addresses for peers when it does not have them.
 class RoutedHost(BasicHost):
-    _router: IPeerRouting
+    _router: CachedPeerRouting
 
     def __init__(self, network: INetworkService, router: IPeerRouting):
+        """
+        :param router: routing the addresses of peers are found with, behind a
+            `CachedPeerRouting` with the default settings unless it is one
+        """
         super().__init__(network)
+        if not isinstance(router, CachedPeerRouting):
+            router = CachedPeerRouting(router)
         self._router = router
 
     async def connect(self, peer_info: PeerInfo) -> None:
@@ -29,22 +44,36 @@ class RoutedHost(BasicHost):
         information.
 
         RoutedHost's Connect differs in that if the host has no addresses for a
-        given peer, it will use its routing system to try to find some.
+        given peer, it will use its routing system to try to find some. The
+        addresses found are cached, until a dial to them fails.
 
         :param peer_info: peer_info of the peer we want to connect to
         :type peer_info: peer.peerinfo.PeerInfo
         """
+        # there is already a connection to this peer, no need to route to it
+        if not peer_info.addrs and peer_info.peer_id in self._network.connections:
+            return
+
         # check if we were given some addresses, otherwise, find some with the
         # routing system.
-        if not peer_info.addrs:
+        routed = not peer_info.addrs
+        if routed:
             found_peer_info = await self._router.find_peer(peer_info.peer_id)
             if not found_peer_info:
                 raise ConnectionFailure("Unable to find Peer address")
-            self.peerstore.add_addrs(peer_info.peer_id, found_peer_info.addrs, 10)
-        self.peerstore.add_addrs(peer_info.peer_id, peer_info.addrs, 10)
+            self.peerstore.add_addrs(
+                peer_info.peer_id, found_peer_info.addrs, TEMP_ADDR_TTL
+            )
+        self.peerstore.add_addrs(peer_info.peer_id, peer_info.addrs, TEMP_ADDR_TTL)
 
         # there is already a connection to this peer
         if peer_info.peer_id in self._network.connections:
             return
 
-        await self._network.dial_peer(peer_info.peer_id)
+        try:
+            await self._network.dial_peer(peer_info.peer_id)
+        except SwarmException:
+            if routed:
+                # The addresses may be stale, route to the peer again next time.
+                self._router.invalidate(peer_info.peer_id)
+            raise
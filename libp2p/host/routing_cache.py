@@ -0,0 +1,123 @@
+import time
+from typing import (
+    Callable,
+    NamedTuple,
+    Optional,
+)
+
+from lru import (
+    LRU,
+)
+import trio
+
+from libp2p.abc import (
+    IPeerRouting,
+)
+from libp2p.peer.id import (
+    ID,
+)
+from libp2p.peer.peerinfo import (
+    PeerInfo,
+)
+from libp2p.peer.peerstore import (
+    TEMP_ADDR_TTL,
+)
+
+# Seconds a peer found is served from the cache, as long as the addresses
+# routed to are kept in the peerstore.
+ROUTING_CACHE_TTL = TEMP_ADDR_TTL
+# Seconds a peer not found is, so that it is looked up again soon.
+NEGATIVE_ROUTING_CACHE_TTL = 30
+# Peers whose routing result is cached.
+ROUTING_CACHE_SIZE = 1024
+
+
+class _CachedResult(NamedTuple):
+    expiry: float
+    peer_info: Optional[PeerInfo]
+
+
+class _Lookup:
+    """A lookup in flight, which the callers of the same peer wait for."""
+
+    done: trio.Event
+    # Whether the lookup completed, rather than failed or was cancelled.
+    completed: bool
+    peer_info: Optional[PeerInfo]
+
+    def __init__(self) -> None:
+        self.done = trio.Event()
+        self.completed = False
+        self.peer_info = None
+
+
+class CachedPeerRouting(IPeerRouting):
+    """
+    Peer routing which serves the results of ``router`` from an LRU cache,
+    peers not found included for a shorter time, and runs concurrent lookups
+    of the same peer only once.
+    """
+
+    router: IPeerRouting
+    ttl: float
+    negative_ttl: float
+    _clock: Callable[[], float]
+    _cache: "LRU[ID, _CachedResult]"
+    _lookups: dict[ID, _Lookup]
+
+    def __init__(
+        self,
+        router: IPeerRouting,
+        ttl: float = ROUTING_CACHE_TTL,
+        negative_ttl: float = NEGATIVE_ROUTING_CACHE_TTL,
+        size: int = ROUTING_CACHE_SIZE,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """
+        :param router: routing the lookups are made with
+        :param ttl: seconds a peer found is served from the cache
+        :param negative_ttl: seconds a peer not found is served from the cache
+        :param size: peers whose result is cached
+        :param clock: seconds from an arbitrary point, that results expire by
+        """
+        self.router = router
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self._clock = clock
+        self._cache = LRU(size)
+        self._lookups = {}
+
+    async def find_peer(self, peer_id: ID) -> Optional[PeerInfo]:
+        while True:
+            cached = self._cache.get(peer_id)
+            if cached is not None:
+                if cached.expiry > self._clock():
+                    await trio.lowlevel.checkpoint()
+                    return cached.peer_info
+                del self._cache[peer_id]
+
+            lookup = self._lookups.get(peer_id)
+            if lookup is None:
+                return await self._lookup(peer_id)
+            await lookup.done.wait()
+            if lookup.completed:
+                return lookup.peer_info
+            # The caller which looked the peer up failed, or was cancelled.
+
+    async def _lookup(self, peer_id: ID) -> Optional[PeerInfo]:
+        lookup = self._lookups[peer_id] = _Lookup()
+        try:
+            peer_info = await self.router.find_peer(peer_id)
+            lookup.peer_info = peer_info
+            lookup.completed = True
+            ttl = self.ttl if peer_info else self.negative_ttl
+            self._cache[peer_id] = _CachedResult(self._clock() + ttl, peer_info)
+            return peer_info
+        finally:
+            del self._lookups[peer_id]
+            lookup.done.set()
+
+    def invalidate(self, peer_id: ID) -> None:
+        """Drop the result cached for the peer, e.g. once it proved stale."""
+        if peer_id in self._cache:
+            del self._cache[peer_id]
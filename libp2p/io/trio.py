@@ -11,15 +11,23 @@ from libp2p.io.exceptions import (
 
 logger = logging.getLogger("libp2p.io.trio")
 
+# Same as the default of `trio.SocketStream.receive_some`.
+DEFAULT_READ_SIZE = 65536
+
 
 class TrioTCPStream(ReadWriteCloser):
     stream: trio.SocketStream
     # NOTE: Add both read and write lock to avoid `trio.BusyResourceError`
     read_lock: trio.Lock
     write_lock: trio.Lock
+    # Largest chunk returned by `read` when no size is given.
+    read_size: int
 
-    def __init__(self, stream: trio.SocketStream) -> None:
+    def __init__(
+        self, stream: trio.SocketStream, read_size: int = DEFAULT_READ_SIZE
+    ) -> None:
         self.stream = stream
+        self.read_size = read_size
         self.read_lock = trio.Lock()
         self.write_lock = trio.Lock()
 
@@ -36,7 +44,9 @@ class TrioTCPStream(ReadWriteCloser):
             if n is not None and n == 0:
                 return b""
             try:
-                return await self.stream.receive_some(n)
+                return await self.stream.receive_some(
+                    self.read_size if n is None else n
+                )
             except (trio.ClosedResourceError, trio.BrokenResourceError) as error:
                 raise IOException from error
 
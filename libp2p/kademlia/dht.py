@@ -0,0 +1,508 @@
+from collections.abc import (
+    AsyncIterator,
+    Sequence,
+)
+import logging
+import math
+from typing import (
+    Optional,
+)
+
+from google.protobuf.message import (
+    DecodeError,
+)
+from multiaddr import (
+    Multiaddr,
+)
+import trio
+
+from libp2p.abc import (
+    IContentRouting,
+    IHost,
+    INetStream,
+    IPeerRouting,
+)
+from libp2p.custom_types import (
+    TProtocol,
+)
+from libp2p.exceptions import (
+    BaseLibp2pError,
+)
+from libp2p.identity.identify.pb.identify_pb2 import (
+    Identify,
+)
+from libp2p.identity.identify.protocol import ID as IdentifyID
+from libp2p.peer.id import (
+    ID,
+)
+from libp2p.peer.peerinfo import (
+    PeerInfo,
+)
+from libp2p.peer.peerstore import (
+    CONNECTED_ADDR_TTL,
+    TEMP_ADDR_TTL,
+    PeerStoreError,
+)
+from libp2p.tools.async_service import (
+    Service,
+)
+from libp2p.utils import (
+    encode_varint_prefixed,
+    read_varint_prefixed_bytes,
+)
+
+from .lookup import (
+    ALPHA,
+    find_closest_peers,
+)
+from .pb.kademlia_pb2 import (
+    Message,
+)
+from .providers import (
+    CLEANUP_INTERVAL,
+    PROVIDER_ADDR_TTL,
+    REPUBLISH_INTERVAL,
+    ProviderStore,
+)
+from .routing_table import (
+    BUCKET_SIZE,
+    RoutingTable,
+    key_of,
+)
+
+PROTOCOL_ID = TProtocol("/ipfs/kad/1.0.0")
+# Seconds a peer has to answer a query, the stream opened included.
+QUERY_TIMEOUT = 10.0
+# Seconds after which a bucket no lookup went through is refreshed.
+REFRESH_INTERVAL = 10 * 60
+
+logger = logging.getLogger("libp2p.kademlia")
+
+
+class KadDHT(Service, IPeerRouting, IContentRouting):
+    """
+    Kademlia DHT over ``/ipfs/kad/1.0.0``, routing peers with iterative
+    ``FIND_NODE`` lookups and content with ``ADD_PROVIDER`` and
+    ``GET_PROVIDERS``. Peers are added to the routing table once they
+    answered a query, or sent one and their listen addresses are known, and
+    their addresses to the peerstore of the host.
+
+    Reference: https://github.com/libp2p/specs/tree/master/kad-dht
+    """
+
+    host: IHost
+    routing_table: RoutingTable
+    bucket_size: int
+    alpha: int
+    query_timeout: float
+    refresh_interval: float
+    providers: ProviderStore
+    # Keys we provide, republished until we stop.
+    _provided: set[bytes]
+
+    def __init__(
+        self,
+        host: IHost,
+        bucket_size: int = BUCKET_SIZE,
+        alpha: int = ALPHA,
+        query_timeout: float = QUERY_TIMEOUT,
+        refresh_interval: float = REFRESH_INTERVAL,
+        providers: ProviderStore = None,
+    ) -> None:
+        """
+        :param host: host the DHT speaks through
+        :param bucket_size: peers per bucket, and peers a lookup converges to
+        :param alpha: queries each lookup keeps in flight
+        :param query_timeout: seconds a peer has to answer a query
+        :param refresh_interval: seconds after which a bucket no lookup went
+            through is refreshed with a lookup of a random key in it
+        :param providers: where provider records are stored, a temporary
+            file by default
+        """
+        self.host = host
+        self.bucket_size = bucket_size
+        self.alpha = alpha
+        self.query_timeout = query_timeout
+        self.refresh_interval = refresh_interval
+        self.routing_table = RoutingTable(host.get_id(), bucket_size)
+        self.providers = providers if providers is not None else ProviderStore()
+        self._provided = set()
+        self.host.set_stream_handler(PROTOCOL_ID, self._handle_stream)
+
+    async def run(self) -> None:
+        # The peers known to speak the protocol, e.g. from a persistent
+        # peerstore, until they fail to answer.
+        for peer_id in self.host.get_peerstore().peers_supporting(PROTOCOL_ID):
+            self.routing_table.add_peer(peer_id)
+        self.manager.run_daemon_task(self._refresh_buckets)
+        self.manager.run_daemon_task(self._republish)
+        self.manager.run_daemon_task(self._cleanup_providers)
+        await self.manager.wait_finished()
+
+    async def bootstrap(self, peers: Sequence[PeerInfo]) -> None:
+        """
+        Join the DHT through ``peers``, looking up our own ID through them to
+        fill the routing table with the peers closest to us.
+        """
+        peerstore = self.host.get_peerstore()
+        for peer_info in peers:
+            peerstore.add_addrs(peer_info.peer_id, peer_info.addrs, TEMP_ADDR_TTL)
+        await self._lookup(
+            self.host.get_id().to_bytes(),
+            [peer_info.peer_id for peer_info in peers],
+        )
+
+    async def find_closest_peers(self, key: bytes) -> list[ID]:
+        """
+        :return: the peers of the DHT closest to ``key``, the closest first
+        """
+        return await self._lookup(key)
+
+    async def find_peer(self, peer_id: ID) -> Optional[PeerInfo]:
+        """
+        :return: the addresses of the peer, from the peerstore if known or
+            else from a lookup stopped as soon as a peer returns the peer,
+            ``None`` if it was not found
+        """
+        addrs = self._addrs(peer_id)
+        if addrs:
+            return PeerInfo(peer_id, addrs)
+        key = peer_id.to_bytes()
+        with trio.CancelScope() as lookup_scope:
+
+            async def query(remote_peer_id: ID) -> Optional[list[ID]]:
+                closer_peers = await self._find_node(key, remote_peer_id)
+                if closer_peers is not None and (
+                    remote_peer_id == peer_id or peer_id in closer_peers
+                ):
+                    lookup_scope.cancel()
+                return closer_peers
+
+            await find_closest_peers(
+                peer_id.xor_id,
+                self.routing_table.nearest(peer_id.xor_id, self.bucket_size),
+                query,
+                self.bucket_size,
+                self.alpha,
+            )
+        addrs = self._addrs(peer_id)
+        if not addrs:
+            return None
+        return PeerInfo(peer_id, addrs)
+
+    async def provide(self, cid: bytes, announce: bool = True) -> None:
+        """
+        Provide ``cid``, and keep providing it: the record is republished every
+        ``REPUBLISH_INTERVAL``.
+
+        :param announce: whether to add the record to the peers closest to
+            ``cid`` rather than only to our own store
+        """
+        self.providers.add_provider(cid, self.host.get_id(), limited=False)
+        self._provided.add(cid)
+        if not announce:
+            return
+        request = Message(
+            type=Message.ADD_PROVIDER,
+            key=cid,
+            providerPeers=self._write_peers([self.host.get_id()]),
+        )
+        closest = await self._lookup(cid)
+        async with trio.open_nursery() as nursery:
+            for peer_id in closest:
+                nursery.start_soon(self._send, peer_id, request)
+
+    async def find_provider_iter(
+        self, cid: bytes, count: int
+    ) -> AsyncIterator[PeerInfo]:
+        """
+        Yield up to ``count`` providers of ``cid``, ours first and then those
+        of the peers on the way to the closest to ``cid``, as their answers
+        arrive. The lookup stops once enough providers were found, or when the
+        iteration is stopped.
+        """
+        send_channel, receive_channel = trio.open_memory_channel[PeerInfo](math.inf)
+        lookup_scope = trio.CancelScope()
+        self.manager.run_task(
+            self._find_providers, cid, count, send_channel, lookup_scope
+        )
+        try:
+            async with receive_channel:
+                async for peer_info in receive_channel:
+                    yield peer_info
+        finally:
+            lookup_scope.cancel()
+
+    async def _find_providers(
+        self,
+        cid: bytes,
+        count: int,
+        send_channel: "trio.MemorySendChannel[PeerInfo]",
+        lookup_scope: trio.CancelScope,
+    ) -> None:
+        found: set[ID] = set()
+
+        def add_providers(provider_ids: Sequence[ID]) -> None:
+            for provider_id in provider_ids:
+                if len(found) >= count:
+                    lookup_scope.cancel()
+                    return
+                if provider_id in found:
+                    continue
+                found.add(provider_id)
+                try:
+                    send_channel.send_nowait(
+                        PeerInfo(provider_id, self._addrs(provider_id))
+                    )
+                except trio.BrokenResourceError:
+                    # Nobody is iterating anymore.
+                    lookup_scope.cancel()
+                    return
+            if len(found) >= count:
+                lookup_scope.cancel()
+
+        async def query(peer_id: ID) -> Optional[list[ID]]:
+            response = await self._query(
+                peer_id, Message(type=Message.GET_PROVIDERS, key=cid)
+            )
+            if response is None:
+                return None
+            add_providers(self._read_peers(response.providerPeers, PROVIDER_ADDR_TTL))
+            return self._read_peers(response.closerPeers)
+
+        with send_channel, lookup_scope:
+            add_providers(self.providers.get_providers(cid))
+            target = key_of(cid)
+            await find_closest_peers(
+                target,
+                self.routing_table.nearest(target, self.bucket_size),
+                query,
+                self.bucket_size,
+                self.alpha,
+            )
+
+    async def _lookup(self, key: bytes, seeds: Sequence[ID] = ()) -> list[ID]:
+        target = key_of(key)
+
+        async def query(peer_id: ID) -> Optional[list[ID]]:
+            return await self._find_node(key, peer_id)
+
+        result = await find_closest_peers(
+            target,
+            [*seeds, *self.routing_table.nearest(target, self.bucket_size)],
+            query,
+            self.bucket_size,
+            self.alpha,
+        )
+        self.routing_table.mark_refreshed(target)
+        logger.debug(
+            "lookup queried %d peers over %d hops", result.queried, result.hops
+        )
+        return result.peers
+
+    async def _refresh_buckets(self) -> None:
+        while True:
+            await trio.sleep(self.refresh_interval)
+            for cpl in self.routing_table.stale_buckets(self.refresh_interval):
+                await self._lookup(self.routing_table.random_key(cpl))
+
+    async def _republish(self) -> None:
+        while True:
+            await trio.sleep(REPUBLISH_INTERVAL)
+            for cid in list(self._provided):
+                await self.provide(cid)
+
+    async def _cleanup_providers(self) -> None:
+        while True:
+            await trio.sleep(CLEANUP_INTERVAL)
+            removed = self.providers.remove_expired()
+            logger.debug("removed %d expired provider records", removed)
+
+    def _addrs(self, peer_id: ID) -> Sequence[Multiaddr]:
+        if peer_id == self.host.get_id():
+            return self.host.get_addrs()
+        try:
+            return self.host.get_peerstore().addrs(peer_id)
+        except PeerStoreError:
+            return []
+
+    def _peer_seen(self, peer_id: ID) -> None:
+        self.routing_table.add_peer(peer_id)
+        self.host.get_peerstore().add_protocols(peer_id, [PROTOCOL_ID])
+
+    async def _request(self, peer_id: ID, request: Message) -> Message:
+        """
+        :return: the answer of the peer to ``request``
+        :raise BaseLibp2pError: if the peer cannot be reached or resets
+        :raise trio.TooSlowError: if the peer does not answer in time
+        :raise DecodeError: if the answer is malformed
+        """
+        with trio.fail_after(self.query_timeout):
+            stream = await self.host.new_stream(peer_id, [PROTOCOL_ID])
+            try:
+                await stream.write(encode_varint_prefixed(request.SerializeToString()))
+                response = Message.FromString(await read_varint_prefixed_bytes(stream))
+            except BaseException:
+                # Even if cancelled, e.g. by a lookup which found its peer.
+                with trio.CancelScope(shield=True):
+                    await stream.reset()
+                raise
+        await stream.close()
+        return response
+
+    async def _query(self, peer_id: ID, request: Message) -> Optional[Message]:
+        """
+        :return: the answer of the peer to ``request``, ``None`` if it did
+            not answer, in which case it is dropped from the routing table
+        """
+        try:
+            response = await self._request(peer_id, request)
+        except (BaseLibp2pError, trio.TooSlowError, DecodeError) as error:
+            logger.debug("request %d to %s failed: %s", request.type, peer_id, error)
+            self.routing_table.remove_peer(peer_id)
+            return None
+        self._peer_seen(peer_id)
+        return response
+
+    async def _send(self, peer_id: ID, request: Message) -> None:
+        """Send ``request``, which is not answered, to the peer."""
+        try:
+            with trio.fail_after(self.query_timeout):
+                stream = await self.host.new_stream(peer_id, [PROTOCOL_ID])
+                await stream.write(encode_varint_prefixed(request.SerializeToString()))
+                await stream.close()
+        except (BaseLibp2pError, trio.TooSlowError) as error:
+            logger.debug("request %d to %s failed: %s", request.type, peer_id, error)
+
+    async def _find_node(self, key: bytes, peer_id: ID) -> Optional[list[ID]]:
+        """
+        Ask the peer for the peers it knows closest to ``key``, and add their
+        addresses to the peerstore.
+
+        :return: the peers returned, ``None`` if the peer did not answer
+        """
+        response = await self._query(peer_id, Message(type=Message.FIND_NODE, key=key))
+        if response is None:
+            return None
+        return self._read_peers(response.closerPeers)
+
+    def _read_peers(
+        self, peers: Sequence[Message.Peer], ttl: int = TEMP_ADDR_TTL
+    ) -> list[ID]:
+        peerstore = self.host.get_peerstore()
+        local_id = self.host.get_id()
+        peer_ids = []
+        for peer in peers:
+            try:
+                peer_id = ID(peer.id)
+                addrs = [Multiaddr(addr) for addr in peer.addrs]
+            except ValueError as error:
+                logger.debug("dropped malformed peer: %s", error)
+                continue
+            if not peer.id or peer_id == local_id:
+                continue
+            if addrs:
+                peerstore.add_addrs(peer_id, addrs, ttl)
+            peer_ids.append(peer_id)
+        return peer_ids
+
+    def _write_peers(self, peer_ids: Sequence[ID]) -> list[Message.Peer]:
+        connections = self.host.get_network().connections
+        return [
+            Message.Peer(
+                id=peer_id.to_bytes(),
+                addrs=[addr.to_bytes() for addr in self._addrs(peer_id)],
+                connection=(
+                    Message.CONNECTED
+                    if peer_id in connections
+                    else Message.NOT_CONNECTED
+                ),
+            )
+            for peer_id in peer_ids
+        ]
+
+    def _add_providers(self, peer_id: ID, request: Message) -> None:
+        """
+        Store the provider record of an ``ADD_PROVIDER`` request. Peers only
+        add themselves as providers.
+        """
+        for provider in request.providerPeers:
+            if provider.id != peer_id.to_bytes():
+                logger.debug("%s tried to add another provider", peer_id)
+                continue
+            if not self.providers.add_provider(request.key, peer_id):
+                logger.debug("refused a provider record of %s over limits", peer_id)
+                continue
+            self._read_peers([provider], PROVIDER_ADDR_TTL)
+
+    def _handle_request(self, peer_id: ID, request: Message) -> Optional[Message]:
+        """
+        :return: the answer to ``request``, ``None`` if it is not supported
+        """
+        if request.type in (Message.FIND_NODE, Message.GET_PROVIDERS):
+            closest = self.routing_table.nearest(
+                key_of(request.key), self.bucket_size + 1
+            )
+            closer_peers = [p for p in closest if p != peer_id][: self.bucket_size]
+            response = Message(
+                type=request.type,
+                key=request.key,
+                closerPeers=self._write_peers(closer_peers),
+            )
+            if request.type == Message.GET_PROVIDERS:
+                response.providerPeers.extend(
+                    self._write_peers(self.providers.get_providers(request.key))
+                )
+            return response
+        if request.type == Message.PING:
+            return Message(type=Message.PING)
+        return None
+
+    async def _handle_stream(self, stream: INetStream) -> None:
+        peer_id = stream.muxed_conn.peer_id
+        try:
+            with trio.fail_after(self.query_timeout):
+                request = Message.FromString(await read_varint_prefixed_bytes(stream))
+                if request.type == Message.ADD_PROVIDER:
+                    # Not answered.
+                    self._add_providers(peer_id, request)
+                else:
+                    response = self._handle_request(peer_id, request)
+                    if response is None:
+                        logger.debug(
+                            "unsupported request %d from %s", request.type, peer_id
+                        )
+                        await stream.reset()
+                        return
+                    await stream.write(
+                        encode_varint_prefixed(response.SerializeToString())
+                    )
+        except (BaseLibp2pError, trio.TooSlowError, DecodeError) as error:
+            logger.debug("failed to answer %s: %s", peer_id, error)
+            await stream.reset()
+            return
+        await stream.close()
+        # Only peers others can dial are worth returning to them.
+        if self._addrs(peer_id) or await self._identify(peer_id):
+            self._peer_seen(peer_id)
+
+    async def _identify(self, peer_id: ID) -> bool:
+        """
+        Ask a peer which connected to us for its listen addresses, and add
+        them to the peerstore.
+
+        :return: whether the peer has listen addresses
+        """
+        try:
+            with trio.fail_after(self.query_timeout):
+                stream = await self.host.new_stream(peer_id, [IdentifyID])
+                # Until the end of the stream, which the answer is closed with.
+                identify = Identify.FromString(await stream.read())
+            addrs = [Multiaddr(addr) for addr in identify.listen_addrs]
+        except (BaseLibp2pError, trio.TooSlowError, DecodeError, ValueError) as error:
+            logger.debug("failed to identify %s: %s", peer_id, error)
+            return False
+        await stream.close()
+        # Until the peer disconnects, as for the addresses dialed.
+        self.host.get_peerstore().add_addrs(peer_id, addrs, CONNECTED_ADDR_TTL)
+        return bool(addrs)
@@ -0,0 +1,109 @@
+from collections.abc import (
+    Awaitable,
+    Iterable,
+    Sequence,
+)
+import heapq
+import math
+from typing import (
+    Callable,
+    NamedTuple,
+    Optional,
+)
+
+import trio
+
+from libp2p.peer.id import (
+    ID,
+)
+
+from .routing_table import (
+    BUCKET_SIZE,
+)
+
+# Queries a lookup keeps in flight.
+ALPHA = 3
+
+# Asks a peer for the peers it knows closest to the key looked up, ``None`` if
+# it did not answer.
+QueryFn = Callable[[ID], Awaitable[Optional[Sequence[ID]]]]
+
+
+class LookupResult(NamedTuple):
+    # The peers closest to the key which answered, the closest first.
+    peers: list[ID]
+    # Peers queried, whether they answered or not.
+    queried: int
+    # Longest chain of answers the lookup followed to its result.
+    hops: int
+
+
+async def find_closest_peers(
+    key: int,
+    seeds: Iterable[ID],
+    query: QueryFn,
+    count: int = BUCKET_SIZE,
+    alpha: int = ALPHA,
+) -> LookupResult:
+    """
+    Iterative Kademlia lookup: query the closest peers known to ``key``, at
+    most ``alpha`` at a time, learn closer ones from their answers, and stop
+    once the ``count`` closest peers which answered have no unqueried peer
+    closer than them.
+
+    :param key: position looked up in the keyspace
+    :param seeds: peers to start from, usually the closest of the routing table
+    :param query: asks a peer for the peers it knows closest to ``key``
+    :param count: peers to find
+    :param alpha: queries to keep in flight
+    """
+    # Peers learned but not queried yet, by distance.
+    candidates: list[tuple[int, ID]] = []
+    # Answers followed to learn of each peer.
+    depths: dict[ID, int] = {}
+    for peer_id in seeds:
+        if peer_id not in depths:
+            depths[peer_id] = 1
+            heapq.heappush(candidates, (peer_id.xor_id ^ key, peer_id))
+    # The `count` closest peers which answered, the furthest first.
+    closest: list[tuple[int, ID]] = []
+    queried = 0
+    hops = 0
+    in_flight = 0
+    send_channel, receive_channel = trio.open_memory_channel[
+        tuple[ID, Optional[Sequence[ID]]]
+    ](math.inf)
+
+    async def query_peer(peer_id: ID) -> None:
+        await send_channel.send((peer_id, await query(peer_id)))
+
+    async with trio.open_nursery() as nursery:
+        while True:
+            while in_flight < alpha and candidates:
+                distance, peer_id = candidates[0]
+                if len(closest) >= count and distance > -closest[0][0]:
+                    break
+                heapq.heappop(candidates)
+                in_flight += 1
+                queried += 1
+                nursery.start_soon(query_peer, peer_id)
+            if in_flight == 0:
+                break
+            peer_id, closer_peers = await receive_channel.receive()
+            in_flight -= 1
+            if closer_peers is None:
+                continue
+            entry = (-(peer_id.xor_id ^ key), peer_id)
+            if len(closest) < count:
+                heapq.heappush(closest, entry)
+            elif entry > closest[0]:
+                heapq.heapreplace(closest, entry)
+            depth = depths[peer_id]
+            hops = max(hops, depth)
+            for closer_peer in closer_peers:
+                if closer_peer not in depths:
+                    depths[closer_peer] = depth + 1
+                    heapq.heappush(candidates, (closer_peer.xor_id ^ key, closer_peer))
+
+    peers = [peer_id for _, peer_id in sorted(closest, reverse=True)]
+    return LookupResult(peers, queried, hops)
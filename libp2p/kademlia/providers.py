@@ -0,0 +1,194 @@
+import sqlite3
+import time
+from typing import (
+    Callable,
+)
+
+from lru import (
+    LRU,
+)
+
+from libp2p.peer.id import (
+    ID,
+)
+
+# Seconds a provider record is valid for, unless republished.
+PROVIDE_VALIDITY = 48 * 60 * 60
+# Seconds between republishes of what we provide, well within the validity.
+REPUBLISH_INTERVAL = 22 * 60 * 60
+# Seconds between sweeps of the expired records.
+CLEANUP_INTERVAL = 60 * 60
+# Seconds the addresses of providers are kept for.
+PROVIDER_ADDR_TTL = 30 * 60
+# Keys whose providers are kept in memory.
+DEFAULT_CACHE_SIZE = 256
+# Records written before they are committed.
+DEFAULT_BATCH_SIZE = 1000
+# Unexpired records kept for a key, and for a peer, beyond which new ones are
+# refused, so that no peer can fill the store.
+DEFAULT_MAX_PROVIDERS_PER_KEY = 100
+DEFAULT_MAX_KEYS_PER_PEER = 10_000
+
+_SCHEMA = (
+    """
+    CREATE TABLE IF NOT EXISTS providers (
+        key BLOB NOT NULL,
+        peer_id BLOB NOT NULL,
+        expiry REAL NOT NULL,
+        PRIMARY KEY (key, peer_id)
+    ) WITHOUT ROWID
+    """,
+    "CREATE INDEX IF NOT EXISTS providers_expiry ON providers (expiry)",
+    "CREATE INDEX IF NOT EXISTS providers_peer ON providers (peer_id, expiry)",
+)
+
+
+class ProviderStore:
+    """
+    Provider records: which peers provide the content of each key, until when.
+
+    Records are kept in a SQLite database on disk, so that millions of them
+    do not have to fit in memory: in a temporary file deleted on ``close`` by
+    default. ``":memory:"`` keeps them in memory instead, without bound. The
+    providers of the keys looked up the most recently are cached in memory as
+    well.
+
+    Records past ``max_providers_per_key`` or ``max_keys_per_peer`` are
+    refused, unless they renew an existing record.
+    """
+
+    _db: sqlite3.Connection
+    _clock: Callable[[], float]
+    validity: float
+    batch_size: int
+    max_providers_per_key: int
+    max_keys_per_peer: int
+    # Unexpired and expired providers of the hot keys, with their expiry.
+    _cache: "LRU[bytes, dict[ID, float]]"
+    # Records written since the last commit.
+    _pending: int
+
+    def __init__(
+        self,
+        path: str = "",
+        clock: Callable[[], float] = time.time,
+        validity: float = PROVIDE_VALIDITY,
+        cache_size: int = DEFAULT_CACHE_SIZE,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        max_providers_per_key: int = DEFAULT_MAX_PROVIDERS_PER_KEY,
+        max_keys_per_peer: int = DEFAULT_MAX_KEYS_PER_PEER,
+    ) -> None:
+        """
+        :param path: the database file, created if it does not exist, a
+            temporary file by default
+        :param clock: seconds since the epoch, that records expire by
+        :param validity: seconds a record is valid for
+        :param cache_size: keys whose providers are cached in memory
+        :param batch_size: records written before they are committed
+        :param max_providers_per_key: unexpired records kept for a key
+        :param max_keys_per_peer: unexpired records kept for a peer
+        """
+        self._clock = clock
+        self.validity = validity
+        self.batch_size = batch_size
+        self.max_providers_per_key = max_providers_per_key
+        self.max_keys_per_peer = max_keys_per_peer
+        self._cache = LRU(cache_size)
+        self._pending = 0
+        # SQLite makes an empty path a temporary file, which only pages out of
+        # its cache are written to.
+        self._db = sqlite3.connect(path)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        for statement in _SCHEMA:
+            self._db.execute(statement)
+        self._db.commit()
+
+    def add_provider(self, key: bytes, peer_id: ID, limited: bool = True) -> bool:
+        """
+        Record that the peer provides ``key``, or that it still does.
+
+        :param limited: whether the record counts against the limits, which
+            our own records should not
+        :return: False if the record was refused for being over a limit
+        """
+        now = self._clock()
+        if limited and self._over_limits(key, peer_id.to_bytes(), now):
+            return False
+        expiry = now + self.validity
+        self._db.execute(
+            "INSERT OR REPLACE INTO providers VALUES (?, ?, ?)",
+            (key, peer_id.to_bytes(), expiry),
+        )
+        providers = self._cache.get(key)
+        if providers is not None:
+            providers[peer_id] = expiry
+        self._pending += 1
+        if self._pending >= self.batch_size:
+            self.flush()
+        return True
+
+    def _over_limits(self, key: bytes, peer_id: bytes, now: float) -> bool:
+        if self._db.execute(
+            "SELECT 1 FROM providers WHERE key = ? AND peer_id = ? AND expiry > ?",
+            (key, peer_id, now),
+        ).fetchone():
+            # Renewing a record does not add one.
+            return False
+        (key_records,) = self._db.execute(
+            "SELECT COUNT(*) FROM providers WHERE key = ? AND expiry > ?", (key, now)
+        ).fetchone()
+        if key_records >= self.max_providers_per_key:
+            return True
+        (peer_records,) = self._db.execute(
+            "SELECT COUNT(*) FROM providers WHERE peer_id = ? AND expiry > ?",
+            (peer_id, now),
+        ).fetchone()
+        return peer_records >= self.max_keys_per_peer
+
+    def get_providers(self, key: bytes) -> list[ID]:
+        """
+        :return: the peers providing ``key`` whose record has not expired
+        """
+        now = self._clock()
+        providers = self._cache.get(key)
+        if providers is None:
+            rows = self._db.execute(
+                "SELECT peer_id, expiry FROM providers WHERE key = ? AND expiry > ?",
+                (key, now),
+            )
+            providers = {ID(peer_id): expiry for peer_id, expiry in rows}
+            # Keys without providers too, lookups of them are as frequent.
+            self._cache[key] = providers
+        return [peer_id for peer_id, expiry in providers.items() if expiry > now]
+
+    def remove_expired(self) -> int:
+        """
+        Drop the expired records.
+
+        :return: the number of records dropped
+        """
+        now = self._clock()
+        removed = self._db.execute(
+            "DELETE FROM providers WHERE expiry <= ?", (now,)
+        ).rowcount
+        for providers in self._cache.values():
+            for peer_id, expiry in list(providers.items()):
+                if expiry <= now:
+                    del providers[peer_id]
+        self.flush()
+        return removed
+
+    def count(self) -> int:
+        """:return: the number of records, expired ones not swept yet included"""
+        return self._db.execute("SELECT COUNT(*) FROM providers").fetchone()[0]
+
+    def flush(self) -> None:
+        """Commit the records written since the last commit."""
+        self._db.commit()
+        self._pending = 0
+
+    def close(self) -> None:
+        """Commit the pending records and close the database."""
+        self.flush()
+        self._db.close()
@@ -0,0 +1,158 @@
+import heapq
+import secrets
+import time
+from typing import (
+    Callable,
+)
+
+from libp2p.peer.id import (
+    ID,
+    sha256_digest,
+)
+
+# Peers per bucket, and peers a lookup converges to.
+BUCKET_SIZE = 20
+# Bits of the keyspace, that of SHA-256.
+KEY_BITS = 256
+# Buckets further than this are too unlikely to hold anyone to be refreshed,
+# finding a key in them takes `2 ** (cpl + 1)` hashes on average.
+MAX_REFRESH_CPL = 15
+
+
+def key_of(key: bytes) -> int:
+    """
+    :return: position of ``key`` in the keyspace, as `ID.xor_id` for the bytes
+        of a peer ID
+    """
+    return int.from_bytes(sha256_digest(key), "big")
+
+
+def common_prefix_length(key_1: int, key_2: int) -> int:
+    """
+    :return: leading bits ``key_1`` and ``key_2`` have in common
+    """
+    return KEY_BITS - (key_1 ^ key_2).bit_length()
+
+
+class RoutingTable:
+    """
+    k-bucket routing table: the peers known, by the length of the prefix
+    their key shares with ours, at most ``bucket_size`` of each length. Each
+    bucket keeps the peers seen least recently first.
+
+    Long-lived peers are the most likely to stay, so a full bucket keeps its
+    peers rather than taking newcomers, until one of them fails to answer.
+    """
+
+    local_id: ID
+    local_key: int
+    bucket_size: int
+    _clock: Callable[[], float]
+    # When each peer was last seen, by common prefix length. Buckets are
+    # created on first use, most of them stay empty.
+    _buckets: dict[int, dict[ID, float]]
+    # When a lookup last went through each bucket.
+    _refreshed_at: dict[int, float]
+    _created_at: float
+
+    def __init__(
+        self,
+        local_id: ID,
+        bucket_size: int = BUCKET_SIZE,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """
+        :param local_id: peer ID of the node the table is of
+        :param bucket_size: the k of k-buckets
+        :param clock: seconds from an arbitrary point, refreshes are timed by
+        """
+        self.local_id = local_id
+        self.local_key = local_id.xor_id
+        self.bucket_size = bucket_size
+        self._clock = clock
+        self._buckets = {}
+        self._refreshed_at = {}
+        self._created_at = clock()
+
+    def __len__(self) -> int:
+        return sum(len(bucket) for bucket in self._buckets.values())
+
+    def __contains__(self, peer_id: object) -> bool:
+        if not isinstance(peer_id, ID):
+            return False
+        bucket = self._buckets.get(self._cpl(peer_id.xor_id))
+        return bucket is not None and peer_id in bucket
+
+    def _cpl(self, key: int) -> int:
+        return min(common_prefix_length(self.local_key, key), KEY_BITS - 1)
+
+    def add_peer(self, peer_id: ID) -> bool:
+        """
+        Add a peer which answered, or mark it as seen if it is known already.
+
+        :return: whether the peer is in the table, it is not if its bucket is
+            full
+        """
+        if peer_id == self.local_id:
+            return False
+        cpl = self._cpl(peer_id.xor_id)
+        bucket = self._buckets.setdefault(cpl, {})
+        if peer_id in bucket:
+            # Moved to the end, as the peer seen the most recently.
+            del bucket[peer_id]
+        elif len(bucket) >= self.bucket_size:
+            return False
+        bucket[peer_id] = self._clock()
+        return True
+
+    def remove_peer(self, peer_id: ID) -> None:
+        """Remove a peer, e.g. once it failed to answer."""
+        cpl = self._cpl(peer_id.xor_id)
+        bucket = self._buckets.get(cpl)
+        if bucket is not None:
+            bucket.pop(peer_id, None)
+
+    def peers(self) -> list[ID]:
+        return [peer_id for bucket in self._buckets.values() for peer_id in bucket]
+
+    def bucket(self, cpl: int) -> list[ID]:
+        """
+        :return: the peers whose key shares ``cpl`` leading bits with ours,
+            the least recently seen first
+        """
+        return list(self._buckets.get(cpl, ()))
+
+    def nearest(self, key: int, count: int) -> list[ID]:
+        """
+        :return: the ``count`` peers closest to ``key``, the closest first
+        """
+        return heapq.nsmallest(
+            count, self.peers(), key=lambda peer_id: peer_id.xor_id ^ key
+        )
+
+    def mark_refreshed(self, key: int) -> None:
+        """Record that a lookup of ``key`` went through its bucket."""
+        self._refreshed_at[self._cpl(key)] = self._clock()
+
+    def stale_buckets(self, max_age: float) -> list[int]:
+        """
+        :return: the common prefix lengths of the buckets no lookup went
+            through for ``max_age``, up to the deepest bucket holding peers
+        """
+        deepest = max((cpl for cpl, b in self._buckets.items() if b), default=0)
+        now = self._clock()
+        return [
+            cpl
+            for cpl in range(min(deepest, MAX_REFRESH_CPL) + 1)
+            if now - self._refreshed_at.get(cpl, self._created_at) >= max_age
+        ]
+
+    def random_key(self, cpl: int) -> bytes:
+        """
+        :return: random bytes whose key shares ``cpl`` leading bits with ours,
+            to look up to refresh that bucket
+        """
+        while True:
+            key = secrets.token_bytes(32)
+            if self._cpl(key_of(key)) == cpl:
+                return key
@@ -24,12 +24,20 @@ if TYPE_CHECKING:
 Reference: https://github.com/libp2p/go-libp2p-swarm/blob/04c86bbdafd390651cb2ee14e334f7caeedad722/swarm_conn.go  # noqa: E501
 """
 
+# Seconds stream handlers are given to wind down after their streams are reset
+# on close, before disconnection is notified.
+STREAM_HANDLER_GRACE_PERIOD = 0.1
+
 
 class SwarmConn(INetConn):
     muxed_conn: IMuxedConn
     swarm: "Swarm"
     streams: set[NetStream]
     event_closed: trio.Event
+    # `trio.current_time()` of the last stream opened or removed.
+    last_activity: float
+    _handler_tasks: set[trio.lowlevel.Task]
+    _event_handler_done: trio.Event
 
     def __init__(self, muxed_conn: IMuxedConn, swarm: "Swarm") -> None:
         self.muxed_conn = muxed_conn
@@ -37,6 +45,9 @@ class SwarmConn(INetConn):
         self.streams = set()
         self.event_closed = trio.Event()
         self.event_started = trio.Event()
+        self.last_activity = trio.current_time()
+        self._handler_tasks = set()
+        self._event_handler_done = trio.Event()
 
     @property
     def is_closed(self) -> bool:
@@ -54,15 +65,24 @@ class SwarmConn(INetConn):
         await self.muxed_conn.close()
 
         # This is just for cleaning up state. The connection has already been closed.
-        # We *could* optimize this but it really isn't worth it.
-        for stream in self.streams.copy():
-            await stream.reset()
-        # Force context switch for stream handlers to process the stream reset event we
-        # just emit before we cancel the stream handler tasks.
-        await trio.sleep(0.1)
+        async with trio.open_nursery() as nursery:
+            for stream in self.streams.copy():
+                nursery.start_soon(stream.reset)
+        await self._wait_handlers_done()
 
         await self._notify_disconnected()
 
+    async def _wait_handlers_done(self) -> None:
+        """
+        Let the stream handlers still running process the reset of their
+        streams, for at most ``STREAM_HANDLER_GRACE_PERIOD``. The handler
+        closing the connection, if any, is not waited for.
+        """
+        current_task = trio.lowlevel.current_task()
+        with trio.move_on_after(STREAM_HANDLER_GRACE_PERIOD):
+            while self._handler_tasks - {current_task}:
+                await self._event_handler_done.wait()
+
     async def _handle_new_streams(self) -> None:
         self.event_started.set()
         async with trio.open_nursery() as nursery:
@@ -78,15 +98,21 @@ class SwarmConn(INetConn):
 
     async def _handle_muxed_stream(self, muxed_stream: IMuxedStream) -> None:
         net_stream = await self._add_stream(muxed_stream)
+        task = trio.lowlevel.current_task()
+        self._handler_tasks.add(task)
         try:
             await self.swarm.common_stream_handler(net_stream)
         finally:
             # As long as `common_stream_handler`, remove the stream.
             self.remove_stream(net_stream)
+            self._handler_tasks.discard(task)
+            self._event_handler_done.set()
+            self._event_handler_done = trio.Event()
 
     async def _add_stream(self, muxed_stream: IMuxedStream) -> NetStream:
         net_stream = NetStream(muxed_stream)
         self.streams.add(net_stream)
+        self.last_activity = trio.current_time()
         await self.swarm.notify_opened_stream(net_stream)
         return net_stream
 
@@ -107,3 +133,4 @@ class SwarmConn(INetConn):
         if stream not in self.streams:
             return
         self.streams.remove(stream)
+        self.last_activity = trio.current_time()
@@ -0,0 +1,161 @@
+from collections.abc import (
+    Awaitable,
+)
+from enum import (
+    Enum,
+)
+import logging
+from typing import (
+    Callable,
+)
+
+import trio
+
+from libp2p.abc import (
+    INotifee,
+)
+from libp2p.tools.async_service import (
+    Service,
+)
+
+logger = logging.getLogger("libp2p.network.event_bus")
+
+# Ref: https://github.com/libp2p/go-libp2p/blob/master/p2p/host/eventbus/opts.go
+DEFAULT_QUEUE_SIZE = 256
+
+NotifeeEvent = Callable[[INotifee], Awaitable[None]]
+
+
+class OverflowPolicy(Enum):
+    # Wait until the subscriber catches up. The emitter is blocked meanwhile.
+    BLOCK = 0
+    # Discard the event being emitted.
+    DROP_NEWEST = 1
+    # Discard the oldest queued event to make room for the new one.
+    DROP_OLDEST = 2
+
+
+class Subscription:
+    notifee: INotifee
+    overflow_policy: OverflowPolicy
+    send_channel: "trio.MemorySendChannel[NotifeeEvent]"
+    receive_channel: "trio.MemoryReceiveChannel[NotifeeEvent]"
+    # Number of events discarded because the queue was full.
+    dropped: int
+
+    def __init__(
+        self, notifee: INotifee, queue_size: int, overflow_policy: OverflowPolicy
+    ) -> None:
+        if overflow_policy is OverflowPolicy.DROP_OLDEST and queue_size < 1:
+            # There would never be a queued event to make room by dropping.
+            raise ValueError("DROP_OLDEST needs a queue size of at least 1")
+        self.notifee = notifee
+        self.overflow_policy = overflow_policy
+        self.send_channel, self.receive_channel = trio.open_memory_channel[
+            NotifeeEvent
+        ](queue_size)
+        self.dropped = 0
+
+    @property
+    def queued(self) -> int:
+        return self.send_channel.statistics().current_buffer_used
+
+    async def put(self, event: NotifeeEvent) -> None:
+        if self.overflow_policy is OverflowPolicy.BLOCK:
+            await self.send_channel.send(event)
+            return
+        try:
+            self.send_channel.send_nowait(event)
+        except trio.WouldBlock:
+            self.dropped += 1
+            logger.warning(
+                "event queue of notifee %s is full: dropping the %s event",
+                self.notifee,
+                "newest"
+                if self.overflow_policy is OverflowPolicy.DROP_NEWEST
+                else "oldest",
+            )
+            if self.overflow_policy is OverflowPolicy.DROP_OLDEST:
+                self.receive_channel.receive_nowait()
+                self.send_channel.send_nowait(event)
+
+
+class NotifeeEventBus(Service):
+    """
+    Deliver network events to notifees without waiting for them. Each
+    notifee gets a bounded queue and a task which dispatches the queued events
+    to it one by one, so events reach a notifee in the order they are emitted
+    and a slow notifee only delays itself until its queue fills up.
+
+    The default ``OverflowPolicy.BLOCK`` never loses an event, which matters
+    for connected/disconnected events that notifees track state with. The
+    dropping policies are for notifees which can live with missing events.
+    """
+
+    queue_size: int
+    overflow_policy: OverflowPolicy
+    subscriptions: list[Subscription]
+
+    _is_dispatching: bool
+
+    def __init__(
+        self,
+        queue_size: int = DEFAULT_QUEUE_SIZE,
+        overflow_policy: OverflowPolicy = OverflowPolicy.BLOCK,
+    ) -> None:
+        """
+        :param queue_size: number of events queued for each notifee
+        :param overflow_policy: what to do when the queue of a notifee is full
+        """
+        self.queue_size = queue_size
+        self.overflow_policy = overflow_policy
+        self.subscriptions = []
+        self._is_dispatching = False
+
+    async def run(self) -> None:
+        self._is_dispatching = True
+        for subscription in self.subscriptions:
+            self.manager.run_daemon_task(self._dispatch, subscription)
+        await self.manager.wait_finished()
+
+    def subscribe(
+        self,
+        notifee: INotifee,
+        queue_size: int = None,
+        overflow_policy: OverflowPolicy = None,
+    ) -> Subscription:
+        """
+        :param notifee: notifee to deliver events to
+        :param queue_size: overrides the default queue size of the bus
+        :param overflow_policy: overrides the default overflow policy of the bus
+        """
+        subscription = Subscription(
+            notifee,
+            self.queue_size if queue_size is None else queue_size,
+            overflow_policy or self.overflow_policy,
+        )
+        self.subscriptions.append(subscription)
+        # Events emitted before the bus runs stay queued until then.
+        if self._is_dispatching:
+            self.manager.run_daemon_task(self._dispatch, subscription)
+        return subscription
+
+    async def emit(self, event: NotifeeEvent) -> None:
+        """
+        Queue ``event`` for every notifee. It only waits for a notifee if its
+        overflow policy is ``OverflowPolicy.BLOCK``.
+        """
+        for subscription in self.subscriptions:
+            await subscription.put(event)
+        await trio.lowlevel.checkpoint()
+
+    async def _dispatch(self, subscription: Subscription) -> None:
+        async for event in subscription.receive_channel:
+            try:
+                await event(subscription.notifee)
+            except Exception as error:
+                logger.warning(
+                    "notifee %s failed to handle an event: %s",
+                    subscription.notifee,
+                    error,
+                )
@@ -5,3 +5,7 @@ from libp2p.exceptions import (
 
 class SwarmException(BaseLibp2pError):
     pass
+
+
+class ConnectionGated(SwarmException):
+    pass
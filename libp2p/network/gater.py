@@ -0,0 +1,137 @@
+import ipaddress
+import logging
+from typing import (
+    Optional,
+    Union,
+)
+
+from lru import (
+    LRU,
+)
+from multiaddr import (
+    Multiaddr,
+)
+import trio
+
+from libp2p.abc import (
+    IConnectionGater,
+    IMuxedConn,
+)
+from libp2p.peer.id import (
+    ID,
+)
+from libp2p.rcmgr.limits import (
+    Direction,
+)
+
+logger = logging.getLogger("libp2p.network.gater")
+
+TIPAddress = Union[ipaddress.IPv4Address, ipaddress.IPv6Address]
+TIPNetwork = Union[ipaddress.IPv4Network, ipaddress.IPv6Network]
+
+# Number of remote IP addresses whose accept rate is tracked.
+ACCEPT_RATE_CACHE_SIZE = 4096
+
+
+def _ip_address(maddr: Multiaddr) -> Optional[TIPAddress]:
+    for protocol in maddr.protocols():
+        if protocol.name in ("ip4", "ip6"):
+            return ipaddress.ip_address(maddr.value_for_protocol(protocol.name))
+    return None
+
+
+class ConnectionGater(IConnectionGater):
+    """
+    Rejects blocked peers, IP addresses and subnets, and the remote IP
+    addresses opening connections faster than allowed. IP addresses are
+    checked when connections are accepted, before their handshake.
+    """
+
+    blocked_peers: set[ID]
+    blocked_addrs: set[TIPAddress]
+    blocked_subnets: set[TIPNetwork]
+    accept_rate: Optional[float]
+    accept_burst: int
+    # Token bucket of each remote IP address: tokens left, and when.
+    _buckets: "LRU[TIPAddress, tuple[float, float]]"
+
+    def __init__(self, accept_rate: float = None, accept_burst: int = 10) -> None:
+        """
+        :param accept_rate: inbound connections accepted per second from a
+            single IP address, unlimited if ``None``
+        :param accept_burst: inbound connections a single IP address can open
+            at once, after being idle
+        """
+        self.blocked_peers = set()
+        self.blocked_addrs = set()
+        self.blocked_subnets = set()
+        self.accept_rate = accept_rate
+        self.accept_burst = accept_burst
+        self._buckets = LRU(ACCEPT_RATE_CACHE_SIZE)
+
+    def block_peer(self, peer_id: ID) -> None:
+        self.blocked_peers.add(peer_id)
+
+    def unblock_peer(self, peer_id: ID) -> None:
+        self.blocked_peers.discard(peer_id)
+
+    def block_addr(self, ip: str) -> None:
+        """
+        :raise ValueError: if ``ip`` is not an IP address
+        """
+        self.blocked_addrs.add(ipaddress.ip_address(ip))
+
+    def unblock_addr(self, ip: str) -> None:
+        self.blocked_addrs.discard(ipaddress.ip_address(ip))
+
+    def block_subnet(self, cidr: str) -> None:
+        """
+        :param cidr: e.g. ``10.0.0.0/8``
+        :raise ValueError: if ``cidr`` is not a subnet
+        """
+        self.blocked_subnets.add(ipaddress.ip_network(cidr))
+
+    def unblock_subnet(self, cidr: str) -> None:
+        self.blocked_subnets.discard(ipaddress.ip_network(cidr))
+
+    def _is_blocked(self, maddr: Multiaddr) -> bool:
+        ip = _ip_address(maddr)
+        if ip is None:
+            return False
+        return ip in self.blocked_addrs or any(
+            ip in subnet for subnet in self.blocked_subnets
+        )
+
+    def _is_over_rate(self, maddr: Multiaddr) -> bool:
+        ip = _ip_address(maddr)
+        if self.accept_rate is None or ip is None:
+            return False
+        now = trio.current_time()
+        tokens, updated_at = self._buckets.get(ip, (self.accept_burst, now))
+        tokens = min(self.accept_burst, tokens + (now - updated_at) * self.accept_rate)
+        if tokens < 1:
+            self._buckets[ip] = (tokens, now)
+            return True
+        self._buckets[ip] = (tokens - 1, now)
+        return False
+
+    def intercept_peer_dial(self, peer_id: ID) -> bool:
+        return peer_id not in self.blocked_peers
+
+    def intercept_addr_dial(self, peer_id: ID, maddr: Multiaddr) -> bool:
+        return peer_id not in self.blocked_peers and not self._is_blocked(maddr)
+
+    def intercept_accept(self, remote_maddr: Multiaddr) -> bool:
+        if self._is_blocked(remote_maddr):
+            logger.debug("rejected connection from blocked %s", remote_maddr)
+            return False
+        if self._is_over_rate(remote_maddr):
+            logger.debug("rejected connection from %s over its rate", remote_maddr)
+            return False
+        return True
+
+    def intercept_secured(self, direction: Direction, peer_id: ID) -> bool:
+        return peer_id not in self.blocked_peers
+
+    def intercept_upgraded(self, muxed_conn: IMuxedConn) -> bool:
+        return True
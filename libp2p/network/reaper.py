@@ -0,0 +1,133 @@
+from collections.abc import (
+    Mapping,
+)
+import logging
+from typing import (
+    TYPE_CHECKING,
+    NamedTuple,
+    Optional,
+    cast,
+)
+
+import trio
+
+from libp2p.custom_types import (
+    TProtocol,
+)
+from libp2p.network.stream.net_stream import (
+    NetStream,
+)
+from libp2p.peer.id import (
+    ID,
+)
+from libp2p.tools.async_service import (
+    Service,
+)
+
+if TYPE_CHECKING:
+    from libp2p.network.connection.swarm_connection import SwarmConn  # noqa: F401
+    from libp2p.network.swarm import Swarm  # noqa: F401
+
+logger = logging.getLogger("libp2p.network.reaper")
+
+DEFAULT_SWEEP_INTERVAL = 10.0
+
+
+class IdleTimeouts(NamedTuple):
+    # Seconds without reads or writes after which a stream is reset, `None`
+    # keeps idle streams.
+    stream: Optional[float] = None
+    # Per protocol stream timeouts, which take precedence over `stream`.
+    protocols: Optional[Mapping[TProtocol, Optional[float]]] = None
+    # Seconds without any stream after which a connection is closed.
+    connection: Optional[float] = None
+    sweep_interval: float = DEFAULT_SWEEP_INTERVAL
+
+
+class ReaperStats(NamedTuple):
+    streams_reset: int
+    connections_closed: int
+
+
+class IdleReaper(Service):
+    """
+    Periodically reset the idle streams of a swarm and close its connections
+    left without streams, from the last activity recorded on them.
+    """
+
+    swarm: "Swarm"
+    timeouts: IdleTimeouts
+    # Totals since the reaper started.
+    streams_reset: int
+    connections_closed: int
+
+    def __init__(self, swarm: "Swarm", timeouts: IdleTimeouts) -> None:
+        self.swarm = swarm
+        self.timeouts = timeouts
+        self.streams_reset = 0
+        self.connections_closed = 0
+
+    def stats(self) -> ReaperStats:
+        return ReaperStats(self.streams_reset, self.connections_closed)
+
+    async def run(self) -> None:
+        while True:
+            await trio.sleep(self.timeouts.sweep_interval)
+            await self.sweep()
+
+    def _stream_timeout(self, stream: NetStream) -> Optional[float]:
+        protocols = self.timeouts.protocols
+        if protocols is not None and stream.get_protocol() in protocols:
+            return protocols[stream.get_protocol()]
+        return self.timeouts.stream
+
+    def _idle_streams(self, now: float) -> list[tuple["SwarmConn", NetStream]]:
+        idle_streams = []
+        for net_conn in self.swarm.connections.values():
+            # The swarm only keeps `SwarmConn`s, whose streams are `NetStream`s.
+            conn = cast("SwarmConn", net_conn)
+            for stream in conn.get_streams():
+                timeout = self._stream_timeout(stream)
+                if (
+                    timeout is not None
+                    and now - stream.muxed_stream.last_activity >= timeout
+                ):
+                    idle_streams.append((conn, stream))
+        return idle_streams
+
+    def _idle_peers(self, now: float) -> list[ID]:
+        timeout = self.timeouts.connection
+        if timeout is None:
+            return []
+        return [
+            peer_id
+            for peer_id, conn in self.swarm.connections.items()
+            if not conn.get_streams() and now - conn.last_activity >= timeout
+        ]
+
+    async def _reset_stream(self, conn: "SwarmConn", stream: NetStream) -> None:
+        await stream.reset()
+        # Streams we opened are not removed by anyone else.
+        conn.remove_stream(stream)
+
+    async def sweep(self) -> ReaperStats:
+        """
+        :return: what this sweep reset and closed
+        """
+        idle_streams = self._idle_streams(trio.current_time())
+        async with trio.open_nursery() as nursery:
+            for conn, stream in idle_streams:
+                nursery.start_soon(self._reset_stream, conn, stream)
+        # Connections emptied just now are given the full timeout.
+        idle_peers = self._idle_peers(trio.current_time())
+        await self.swarm.close_peers(idle_peers)
+
+        self.streams_reset += len(idle_streams)
+        self.connections_closed += len(idle_peers)
+        if idle_streams or idle_peers:
+            logger.debug(
+                "reaped %d idle streams and %d idle connections",
+                len(idle_streams),
+                len(idle_peers),
+            )
+        return ReaperStats(len(idle_streams), len(idle_peers))
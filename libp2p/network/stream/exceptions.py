@@ -17,3 +17,7 @@ class StreamReset(StreamError):
 
 class StreamClosed(StreamError):
     pass
+
+
+class StreamTimeout(StreamError):
+    pass
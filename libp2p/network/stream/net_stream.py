@@ -13,12 +13,17 @@ from libp2p.stream_muxer.exceptions import (
     MuxedStreamClosed,
     MuxedStreamEOF,
     MuxedStreamReset,
+    MuxedStreamTimeout,
+)
+from libp2p.stream_muxer.scheduler import (
+    StreamPriority,
 )
 
 from .exceptions import (
     StreamClosed,
     StreamEOF,
     StreamReset,
+    StreamTimeout,
 )
 
 
@@ -43,7 +48,10 @@ class NetStream(INetStream):
     def set_protocol(self, protocol_id: TProtocol) -> None:
         """
         :param protocol_id: protocol id that stream runs on
+        :raise ResourceLimitExceeded: if the protocol has no room for the stream
         """
+        if self.muxed_stream.resource_scope is not None:
+            self.muxed_stream.resource_scope.set_protocol(protocol_id)
         self.protocol_id = protocol_id
 
     async def read(self, n: int = None) -> bytes:
@@ -59,6 +67,8 @@ class NetStream(INetStream):
             raise StreamEOF() from error
         except MuxedStreamReset as error:
             raise StreamReset() from error
+        except MuxedStreamTimeout as error:
+            raise StreamTimeout() from error
 
     async def write(self, data: bytes) -> None:
         """
@@ -70,6 +80,8 @@ class NetStream(INetStream):
             await self.muxed_stream.write(data)
         except MuxedStreamClosed as error:
             raise StreamClosed() from error
+        except MuxedStreamTimeout as error:
+            raise StreamTimeout() from error
 
     async def close(self) -> None:
         """Close stream."""
@@ -78,6 +90,22 @@ class NetStream(INetStream):
     async def reset(self) -> None:
         await self.muxed_stream.reset()
 
+    def set_deadline(self, ttl: Optional[float]) -> bool:
+        """
+        :param ttl: seconds from now until reads and writes raise
+            ``StreamTimeout``, ``None`` to remove the deadline
+        """
+        return self.muxed_stream.set_deadline(ttl)
+
+    def set_read_deadline(self, ttl: Optional[float]) -> bool:
+        return self.muxed_stream.set_read_deadline(ttl)
+
+    def set_write_deadline(self, ttl: Optional[float]) -> bool:
+        return self.muxed_stream.set_write_deadline(ttl)
+
+    def set_priority(self, priority: StreamPriority, weight: float = 1) -> None:
+        self.muxed_stream.set_priority(priority, weight)
+
     # TODO: `remove`: Called by close and write when the stream is in specific states.
     #   It notifies `ClosedStream` after `SwarmConn.remove_stream` is called.
     # Reference: https://github.com/libp2p/go-libp2p-swarm/blob/99831444e78c8f23c9335c17d8f7c700ba25ca14/swarm_stream.go  # noqa: E501
@@ -1,3 +1,6 @@
+from collections.abc import (
+    Sequence,
+)
 import logging
 from typing import (
     Optional,
@@ -9,8 +12,10 @@ from multiaddr import (
 import trio
 
 from libp2p.abc import (
+    IConnectionGater,
     IListener,
     IMuxedConn,
+    IMuxedTransport,
     INetConn,
     INetStream,
     INetworkService,
@@ -28,15 +33,42 @@ from libp2p.peer.id import (
     ID,
 )
 from libp2p.peer.peerstore import (
+    CONNECTED_ADDR_TTL,
+    RECENTLY_CONNECTED_ADDR_TTL,
     PeerStoreError,
 )
+from libp2p.rcmgr.exceptions import (
+    ResourceLimitExceeded,
+)
+from libp2p.rcmgr.limits import (
+    Direction,
+)
+from libp2p.rcmgr.manager import (
+    ConnectionScope,
+    ResourceManager,
+)
 from libp2p.tools.async_service import (
     Service,
 )
+from libp2p.transport.dns.exceptions import (
+    DNSResolutionError,
+)
+from libp2p.transport.dns.resolver import (
+    DNSResolver,
+)
 from libp2p.transport.exceptions import (
     MuxerUpgradeFailure,
     OpenConnectionError,
     SecurityUpgradeFailure,
+    UpgradeQueueFull,
+)
+from libp2p.transport.registry import (
+    TransportRegistry,
+    TTransport,
+)
+from libp2p.transport.unix.unix import (
+    UNIX_PROTOCOL,
+    UnixTransport,
 )
 from libp2p.transport.upgrader import (
     TransportUpgrader,
@@ -51,9 +83,17 @@ from .connection.raw_connection import (
 from .connection.swarm_connection import (
     SwarmConn,
 )
+from .event_bus import (
+    NotifeeEventBus,
+)
 from .exceptions import (
+    ConnectionGated,
     SwarmException,
 )
+from .reaper import (
+    IdleReaper,
+    IdleTimeouts,
+)
 
 logger = logging.getLogger("libp2p.network.swarm")
 
@@ -69,7 +109,13 @@ class Swarm(Service, INetworkService):
     self_id: ID
     peerstore: IPeerStore
     upgrader: TransportUpgrader
-    transport: ITransport
+    # Connections of `IMuxedTransport`s skip `upgrader`.
+    transports: TransportRegistry
+    # Expands the DNS addresses of peers before dialing them.
+    resolver: DNSResolver
+    resource_manager: ResourceManager
+    # Consulted at each stage of the setup of connections, if any.
+    gater: Optional[IConnectionGater]
     # TODO: Connection and `peer_id` are 1-1 mapping in our implementation,
     #   whereas in Go one `peer_id` may point to multiple connections.
     connections: dict[ID, INetConn]
@@ -79,41 +125,110 @@ class Swarm(Service, INetworkService):
     event_listener_nursery_created: trio.Event
 
     notifees: list[INotifee]
+    event_bus: NotifeeEventBus
+    # Resets idle streams and closes idle connections, if timeouts are given.
+    reaper: Optional[IdleReaper]
+    peerstore_gc_interval: Optional[float]
 
     def __init__(
         self,
         peer_id: ID,
         peerstore: IPeerStore,
         upgrader: TransportUpgrader,
-        transport: ITransport,
+        transport: ITransport = None,
+        resource_manager: ResourceManager = None,
+        event_bus: NotifeeEventBus = None,
+        transports: TransportRegistry = None,
+        resolver: DNSResolver = None,
+        gater: IConnectionGater = None,
+        idle_timeouts: IdleTimeouts = None,
+        peerstore_gc_interval: Optional[float] = None,
     ):
+        """
+        :param transport: transport of ``/tcp`` addresses
+        :param transports: transports of the other addresses, a ``/unix`` one
+            is added if the platform supports it
+        :param resolver: resolver of DNS addresses, the system one by default
+        :param gater: checks dialed and accepted connections once their peer
+            is known and once they are multiplexed. Transports check accepted
+            connections earlier with their own gater, e.g. ``TCP(gater=...)``
+        :param idle_timeouts: timeouts after which idle streams are reset and
+            connections without streams are closed
+        :param peerstore_gc_interval: seconds between the removals of the
+            peers neither connected nor with addresses from ``peerstore``, along
+            with their public keys and protocols. ``None``, the default, keeps
+            them
+        """
         self.self_id = peer_id
         self.peerstore = peerstore
         self.upgrader = upgrader
-        self.transport = transport
+        self.transports = transports if transports is not None else TransportRegistry()
+        if transport is not None:
+            self.transports.register("tcp", transport)
+        if UNIX_PROTOCOL not in self.transports and hasattr(trio.socket, "AF_UNIX"):
+            self.transports.register(UNIX_PROTOCOL, UnixTransport())
+        self.resolver = resolver or DNSResolver()
+        self.gater = gater
+        self.resource_manager = resource_manager or ResourceManager()
         self.connections = dict()
         self.listeners = dict()
 
         # Create Notifee array
         self.notifees = []
+        self.event_bus = event_bus or NotifeeEventBus()
+        self.reaper = (
+            IdleReaper(self, idle_timeouts) if idle_timeouts is not None else None
+        )
+        self.peerstore_gc_interval = peerstore_gc_interval
 
         self.common_stream_handler = create_default_stream_handler(self)
 
         self.listener_nursery = None
         self.event_listener_nursery_created = trio.Event()
 
+    @property
+    def transport(self) -> Optional[TTransport]:
+        """
+        The transport of ``/tcp`` addresses, which used to be the only one.
+        ``transports`` has them all.
+        """
+        return self.transports.get("tcp")
+
+    @transport.setter
+    def transport(self, transport: TTransport) -> None:
+        self.transports.register("tcp", transport)
+
     async def run(self) -> None:
-        async with trio.open_nursery() as nursery:
-            # Create a nursery for listener tasks.
-            self.listener_nursery = nursery
-            self.event_listener_nursery_created.set()
-            try:
-                await self.manager.wait_finished()
-            finally:
-                # The service ended. Cancel listener tasks.
-                nursery.cancel_scope.cancel()
-                # Indicate that the nursery has been cancelled.
-                self.listener_nursery = None
+        self.manager.run_daemon_child_service(self.event_bus)
+        if self.reaper is not None:
+            self.manager.run_daemon_child_service(self.reaper)
+        if self.peerstore_gc_interval is not None:
+            self.manager.run_daemon_task(self._gc_peerstore)
+        self.manager.run_task(self.peerstore.run_maintenance)
+        try:
+            async with trio.open_nursery() as nursery:
+                # Create a nursery for listener tasks.
+                self.listener_nursery = nursery
+                self.event_listener_nursery_created.set()
+                try:
+                    await self.manager.wait_finished()
+                finally:
+                    # The service ended. Cancel listener tasks.
+                    nursery.cancel_scope.cancel()
+                    # Indicate that the nursery has been cancelled.
+                    self.listener_nursery = None
+        finally:
+            # Release what outlives the listener tasks, e.g. unix socket files.
+            with trio.CancelScope(shield=True):
+                for listener in self.listeners.values():
+                    await listener.close()
+
+    async def _gc_peerstore(self) -> None:
+        while True:
+            await trio.sleep(self.peerstore_gc_interval)
+            removed = self.peerstore.gc_peers(keep=self.connections)
+            if removed:
+                logger.debug("removed %d peers from the peerstore", len(removed))
 
     def get_peer_id(self) -> ID:
         return self.self_id
@@ -121,6 +236,15 @@ class Swarm(Service, INetworkService):
     def set_stream_handler(self, stream_handler: StreamHandlerFn) -> None:
         self.common_stream_handler = stream_handler
 
+    def _transport_for(self, maddr: Multiaddr) -> TTransport:
+        """
+        :raise SwarmException: if no transport can handle ``maddr``
+        """
+        transport = self.transports.transport_for(maddr)
+        if transport is None:
+            raise SwarmException(f"no transport for {maddr}")
+        return transport
+
     async def dial_peer(self, peer_id: ID) -> INetConn:
         """
         Try to create a connection to peer_id.
@@ -136,22 +260,29 @@ class Swarm(Service, INetworkService):
 
         logger.debug("attempting to dial peer %s", peer_id)
 
+        if self.gater is not None and not self.gater.intercept_peer_dial(peer_id):
+            raise ConnectionGated(f"dialing peer {peer_id} is gated")
+
         try:
             # Get peer info from peer store
             addrs = self.peerstore.addrs(peer_id)
         except PeerStoreError as error:
             raise SwarmException(f"No known addresses to peer {peer_id}") from error
 
+        addrs = await self._resolve_addrs(addrs)
         if not addrs:
             raise SwarmException(f"No known addresses to peer {peer_id}")
 
         exceptions: list[SwarmException] = []
 
-        # Try all known addresses
-        for multiaddr in addrs:
+        # Try all known addresses, the cheapest transports first and the
+        # fastest and most reliable addresses first among them
+        addrs = self.peerstore.rank_addrs(peer_id, addrs)
+        for multiaddr in self.transports.sort_for_dialing(addrs):
             try:
-                return await self.dial_addr(multiaddr, peer_id)
+                conn = await self.dial_addr(multiaddr, peer_id)
             except SwarmException as e:
+                self.peerstore.record_dial(peer_id, multiaddr, False)
                 exceptions.append(e)
                 logger.debug(
                     "encountered swarm exception when trying to connect to %s, "
@@ -159,6 +290,11 @@ class Swarm(Service, INetworkService):
                     multiaddr,
                     exc_info=e,
                 )
+            else:
+                self.peerstore.record_dial(peer_id, multiaddr, True)
+                # Keep the address for as long as the connection is up.
+                self.peerstore.add_addr(peer_id, multiaddr, CONNECTED_ADDR_TTL)
+                return conn
 
         # Tried all addresses, raising exception.
         raise SwarmException(
@@ -166,6 +302,78 @@ class Swarm(Service, INetworkService):
             "connection (with exceptions)"
         ) from MultiError(exceptions)
 
+    async def _upgrade_inbound(
+        self, raw_conn: RawConnection, conn_scope: ConnectionScope, maddr: Multiaddr
+    ) -> Optional[IMuxedConn]:
+        """
+        Secure and multiplex an accepted connection. Connections which fail,
+        take too long or are rejected are closed.
+
+        :return: the multiplexed connection, ``None`` if it was closed
+        """
+        # Per, https://discuss.libp2p.io/t/multistream-security/130, we first
+        # secure the conn and then mux the conn
+        try:
+            # FIXME: This dummy `ID(b"")` for the remote peer is useless.
+            secured_conn = await self.upgrader.upgrade_security(
+                raw_conn, ID(b""), False
+            )
+        except SecurityUpgradeFailure as error:
+            # Not raised, a remote peer must not be able to stop the listener.
+            logger.debug("failed to upgrade security for peer at %s: %s", maddr, error)
+            await raw_conn.close()
+            conn_scope.done()
+            return None
+        peer_id = secured_conn.get_remote_peer()
+
+        if not self._intercept_secured(Direction.INBOUND, peer_id):
+            logger.debug("gated inbound connection from peer %s", peer_id)
+            await secured_conn.close()
+            conn_scope.done()
+            return None
+
+        try:
+            conn_scope.set_peer(peer_id)
+        except ResourceLimitExceeded as error:
+            logger.debug("rejected inbound connection from peer %s: %s", peer_id, error)
+            await secured_conn.close()
+            conn_scope.done()
+            return None
+
+        try:
+            muxed_conn = await self.upgrader.upgrade_connection(
+                secured_conn, peer_id, conn_scope
+            )
+        except MuxerUpgradeFailure as error:
+            logger.debug("fail to upgrade mux for peer %s: %s", peer_id, error)
+            await secured_conn.close()
+            conn_scope.done()
+            return None
+        logger.debug("upgraded mux for peer %s", peer_id)
+
+        if not self._intercept_upgraded(muxed_conn):
+            logger.debug("gated inbound connection from peer %s", peer_id)
+            await secured_conn.close()
+            conn_scope.done()
+            return None
+        return muxed_conn
+
+    def _intercept_secured(self, direction: Direction, peer_id: ID) -> bool:
+        return self.gater is None or self.gater.intercept_secured(direction, peer_id)
+
+    def _intercept_upgraded(self, muxed_conn: IMuxedConn) -> bool:
+        return self.gater is None or self.gater.intercept_upgraded(muxed_conn)
+
+    async def _resolve_addrs(self, addrs: Sequence[Multiaddr]) -> list[Multiaddr]:
+        """Replace the DNS addresses by the ones they resolve to."""
+        resolved: list[Multiaddr] = []
+        for addr in addrs:
+            try:
+                resolved += await self.resolver.resolve(addr)
+            except DNSResolutionError as error:
+                logger.debug("failed to resolve %s: %s", addr, error)
+        return resolved
+
     async def dial_addr(self, addr: Multiaddr, peer_id: ID) -> INetConn:
         """
         Try to create a connection to peer_id with addr.
@@ -175,17 +383,35 @@ class Swarm(Service, INetworkService):
         :raises SwarmException: raised when an error occurs
         :return: network connection
         """
+        transport = self._transport_for(addr)
+        if self.gater is not None and not self.gater.intercept_addr_dial(peer_id, addr):
+            raise ConnectionGated(f"dialing peer {peer_id} at {addr} is gated")
+        try:
+            conn_scope = self.resource_manager.open_connection(Direction.OUTBOUND)
+        except ResourceLimitExceeded as error:
+            logger.debug("resource limit reached when dialing peer %s", peer_id)
+            raise SwarmException(
+                f"resource limit reached when dialing peer {peer_id}"
+            ) from error
+
+        if isinstance(transport, IMuxedTransport):
+            return await self._dial_muxed_addr(transport, addr, peer_id, conn_scope)
+
         # Dial peer (connection to peer does not yet exist)
         # Transport dials peer (gets back a raw conn)
+        dial_started = trio.current_time()
         try:
-            raw_conn = await self.transport.dial(addr)
+            raw_conn = await transport.dial(addr)
         except OpenConnectionError as error:
             logger.debug("fail to dial peer %s over base transport", peer_id)
+            conn_scope.done()
             raise SwarmException(
                 f"fail to open connection to peer {peer_id}"
             ) from error
 
         logger.debug("dialed peer %s over base transport", peer_id)
+        # Opening the connection took about a round trip, e.g. the TCP handshake.
+        self.peerstore.record_latency(peer_id, trio.current_time() - dial_started, addr)
 
         # Per, https://discuss.libp2p.io/t/multistream-security/130, we first secure
         # the conn and then mux the conn
@@ -194,27 +420,97 @@ class Swarm(Service, INetworkService):
         except SecurityUpgradeFailure as error:
             logger.debug("failed to upgrade security for peer %s", peer_id)
             await raw_conn.close()
+            conn_scope.done()
             raise SwarmException(
                 f"failed to upgrade security for peer {peer_id}"
             ) from error
 
         logger.debug("upgraded security for peer %s", peer_id)
 
+        if not self._intercept_secured(Direction.OUTBOUND, peer_id):
+            await secured_conn.close()
+            conn_scope.done()
+            raise ConnectionGated(f"connection to peer {peer_id} is gated")
+
         try:
-            muxed_conn = await self.upgrader.upgrade_connection(secured_conn, peer_id)
+            conn_scope.set_peer(peer_id)
+        except ResourceLimitExceeded as error:
+            logger.debug("resource limit reached for peer %s", peer_id)
+            await secured_conn.close()
+            conn_scope.done()
+            raise SwarmException(
+                f"resource limit reached for peer {peer_id}"
+            ) from error
+
+        try:
+            muxed_conn = await self.upgrader.upgrade_connection(
+                secured_conn, peer_id, conn_scope
+            )
         except MuxerUpgradeFailure as error:
             logger.debug("failed to upgrade mux for peer %s", peer_id)
             await secured_conn.close()
+            conn_scope.done()
             raise SwarmException(f"failed to upgrade mux for peer {peer_id}") from error
 
         logger.debug("upgraded mux for peer %s", peer_id)
 
+        if not self._intercept_upgraded(muxed_conn):
+            # `muxed_conn` is not running yet, close what it wraps.
+            await secured_conn.close()
+            conn_scope.done()
+            raise ConnectionGated(f"connection to peer {peer_id} is gated")
+
         swarm_conn = await self.add_conn(muxed_conn)
 
         logger.debug("successfully dialed peer %s", peer_id)
 
         return swarm_conn
 
+    async def _dial_muxed_addr(
+        self,
+        transport: IMuxedTransport,
+        addr: Multiaddr,
+        peer_id: ID,
+        conn_scope: ConnectionScope,
+    ) -> INetConn:
+        """
+        Dial with a transport whose connections are already secured and
+        multiplexed, without the upgrader.
+
+        :raises SwarmException: raised when an error occurs
+        """
+        try:
+            muxed_conn = await transport.dial(addr, peer_id)
+        except (OpenConnectionError, SecurityUpgradeFailure) as error:
+            logger.debug("fail to dial peer %s over %s", peer_id, addr)
+            conn_scope.done()
+            raise SwarmException(
+                f"fail to open connection to peer {peer_id}"
+            ) from error
+
+        if not (
+            self._intercept_secured(Direction.OUTBOUND, peer_id)
+            and self._intercept_upgraded(muxed_conn)
+        ):
+            await muxed_conn.close()
+            conn_scope.done()
+            raise ConnectionGated(f"connection to peer {peer_id} is gated")
+
+        try:
+            conn_scope.set_peer(peer_id)
+        except ResourceLimitExceeded as error:
+            logger.debug("resource limit reached for peer %s", peer_id)
+            await muxed_conn.close()
+            conn_scope.done()
+            raise SwarmException(
+                f"resource limit reached for peer {peer_id}"
+            ) from error
+        muxed_conn.resource_scope = conn_scope
+
+        swarm_conn = await self.add_conn(muxed_conn)
+        logger.debug("successfully dialed peer %s", peer_id)
+        return swarm_conn
+
     async def new_stream(self, peer_id: ID) -> INetStream:
         """
         :param peer_id: peer_id of destination
@@ -225,7 +521,13 @@ class Swarm(Service, INetworkService):
 
         swarm_conn = await self.dial_peer(peer_id)
 
-        net_stream = await swarm_conn.new_stream()
+        try:
+            net_stream = await swarm_conn.new_stream()
+        except ResourceLimitExceeded as error:
+            logger.debug("resource limit reached for a stream to peer %s", peer_id)
+            raise SwarmException(
+                f"resource limit reached for a stream to peer {peer_id}"
+            ) from error
         logger.debug("successfully opened a stream to peer %s", peer_id)
         return net_stream
 
@@ -257,32 +559,29 @@ class Swarm(Service, INetworkService):
             ) -> None:
                 raw_conn = RawConnection(read_write_closer, False)
 
-                # Per, https://discuss.libp2p.io/t/multistream-security/130, we first
-                # secure the conn and then mux the conn
                 try:
-                    # FIXME: This dummy `ID(b"")` for the remote peer is useless.
-                    secured_conn = await self.upgrader.upgrade_security(
-                        raw_conn, ID(b""), False
+                    conn_scope = self.resource_manager.open_connection(
+                        Direction.INBOUND
                     )
-                except SecurityUpgradeFailure as error:
-                    logger.debug("failed to upgrade security for peer at %s", maddr)
+                except ResourceLimitExceeded as error:
+                    # Drop the connection before spending anything on it.
+                    logger.debug("rejected inbound connection at %s: %s", maddr, error)
                     await raw_conn.close()
-                    raise SwarmException(
-                        f"failed to upgrade security for peer at {maddr}"
-                    ) from error
-                peer_id = secured_conn.get_remote_peer()
+                    return
 
                 try:
-                    muxed_conn = await self.upgrader.upgrade_connection(
-                        secured_conn, peer_id
-                    )
-                except MuxerUpgradeFailure as error:
-                    logger.debug("fail to upgrade mux for peer %s", peer_id)
-                    await secured_conn.close()
-                    raise SwarmException(
-                        f"fail to upgrade mux for peer {peer_id}"
-                    ) from error
-                logger.debug("upgraded mux for peer %s", peer_id)
+                    async with self.upgrader.inbound_upgrade_slot():
+                        muxed_conn = await self._upgrade_inbound(
+                            raw_conn, conn_scope, maddr
+                        )
+                except UpgradeQueueFull:
+                    logger.debug("too many inbound upgrades, dropped one at %s", maddr)
+                    await raw_conn.close()
+                    conn_scope.done()
+                    return
+                if muxed_conn is None:
+                    return
+                peer_id = muxed_conn.peer_id
 
                 await self.add_conn(muxed_conn)
                 logger.debug("successfully opened connection to peer %s", peer_id)
@@ -291,9 +590,53 @@ class Swarm(Service, INetworkService):
                 # exiting and closing the connection.
                 await self.manager.wait_finished()
 
+            async def muxed_conn_handler(
+                muxed_conn: IMuxedConn, maddr: Multiaddr = maddr
+            ) -> None:
+                # The handshake is done by the transport, so the connection is
+                # accounted for only now.
+                try:
+                    conn_scope = self.resource_manager.open_connection(
+                        Direction.INBOUND
+                    )
+                except ResourceLimitExceeded as error:
+                    logger.debug("rejected inbound connection at %s: %s", maddr, error)
+                    await muxed_conn.close()
+                    return
+                peer_id = muxed_conn.peer_id
+                if not (
+                    self._intercept_secured(Direction.INBOUND, peer_id)
+                    and self._intercept_upgraded(muxed_conn)
+                ):
+                    logger.debug("gated inbound connection from peer %s", peer_id)
+                    await muxed_conn.close()
+                    conn_scope.done()
+                    return
+                try:
+                    conn_scope.set_peer(peer_id)
+                except ResourceLimitExceeded as error:
+                    logger.debug(
+                        "rejected inbound connection from peer %s: %s", peer_id, error
+                    )
+                    await muxed_conn.close()
+                    conn_scope.done()
+                    return
+                muxed_conn.resource_scope = conn_scope
+
+                await self.add_conn(muxed_conn)
+                logger.debug("successfully opened connection to peer %s", peer_id)
+
+                # NOTE: Same barrier as in `conn_handler`.
+                await self.manager.wait_finished()
+
             try:
                 # Success
-                listener = self.transport.create_listener(conn_handler)
+                listener: IListener
+                transport = self._transport_for(maddr)
+                if isinstance(transport, IMuxedTransport):
+                    listener = transport.create_listener(muxed_conn_handler)
+                else:
+                    listener = transport.create_listener(conn_handler)
                 self.listeners[str(maddr)] = listener
                 # TODO: `listener.listen` is not bounded with nursery. If we want to be
                 #   I/O agnostic, we should change the API.
@@ -326,6 +669,15 @@ class Swarm(Service, INetworkService):
 
         logger.debug("successfully close the connection to peer %s", peer_id)
 
+    async def close_peers(self, peer_ids: Sequence[ID]) -> None:
+        """
+        Close the connections to ``peer_ids`` in parallel, e.g. when trimming
+        connections.
+        """
+        async with trio.open_nursery() as nursery:
+            for peer_id in peer_ids:
+                nursery.start_soon(self.close_peer, peer_id)
+
     async def add_conn(self, muxed_conn: IMuxedConn) -> SwarmConn:
         """
         Add a `IMuxedConn` to `Swarm` as a `SwarmConn`, notify "connected",
@@ -339,6 +691,9 @@ class Swarm(Service, INetworkService):
         await swarm_conn.event_started.wait()
         # Store muxed_conn with peer id
         self.connections[muxed_conn.peer_id] = swarm_conn
+        self.peerstore.update_addrs(
+            muxed_conn.peer_id, RECENTLY_CONNECTED_ADDR_TTL, CONNECTED_ADDR_TTL
+        )
         # Call notifiers since event occurred
         await self.notify_connected(swarm_conn)
         return swarm_conn
@@ -352,6 +707,9 @@ class Swarm(Service, INetworkService):
         if peer_id not in self.connections:
             return
         del self.connections[peer_id]
+        self.peerstore.update_addrs(
+            peer_id, CONNECTED_ADDR_TTL, RECENTLY_CONNECTED_ADDR_TTL
+        )
 
     # Notifee
 
@@ -361,26 +719,23 @@ class Swarm(Service, INetworkService):
         :return: true if notifee registered successfully, false otherwise
         """
         self.notifees.append(notifee)
+        self.event_bus.subscribe(notifee)
+
+    # Notifees are called from the tasks of `event_bus`, possibly after the call
+    # which triggered the event returns. A slow notifee only holds up the
+    # connection or stream which triggered the event once its queue is full.
 
     async def notify_opened_stream(self, stream: INetStream) -> None:
-        async with trio.open_nursery() as nursery:
-            for notifee in self.notifees:
-                nursery.start_soon(notifee.opened_stream, self, stream)
+        await self.event_bus.emit(lambda notifee: notifee.opened_stream(self, stream))
 
     async def notify_connected(self, conn: INetConn) -> None:
-        async with trio.open_nursery() as nursery:
-            for notifee in self.notifees:
-                nursery.start_soon(notifee.connected, self, conn)
+        await self.event_bus.emit(lambda notifee: notifee.connected(self, conn))
 
     async def notify_disconnected(self, conn: INetConn) -> None:
-        async with trio.open_nursery() as nursery:
-            for notifee in self.notifees:
-                nursery.start_soon(notifee.disconnected, self, conn)
+        await self.event_bus.emit(lambda notifee: notifee.disconnected(self, conn))
 
     async def notify_listen(self, multiaddr: Multiaddr) -> None:
-        async with trio.open_nursery() as nursery:
-            for notifee in self.notifees:
-                nursery.start_soon(notifee.listen, self, multiaddr)
+        await self.event_bus.emit(lambda notifee: notifee.listen(self, multiaddr))
 
     async def notify_closed_stream(self, stream: INetStream) -> None:
         raise NotImplementedError
@@ -1,7 +1,10 @@
+import functools
 import hashlib
 from typing import (
+    Optional,
     Union,
 )
+import weakref
 
 import base58
 import multihash
@@ -37,25 +40,52 @@ if ENABLE_INLINING:
     )
 
 
+# Peer IDs derived from recently seen public keys.
+FROM_PUBKEY_CACHE_SIZE = 4096
+
+
 class ID:
-    _bytes: bytes
-    _xor_id: int = None
-    _b58_str: str = None
+    """
+    Peer ID. IDs are interned: while one is alive, constructing another from
+    the same bytes returns it, so that dicts keyed by IDs compare them by
+    identity.
+    """
 
-    def __init__(self, peer_id_bytes: bytes) -> None:
-        self._bytes = peer_id_bytes
+    __slots__ = ("_bytes", "_hash", "_xor_id", "_b58_str", "__weakref__")
+
+    _bytes: bytes
+    _hash: int
+    _xor_id: Optional[int]
+    _b58_str: Optional[str]
+
+    _interned: "weakref.WeakValueDictionary[bytes, ID]" = weakref.WeakValueDictionary()
+
+    def __new__(cls, peer_id_bytes: bytes) -> "ID":
+        peer_id = cls._interned.get(peer_id_bytes)
+        if peer_id is not None and type(peer_id) is cls:
+            return peer_id
+        peer_id = super().__new__(cls)
+        peer_id._bytes = peer_id_bytes
+        peer_id._hash = hash(peer_id_bytes)
+        peer_id._xor_id = None
+        peer_id._b58_str = None
+        cls._interned[peer_id_bytes] = peer_id
+        return peer_id
+
+    def __reduce__(self) -> tuple[type["ID"], tuple[bytes]]:
+        return type(self), (self._bytes,)
 
     @property
     def xor_id(self) -> int:
-        if not self._xor_id:
-            self._xor_id = int(sha256_digest(self._bytes).hex(), 16)
+        if self._xor_id is None:
+            self._xor_id = int.from_bytes(sha256_digest(self._bytes), "big")
         return self._xor_id
 
     def to_bytes(self) -> bytes:
         return self._bytes
 
     def to_base58(self) -> str:
-        if not self._b58_str:
+        if self._b58_str is None:
             self._b58_str = base58.b58encode(self._bytes).decode()
         return self._b58_str
 
@@ -65,17 +95,19 @@ class ID:
     __str__ = pretty = to_string = to_base58
 
     def __eq__(self, other: object) -> bool:
-        if isinstance(other, str):
+        if self is other:
+            return True
+        if isinstance(other, ID):
+            return self._bytes == other._bytes
+        elif isinstance(other, str):
             return self.to_base58() == other
         elif isinstance(other, bytes):
             return self._bytes == other
-        elif isinstance(other, ID):
-            return self._bytes == other._bytes
         else:
             return NotImplemented
 
     def __hash__(self) -> int:
-        return hash(self._bytes)
+        return self._hash
 
     @classmethod
     def from_base58(cls, b58_encoded_peer_id_str: str) -> "ID":
@@ -85,12 +117,15 @@ class ID:
 
     @classmethod
     def from_pubkey(cls, key: PublicKey) -> "ID":
-        serialized_key = key.serialize()
-        algo = multihash.Func.sha2_256
-        if ENABLE_INLINING and len(serialized_key) <= MAX_INLINE_KEY_LENGTH:
-            algo = IDENTITY_MULTIHASH_CODE
-        mh_digest = multihash.digest(serialized_key, algo)
-        return cls(mh_digest.encode())
+        return cls(_peer_id_bytes_from_serialized_key(key.serialize()))
+
+
+@functools.lru_cache(maxsize=FROM_PUBKEY_CACHE_SIZE)
+def _peer_id_bytes_from_serialized_key(serialized_key: bytes) -> bytes:
+    algo = multihash.Func.sha2_256
+    if ENABLE_INLINING and len(serialized_key) <= MAX_INLINE_KEY_LENGTH:
+        algo = IDENTITY_MULTIHASH_CODE
+    return multihash.digest(serialized_key, algo).encode()
 
 
 def sha256_digest(data: Union[str, bytes]) -> bytes:
@@ -0,0 +1,137 @@
+from collections.abc import (
+    Iterable,
+)
+import math
+from typing import (
+    Optional,
+)
+
+from multiaddr import (
+    Multiaddr,
+)
+
+from libp2p.abc import (
+    IPeerMetrics,
+)
+
+from .id import (
+    ID,
+)
+
+# Weight of a new sample in the moving averages.
+LATENCY_EWMA_SMOOTHING = 0.1
+DIAL_EWMA_SMOOTHING = 0.2
+# Floor of the success rate an address is ranked with, so that addresses which
+# always failed are still ordered by latency.
+MIN_DIAL_SUCCESS_RATE = 0.05
+
+
+def _ewma(average: Optional[float], sample: float, smoothing: float) -> float:
+    if average is None:
+        return sample
+    return (1 - smoothing) * average + smoothing * sample
+
+
+class PeerMetrics(IPeerMetrics):
+    """
+    Exponentially weighted moving averages of the round trip time to peers and
+    their addresses, and of the outcome of dials to them.
+    """
+
+    _latencies: dict[ID, float]
+    _addr_latencies: dict[ID, dict[Multiaddr, float]]
+    _dial_rates: dict[ID, float]
+    _addr_dial_rates: dict[ID, dict[Multiaddr, float]]
+
+    def __init__(self) -> None:
+        self._latencies = {}
+        self._addr_latencies = {}
+        self._dial_rates = {}
+        self._addr_dial_rates = {}
+
+    def record_latency(
+        self, peer_id: ID, rtt: float, addr: Optional[Multiaddr] = None
+    ) -> None:
+        """
+        :param peer_id: peer ID the round trip was made to
+        :param rtt: round trip time, in seconds
+        :param addr: address the round trip was made over, if known
+        """
+        self._latencies[peer_id] = _ewma(
+            self._latencies.get(peer_id), rtt, LATENCY_EWMA_SMOOTHING
+        )
+        if addr is not None:
+            addr_latencies = self._addr_latencies.setdefault(peer_id, {})
+            addr_latencies[addr] = _ewma(
+                addr_latencies.get(addr), rtt, LATENCY_EWMA_SMOOTHING
+            )
+
+    def latency_ewma(self, peer_id: ID) -> Optional[float]:
+        """
+        :return: average round trip time to the peer in seconds, ``None`` if
+            none was recorded
+        """
+        return self._latencies.get(peer_id)
+
+    def set_latency_ewma(self, peer_id: ID, latency: float) -> None:
+        """Restore the average round trip time to the peer, e.g. from disk."""
+        self._latencies[peer_id] = latency
+
+    def addr_latency_ewma(self, peer_id: ID, addr: Multiaddr) -> Optional[float]:
+        """
+        :return: average round trip time over the address in seconds, ``None``
+            if none was recorded
+        """
+        return self._addr_latencies.get(peer_id, {}).get(addr)
+
+    def record_dial(self, peer_id: ID, addr: Multiaddr, success: bool) -> None:
+        """
+        :param peer_id: peer ID which was dialed
+        :param addr: address which was dialed
+        :param success: whether a connection was established
+        """
+        sample = 1.0 if success else 0.0
+        self._dial_rates[peer_id] = _ewma(
+            self._dial_rates.get(peer_id), sample, DIAL_EWMA_SMOOTHING
+        )
+        addr_dial_rates = self._addr_dial_rates.setdefault(peer_id, {})
+        addr_dial_rates[addr] = _ewma(
+            addr_dial_rates.get(addr), sample, DIAL_EWMA_SMOOTHING
+        )
+
+    def dial_success_rate(
+        self, peer_id: ID, addr: Optional[Multiaddr] = None
+    ) -> Optional[float]:
+        """
+        :param addr: address to get the rate of, rather than of the whole peer
+        :return: recent share of the dials which succeeded, ``None`` if the
+            peer or address was never dialed
+        """
+        if addr is None:
+            return self._dial_rates.get(peer_id)
+        return self._addr_dial_rates.get(peer_id, {}).get(addr)
+
+    def rank_addrs(self, peer_id: ID, addrs: Iterable[Multiaddr]) -> list[Multiaddr]:
+        """
+        Order ``addrs`` by their expected time to a working connection: the
+        latency over them divided by their dial success rate. Addresses with no
+        latency recorded are assumed to have the average one of the peer, and
+        the order is kept when nothing is known.
+        """
+        addr_latencies = self._addr_latencies.get(peer_id, {})
+        addr_dial_rates = self._addr_dial_rates.get(peer_id, {})
+        peer_latency = self._latencies.get(peer_id, math.inf)
+
+        def cost(addr: Multiaddr) -> float:
+            latency = addr_latencies.get(addr, peer_latency)
+            rate = addr_dial_rates.get(addr, 1.0)
+            return latency / max(rate, MIN_DIAL_SUCCESS_RATE)
+
+        return sorted(addrs, key=cost)
+
+    def remove_peer(self, peer_id: ID) -> None:
+        """Forget everything recorded about the peer."""
+        self._latencies.pop(peer_id, None)
+        self._addr_latencies.pop(peer_id, None)
+        self._dial_rates.pop(peer_id, None)
+        self._addr_dial_rates.pop(peer_id, None)
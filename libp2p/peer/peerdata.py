@@ -1,8 +1,17 @@
 from collections.abc import (
+    Iterable,
+    Iterator,
     Sequence,
 )
+import itertools
+import math
+import sys
 from typing import (
     Any,
+    Optional,
+    TypeVar,
+    Union,
+    overload,
 )
 
 from multiaddr import (
@@ -17,62 +26,244 @@ from libp2p.crypto.keys import (
     PublicKey,
 )
 
+T = TypeVar("T")
+
+
+class OrderedSetView(Sequence[T]):
+    """
+    Read-only view of the keys of a dict, in insertion order, which reflects
+    later changes to it. Membership tests are O(1), and iteration works on a
+    snapshot so the dict may change meanwhile.
+    """
+
+    __slots__ = ("_items",)
+
+    _items: dict[T, Any]
+
+    def __init__(self, items: dict[T, Any]) -> None:
+        self._items = items
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def __contains__(self, item: object) -> bool:
+        return item in self._items
+
+    def __iter__(self) -> Iterator[T]:
+        return iter(tuple(self._items))
+
+    @overload
+    def __getitem__(self, index: int) -> T:
+        ...
+
+    @overload
+    def __getitem__(self, index: slice) -> Sequence[T]:
+        ...
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[T, Sequence[T]]:
+        if isinstance(index, int) and 0 <= index < len(self._items):
+            # Without copying every item for the common `view[0]`.
+            return next(itertools.islice(self._items, index, None))
+        return tuple(self._items)[index]
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, (OrderedSetView, list, tuple)):
+            return list(self) == list(other)
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({list(self._items)!r})"
+
+
+class PackedAddrsView(OrderedSetView[Multiaddr]):
+    """
+    `OrderedSetView` of addresses stored as their packed bytes, which decodes
+    them to `Multiaddr` only as they are read.
+    """
+
+    __slots__ = ()
+
+    def __contains__(self, item: object) -> bool:
+        if isinstance(item, Multiaddr):
+            item = item.to_bytes()
+        return item in self._items
+
+    def __iter__(self) -> Iterator[Multiaddr]:
+        return map(Multiaddr, tuple(self._items))
+
+    @overload
+    def __getitem__(self, index: int) -> Multiaddr:
+        ...
+
+    @overload
+    def __getitem__(self, index: slice) -> Sequence[Multiaddr]:
+        ...
+
+    def __getitem__(
+        self, index: Union[int, slice]
+    ) -> Union[Multiaddr, Sequence[Multiaddr]]:
+        packed = super().__getitem__(index)
+        if isinstance(index, slice):
+            return tuple(map(Multiaddr, packed))
+        return Multiaddr(packed)
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({list(self)!r})"
+
 
 class PeerData(IPeerData):
+    # A peerstore may hold hundreds of thousands of these.
+    __slots__ = ("pubkey", "privkey", "metadata", "protocols", "addrs")
+
     pubkey: PublicKey
     privkey: PrivateKey
-    metadata: dict[Any, Any]
-    protocols: list[str]
-    addrs: list[Multiaddr]
+    # Created with the first key put, most peers never have any.
+    metadata: Optional[dict[Any, Any]]
+    # Insertion-ordered sets of interned protocols.
+    protocols: dict[str, None]
+    # `(expiry, ttl)` of each address, keyed by its packed bytes, in insertion
+    # order. An expiry of `math.inf` never passes.
+    addrs: dict[bytes, tuple[float, Optional[int]]]
 
     def __init__(self) -> None:
         self.pubkey = None
         self.privkey = None
-        self.metadata = {}
-        self.protocols = []
-        self.addrs = []
+        self.metadata = None
+        self.protocols = {}
+        self.addrs = {}
 
-    def get_protocols(self) -> list[str]:
+    def get_protocols(self) -> Sequence[str]:
         """
-        :return: all protocols associated with given peer
+        :return: read-only view of the protocols associated with given peer
         """
-        return self.protocols
+        return OrderedSetView(self.protocols)
 
-    def add_protocols(self, protocols: Sequence[str]) -> None:
+    def add_protocols(self, protocols: Iterable[str]) -> list[str]:
         """
         :param protocols: protocols to add
+        :return: the protocols which were not known yet
         """
-        self.protocols.extend(list(protocols))
+        added = []
+        for protocol in protocols:
+            if protocol not in self.protocols:
+                protocol = sys.intern(protocol)
+                self.protocols[protocol] = None
+                added.append(protocol)
+        return added
 
-    def set_protocols(self, protocols: Sequence[str]) -> None:
+    def set_protocols(self, protocols: Iterable[str]) -> None:
         """
         :param protocols: protocols to set
         """
-        self.protocols = list(protocols)
+        # In place, the views already handed out follow.
+        self.protocols.clear()
+        self.add_protocols(protocols)
+
+    def remove_protocols(self, protocols: Iterable[str]) -> list[str]:
+        """
+        :param protocols: protocols to remove, unknown ones are skipped
+        :return: the protocols which were removed
+        """
+        removed = []
+        for protocol in protocols:
+            if protocol in self.protocols:
+                del self.protocols[protocol]
+                removed.append(protocol)
+        return removed
 
-    def add_addrs(self, addrs: Sequence[Multiaddr]) -> None:
+    def add_addrs(
+        self,
+        addrs: Iterable[Multiaddr],
+        ttl: Optional[int] = None,
+        expiry: float = math.inf,
+    ) -> list[bytes]:
         """
+        Add addresses, or extend those already known to ``expiry`` if they
+        expire earlier.
+
         :param addrs: multiaddresses to add
+        :param ttl: time-to-live the addresses were added with
+        :param expiry: when the addresses expire
+        :return: the packed addresses whose expiry changed
         """
+        # Shared by the addresses, it is immutable.
+        record = (expiry, ttl)
+        changed = []
         for addr in addrs:
-            if addr not in self.addrs:
-                self.addrs.append(addr)
+            packed = addr.to_bytes()
+            current = self.addrs.get(packed)
+            if current is not None and current[0] >= expiry:
+                continue
+            self.addrs[packed] = record
+            changed.append(packed)
+        return changed
 
-    def get_addrs(self) -> list[Multiaddr]:
+    def set_addrs(
+        self,
+        addrs: Iterable[Multiaddr],
+        ttl: Optional[int] = None,
+        expiry: float = math.inf,
+    ) -> list[bytes]:
         """
-        :return: all multiaddresses
+        Add addresses, or make those already known expire at ``expiry``
+        whether it is earlier or later.
+
+        :param addrs: multiaddresses to set
+        :param ttl: time-to-live the addresses were set with
+        :param expiry: when the addresses expire
+        :return: the packed addresses
         """
-        return self.addrs
+        record = (expiry, ttl)
+        packed_addrs = [addr.to_bytes() for addr in addrs]
+        for packed in packed_addrs:
+            self.addrs[packed] = record
+        return packed_addrs
+
+    def remove_addrs(self, addrs: Iterable[Multiaddr]) -> None:
+        """
+        :param addrs: multiaddresses to remove, unknown ones are skipped
+        """
+        for addr in addrs:
+            self.addrs.pop(addr.to_bytes(), None)
+
+    def get_addr_expiry(self, addr: Multiaddr) -> Optional[float]:
+        """
+        :return: when ``addr`` expires, or ``None`` if it is not known
+        """
+        current = self.addrs.get(addr.to_bytes())
+        if current is None:
+            return None
+        return current[0]
+
+    def get_addrs(self) -> Sequence[Multiaddr]:
+        """
+        :return: read-only view of all multiaddresses, decoded as they are read
+        """
+        return PackedAddrsView(self.addrs)
 
     def clear_addrs(self) -> None:
         """Clear all addresses."""
-        self.addrs = []
+        self.addrs.clear()
+
+    def is_empty(self) -> bool:
+        """
+        :return: whether nothing at all is known about the peer
+        """
+        return not (
+            self.addrs
+            or self.protocols
+            or self.metadata
+            or self.pubkey is not None
+            or self.privkey is not None
+        )
 
     def put_metadata(self, key: str, val: Any) -> None:
         """
         :param key: key in KV pair
         :param val: val to associate with key
         """
+        if self.metadata is None:
+            self.metadata = {}
         self.metadata[key] = val
 
     def get_metadata(self, key: str) -> Any:
@@ -81,7 +272,7 @@ class PeerData(IPeerData):
         :return: val for key
         :raise PeerDataError: key not found
         """
-        if key in self.metadata:
+        if self.metadata is not None and key in self.metadata:
             return self.metadata[key]
         raise PeerDataError("key not found")
 
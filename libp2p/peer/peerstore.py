@@ -1,11 +1,17 @@
-from collections import (
-    defaultdict,
-)
 from collections.abc import (
+    Container,
+    Iterable,
+    Mapping,
     Sequence,
 )
+import heapq
+import itertools
+import math
+import time
 from typing import (
     Any,
+    Callable,
+    Optional,
 )
 
 from multiaddr import (
@@ -24,6 +30,9 @@ from libp2p.crypto.keys import (
 from .id import (
     ID,
 )
+from .metrics import (
+    PeerMetrics,
+)
 from .peerdata import (
     PeerData,
     PeerDataError,
@@ -32,55 +41,180 @@ from .peerinfo import (
     PeerInfo,
 )
 
+# Time-to-live of addresses, in seconds.
+# Addresses we were told about but have not connected to.
+TEMP_ADDR_TTL = 2 * 60
+# Addresses of peers we were connected to until recently.
+RECENTLY_CONNECTED_ADDR_TTL = 15 * 60
+PERMANENT_ADDR_TTL = 2**63 - 1
+# Addresses of peers we are connected to. They do not expire either, but are
+# told apart from permanent ones to expire once the connection closes.
+CONNECTED_ADDR_TTL = PERMANENT_ADDR_TTL - 1
+
+# Size below which the expiry heap is not compacted.
+MIN_ADDR_EXPIRIES_LIMIT = 1024
+
 
 class PeerStore(IPeerStore):
     peer_data_map: dict[ID, PeerData]
+    metrics: PeerMetrics
+    _clock: Callable[[], float]
+    # Min-heap of `(expiry, sequence, peer_id, packed_addr)`. Entries are not
+    # removed when the expiry of an address changes, but skipped once popped.
+    _addr_expiries: list[tuple[float, int, ID, bytes]]
+    # Length past which `_addr_expiries` is rebuilt from the live entries.
+    _addr_expiries_limit: int
+    _sequence: "itertools.count[int]"
+    # Peers supporting each protocol, kept up to date with `peer_data_map`.
+    _protocol_peers: dict[str, set[ID]]
 
-    def __init__(self) -> None:
-        self.peer_data_map = defaultdict(PeerData)
+    def __init__(self, clock: Callable[[], float] = time.monotonic) -> None:
+        """
+        :param clock: seconds from an arbitrary point, that addresses expire by
+        """
+        # Only the methods which store something create entries.
+        self.peer_data_map = {}
+        self.metrics = PeerMetrics()
+        self._clock = clock
+        self._addr_expiries = []
+        self._addr_expiries_limit = MIN_ADDR_EXPIRIES_LIMIT
+        self._sequence = itertools.count()
+        self._protocol_peers = {}
 
     def peer_info(self, peer_id: ID) -> PeerInfo:
         """
         :param peer_id: peer ID to get info for
         :return: peer info object
         """
-        if peer_id in self.peer_data_map:
-            peer_data = self.peer_data_map[peer_id]
-            return PeerInfo(peer_id, peer_data.get_addrs())
-        raise PeerStoreError("peer ID not found")
+        self._expire_addrs()
+        peer_data = self.peer_data_map.get(peer_id)
+        if peer_data is None:
+            raise PeerStoreError("peer ID not found")
+        return PeerInfo(peer_id, peer_data.get_addrs())
 
-    def get_protocols(self, peer_id: ID) -> list[str]:
+    def get_protocols(self, peer_id: ID) -> Sequence[str]:
         """
         :param peer_id: peer ID to get protocols for
-        :return: protocols (as list of strings)
+        :return: read-only view of the protocols
         :raise PeerStoreError: if peer ID not found
         """
-        if peer_id in self.peer_data_map:
-            return self.peer_data_map[peer_id].get_protocols()
-        raise PeerStoreError("peer ID not found")
+        peer_data = self.peer_data_map.get(peer_id)
+        if peer_data is None:
+            raise PeerStoreError("peer ID not found")
+        return peer_data.get_protocols()
 
     def add_protocols(self, peer_id: ID, protocols: Sequence[str]) -> None:
         """
         :param peer_id: peer ID to add protocols for
         :param protocols: protocols to add
         """
-        peer_data = self.peer_data_map[peer_id]
-        peer_data.add_protocols(list(protocols))
+        peer_data = self._get_or_create(peer_id)
+        self._index_protocols(peer_id, peer_data.add_protocols(protocols))
+        self._peer_changed(peer_id)
 
     def set_protocols(self, peer_id: ID, protocols: Sequence[str]) -> None:
         """
         :param peer_id: peer ID to set protocols for
         :param protocols: protocols to set
         """
-        peer_data = self.peer_data_map[peer_id]
-        peer_data.set_protocols(list(protocols))
+        peer_data = self._get_or_create(peer_id)
+        old_protocols = set(peer_data.protocols)
+        peer_data.set_protocols(protocols)
+        self._unindex_protocols(peer_id, old_protocols - peer_data.protocols.keys())
+        self._index_protocols(peer_id, peer_data.protocols)
+        self._peer_changed(peer_id)
+
+    def remove_protocols(self, peer_id: ID, protocols: Sequence[str]) -> None:
+        """
+        :param peer_id: peer ID to remove protocols for
+        :param protocols: protocols to remove
+        """
+        peer_data = self.peer_data_map.get(peer_id)
+        if peer_data is not None:
+            self._unindex_protocols(peer_id, peer_data.remove_protocols(protocols))
+            self._peer_changed(peer_id)
+
+    def bulk_add_protocols(self, peer_protocols: Mapping[ID, Sequence[str]]) -> None:
+        """
+        :param peer_protocols: protocols to add, by peer ID
+        """
+        for peer_id, protocols in peer_protocols.items():
+            added = self._get_or_create(peer_id).add_protocols(protocols)
+            self._index_protocols(peer_id, added)
+            self._peer_changed(peer_id)
+
+    def peers_supporting(self, protocol: str) -> list[ID]:
+        """
+        :param protocol: protocol to look peers up for
+        :return: the peers known to support ``protocol``, in O(number of them)
+        """
+        return list(self._protocol_peers.get(protocol, ()))
+
+    def supports(self, peer_id: ID, protocols: Sequence[str]) -> list[str]:
+        """
+        :param peer_id: peer ID to check protocols for
+        :param protocols: protocols to check, e.g. in order of preference
+        :return: those of ``protocols`` which the peer supports, in that order
+        :raise PeerStoreError: if peer ID not found
+        """
+        peer_data = self.peer_data_map.get(peer_id)
+        if peer_data is None:
+            raise PeerStoreError("peer ID not found")
+        return [protocol for protocol in protocols if protocol in peer_data.protocols]
+
+    def _index_protocols(self, peer_id: ID, protocols: Iterable[str]) -> None:
+        for protocol in protocols:
+            self._protocol_peers.setdefault(protocol, set()).add(peer_id)
+
+    def _unindex_protocols(self, peer_id: ID, protocols: Iterable[str]) -> None:
+        for protocol in protocols:
+            peers = self._protocol_peers.get(protocol)
+            if peers is None:
+                continue
+            peers.discard(peer_id)
+            if not peers:
+                del self._protocol_peers[protocol]
 
     def peer_ids(self) -> list[ID]:
         """
         :return: all of the peer IDs stored in peer store
         """
+        self._expire_addrs()
         return list(self.peer_data_map.keys())
 
+    async def run_maintenance(self) -> None:
+        """Nothing to do for peers only kept in memory."""
+
+    def gc_peers(self, keep: Container[ID] = ()) -> list[ID]:
+        """
+        Remove the peers without addresses, other than ours, along with their
+        protocols, metadata and metrics.
+
+        :param keep: peers to keep anyway, e.g. those still connected
+        :return: the peer IDs removed
+        """
+        self._expire_addrs()
+        removed = [
+            peer_id
+            for peer_id, peer_data in self.peer_data_map.items()
+            if not peer_data.addrs and peer_data.privkey is None and peer_id not in keep
+        ]
+        for peer_id in removed:
+            self._remove_peer(peer_id)
+        return removed
+
+    def _get_or_create(self, peer_id: ID) -> PeerData:
+        peer_data = self.peer_data_map.get(peer_id)
+        if peer_data is None:
+            peer_data = self.peer_data_map[peer_id] = PeerData()
+        return peer_data
+
+    def _remove_peer(self, peer_id: ID) -> None:
+        peer_data = self.peer_data_map.pop(peer_id)
+        self._unindex_protocols(peer_id, peer_data.protocols)
+        self.metrics.remove_peer(peer_id)
+        self._peer_changed(peer_id)
+
     def get(self, peer_id: ID, key: str) -> Any:
         """
         :param peer_id: peer ID to get peer data for
@@ -88,13 +222,13 @@ class PeerStore(IPeerStore):
         :return: value corresponding to the key
         :raise PeerStoreError: if peer ID or value not found
         """
-        if peer_id in self.peer_data_map:
-            try:
-                val = self.peer_data_map[peer_id].get_metadata(key)
-            except PeerDataError as error:
-                raise PeerStoreError() from error
-            return val
-        raise PeerStoreError("peer ID not found")
+        peer_data = self.peer_data_map.get(peer_id)
+        if peer_data is None:
+            raise PeerStoreError("peer ID not found")
+        try:
+            return peer_data.get_metadata(key)
+        except PeerDataError as error:
+            raise PeerStoreError() from error
 
     def put(self, peer_id: ID, key: str, val: Any) -> None:
         """
@@ -102,8 +236,7 @@ class PeerStore(IPeerStore):
         :param key:
         :param value:
         """
-        peer_data = self.peer_data_map[peer_id]
-        peer_data.put_metadata(key, val)
+        self._get_or_create(peer_id).put_metadata(key, val)
 
     def add_addr(self, peer_id: ID, addr: Multiaddr, ttl: int) -> None:
         """
@@ -117,41 +250,224 @@ class PeerStore(IPeerStore):
         """
         :param peer_id: peer ID to add address for
         :param addrs:
-        :param ttl: time-to-live for the this record
+        :param ttl: time-to-live for the this record, addresses already stored
+            with a longer one keep it
+        """
+        self._expire_addrs()
+        peer_data = self._get_or_create(peer_id)
+        if ttl <= 0:
+            self._peer_changed(peer_id)
+            return
+        expiry = self._expiry(ttl)
+        changed = peer_data.add_addrs(addrs, ttl, expiry)
+        self._push_addr_expiries(peer_id, changed, expiry)
+        self._peer_changed(peer_id)
+
+    def bulk_add_addrs(
+        self, peer_addrs: Mapping[ID, Sequence[Multiaddr]], ttl: int
+    ) -> None:
+        """
+        :param peer_addrs: addresses to add, by peer ID
+        :param ttl: time-to-live for the addresses
+        """
+        self._expire_addrs()
+        # One reading of the clock for the whole batch.
+        expiry = self._expiry(ttl)
+        for peer_id, addrs in peer_addrs.items():
+            peer_data = self._get_or_create(peer_id)
+            if ttl > 0:
+                changed = peer_data.add_addrs(addrs, ttl, expiry)
+                self._push_addr_expiries(peer_id, changed, expiry)
+            self._peer_changed(peer_id)
+
+    def set_addrs(self, peer_id: ID, addrs: Sequence[Multiaddr], ttl: int) -> None:
         """
-        # Ignore ttl for now
-        peer_data = self.peer_data_map[peer_id]
-        peer_data.add_addrs(list(addrs))
+        :param peer_id: peer ID to set addresses for
+        :param addrs:
+        :param ttl: time-to-live for the this record, zero or less removes
+            the addresses
+        """
+        self._expire_addrs()
+        if ttl <= 0:
+            if peer_id in self.peer_data_map:
+                self.peer_data_map[peer_id].remove_addrs(addrs)
+                self._peer_changed(peer_id)
+            return
+        expiry = self._expiry(ttl)
+        packed_addrs = self._get_or_create(peer_id).set_addrs(addrs, ttl, expiry)
+        self._push_addr_expiries(peer_id, packed_addrs, expiry)
+        self._peer_changed(peer_id)
+
+    def update_addrs(self, peer_id: ID, old_ttl: int, new_ttl: int) -> None:
+        """
+        :param peer_id: peer ID to update addresses for
+        :param old_ttl: time-to-live of the addresses to update
+        :param new_ttl: their new time-to-live from now
+        """
+        self._expire_addrs()
+        peer_data = self.peer_data_map.get(peer_id)
+        if peer_data is None:
+            return
+        packed_addrs = [
+            packed for packed, (_, ttl) in peer_data.addrs.items() if ttl == old_ttl
+        ]
+        if not packed_addrs:
+            return
+        if new_ttl <= 0:
+            for packed in packed_addrs:
+                del peer_data.addrs[packed]
+        else:
+            expiry = self._expiry(new_ttl)
+            record = (expiry, new_ttl)
+            for packed in packed_addrs:
+                peer_data.addrs[packed] = record
+            self._push_addr_expiries(peer_id, packed_addrs, expiry)
+        self._peer_changed(peer_id)
 
-    def addrs(self, peer_id: ID) -> list[Multiaddr]:
+    def addrs(self, peer_id: ID) -> Sequence[Multiaddr]:
         """
         :param peer_id: peer ID to get addrs for
-        :return: list of addrs
+        :return: read-only view of the addrs which have not expired
         :raise PeerStoreError: if peer ID not found
         """
-        if peer_id in self.peer_data_map:
-            return self.peer_data_map[peer_id].get_addrs()
-        raise PeerStoreError("peer ID not found")
+        self._expire_addrs()
+        peer_data = self.peer_data_map.get(peer_id)
+        if peer_data is None:
+            raise PeerStoreError("peer ID not found")
+        return peer_data.get_addrs()
 
     def clear_addrs(self, peer_id: ID) -> None:
         """
         :param peer_id: peer ID to clear addrs for
         """
         # Only clear addresses if the peer is in peer map
-        if peer_id in self.peer_data_map:
-            self.peer_data_map[peer_id].clear_addrs()
+        peer_data = self.peer_data_map.get(peer_id)
+        if peer_data is not None:
+            peer_data.clear_addrs()
+            self._peer_changed(peer_id)
 
     def peers_with_addrs(self) -> list[ID]:
         """
         :return: all of the peer IDs which has addrs stored in peer store
         """
-        # Add all peers with addrs at least 1 to output
-        output: list[ID] = []
+        self._expire_addrs()
+        return [
+            peer_id
+            for peer_id, peer_data in self.peer_data_map.items()
+            if peer_data.addrs
+        ]
+
+    def _expiry(self, ttl: int) -> float:
+        if ttl >= CONNECTED_ADDR_TTL:
+            return math.inf
+        return self._clock() + ttl
+
+    def _push_addr_expiries(
+        self, peer_id: ID, packed_addrs: Sequence[bytes], expiry: float
+    ) -> None:
+        if expiry == math.inf:
+            return
+        for packed in packed_addrs:
+            heapq.heappush(
+                self._addr_expiries, (expiry, next(self._sequence), peer_id, packed)
+            )
+        if len(self._addr_expiries) > self._addr_expiries_limit:
+            self._compact_addr_expiries()
+
+    def _compact_addr_expiries(self) -> None:
+        # Addresses whose expiry changed many times leave as many stale entries.
+        self._addr_expiries = [
+            (expiry, next(self._sequence), peer_id, packed)
+            for peer_id, peer_data in self.peer_data_map.items()
+            for packed, (expiry, _) in peer_data.addrs.items()
+            if expiry != math.inf
+        ]
+        heapq.heapify(self._addr_expiries)
+        self._addr_expiries_limit = max(
+            MIN_ADDR_EXPIRIES_LIMIT, 2 * len(self._addr_expiries)
+        )
+
+    def _expire_addrs(self) -> None:
+        """
+        Remove the addresses which expired, in O(log n) each, and the peers
+        left without anything stored for them.
+        """
+        now = self._clock()
+        heap = self._addr_expiries
+        while heap and heap[0][0] <= now:
+            expiry, _, peer_id, packed = heapq.heappop(heap)
+            peer_data = self.peer_data_map.get(peer_id)
+            if peer_data is None:
+                continue
+            current = peer_data.addrs.get(packed)
+            if current is None or current[0] != expiry:
+                continue
+            del peer_data.addrs[packed]
+            if peer_data.is_empty():
+                self._remove_peer(peer_id)
+            else:
+                self._peer_changed(peer_id)
+
+    def _peer_changed(self, peer_id: ID) -> None:
+        """
+        Called after the addresses, protocols or public key of a peer changed,
+        or the peer was dropped, for subclasses persisting them.
+        """
 
-        for peer_id in self.peer_data_map:
-            if len(self.peer_data_map[peer_id].get_addrs()) >= 1:
-                output.append(peer_id)
-        return output
+    def record_latency(
+        self, peer_id: ID, rtt: float, addr: Optional[Multiaddr] = None
+    ) -> None:
+        """
+        :param peer_id: peer ID the round trip was made to
+        :param rtt: round trip time, in seconds
+        :param addr: address the round trip was made over, if known
+        """
+        self.metrics.record_latency(peer_id, rtt, addr)
+        if peer_id in self.peer_data_map:
+            self._peer_changed(peer_id)
+
+    def latency_ewma(self, peer_id: ID) -> Optional[float]:
+        """
+        :param peer_id: peer ID to get the latency of
+        :return: moving average of the round trip time in seconds, ``None`` if
+            none was recorded
+        """
+        return self.metrics.latency_ewma(peer_id)
+
+    def addr_latency_ewma(self, peer_id: ID, addr: Multiaddr) -> Optional[float]:
+        """
+        :param peer_id: peer ID to get the latency of
+        :param addr: address to get the latency over
+        :return: moving average of the round trip time in seconds, ``None`` if
+            none was recorded
+        """
+        return self.metrics.addr_latency_ewma(peer_id, addr)
+
+    def record_dial(self, peer_id: ID, addr: Multiaddr, success: bool) -> None:
+        """
+        :param peer_id: peer ID which was dialed
+        :param addr: address which was dialed
+        :param success: whether a connection was established
+        """
+        self.metrics.record_dial(peer_id, addr, success)
+
+    def dial_success_rate(
+        self, peer_id: ID, addr: Optional[Multiaddr] = None
+    ) -> Optional[float]:
+        """
+        :param peer_id: peer ID to get the rate of
+        :param addr: address to get the rate of, rather than of the whole peer
+        :return: moving average of the share of dials which succeeded
+        """
+        return self.metrics.dial_success_rate(peer_id, addr)
+
+    def rank_addrs(self, peer_id: ID, addrs: Iterable[Multiaddr]) -> list[Multiaddr]:
+        """
+        :param peer_id: peer ID the addresses are of
+        :param addrs: addresses to order
+        :return: ``addrs``, the ones expected to connect the soonest first
+        """
+        return self.metrics.rank_addrs(peer_id, addrs)
 
     def add_pubkey(self, peer_id: ID, pubkey: PublicKey) -> None:
         """
@@ -159,10 +475,10 @@ class PeerStore(IPeerStore):
         :param pubkey:
         :raise PeerStoreError: if peer ID and pubkey does not match
         """
-        peer_data = self.peer_data_map[peer_id]
         if ID.from_pubkey(pubkey) != peer_id:
             raise PeerStoreError("peer ID and pubkey does not match")
-        peer_data.add_pubkey(pubkey)
+        self._get_or_create(peer_id).add_pubkey(pubkey)
+        self._peer_changed(peer_id)
 
     def pubkey(self, peer_id: ID) -> PublicKey:
         """
@@ -170,14 +486,13 @@ class PeerStore(IPeerStore):
         :return: public key of the peer
         :raise PeerStoreError: if peer ID or peer pubkey not found
         """
-        if peer_id in self.peer_data_map:
-            peer_data = self.peer_data_map[peer_id]
-            try:
-                pubkey = peer_data.get_pubkey()
-            except PeerDataError as e:
-                raise PeerStoreError("peer pubkey not found") from e
-            return pubkey
-        raise PeerStoreError("peer ID not found")
+        peer_data = self.peer_data_map.get(peer_id)
+        if peer_data is None:
+            raise PeerStoreError("peer ID not found")
+        try:
+            return peer_data.get_pubkey()
+        except PeerDataError as e:
+            raise PeerStoreError("peer pubkey not found") from e
 
     def add_privkey(self, peer_id: ID, privkey: PrivateKey) -> None:
         """
@@ -185,10 +500,9 @@ class PeerStore(IPeerStore):
         :param privkey:
         :raise PeerStoreError: if peer ID or peer privkey not found
         """
-        peer_data = self.peer_data_map[peer_id]
         if ID.from_pubkey(privkey.get_public_key()) != peer_id:
             raise PeerStoreError("peer ID and privkey does not match")
-        peer_data.add_privkey(privkey)
+        self._get_or_create(peer_id).add_privkey(privkey)
 
     def privkey(self, peer_id: ID) -> PrivateKey:
         """
@@ -196,14 +510,13 @@ class PeerStore(IPeerStore):
         :return: private key of the peer
         :raise PeerStoreError: if peer ID or peer privkey not found
         """
-        if peer_id in self.peer_data_map:
-            peer_data = self.peer_data_map[peer_id]
-            try:
-                privkey = peer_data.get_privkey()
-            except PeerDataError as e:
-                raise PeerStoreError("peer privkey not found") from e
-            return privkey
-        raise PeerStoreError("peer ID not found")
+        peer_data = self.peer_data_map.get(peer_id)
+        if peer_data is None:
+            raise PeerStoreError("peer ID not found")
+        try:
+            return peer_data.get_privkey()
+        except PeerDataError as e:
+            raise PeerStoreError("peer privkey not found") from e
 
     def add_key_pair(self, peer_id: ID, key_pair: KeyPair) -> None:
         """
@@ -0,0 +1,337 @@
+from collections.abc import (
+    Iterable,
+)
+import gc
+import heapq
+import math
+import sqlite3
+import struct
+import sys
+import threading
+import time
+from typing import (
+    Callable,
+    Optional,
+)
+
+import trio
+
+from libp2p.crypto.serialization import (
+    deserialize_public_key,
+)
+
+from .id import (
+    ID,
+)
+from .peerdata import (
+    PeerData,
+)
+from .peerstore import (
+    CONNECTED_ADDR_TTL,
+    MIN_ADDR_EXPIRIES_LIMIT,
+    RECENTLY_CONNECTED_ADDR_TTL,
+    PeerStore,
+)
+
+# Peers changed before the pending writes are committed.
+DEFAULT_BATCH_SIZE = 1000
+# Seconds between commits of the pending writes.
+DEFAULT_FLUSH_INTERVAL = 5.0
+
+# A peer as stored: its ID, public key, protocols, addresses and latency.
+_Row = tuple[bytes, Optional[bytes], str, bytes, Optional[float]]
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS peers (
+    peer_id BLOB PRIMARY KEY,
+    pubkey BLOB,
+    protocols TEXT NOT NULL,
+    addrs BLOB NOT NULL,
+    latency REAL
+) WITHOUT ROWID
+"""
+
+
+def _has_latency(db: sqlite3.Connection, schema: str) -> bool:
+    """
+    Whether the peers table of ``schema`` has the latency column, which
+    databases written before latencies were stored lack.
+    """
+    columns = db.execute(f"PRAGMA {schema}.table_info(peers)").fetchall()
+    return any(column[1] == "latency" for column in columns)
+
+
+# Each address is its length, its expiry in `time.time()` terms and its ttl,
+# followed by its bytes.
+_ADDR_HEADER = struct.Struct(">Hdq")
+
+
+def _pack_addrs(peer_data: PeerData, to_wall_time: float) -> bytes:
+    parts = []
+    for packed, (expiry, ttl) in peer_data.addrs.items():
+        parts.append(_ADDR_HEADER.pack(len(packed), expiry + to_wall_time, ttl or 0))
+        parts.append(packed)
+    return b"".join(parts)
+
+
+def _unpack_addrs(data: bytes) -> Iterable[tuple[bytes, float, int]]:
+    offset = 0
+    while offset < len(data):
+        length, wall_expiry, ttl = _ADDR_HEADER.unpack_from(data, offset)
+        offset += _ADDR_HEADER.size
+        yield data[offset : offset + length], wall_expiry, ttl
+        offset += length
+
+
+class SQLitePeerStore(PeerStore):
+    """
+    Peerstore whose addresses, protocols, public keys and latencies are kept
+    in a SQLite database, to be loaded back in bulk when a node restarts.
+
+    Changes are written behind by ``run_maintenance``, which the swarm runs
+    until it stops: the peers changed are written together every
+    ``flush_interval``, or once ``batch_size`` of them are pending, in a worker
+    thread so that the commits do not block trio, and the rest when the swarm
+    stops. Without it, nothing is written until ``flush`` or ``close``, which
+    write on the calling thread. Metadata and private keys are not stored.
+    """
+
+    _db: sqlite3.Connection
+    # Held while the database is written, possibly by a worker thread.
+    _db_lock: threading.Lock
+    batch_size: int
+    flush_interval: float
+    # Peers changed since the last flush.
+    _dirty: set[ID]
+    _batch_ready: trio.Event
+
+    def __init__(
+        self,
+        path: str,
+        clock: Callable[[], float] = time.monotonic,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        flush_interval: float = DEFAULT_FLUSH_INTERVAL,
+    ) -> None:
+        """
+        :param path: the database file, created if it does not exist
+        :param clock: seconds from an arbitrary point, that addresses expire by
+        :param batch_size: changed peers which trigger a flush
+        :param flush_interval: seconds after which changes are flushed
+        """
+        super().__init__(clock)
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._dirty = set()
+        self._batch_ready = trio.Event()
+        self._db_lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        # Commits only wait for the write-ahead log.
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(_SCHEMA)
+        if not _has_latency(self._db, "main"):
+            self._db.execute("ALTER TABLE peers ADD COLUMN latency REAL")
+        self._db.commit()
+        self._load_rows(
+            self._db.execute(
+                "SELECT peer_id, pubkey, protocols, addrs, latency FROM peers"
+            )
+        )
+
+    def _load_rows(
+        self, rows: Iterable[tuple[bytes, bytes, str, bytes, Optional[float]]]
+    ) -> None:
+        """
+        Replace the addresses, protocols, public keys and latencies of the
+        peers of ``rows`` with theirs. This is the hot path of a restart, so it fills
+        `PeerData` directly and heapifies the expiries once.
+        """
+        now = self._clock()
+        from_wall_time = now - time.time()
+        expiries = self._addr_expiries
+        sequence = self._sequence
+        protocol_peers = self._protocol_peers
+        # Loading allocates many objects but no cycles, garbage collections
+        # meanwhile would only slow it down.
+        gc_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            for peer_id_bytes, pubkey, protocols, addrs, latency in rows:
+                peer_id = ID(peer_id_bytes)
+                peer_data = self.peer_data_map.get(peer_id)
+                if peer_data is None:
+                    peer_data = self.peer_data_map[peer_id] = PeerData()
+                else:
+                    self._unindex_protocols(peer_id, peer_data.protocols)
+                    peer_data.protocols.clear()
+                    peer_data.addrs.clear()
+                if pubkey is not None:
+                    peer_data.pubkey = deserialize_public_key(pubkey)
+                if latency is not None:
+                    self.metrics.set_latency_ewma(peer_id, latency)
+                if protocols:
+                    peer_protocols = peer_data.protocols
+                    for protocol in protocols.split("\n"):
+                        protocol = sys.intern(protocol)
+                        peer_protocols[protocol] = None
+                        peers = protocol_peers.get(protocol)
+                        if peers is None:
+                            protocol_peers[protocol] = {peer_id}
+                        else:
+                            peers.add(peer_id)
+                peer_addrs = peer_data.addrs
+                for addr_bytes, wall_expiry, ttl in _unpack_addrs(addrs):
+                    if ttl == CONNECTED_ADDR_TTL:
+                        # The connection is gone with the process.
+                        ttl = RECENTLY_CONNECTED_ADDR_TTL
+                        expiry = now + ttl
+                    elif wall_expiry == math.inf:
+                        expiry = math.inf
+                    else:
+                        expiry = wall_expiry + from_wall_time
+                        if expiry <= now:
+                            # Drop it from the database too.
+                            self._dirty.add(peer_id)
+                            continue
+                    # Stored as they are, without parsing them.
+                    peer_addrs[addr_bytes] = (expiry, ttl)
+                    if expiry != math.inf:
+                        expiries.append((expiry, next(sequence), peer_id, addr_bytes))
+                if peer_data.is_empty():
+                    del self.peer_data_map[peer_id]
+                    self._dirty.add(peer_id)
+        finally:
+            if gc_enabled:
+                gc.enable()
+        heapq.heapify(expiries)
+        self._addr_expiries_limit = max(MIN_ADDR_EXPIRIES_LIMIT, 2 * len(expiries))
+
+    def _peer_changed(self, peer_id: ID) -> None:
+        self._dirty.add(peer_id)
+        if len(self._dirty) >= self.batch_size:
+            self._batch_ready.set()
+
+    def _row(self, peer_id: ID, to_wall_time: float) -> Optional[_Row]:
+        peer_data = self.peer_data_map.get(peer_id)
+        if peer_data is None:
+            return None
+        pubkey = None
+        if peer_data.pubkey is not None:
+            pubkey = peer_data.pubkey.serialize()
+        return (
+            peer_id.to_bytes(),
+            pubkey,
+            "\n".join(peer_data.protocols),
+            _pack_addrs(peer_data, to_wall_time),
+            self.metrics.latency_ewma(peer_id),
+        )
+
+    def _take_dirty(self) -> tuple[list[_Row], list[tuple[bytes]]]:
+        """
+        :return: the rows of the peers changed since the last flush, and the
+            peer IDs of those to delete
+        """
+        to_wall_time = time.time() - self._clock()
+        rows = []
+        deleted = []
+        for peer_id in self._dirty:
+            row = self._row(peer_id, to_wall_time)
+            if row is None:
+                deleted.append((peer_id.to_bytes(),))
+            else:
+                rows.append(row)
+        self._dirty = set()
+        return rows, deleted
+
+    def _write(self, rows: list[_Row], deleted: list[tuple[bytes]]) -> None:
+        """Write ``rows`` in one transaction, with ``_db_lock`` held."""
+        with self._db:
+            self._db.executemany(
+                "INSERT OR REPLACE INTO peers VALUES (?, ?, ?, ?, ?)", rows
+            )
+            self._db.executemany("DELETE FROM peers WHERE peer_id = ?", deleted)
+
+    def flush(self) -> None:
+        """
+        Write the peers changed since the last flush, in one transaction on
+        the calling thread.
+        """
+        # Waits for a write of `flush_periodically` in progress, so that the
+        # older rows it writes do not overwrite these.
+        with self._db_lock:
+            self._write(*self._take_dirty())
+
+    async def flush_periodically(self) -> None:
+        """
+        Write the peers changed every ``flush_interval``, or as soon as
+        ``batch_size`` of them are pending, until cancelled.
+        """
+        while True:
+            with trio.move_on_after(self.flush_interval):
+                await self._batch_ready.wait()
+            self._batch_ready = trio.Event()
+            if not self._dirty:
+                continue
+            # The rows are taken on the trio thread, which changes the peers,
+            # and only written in the worker thread.
+            self._db_lock.acquire()
+            try:
+                dirty = self._dirty
+                rows, deleted = self._take_dirty()
+                try:
+                    await trio.to_thread.run_sync(self._write, rows, deleted)
+                except BaseException:
+                    # Cancelled before the worker thread started, or the write
+                    # failed: the peers are written by the next flush instead.
+                    self._dirty |= dirty
+                    raise
+            finally:
+                self._db_lock.release()
+
+    async def run_maintenance(self) -> None:
+        """
+        Write the changes behind with ``flush_periodically``, and flush what
+        is left once cancelled.
+        """
+        try:
+            await self.flush_periodically()
+        finally:
+            self.flush()
+
+    def export_to(self, path: str) -> None:
+        """
+        Copy the whole peerstore to the database at ``path``, with SQLite's
+        backup API rather than row by row.
+        """
+        self.flush()
+        target = sqlite3.connect(path)
+        try:
+            self._db.backup(target)
+        finally:
+            target.close()
+
+    def import_from(self, path: str) -> None:
+        """
+        Add the peers stored in the database at ``path``, replacing what is
+        known about them.
+        """
+        self.flush()
+        self._db.execute("ATTACH DATABASE ? AS imported", (path,))
+        try:
+            latency = "latency" if _has_latency(self._db, "imported") else "NULL"
+            rows = self._db.execute(
+                "SELECT peer_id, pubkey, protocols, addrs, "
+                f"{latency} FROM imported.peers"
+            ).fetchall()
+        finally:
+            self._db.execute("DETACH DATABASE imported")
+        with self._db:
+            self._db.executemany(
+                "INSERT OR REPLACE INTO peers VALUES (?, ?, ?, ?, ?)", rows
+            )
+        self._load_rows(rows)
+
+    def close(self) -> None:
+        """Flush the pending changes and close the database."""
+        self.flush()
+        self._db.close()
@@ -14,6 +14,8 @@ from .exceptions import (
 
 MULTISELECT_PROTOCOL_ID = "/multistream/1.0.0"
 PROTOCOL_NOT_FOUND_MSG = "na"
+# Seconds the connection upgrades wait for peers to agree on a protocol.
+DEFAULT_NEGOTIATE_TIMEOUT = 60
 
 
 class Multiselect(IMultiselectMuxer):
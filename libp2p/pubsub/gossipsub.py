@@ -9,6 +9,7 @@ from collections.abc import (
     Sequence,
 )
 import logging
+import math
 import random
 from typing import (
     Any,
@@ -54,6 +55,9 @@ from .pubsub import (
 
 PROTOCOL_ID = TProtocol("/meshsub/1.0.0")
 
+# Mesh and fanout peers are the fastest of this many times as many random ones.
+LATENCY_SAMPLE_FACTOR = 2
+
 logger = logging.getLogger("libp2p.pubsub.gossipsub")
 
 
@@ -266,7 +270,10 @@ class GossipSub(IPubsubRouter, Service):
                         # Combine fanout peers with selected peers
                         fanout_peers.update(
                             self._get_in_topic_gossipsub_peers_from_minus(
-                                topic, self.degree - fanout_size, fanout_peers
+                                topic,
+                                self.degree - fanout_size,
+                                fanout_peers,
+                                prefer_low_latency=True,
                             )
                         )
                 self.fanout[topic] = fanout_peers
@@ -298,7 +305,10 @@ class GossipSub(IPubsubRouter, Service):
             # Selects the remaining number of peers (D-x) from peers.gossipsub[topic].
             if topic in self.pubsub.peer_topics:
                 selected_peers = self._get_in_topic_gossipsub_peers_from_minus(
-                    topic, self.degree - fanout_size, fanout_peers
+                    topic,
+                    self.degree - fanout_size,
+                    fanout_peers,
+                    prefer_low_latency=True,
                 )
                 # Combine fanout peers with selected peers
                 fanout_peers.update(selected_peers)
@@ -438,7 +448,10 @@ class GossipSub(IPubsubRouter, Service):
             if num_mesh_peers_in_topic < self.degree_low:
                 # Select D - |mesh[topic]| peers from peers.gossipsub[topic] - mesh[topic]  # noqa: E501
                 selected_peers = self._get_in_topic_gossipsub_peers_from_minus(
-                    topic, self.degree - num_mesh_peers_in_topic, self.mesh[topic]
+                    topic,
+                    self.degree - num_mesh_peers_in_topic,
+                    self.mesh[topic],
+                    prefer_low_latency=True,
                 )
 
                 for peer in selected_peers:
@@ -487,6 +500,7 @@ class GossipSub(IPubsubRouter, Service):
                         topic,
                         self.degree - num_fanout_peers_in_topic,
                         self.fanout[topic],
+                        prefer_low_latency=True,
                     )
                     # Add the peers to fanout[topic]
                     self.fanout[topic].update(selected_peers)
@@ -561,14 +575,35 @@ class GossipSub(IPubsubRouter, Service):
         return selection
 
     def _get_in_topic_gossipsub_peers_from_minus(
-        self, topic: str, num_to_select: int, minus: Iterable[ID]
+        self,
+        topic: str,
+        num_to_select: int,
+        minus: Iterable[ID],
+        prefer_low_latency: bool = False,
     ) -> list[ID]:
         gossipsub_peers_in_topic = {
             peer_id
             for peer_id in self.pubsub.peer_topics[topic]
             if self.peer_protocol[peer_id] == PROTOCOL_ID
         }
-        return self.select_from_minus(num_to_select, gossipsub_peers_in_topic, minus)
+        if not prefer_low_latency:
+            return self.select_from_minus(
+                num_to_select, gossipsub_peers_in_topic, minus
+            )
+        # Keep the fastest of a larger random sample, so that the mesh favours
+        # low latency peers without always settling on the same ones.
+        candidates = self.select_from_minus(
+            LATENCY_SAMPLE_FACTOR * num_to_select, gossipsub_peers_in_topic, minus
+        )
+        if len(candidates) <= num_to_select:
+            return candidates
+        peerstore = self.pubsub.host.get_peerstore()
+
+        def latency(peer_id: ID) -> float:
+            latency = peerstore.latency_ewma(peer_id)
+            return math.inf if latency is None else latency
+
+        return sorted(candidates, key=latency)[:num_to_select]
 
     # RPC handlers
 
@@ -156,6 +156,9 @@ class Pubsub(Service, IPubsub):
 
         self._msg_id_constructor = msg_id_constructor
 
+        # Set before attaching the router, which may adjust it.
+        self.counter = int(time.time())
+
         # Attach this new Pubsub object to the router
         self.router.attach(self)
 
@@ -203,8 +206,6 @@ class Pubsub(Service, IPubsub):
         # Map of topic to topic validator
         self.topic_validators = {}
 
-        self.counter = int(time.time())
-
         self.event_handle_peer_queue_started = trio.Event()
         self.event_handle_dead_peer_queue_started = trio.Event()
 
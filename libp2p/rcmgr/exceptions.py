@@ -0,0 +1,15 @@
+from libp2p.exceptions import (
+    BaseLibp2pError,
+)
+
+
+class ResourceManagerError(BaseLibp2pError):
+    pass
+
+
+class ResourceLimitExceeded(ResourceManagerError):
+    """Raised when a reservation would exceed the limit of a resource scope."""
+
+
+class ResourceScopeClosed(ResourceManagerError):
+    """Raised when a reservation is made on a scope which is already done."""
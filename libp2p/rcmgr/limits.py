@@ -0,0 +1,136 @@
+from enum import (
+    Enum,
+)
+from typing import (
+    NamedTuple,
+    Optional,
+)
+
+# Large enough to never be hit, while keeping every limit an `int`.
+UNLIMITED = (1 << 63) - 1
+
+KiB = 1 << 10
+MiB = 1 << 20
+GiB = 1 << 30
+
+
+class Direction(Enum):
+    INBOUND = 0
+    OUTBOUND = 1
+
+
+class BaseLimit(NamedTuple):
+    """
+    Limits of a single resource scope. ``streams`` and ``conns`` bound the sum
+    of both directions, while the directional fields bound each side alone.
+
+    Reference: https://github.com/libp2p/go-libp2p/blob/master/p2p/host/resource-manager/limit.go  # noqa: E501
+    """
+
+    streams: int = UNLIMITED
+    streams_inbound: int = UNLIMITED
+    streams_outbound: int = UNLIMITED
+    conns: int = UNLIMITED
+    conns_inbound: int = UNLIMITED
+    conns_outbound: int = UNLIMITED
+    memory: int = UNLIMITED
+
+
+class ScopeStat(NamedTuple):
+    """Resources currently reserved in a scope."""
+
+    streams_inbound: int = 0
+    streams_outbound: int = 0
+    conns_inbound: int = 0
+    conns_outbound: int = 0
+    memory: int = 0
+
+    def plus(self, other: "ScopeStat") -> "ScopeStat":
+        return ScopeStat(*(a + b for a, b in zip(self, other)))
+
+    def minus(self, other: "ScopeStat") -> "ScopeStat":
+        return ScopeStat(*(a - b for a, b in zip(self, other)))
+
+    @property
+    def streams(self) -> int:
+        return self.streams_inbound + self.streams_outbound
+
+    @property
+    def conns(self) -> int:
+        return self.conns_inbound + self.conns_outbound
+
+    def exceeded(self, limit: BaseLimit) -> Optional[str]:
+        """
+        :return: the name of the first resource of ``limit`` this stat goes
+            over, or ``None`` if it is within the limit
+        """
+        if self.memory > limit.memory:
+            return "memory"
+        if self.streams_inbound > limit.streams_inbound:
+            return "streams_inbound"
+        if self.streams_outbound > limit.streams_outbound:
+            return "streams_outbound"
+        if self.streams > limit.streams:
+            return "streams"
+        if self.conns_inbound > limit.conns_inbound:
+            return "conns_inbound"
+        if self.conns_outbound > limit.conns_outbound:
+            return "conns_outbound"
+        if self.conns > limit.conns:
+            return "conns"
+        return None
+
+
+def stream_stat(direction: Direction) -> ScopeStat:
+    if direction is Direction.INBOUND:
+        return ScopeStat(streams_inbound=1)
+    return ScopeStat(streams_outbound=1)
+
+
+def conn_stat(direction: Direction) -> ScopeStat:
+    if direction is Direction.INBOUND:
+        return ScopeStat(conns_inbound=1)
+    return ScopeStat(conns_outbound=1)
+
+
+class LimitConfig(NamedTuple):
+    """
+    Limits for every kind of scope. ``peer`` and ``protocol`` are the limits of
+    each individual peer and protocol scope, unless overridden in the
+    ``ResourceManager``.
+    """
+
+    system: BaseLimit = BaseLimit(
+        streams=16384,
+        streams_inbound=8192,
+        conns=1024,
+        conns_inbound=512,
+        memory=1 * GiB,
+    )
+    # Connections before the remote peer is known, and streams before their
+    # protocol is negotiated.
+    transient: BaseLimit = BaseLimit(
+        streams=1024,
+        streams_inbound=512,
+        conns=128,
+        conns_inbound=64,
+        memory=64 * MiB,
+    )
+    peer: BaseLimit = BaseLimit(
+        streams=2048,
+        streams_inbound=1024,
+        conns=8,
+        conns_inbound=4,
+        memory=128 * MiB,
+    )
+    conn: BaseLimit = BaseLimit(
+        streams=1024,
+        streams_inbound=512,
+        memory=64 * MiB,
+    )
+    stream: BaseLimit = BaseLimit(memory=16 * MiB)
+    protocol: BaseLimit = BaseLimit(
+        streams=4096,
+        streams_inbound=2048,
+        memory=256 * MiB,
+    )
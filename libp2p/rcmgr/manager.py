@@ -0,0 +1,351 @@
+from collections.abc import (
+    Mapping,
+)
+import itertools
+from typing import (
+    Callable,
+    Optional,
+)
+
+from libp2p.custom_types import (
+    TProtocol,
+)
+from libp2p.peer.id import (
+    ID,
+)
+
+from .exceptions import (
+    ResourceLimitExceeded,
+    ResourceScopeClosed,
+)
+from .limits import (
+    BaseLimit,
+    Direction,
+    LimitConfig,
+    ScopeStat,
+    conn_stat,
+    stream_stat,
+)
+
+"""
+Reference: https://github.com/libp2p/go-libp2p/tree/master/p2p/host/resource-manager  # noqa: E501
+"""
+
+
+class ResourceScope:
+    """
+    A scope accounts for the resources reserved in it and in all of its
+    ``edges``. Every reservation is checked against the limits of the scope
+    itself and of each edge before anything is committed, so a failed
+    reservation leaves no trace.
+    """
+
+    name: str
+    limit: BaseLimit
+    edges: tuple["ResourceScope", ...]
+    # Number of scopes which currently have this scope as an edge.
+    ref_count: int
+
+    # Everything accounted in this scope, including reservations of the scopes
+    # which have this one as an edge.
+    _stat: ScopeStat
+    # Only the reservations made through this scope.
+    _own: ScopeStat
+    _is_done: bool
+    _on_idle: Optional[Callable[["ResourceScope"], None]]
+
+    def __init__(
+        self,
+        name: str,
+        limit: BaseLimit,
+        edges: tuple["ResourceScope", ...] = (),
+        on_idle: Callable[["ResourceScope"], None] = None,
+    ) -> None:
+        self.name = name
+        self.limit = limit
+        self.edges = edges
+        self.ref_count = 0
+        for edge in edges:
+            edge.ref_count += 1
+        self._stat = ScopeStat()
+        self._own = ScopeStat()
+        self._is_done = False
+        self._on_idle = on_idle
+
+    def __repr__(self) -> str:
+        return f"<{self.__class__.__name__} {self.name} {self._stat}>"
+
+    @property
+    def stat(self) -> ScopeStat:
+        return self._stat
+
+    @property
+    def is_done(self) -> bool:
+        return self._is_done
+
+    @staticmethod
+    def _check(scopes: tuple["ResourceScope", ...], delta: ScopeStat) -> None:
+        for scope in scopes:
+            resource = scope._stat.plus(delta).exceeded(scope.limit)
+            if resource is not None:
+                raise ResourceLimitExceeded(
+                    f"cannot reserve {resource} in scope {scope.name}: "
+                    f"limit={getattr(scope.limit, resource)}"
+                )
+
+    def _reserve(self, delta: ScopeStat) -> None:
+        if self._is_done:
+            raise ResourceScopeClosed(f"scope {self.name} is done")
+        scopes = (self,) + self.edges
+        self._check(scopes, delta)
+        self._own = self._own.plus(delta)
+        for scope in scopes:
+            scope._stat = scope._stat.plus(delta)
+
+    def _release(self, delta: ScopeStat) -> None:
+        self._own = self._own.minus(delta)
+        for scope in (self,) + self.edges:
+            scope._stat = scope._stat.minus(delta)
+
+    def _set_edges(self, edges: tuple["ResourceScope", ...]) -> None:
+        """
+        Move the reservations of this scope from the current edges to
+        ``edges``.
+
+        :raise ResourceLimitExceeded: if any of the new edges cannot take the
+            reservations of this scope, in which case the edges are unchanged
+        """
+        added = tuple(edge for edge in edges if edge not in self.edges)
+        removed = tuple(edge for edge in self.edges if edge not in edges)
+        try:
+            self._check(added, self._own)
+        except ResourceLimitExceeded:
+            for edge in added:
+                edge._maybe_idle()
+            raise
+        for edge in added:
+            edge._stat = edge._stat.plus(self._own)
+            edge.ref_count += 1
+        for edge in removed:
+            edge._stat = edge._stat.minus(self._own)
+            edge.ref_count -= 1
+            edge._maybe_idle()
+        self.edges = edges
+
+    def _maybe_idle(self) -> None:
+        if self._on_idle is not None and self.ref_count == 0:
+            self._on_idle(self)
+
+    def reserve_memory(self, size: int) -> None:
+        """
+        :param size: number of bytes to reserve
+        :raise ResourceLimitExceeded: if the reservation exceeds any limit
+        :raise ResourceScopeClosed: if the scope is already done
+        """
+        self._reserve(ScopeStat(memory=size))
+
+    def release_memory(self, size: int) -> None:
+        """
+        :param size: number of bytes to release, capped at what is reserved
+        """
+        if self._is_done:
+            return
+        self._release(ScopeStat(memory=min(size, self._own.memory)))
+
+    def done(self) -> None:
+        """
+        Release everything reserved through this scope and detach it from its
+        edges. Calling it more than once is a no-op.
+        """
+        if self._is_done:
+            return
+        self._is_done = True
+        self._release(self._own)
+        edges, self.edges = self.edges, ()
+        for edge in edges:
+            edge.ref_count -= 1
+            edge._maybe_idle()
+
+
+class ConnectionScope(ResourceScope):
+    """
+    The scope of a single connection. It starts in the transient scope and is
+    moved to the scope of the remote peer once it is known, i.e. after the
+    security handshake.
+    """
+
+    direction: Direction
+    peer_id: Optional[ID]
+    manager: "ResourceManager"
+
+    def __init__(
+        self, name: str, manager: "ResourceManager", direction: Direction
+    ) -> None:
+        super().__init__(name, manager.limits.conn, (manager.transient, manager.system))
+        self.manager = manager
+        self.direction = direction
+        self.peer_id = None
+
+    def set_peer(self, peer_id: ID) -> None:
+        """
+        :raise ResourceLimitExceeded: if the peer has no room for the connection
+        """
+        peer_scope = self.manager._get_peer_scope(peer_id)
+        self._set_edges((peer_scope, self.manager.system))
+        self.peer_id = peer_id
+
+    def open_stream(self, direction: Direction) -> "StreamScope":
+        """
+        :raise ResourceLimitExceeded: if the stream exceeds any limit
+        :raise ResourceScopeClosed: if the connection scope is already done
+        """
+        if self.is_done:
+            raise ResourceScopeClosed(f"scope {self.name} is done")
+        stream_scope = StreamScope(
+            f"{self.name}-stream-{next(self.manager._stream_ids)}", self, direction
+        )
+        try:
+            stream_scope._reserve(stream_stat(direction))
+        except ResourceLimitExceeded:
+            stream_scope.done()
+            raise
+        return stream_scope
+
+
+class StreamScope(ResourceScope):
+    """
+    The scope of a single stream. Until its protocol is negotiated it is
+    accounted in the transient scope, afterwards in the scope of its protocol.
+    """
+
+    direction: Direction
+    protocol: Optional[TProtocol]
+    manager: "ResourceManager"
+
+    def __init__(
+        self, name: str, conn_scope: ConnectionScope, direction: Direction
+    ) -> None:
+        manager = conn_scope.manager
+        edges: tuple[ResourceScope, ...]
+        if conn_scope.peer_id is None:
+            edges = (conn_scope, manager.transient, manager.system)
+        else:
+            edges = (
+                conn_scope,
+                manager._get_peer_scope(conn_scope.peer_id),
+                manager.transient,
+                manager.system,
+            )
+        super().__init__(name, manager.limits.stream, edges)
+        self.manager = manager
+        self.direction = direction
+        self.protocol = None
+
+    def set_protocol(self, protocol: TProtocol) -> None:
+        """
+        :raise ResourceLimitExceeded: if the protocol has no room for the stream
+        """
+        if self.is_done or self.protocol == protocol:
+            return
+        if self.protocol is None:
+            current = self.manager.transient
+        else:
+            current = self.manager._get_protocol_scope(self.protocol)
+        protocol_scope = self.manager._get_protocol_scope(protocol)
+        self._set_edges(
+            tuple(protocol_scope if edge is current else edge for edge in self.edges)
+        )
+        self.protocol = protocol
+
+
+class ResourceManager:
+    """
+    Track and limit the connections, streams and buffered memory of a node in
+    a hierarchy of scopes: system, transient, peer, protocol, connection and
+    stream.
+    """
+
+    limits: LimitConfig
+    system: ResourceScope
+    transient: ResourceScope
+    peer_scopes: dict[ID, ResourceScope]
+    protocol_scopes: dict[TProtocol, ResourceScope]
+
+    _peer_limits: Mapping[ID, BaseLimit]
+    _protocol_limits: Mapping[TProtocol, BaseLimit]
+
+    def __init__(
+        self,
+        limits: LimitConfig = None,
+        peer_limits: Mapping[ID, BaseLimit] = None,
+        protocol_limits: Mapping[TProtocol, BaseLimit] = None,
+    ) -> None:
+        """
+        :param limits: limits of each kind of scope
+        :param peer_limits: limits of specific peers, overriding ``limits.peer``
+        :param protocol_limits: limits of specific protocols, overriding
+            ``limits.protocol``
+        """
+        self.limits = limits or LimitConfig()
+        self._peer_limits = peer_limits or {}
+        self._protocol_limits = protocol_limits or {}
+        self.system = ResourceScope("system", self.limits.system)
+        self.transient = ResourceScope(
+            "transient", self.limits.transient, (self.system,)
+        )
+        self.peer_scopes = {}
+        self.protocol_scopes = {}
+        self._conn_ids = itertools.count()
+        self._stream_ids = itertools.count()
+
+    def open_connection(self, direction: Direction) -> ConnectionScope:
+        """
+        :raise ResourceLimitExceeded: if the connection exceeds any limit
+        """
+        conn_scope = ConnectionScope(f"conn-{next(self._conn_ids)}", self, direction)
+        try:
+            conn_scope._reserve(conn_stat(direction))
+        except ResourceLimitExceeded:
+            conn_scope.done()
+            raise
+        return conn_scope
+
+    def peer_stat(self, peer_id: ID) -> ScopeStat:
+        if peer_id in self.peer_scopes:
+            return self.peer_scopes[peer_id].stat
+        return ScopeStat()
+
+    def protocol_stat(self, protocol: TProtocol) -> ScopeStat:
+        if protocol in self.protocol_scopes:
+            return self.protocol_scopes[protocol].stat
+        return ScopeStat()
+
+    def _get_peer_scope(self, peer_id: ID) -> ResourceScope:
+        if peer_id not in self.peer_scopes:
+            self.peer_scopes[peer_id] = ResourceScope(
+                f"peer:{peer_id}",
+                self._peer_limits.get(peer_id, self.limits.peer),
+                (self.system,),
+                on_idle=lambda _: self._remove_peer_scope(peer_id),
+            )
+        return self.peer_scopes[peer_id]
+
+    def _get_protocol_scope(self, protocol: TProtocol) -> ResourceScope:
+        if protocol not in self.protocol_scopes:
+            self.protocol_scopes[protocol] = ResourceScope(
+                f"protocol:{protocol}",
+                self._protocol_limits.get(protocol, self.limits.protocol),
+                (self.system,),
+                on_idle=lambda _: self._remove_protocol_scope(protocol),
+            )
+        return self.protocol_scopes[protocol]
+
+    def _remove_peer_scope(self, peer_id: ID) -> None:
+        scope = self.peer_scopes.pop(peer_id, None)
+        if scope is not None:
+            scope.done()
+
+    def _remove_protocol_scope(self, protocol: TProtocol) -> None:
+        scope = self.protocol_scopes.pop(protocol, None)
+        if scope is not None:
+            scope.done()
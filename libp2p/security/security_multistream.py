@@ -5,6 +5,8 @@ from collections import (
     OrderedDict,
 )
 
+import trio
+
 from libp2p.abc import (
     IRawConnection,
     ISecureConn,
@@ -18,6 +20,7 @@ from libp2p.peer.id import (
     ID,
 )
 from libp2p.protocol_muxer.multiselect import (
+    DEFAULT_NEGOTIATE_TIMEOUT,
     Multiselect,
 )
 from libp2p.protocol_muxer.multiselect_client import (
@@ -45,8 +48,18 @@ class SecurityMultistream(ABC):
     transports: "OrderedDict[TProtocol, ISecureTransport]"
     multiselect: Multiselect
     multiselect_client: MultiselectClient
+    negotiate_timeout: float
 
-    def __init__(self, secure_transports_by_protocol: TSecurityOptions) -> None:
+    def __init__(
+        self,
+        secure_transports_by_protocol: TSecurityOptions,
+        negotiate_timeout: float = DEFAULT_NEGOTIATE_TIMEOUT,
+    ) -> None:
+        """
+        :param negotiate_timeout: seconds the peers may take to agree on a
+            security protocol
+        """
+        self.negotiate_timeout = negotiate_timeout
         self.transports = OrderedDict()
         self.multiselect = Multiselect()
         self.multiselect_client = MultiselectClient()
@@ -103,16 +116,18 @@ class SecurityMultistream(ABC):
         :param conn: conn to choose a transport over
         :param is_initiator: true if we are the initiator, false otherwise
         :return: selected secure transport
+        :raise trio.TooSlowError: if it takes longer than ``negotiate_timeout``
         """
         protocol: TProtocol
         communicator = MultiselectCommunicator(conn)
-        if is_initiator:
-            # Select protocol if initiator
-            protocol = await self.multiselect_client.select_one_of(
-                list(self.transports.keys()), communicator
-            )
-        else:
-            # Select protocol if non-initiator
-            protocol, _ = await self.multiselect.negotiate(communicator)
+        with trio.fail_after(self.negotiate_timeout):
+            if is_initiator:
+                # Select protocol if initiator
+                protocol = await self.multiselect_client.select_one_of(
+                    list(self.transports.keys()), communicator
+                )
+            else:
+                # Select protocol if non-initiator
+                protocol, _ = await self.multiselect.negotiate(communicator)
         # Return transport from protocol
         return self.transports[protocol]
@@ -0,0 +1,253 @@
+import logging
+from typing import (
+    TYPE_CHECKING,
+    Optional,
+)
+
+from google.protobuf.message import (
+    DecodeError,
+)
+from multiaddr import (
+    Multiaddr,
+)
+
+from libp2p.abc import (
+    IHost,
+    INetConn,
+    INetStream,
+    INetwork,
+    INotifee,
+    IPubsubRouter,
+)
+from libp2p.custom_types import (
+    TProtocol,
+)
+from libp2p.peer.id import (
+    ID,
+)
+from libp2p.peer.peerstore import (
+    TEMP_ADDR_TTL,
+    PeerStoreError,
+)
+from libp2p.pubsub.pb import (
+    rpc_pb2,
+)
+from libp2p.tools.async_service import (
+    Service,
+)
+
+from .exceptions import (
+    ShardLinkError,
+)
+from .ipc import (
+    ShardLink,
+    ShardMessageKind,
+)
+from .worker import (
+    ShardWorker,
+)
+
+if TYPE_CHECKING:
+    from libp2p.pubsub.pubsub import Pubsub  # noqa: F401
+
+logger = logging.getLogger("libp2p.sharding.bridge")
+
+
+def _parse_addr(data: bytes) -> Multiaddr:
+    """
+    :raise ValueError: if ``data`` is not a binary multiaddr
+    :raise LookupError: if it has a protocol we do not know
+    """
+    addr = Multiaddr(data)
+    # Binary multiaddrs are only decoded when used, which would fail later.
+    str(addr)
+    return addr
+
+
+class ShardBridge(Service):
+    """
+    Connect a worker to its sibling shards: pubsub messages seen by one shard
+    are delivered to the others, and the addresses of newly connected peers
+    are shared so that every shard's peerstore can reach them.
+
+    Remote peers only see the subscriptions of the shard they are connected
+    to, so every shard should subscribe to the same topics.
+    """
+
+    host: IHost
+    worker: ShardWorker
+    links: tuple[ShardLink, ...]
+    pubsub: Optional["Pubsub"]
+
+    # Messages received from siblings which are being pushed through the local
+    # pubsub. They must not be sent back to the siblings.
+    _relayed_msgs: set[bytes]
+
+    def __init__(self, host: IHost, worker: ShardWorker) -> None:
+        self.host = host
+        self.worker = worker
+        self.links = worker.links()
+        self.pubsub = None
+        self._relayed_msgs = set()
+        host.get_network().register_notifee(ShardNotifee(self))
+
+    async def run(self) -> None:
+        for link in self.links:
+            self.manager.run_daemon_task(self._handle_link, link)
+        try:
+            await self.manager.wait_finished()
+        finally:
+            for link in self.links:
+                await link.close()
+
+    def wrap_router(self, router: IPubsubRouter) -> "ShardedRouter":
+        """
+        :return: a router which behaves like ``router`` and relays every
+            message it publishes to the sibling shards. It must be the router
+            given to ``Pubsub``.
+        """
+        return ShardedRouter(router, self)
+
+    async def broadcast(self, kind: ShardMessageKind, *fields: bytes) -> None:
+        for link in self.links:
+            try:
+                await link.send(kind, *fields)
+            except ShardLinkError as error:
+                logger.warning("failed to relay %s: %s", kind, error)
+
+    async def share_peer(self, peer_id: ID) -> None:
+        """Send the addresses of ``peer_id`` in our peerstore to the siblings."""
+        try:
+            addrs = self.host.get_network().peerstore.addrs(peer_id)
+        except PeerStoreError:
+            return
+        await self.broadcast(
+            ShardMessageKind.PEER_ADDRS,
+            peer_id.to_bytes(),
+            *(addr.to_bytes() for addr in addrs),
+        )
+
+    async def _handle_link(self, link: ShardLink) -> None:
+        while True:
+            try:
+                kind, fields = await link.receive()
+            except ShardLinkError as error:
+                logger.debug("link to shard %d is closed: %s", link.remote_index, error)
+                return
+            # Malformed frames are skipped, the link stays up for the others.
+            if kind is ShardMessageKind.PUBSUB_MESSAGE:
+                if len(fields) != 1:
+                    logger.warning(
+                        "skipping a pubsub message of %d fields from shard %d",
+                        len(fields),
+                        link.remote_index,
+                    )
+                    continue
+                await self._handle_pubsub_message(link, fields[0])
+            elif kind is ShardMessageKind.PEER_ADDRS:
+                self._handle_peer_addrs(link, fields)
+
+    def _handle_peer_addrs(self, link: ShardLink, fields: tuple[bytes, ...]) -> None:
+        if not fields or not fields[0]:
+            logger.warning(
+                "skipping peer addresses without peer id from shard %d",
+                link.remote_index,
+            )
+            return
+        peer_id = ID(fields[0])
+        try:
+            addrs = [_parse_addr(addr) for addr in fields[1:]]
+        except (ValueError, LookupError) as error:
+            logger.warning(
+                "skipping invalid addresses of peer %s from shard %d: %s",
+                peer_id,
+                link.remote_index,
+                error,
+            )
+            return
+        self.host.get_network().peerstore.add_addrs(peer_id, addrs, TEMP_ADDR_TTL)
+
+    async def _handle_pubsub_message(self, link: ShardLink, data: bytes) -> None:
+        if self.pubsub is None:
+            return
+        try:
+            msg = rpc_pb2.Message.FromString(data)
+        except DecodeError as error:
+            logger.warning(
+                "skipping an invalid pubsub message from shard %d: %s",
+                link.remote_index,
+                error,
+            )
+            return
+        self._relayed_msgs.add(data)
+        try:
+            # Siblings share our identity, so their messages are forwarded by
+            # "ourselves". They are validated and deduplicated as usual.
+            await self.pubsub.push_msg(self.pubsub.my_id, msg)
+        finally:
+            self._relayed_msgs.discard(data)
+
+
+class ShardedRouter(IPubsubRouter):
+    router: IPubsubRouter
+    bridge: ShardBridge
+
+    def __init__(self, router: IPubsubRouter, bridge: ShardBridge) -> None:
+        self.router = router
+        self.bridge = bridge
+
+    def get_protocols(self) -> list[TProtocol]:
+        return self.router.get_protocols()
+
+    def attach(self, pubsub: "Pubsub") -> None:
+        self.bridge.pubsub = pubsub
+        # Siblings publish with the same peer id, so their sequence numbers
+        # must not collide: each shard counts in its own range.
+        pubsub.counter += self.bridge.worker.index << 56
+        self.router.attach(pubsub)
+
+    def add_peer(self, peer_id: ID, protocol_id: TProtocol) -> None:
+        self.router.add_peer(peer_id, protocol_id)
+
+    def remove_peer(self, peer_id: ID) -> None:
+        self.router.remove_peer(peer_id)
+
+    async def handle_rpc(self, rpc: rpc_pb2.RPC, sender_peer_id: ID) -> None:
+        await self.router.handle_rpc(rpc, sender_peer_id)
+
+    async def publish(self, msg_forwarder: ID, pubsub_msg: rpc_pb2.Message) -> None:
+        await self.router.publish(msg_forwarder, pubsub_msg)
+        data = pubsub_msg.SerializeToString()
+        if data not in self.bridge._relayed_msgs:
+            await self.bridge.broadcast(ShardMessageKind.PUBSUB_MESSAGE, data)
+
+    async def join(self, topic: str) -> None:
+        await self.router.join(topic)
+
+    async def leave(self, topic: str) -> None:
+        await self.router.leave(topic)
+
+
+class ShardNotifee(INotifee):
+    bridge: ShardBridge
+
+    def __init__(self, bridge: ShardBridge) -> None:
+        self.bridge = bridge
+
+    async def opened_stream(self, network: INetwork, stream: INetStream) -> None:
+        pass
+
+    async def closed_stream(self, network: INetwork, stream: INetStream) -> None:
+        pass
+
+    async def connected(self, network: INetwork, conn: INetConn) -> None:
+        await self.bridge.share_peer(conn.muxed_conn.peer_id)
+
+    async def disconnected(self, network: INetwork, conn: INetConn) -> None:
+        pass
+
+    async def listen(self, network: INetwork, multiaddr: Multiaddr) -> None:
+        pass
+
+    async def listen_close(self, network: INetwork, multiaddr: Multiaddr) -> None:
+        pass
@@ -0,0 +1,11 @@
+from libp2p.exceptions import (
+    BaseLibp2pError,
+)
+
+
+class ShardingError(BaseLibp2pError):
+    pass
+
+
+class ShardLinkError(ShardingError):
+    pass
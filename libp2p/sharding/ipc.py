@@ -0,0 +1,97 @@
+from enum import (
+    Enum,
+)
+import logging
+import socket
+
+import trio
+
+from libp2p.exceptions import (
+    ParseError,
+)
+from libp2p.io.exceptions import (
+    IOException,
+)
+from libp2p.io.trio import (
+    TrioTCPStream,
+)
+from libp2p.io.utils import (
+    read_exactly,
+)
+from libp2p.utils import (
+    decode_uvarint_from_stream,
+    encode_uvarint,
+    encode_varint_prefixed,
+    read_varint_prefixed_bytes,
+)
+
+from .exceptions import (
+    ShardLinkError,
+)
+
+logger = logging.getLogger("libp2p.sharding.ipc")
+
+
+class ShardMessageKind(Enum):
+    # A serialized `rpc_pb2.Message` which went through pubsub on the sender.
+    PUBSUB_MESSAGE = 0
+    # A peer id followed by the addresses the sender knows for it.
+    PEER_ADDRS = 1
+
+
+class ShardLink:
+    """
+    A local channel to a sibling shard. Each frame is a kind byte followed by
+    the number of fields and the varint-prefixed fields.
+    """
+
+    remote_index: int
+    stream: TrioTCPStream
+
+    def __init__(self, remote_index: int, sock: socket.socket) -> None:
+        """
+        :param remote_index: index of the shard on the other side
+        :param sock: one end of a connected stream socket pair
+        """
+        self.remote_index = remote_index
+        self.stream = TrioTCPStream(
+            trio.SocketStream(trio.socket.from_stdlib_socket(sock))
+        )
+
+    async def send(self, kind: ShardMessageKind, *fields: bytes) -> None:
+        """
+        :raise ShardLinkError: if the link is broken
+        """
+        frame = (
+            bytes((kind.value,))
+            + encode_uvarint(len(fields))
+            + b"".join(encode_varint_prefixed(field) for field in fields)
+        )
+        try:
+            await self.stream.write(frame)
+        except IOException as error:
+            raise ShardLinkError(
+                f"failed to send to shard {self.remote_index}"
+            ) from error
+
+    async def receive(self) -> tuple[ShardMessageKind, tuple[bytes, ...]]:
+        """
+        :raise ShardLinkError: if the link is broken or the frame is malformed
+        """
+        try:
+            kind = ShardMessageKind((await read_exactly(self.stream, 1))[0])
+            num_fields = await decode_uvarint_from_stream(self.stream)
+            fields = tuple(
+                [
+                    await read_varint_prefixed_bytes(self.stream)
+                    for _ in range(num_fields)
+                ]
+            )
+        except (IOException, ParseError, ValueError) as error:
+            raise ShardLinkError(
+                f"failed to receive from shard {self.remote_index}"
+            ) from error
+        return kind, fields
+
+    async def close(self) -> None:
+        await self.stream.close()
@@ -0,0 +1,106 @@
+from collections.abc import (
+    Awaitable,
+)
+import hashlib
+import itertools
+import multiprocessing
+from multiprocessing.process import (
+    BaseProcess,
+)
+import socket
+from typing import (
+    Any,
+    Callable,
+)
+
+import trio
+
+from libp2p.peer.id import (
+    ID,
+)
+
+from .ipc import (
+    ShardLink,
+)
+
+
+def shard_of(peer_id: ID, count: int) -> int:
+    """
+    :return: index of the shard owning ``peer_id`` among ``count`` shards
+    """
+    digest = hashlib.sha256(peer_id.to_bytes()).digest()
+    return int.from_bytes(digest[:8], "big") % count
+
+
+class ShardWorker:
+    """
+    What a worker process knows about its place among the shards: its index,
+    the number of shards, and a socket connected to each sibling.
+    """
+
+    index: int
+    count: int
+    sockets: dict[int, socket.socket]
+
+    def __init__(self, index: int, count: int, sockets: dict[int, socket.socket]):
+        self.index = index
+        self.count = count
+        self.sockets = sockets
+
+    def links(self) -> tuple[ShardLink, ...]:
+        return tuple(
+            ShardLink(remote_index, sock)
+            for remote_index, sock in sorted(self.sockets.items())
+        )
+
+    def owns(self, peer_id: ID) -> bool:
+        """
+        Peers are partitioned between the shards, so that only one of them
+        dials a given peer and keeps its records.
+        """
+        return shard_of(peer_id, self.count) == self.index
+
+
+ShardMain = Callable[..., Awaitable[None]]
+
+
+def _run_shard(main: ShardMain, worker: ShardWorker, args: tuple[Any, ...]) -> None:
+    trio.run(main, worker, *args)
+
+
+def spawn_shards(main: ShardMain, count: int, *args: Any) -> list[BaseProcess]:
+    """
+    Start ``count`` worker processes, each running ``trio.run(main, worker,
+    *args)`` with its own ``ShardWorker``. Every pair of workers is connected
+    with a socket pair for ``ShardBridge``.
+
+    To share one listening port, each worker listens on the same address with
+    ``TCP(TCPOptions(reuse_port=True))`` and the kernel balances incoming
+    connections between them. Workers are expected to use the same key pair,
+    so that they present a single identity to remote peers.
+
+    :param main: module level async function, as it is pickled into the
+        worker processes
+    :return: the started processes, which the caller should join
+    """
+    sockets: dict[int, dict[int, socket.socket]] = {i: {} for i in range(count)}
+    for i, j in itertools.combinations(range(count), 2):
+        sockets[i][j], sockets[j][i] = socket.socketpair()
+
+    context = multiprocessing.get_context("spawn")
+    processes: list[BaseProcess] = [
+        context.Process(
+            target=_run_shard,
+            args=(main, ShardWorker(i, count, sockets[i]), args),
+            name=f"libp2p-shard-{i}",
+            daemon=True,
+        )
+        for i in range(count)
+    ]
+    for process in processes:
+        process.start()
+    # The children hold their own duplicates of the sockets by now.
+    for worker_sockets in sockets.values():
+        for sock in worker_sockets.values():
+            sock.close()
+    return processes
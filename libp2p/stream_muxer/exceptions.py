@@ -25,3 +25,7 @@ class MuxedStreamEOF(MuxedStreamError, EOFError):
 
 class MuxedStreamClosed(MuxedStreamError):
     pass
+
+
+class MuxedStreamTimeout(MuxedStreamError):
+    pass
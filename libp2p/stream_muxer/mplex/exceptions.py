@@ -4,6 +4,7 @@ from libp2p.stream_muxer.exceptions import (
     MuxedStreamClosed,
     MuxedStreamEOF,
     MuxedStreamReset,
+    MuxedStreamTimeout,
 )
 
 
@@ -25,3 +26,7 @@ class MplexStreamEOF(MuxedStreamEOF):
 
 class MplexStreamClosed(MuxedStreamClosed):
     pass
+
+
+class MplexStreamTimeout(MuxedStreamTimeout):
+    pass
@@ -25,6 +25,23 @@ from libp2p.network.connection.exceptions import (
 from libp2p.peer.id import (
     ID,
 )
+from libp2p.rcmgr.exceptions import (
+    ResourceLimitExceeded,
+)
+from libp2p.rcmgr.limits import (
+    Direction,
+)
+from libp2p.rcmgr.manager import (
+    ConnectionScope,
+    StreamScope,
+)
+from libp2p.stream_muxer.scheduler import (
+    OutboundScheduler,
+    StreamPriority,
+)
+from libp2p.stream_muxer.timer_wheel import (
+    deadline_scope,
+)
 from libp2p.utils import (
     decode_uvarint_from_stream,
     encode_uvarint,
@@ -39,6 +56,7 @@ from .datastructures import (
     StreamID,
 )
 from .exceptions import (
+    MplexStreamTimeout,
     MplexUnavailable,
 )
 from .mplex_stream import (
@@ -59,9 +77,12 @@ class Mplex(IMuxedConn):
 
     secured_conn: ISecureConn
     peer_id: ID
+    resource_scope: Optional[ConnectionScope]
     next_channel_id: int
     streams: dict[StreamID, MplexStream]
     streams_lock: trio.Lock
+    # Orders the messages of the streams, which must not interleave.
+    scheduler: OutboundScheduler
     streams_msg_channels: dict[StreamID, "trio.MemorySendChannel[bytes]"]
     new_stream_send_channel: "trio.MemorySendChannel[IMuxedStream]"
     new_stream_receive_channel: "trio.MemoryReceiveChannel[IMuxedStream]"
@@ -70,7 +91,12 @@ class Mplex(IMuxedConn):
     event_closed: trio.Event
     event_started: trio.Event
 
-    def __init__(self, secured_conn: ISecureConn, peer_id: ID) -> None:
+    def __init__(
+        self,
+        secured_conn: ISecureConn,
+        peer_id: ID,
+        resource_scope: ConnectionScope = None,
+    ) -> None:
         """
         Create a new muxed connection.
 
@@ -78,8 +104,11 @@ class Mplex(IMuxedConn):
         :param generic_protocol_handler: generic protocol handler
         for new muxed streams
         :param peer_id: peer_id of peer the connection is to
+        :param resource_scope: optional scope that every stream of the connection
+            and its buffered data are reserved in
         """
         self.secured_conn = secured_conn
+        self.resource_scope = resource_scope
 
         self.next_channel_id = 0
 
@@ -89,6 +118,7 @@ class Mplex(IMuxedConn):
         # Mapping from stream ID -> buffer of messages for that stream
         self.streams = {}
         self.streams_lock = trio.Lock()
+        self.scheduler = OutboundScheduler()
         self.streams_msg_channels = {}
         channels = trio.open_memory_channel[IMuxedStream](0)
         self.new_stream_send_channel, self.new_stream_receive_channel = channels
@@ -134,11 +164,21 @@ class Mplex(IMuxedConn):
         self.next_channel_id += 1
         return next_id
 
-    async def _initialize_stream(self, stream_id: StreamID, name: str) -> MplexStream:
+    def _open_stream_scope(self, direction: Direction) -> Optional[StreamScope]:
+        """
+        :raise ResourceLimitExceeded: if the connection has no room for the stream
+        """
+        if self.resource_scope is None:
+            return None
+        return self.resource_scope.open_stream(direction)
+
+    async def _initialize_stream(
+        self, stream_id: StreamID, name: str, resource_scope: StreamScope = None
+    ) -> MplexStream:
         send_channel, receive_channel = trio.open_memory_channel[bytes](
             MPLEX_MESSAGE_CHANNEL_SIZE
         )
-        stream = MplexStream(name, stream_id, self, receive_channel)
+        stream = MplexStream(name, stream_id, self, receive_channel, resource_scope)
         async with self.streams_lock:
             self.streams[stream_id] = stream
             self.streams_msg_channels[stream_id] = send_channel
@@ -149,12 +189,14 @@ class Mplex(IMuxedConn):
         Create a new muxed_stream.
 
         :return: a new ``MplexStream``
+        :raise ResourceLimitExceeded: if the resource limits forbid a new stream
         """
+        resource_scope = self._open_stream_scope(Direction.OUTBOUND)
         channel_id = self._get_next_channel_id()
         stream_id = StreamID(channel_id=channel_id, is_initiator=True)
         # Default stream name is the `channel_id`
         name = str(channel_id)
-        stream = await self._initialize_stream(stream_id, name)
+        stream = await self._initialize_stream(stream_id, name, resource_scope)
         await self.send_message(HeaderTags.NewStream, name.encode(), stream_id)
         return stream
 
@@ -168,7 +210,13 @@ class Mplex(IMuxedConn):
             raise MplexUnavailable
 
     async def send_message(
-        self, flag: HeaderTags, data: Optional[bytes], stream_id: StreamID
+        self,
+        flag: HeaderTags,
+        data: Optional[bytes],
+        stream_id: StreamID,
+        deadline: float = None,
+        priority: StreamPriority = StreamPriority.CONTROL,
+        weight: float = 1,
     ) -> int:
         """
         Send a message over the connection.
@@ -176,6 +224,10 @@ class Mplex(IMuxedConn):
         :param flag: header to use
         :param data: data to send in the message
         :param stream_id: stream the message is in
+        :param deadline: optional deadline to start sending the message by
+        :param priority: class of the message, the messages which are not data
+            are control ones
+        :param weight: share of the stream within its class
         """
         # << by 3, then or with flag
         header = encode_uvarint((stream_id.channel_id << 3) | flag.value)
@@ -185,8 +237,15 @@ class Mplex(IMuxedConn):
 
         _bytes = header + encode_varint_prefixed(data)
 
-        # type ignored TODO figure out return for this and write_to_stream
-        return await self.write_to_stream(_bytes)  # type: ignore
+        # Only waiting for our turn is bounded by `deadline`, as cancelling a
+        # message halfway would corrupt the connection.
+        with deadline_scope(deadline, MplexStreamTimeout):
+            await self.scheduler.acquire(stream_id, len(_bytes), priority, weight)
+        try:
+            # type ignored TODO figure out return for this and write_to_stream
+            return await self.write_to_stream(_bytes)  # type: ignore
+        finally:
+            self.scheduler.release()
 
     async def write_to_stream(self, _bytes: bytes) -> None:
         """
@@ -279,7 +338,16 @@ class Mplex(IMuxedConn):
                 raise MplexUnavailable(
                     f"received NewStream message for existing stream: {stream_id}"
                 )
-        mplex_stream = await self._initialize_stream(stream_id, message.decode())
+        try:
+            resource_scope = self._open_stream_scope(Direction.INBOUND)
+        except ResourceLimitExceeded as error:
+            # Refuse the stream before allocating anything for it.
+            logger.debug("rejecting new stream %s: %s", stream_id, error)
+            await self.send_message(HeaderTags.ResetReceiver, None, stream_id)
+            return
+        mplex_stream = await self._initialize_stream(
+            stream_id, message.decode(), resource_scope
+        )
         try:
             await self.new_stream_send_channel.send(mplex_stream)
         except trio.ClosedResourceError:
@@ -298,6 +366,18 @@ class Mplex(IMuxedConn):
             if stream.event_remote_closed.is_set():
                 # TODO: Warn "Received data from remote after stream was closed by them. (len = %d)"  # noqa: E501
                 return
+        if stream.resource_scope is not None:
+            try:
+                stream.resource_scope.reserve_memory(len(message))
+            except ResourceLimitExceeded as error:
+                logger.warning(
+                    "cannot buffer message of stream %s: %s: stream is reset",
+                    stream_id,
+                    error,
+                )
+                await stream.reset()
+                return
+        stream.last_activity = trio.current_time()
         try:
             send_channel.send_nowait(message)
         except (trio.BrokenResourceError, trio.ClosedResourceError):
@@ -330,7 +410,7 @@ class Mplex(IMuxedConn):
         #   the entry of this stream, to avoid others from accessing it.
         if is_local_closed:
             async with self.streams_lock:
-                self.streams.pop(stream_id, None)
+                self._remove_stream(stream_id)
 
     async def _handle_reset(self, stream_id: StreamID) -> None:
         async with self.streams_lock:
@@ -348,20 +428,35 @@ class Mplex(IMuxedConn):
             if not stream.event_local_closed.is_set():
                 stream.event_local_closed.set()
         async with self.streams_lock:
-            self.streams.pop(stream_id, None)
-            self.streams_msg_channels.pop(stream_id, None)
+            self._remove_stream(stream_id)
+
+    def _remove_stream(self, stream_id: StreamID) -> None:
+        """
+        Forget the stream ``stream_id`` and release its resources. The caller
+        must hold ``streams_lock``.
+        """
+        stream = self.streams.pop(stream_id, None)
+        self.streams_msg_channels.pop(stream_id, None)
+        self.scheduler.forget(stream_id)
+        if stream is not None and stream.resource_scope is not None:
+            stream.resource_scope.done()
 
     async def _cleanup(self) -> None:
         if not self.event_shutting_down.is_set():
             self.event_shutting_down.set()
         async with self.streams_lock:
+            # Nothing below yields, so the events are set atomically without
+            # waiting for the `close_lock` of each stream, which a stream sending
+            # its close or reset message holds.
             for stream_id, stream in self.streams.items():
-                async with stream.close_lock:
-                    if not stream.event_remote_closed.is_set():
-                        stream.event_remote_closed.set()
-                        stream.event_reset.set()
-                        stream.event_local_closed.set()
-                send_channel = self.streams_msg_channels[stream_id]
-                await send_channel.aclose()
+                if not stream.event_remote_closed.is_set():
+                    stream.event_remote_closed.set()
+                    stream.event_reset.set()
+                    stream.event_local_closed.set()
+                self.streams_msg_channels[stream_id].close()
+                if stream.resource_scope is not None:
+                    stream.resource_scope.done()
+        if self.resource_scope is not None:
+            self.resource_scope.done()
         self.event_closed.set()
         await self.new_stream_send_channel.aclose()
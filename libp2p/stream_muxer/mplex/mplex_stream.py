@@ -1,5 +1,6 @@
 from typing import (
     TYPE_CHECKING,
+    Optional,
 )
 
 import trio
@@ -7,9 +8,19 @@ import trio
 from libp2p.abc import (
     IMuxedStream,
 )
+from libp2p.rcmgr.manager import (
+    StreamScope,
+)
 from libp2p.stream_muxer.exceptions import (
     MuxedConnUnavailable,
 )
+from libp2p.stream_muxer.scheduler import (
+    StreamPriority,
+)
+from libp2p.stream_muxer.timer_wheel import (
+    deadline_from_ttl,
+    deadline_scope,
+)
 
 from .constants import (
     HeaderTags,
@@ -21,6 +32,7 @@ from .exceptions import (
     MplexStreamClosed,
     MplexStreamEOF,
     MplexStreamReset,
+    MplexStreamTimeout,
 )
 
 if TYPE_CHECKING:
@@ -37,8 +49,14 @@ class MplexStream(IMuxedStream):
     name: str
     stream_id: StreamID
     muxed_conn: "Mplex"
-    read_deadline: int
-    write_deadline: int
+    resource_scope: Optional[StreamScope]
+    # In `trio.current_time()` terms, `None` if there is none.
+    read_deadline: Optional[float]
+    write_deadline: Optional[float]
+    last_activity: float
+    # Order of the messages of the stream against those of the other streams.
+    priority: StreamPriority
+    weight: float
 
     # TODO: Add lock for read/write to avoid interleaving receiving messages?
     close_lock: trio.Lock
@@ -58,18 +76,25 @@ class MplexStream(IMuxedStream):
         stream_id: StreamID,
         muxed_conn: "Mplex",
         incoming_data_channel: "trio.MemoryReceiveChannel[bytes]",
+        resource_scope: StreamScope = None,
     ) -> None:
         """
         Create new MuxedStream in muxer.
 
         :param stream_id: stream id of this stream
         :param muxed_conn: muxed connection of this muxed_stream
+        :param resource_scope: optional scope in which the incoming data is
+            reserved until it is read
         """
         self.name = name
         self.stream_id = stream_id
         self.muxed_conn = muxed_conn
+        self.resource_scope = resource_scope
         self.read_deadline = None
         self.write_deadline = None
+        self.last_activity = trio.current_time()
+        self.priority = StreamPriority.DEFAULT
+        self.weight = 1
         self.event_local_closed = trio.Event()
         self.event_remote_closed = trio.Event()
         self.event_reset = trio.Event()
@@ -86,8 +111,13 @@ class MplexStream(IMuxedStream):
             self._buf.extend(data)
         payload = self._buf
         self._buf = self._buf[len(payload) :]
+        self._release_memory(len(payload))
         return bytes(payload)
 
+    def _release_memory(self, size: int) -> None:
+        if self.resource_scope is not None:
+            self.resource_scope.release_memory(size)
+
     def _read_return_when_blocked(self) -> bytes:
         buf = bytearray()
         while True:
@@ -106,6 +136,8 @@ class MplexStream(IMuxedStream):
 
         :param n: number of bytes to read
         :return: bytes actually read
+        :raise MplexStreamTimeout: if the read deadline passes first, the data
+            received until then is kept for the next read
         """
         if n is not None and n < 0:
             raise ValueError(
@@ -114,6 +146,11 @@ class MplexStream(IMuxedStream):
             )
         if self.event_reset.is_set():
             raise MplexStreamReset
+        self.last_activity = trio.current_time()
+        with deadline_scope(self.read_deadline, MplexStreamTimeout):
+            return await self._read(n)
+
+    async def _read(self, n: Optional[int]) -> bytes:
         if n is None:
             return await self._read_until_eof()
         if len(self._buf) == 0:
@@ -148,6 +185,7 @@ class MplexStream(IMuxedStream):
         self._buf.extend(self._read_return_when_blocked())
         payload = self._buf[:n]
         self._buf = self._buf[len(payload) :]
+        self._release_memory(len(payload))
         return bytes(payload)
 
     async def write(self, data: bytes) -> None:
@@ -155,6 +193,8 @@ class MplexStream(IMuxedStream):
         Write to stream.
 
         :return: number of bytes written
+        :raise MplexStreamTimeout: if the write deadline passes before the
+            connection is free to send the data
         """
         if self.event_local_closed.is_set():
             raise MplexStreamClosed(f"cannot write to closed stream: data={data!r}")
@@ -163,7 +203,10 @@ class MplexStream(IMuxedStream):
             if self.is_initiator
             else HeaderTags.MessageReceiver
         )
-        await self.muxed_conn.send_message(flag, data, self.stream_id)
+        self.last_activity = trio.current_time()
+        await self.muxed_conn.send_message(
+            flag, data, self.stream_id, self.write_deadline, self.priority, self.weight
+        )
 
     async def close(self) -> None:
         """
@@ -190,7 +233,7 @@ class MplexStream(IMuxedStream):
         if _is_remote_closed:
             # Both sides are closed, we can safely remove the buffer from the dict.
             async with self.muxed_conn.streams_lock:
-                self.muxed_conn.streams.pop(self.stream_id, None)
+                self.muxed_conn._remove_stream(self.stream_id)
 
     async def reset(self) -> None:
         """Close both ends of the stream tells this remote side to hang up."""
@@ -222,33 +265,43 @@ class MplexStream(IMuxedStream):
 
         async with self.muxed_conn.streams_lock:
             if self.muxed_conn.streams is not None:
-                self.muxed_conn.streams.pop(self.stream_id, None)
+                self.muxed_conn._remove_stream(self.stream_id)
 
-    # TODO deadline not in use
-    def set_deadline(self, ttl: int) -> bool:
+    def set_deadline(self, ttl: Optional[float]) -> bool:
         """
         Set deadline for muxed stream.
 
+        :param ttl: seconds from now until reads and writes time out, ``None``
+            to remove the deadline
         :return: True if successful
         """
-        self.read_deadline = ttl
-        self.write_deadline = ttl
+        self.read_deadline = self.write_deadline = deadline_from_ttl(ttl)
         return True
 
-    def set_read_deadline(self, ttl: int) -> bool:
+    def set_read_deadline(self, ttl: Optional[float]) -> bool:
         """
         Set read deadline for muxed stream.
 
         :return: True if successful
         """
-        self.read_deadline = ttl
+        self.read_deadline = deadline_from_ttl(ttl)
         return True
 
-    def set_write_deadline(self, ttl: int) -> bool:
+    def set_write_deadline(self, ttl: Optional[float]) -> bool:
         """
         Set write deadline for muxed stream.
 
         :return: True if successful
         """
-        self.write_deadline = ttl
+        self.write_deadline = deadline_from_ttl(ttl)
         return True
+
+    def set_priority(self, priority: StreamPriority, weight: float = 1) -> None:
+        """
+        :param priority: class of the messages of the stream, the classes are
+            sent in order
+        :param weight: share of the stream within its class, relative to the
+            other streams of the connection
+        """
+        self.priority = priority
+        self.weight = weight
@@ -2,6 +2,8 @@ from collections import (
     OrderedDict,
 )
 
+import trio
+
 from libp2p.abc import (
     IMuxedConn,
     IRawConnection,
@@ -16,6 +18,7 @@ from libp2p.peer.id import (
     ID,
 )
 from libp2p.protocol_muxer.multiselect import (
+    DEFAULT_NEGOTIATE_TIMEOUT,
     Multiselect,
 )
 from libp2p.protocol_muxer.multiselect_client import (
@@ -24,9 +27,9 @@ from libp2p.protocol_muxer.multiselect_client import (
 from libp2p.protocol_muxer.multiselect_communicator import (
     MultiselectCommunicator,
 )
-
-# FIXME: add negotiate timeout to `MuxerMultistream`
-DEFAULT_NEGOTIATE_TIMEOUT = 60
+from libp2p.rcmgr.manager import (
+    ConnectionScope,
+)
 
 
 class MuxerMultistream:
@@ -40,8 +43,18 @@ class MuxerMultistream:
     transports: "OrderedDict[TProtocol, TMuxerClass]"
     multiselect: Multiselect
     multiselect_client: MultiselectClient
+    negotiate_timeout: float
 
-    def __init__(self, muxer_transports_by_protocol: TMuxerOptions) -> None:
+    def __init__(
+        self,
+        muxer_transports_by_protocol: TMuxerOptions,
+        negotiate_timeout: float = DEFAULT_NEGOTIATE_TIMEOUT,
+    ) -> None:
+        """
+        :param negotiate_timeout: seconds the peers may take to agree on a
+            multiplexer
+        """
+        self.negotiate_timeout = negotiate_timeout
         self.transports = OrderedDict()
         self.multiselect = Multiselect()
         self.multiselect_client = MultiselectClient()
@@ -69,17 +82,24 @@ class MuxerMultistream:
 
         :param conn: conn to choose a transport over
         :return: selected muxer transport
+        :raise trio.TooSlowError: if it takes longer than ``negotiate_timeout``
         """
         protocol: TProtocol
         communicator = MultiselectCommunicator(conn)
-        if conn.is_initiator:
-            protocol = await self.multiselect_client.select_one_of(
-                tuple(self.transports.keys()), communicator
-            )
-        else:
-            protocol, _ = await self.multiselect.negotiate(communicator)
+        with trio.fail_after(self.negotiate_timeout):
+            if conn.is_initiator:
+                protocol = await self.multiselect_client.select_one_of(
+                    tuple(self.transports.keys()), communicator
+                )
+            else:
+                protocol, _ = await self.multiselect.negotiate(communicator)
         return self.transports[protocol]
 
-    async def new_conn(self, conn: ISecureConn, peer_id: ID) -> IMuxedConn:
+    async def new_conn(
+        self,
+        conn: ISecureConn,
+        peer_id: ID,
+        resource_scope: ConnectionScope = None,
+    ) -> IMuxedConn:
         transport_class = await self.select_transport(conn)
-        return transport_class(conn, peer_id)
+        return transport_class(conn, peer_id, resource_scope)
@@ -0,0 +1,124 @@
+from collections.abc import (
+    Hashable,
+)
+from enum import (
+    IntEnum,
+)
+import heapq
+import itertools
+
+import trio
+
+
+class StreamPriority(IntEnum):
+    # Lower values are sent first.
+    # Latency sensitive protocols with small messages, e.g. ping and identify.
+    CONTROL = 0
+    DEFAULT = 1
+    # Transfers which should only use what the others leave.
+    BULK = 2
+
+
+class _Waiter:
+    __slots__ = ("event", "cancelled")
+
+    event: trio.Event
+    cancelled: bool
+
+    def __init__(self) -> None:
+        self.event = trio.Event()
+        self.cancelled = False
+
+
+class OutboundScheduler:
+    """
+    Hand a connection to its writers one at a time: writers of a higher
+    priority class first, and weighted fair queuing between the streams of a
+    class, so that a stream sending large messages cannot hold up another one
+    for long.
+
+    Fair queuing is self-clocked: a message is tagged with the virtual time
+    at which a stream of its weight would have finished sending it, and the
+    smallest tag goes first.
+    """
+
+    _busy: bool
+    # Heaps of `(finish_tag, sequence, waiter)` by priority class.
+    _queues: dict[StreamPriority, list[tuple[float, int, _Waiter]]]
+    _virtual_times: dict[StreamPriority, float]
+    # Finish tag of the last message of each stream, by priority class.
+    _finish_tags: dict[tuple[StreamPriority, Hashable], float]
+    _sequence: "itertools.count[int]"
+
+    def __init__(self) -> None:
+        self._busy = False
+        self._queues = {priority: [] for priority in StreamPriority}
+        self._virtual_times = {priority: 0.0 for priority in StreamPriority}
+        self._finish_tags = {}
+        self._sequence = itertools.count()
+
+    @property
+    def queued(self) -> int:
+        return sum(
+            not waiter.cancelled
+            for queue in self._queues.values()
+            for _, _, waiter in queue
+        )
+
+    def _finish_tag(
+        self, key: Hashable, size: int, priority: StreamPriority, weight: float
+    ) -> float:
+        last = self._finish_tags.get((priority, key), 0.0)
+        start = max(self._virtual_times[priority], last)
+        finish = start + size / weight
+        self._finish_tags[priority, key] = finish
+        return finish
+
+    async def acquire(
+        self,
+        key: Hashable,
+        size: int,
+        priority: StreamPriority = StreamPriority.DEFAULT,
+        weight: float = 1,
+    ) -> None:
+        """
+        Wait for the turn of a message of ``size`` bytes of the stream ``key``.
+        ``release`` must be called once it is written.
+
+        :param weight: share of the class of the stream, relative to the others
+        """
+        await trio.lowlevel.checkpoint_if_cancelled()
+        finish = self._finish_tag(key, size, priority, weight)
+        if not self._busy:
+            self._busy = True
+            self._virtual_times[priority] = finish
+            await trio.lowlevel.cancel_shielded_checkpoint()
+            return
+        waiter = _Waiter()
+        heapq.heappush(self._queues[priority], (finish, next(self._sequence), waiter))
+        try:
+            await waiter.event.wait()
+        except BaseException:
+            if waiter.event.is_set():
+                # The turn was ours already, pass it on.
+                self.release()
+            else:
+                waiter.cancelled = True
+            raise
+
+    def release(self) -> None:
+        """Give the turn to the next message, if any."""
+        for priority, queue in self._queues.items():
+            while queue:
+                finish, _, waiter = heapq.heappop(queue)
+                if waiter.cancelled:
+                    continue
+                self._virtual_times[priority] = finish
+                waiter.event.set()
+                return
+        self._busy = False
+
+    def forget(self, key: Hashable) -> None:
+        """Drop the state of the stream ``key`` once it is gone."""
+        for priority in StreamPriority:
+            self._finish_tags.pop((priority, key), None)
@@ -0,0 +1,164 @@
+from collections.abc import (
+    Iterator,
+)
+from contextlib import (
+    contextmanager,
+)
+import math
+from typing import (
+    Callable,
+    Optional,
+)
+
+import trio
+
+from .exceptions import (
+    MuxedStreamTimeout,
+)
+
+# Resolution of the deadlines, in seconds.
+DEFAULT_TICK = 0.01
+# Slots of the wheel, deadlines further than `DEFAULT_TICK * DEFAULT_SLOTS` go
+# around it more than once.
+DEFAULT_SLOTS = 512
+
+
+class TimerHandle:
+    __slots__ = ("tick", "callback", "_wheel")
+
+    tick: int
+    callback: Callable[[], None]
+    _wheel: Optional["TimerWheel"]
+
+    def __init__(
+        self, tick: int, callback: Callable[[], None], wheel: "TimerWheel"
+    ) -> None:
+        self.tick = tick
+        self.callback = callback
+        self._wheel = wheel
+
+    def cancel(self) -> None:
+        """Cancel the timer, nothing happens if it already fired."""
+        if self._wheel is not None:
+            self._wheel._remove(self)
+            self._wheel = None
+
+
+class TimerWheel:
+    """
+    Hashed timer wheel: timers are put in the slot of the tick they expire at,
+    so scheduling and cancelling one is O(1) however many are pending. A
+    single task advances the wheel, and sleeps while it is empty.
+
+    Timers fire at most one tick late.
+    """
+
+    tick: float
+    _slots: list[set[TimerHandle]]
+    # Last tick whose timers have fired.
+    _current_tick: int
+    _pending: int
+    _event_scheduled: trio.Event
+
+    def __init__(self, tick: float = DEFAULT_TICK, slots: int = DEFAULT_SLOTS) -> None:
+        self.tick = tick
+        self._slots = [set() for _ in range(slots)]
+        self._current_tick = self._tick_of(trio.current_time())
+        self._pending = 0
+        self._event_scheduled = trio.Event()
+
+    def __len__(self) -> int:
+        return self._pending
+
+    def _tick_of(self, when: float) -> int:
+        return math.floor(when / self.tick)
+
+    def schedule(self, deadline: float, callback: Callable[[], None]) -> TimerHandle:
+        """
+        Call ``callback`` once ``deadline``, in ``trio.current_time()`` terms,
+        has passed. ``callback`` must not raise.
+        """
+        tick = max(math.ceil(deadline / self.tick), self._current_tick + 1)
+        handle = TimerHandle(tick, callback, self)
+        self._slots[tick % len(self._slots)].add(handle)
+        self._pending += 1
+        self._event_scheduled.set()
+        return handle
+
+    def _remove(self, handle: TimerHandle) -> None:
+        self._slots[handle.tick % len(self._slots)].discard(handle)
+        self._pending -= 1
+
+    def _advance(self, now_tick: int) -> None:
+        # After a long sleep every slot is visited once.
+        first_tick = max(self._current_tick + 1, now_tick - len(self._slots) + 1)
+        for tick in range(first_tick, now_tick + 1):
+            slot = self._slots[tick % len(self._slots)]
+            expired = [handle for handle in slot if handle.tick <= now_tick]
+            for handle in expired:
+                handle.cancel()
+                handle.callback()
+        self._current_tick = max(self._current_tick, now_tick)
+
+    async def run(self) -> None:
+        while True:
+            if not self._pending:
+                await self._event_scheduled.wait()
+                self._event_scheduled = trio.Event()
+                continue
+            next_tick = self._current_tick + 1
+            await trio.sleep_until(next_tick * self.tick)
+            # The division of the time may round down to the previous tick.
+            self._advance(max(next_tick, self._tick_of(trio.current_time())))
+
+
+_timer_wheel: "trio.lowlevel.RunVar[TimerWheel]" = trio.lowlevel.RunVar("timer_wheel")
+
+
+def get_timer_wheel() -> TimerWheel:
+    """
+    :return: the timer wheel of the current trio run, started on first use
+    """
+    try:
+        return _timer_wheel.get()
+    except LookupError:
+        wheel = TimerWheel()
+        trio.lowlevel.spawn_system_task(wheel.run, name="libp2p-timer-wheel")
+        _timer_wheel.set(wheel)
+        return wheel
+
+
+def deadline_from_ttl(ttl: Optional[float]) -> Optional[float]:
+    """
+    :param ttl: seconds from now, or ``None`` for no deadline
+    :return: the deadline in ``trio.current_time()`` terms
+    """
+    if ttl is None:
+        return None
+    return trio.current_time() + ttl
+
+
+@contextmanager
+def deadline_scope(
+    deadline: Optional[float],
+    error_type: type[MuxedStreamTimeout] = MuxedStreamTimeout,
+) -> Iterator[None]:
+    """
+    Cancel the enclosed operation at ``deadline`` through the timer wheel,
+    instead of registering a deadline with trio for each operation.
+
+    :raise MuxedStreamTimeout: of ``error_type``, if ``deadline`` passed
+    """
+    if deadline is None:
+        yield
+        return
+    if deadline <= trio.current_time():
+        raise error_type("deadline exceeded")
+    with trio.CancelScope() as scope:
+        handle = get_timer_wheel().schedule(deadline, scope.cancel)
+        try:
+            yield
+        finally:
+            handle.cancel()
+    if scope.cancelled_caught:
+        raise error_type("deadline exceeded")
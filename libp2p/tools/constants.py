@@ -16,6 +16,7 @@ MAX_READ_LEN = 65535
 
 
 LISTEN_MADDR = multiaddr.Multiaddr("/ip4/127.0.0.1/tcp/0")
+MEMORY_LISTEN_MADDR = multiaddr.Multiaddr("/memory/0")
 
 
 FLOODSUB_PROTOCOL_ID = floodsub.PROTOCOL_ID
@@ -9,6 +9,7 @@ from contextlib import (
 from typing import (
     Any,
     Callable,
+    Optional,
     cast,
 )
 
@@ -104,6 +105,14 @@ from libp2p.tools.async_service import (
 from libp2p.tools.constants import (
     GOSSIPSUB_PARAMS,
 )
+from libp2p.transport.memory.memory import (
+    MEMORY_PROTOCOL,
+    MemoryNetwork,
+    MemoryTransport,
+)
+from libp2p.transport.registry import (
+    TransportRegistry,
+)
 from libp2p.transport.tcp.tcp import (
     TCP,
 )
@@ -115,6 +124,7 @@ from .constants import (
     FLOODSUB_PROTOCOL_ID,
     GOSSIPSUB_PROTOCOL_ID,
     LISTEN_MADDR,
+    MEMORY_LISTEN_MADDR,
 )
 from .utils import (
     connect,
@@ -293,6 +303,7 @@ class SwarmFactory(factory.Factory):
         key_pair: KeyPair = None,
         security_protocol: TProtocol = None,
         muxer_opt: TMuxerOptions = None,
+        memory_network: MemoryNetwork = None,
     ) -> AsyncIterator[Swarm]:
         # `factory.Factory.__init__` does *not* prepare a *default value* if we pass
         # an argument explicitly with `None`. If an argument is `None`, we don't pass it
@@ -304,9 +315,18 @@ class SwarmFactory(factory.Factory):
             optional_kwargs["security_protocol"] = security_protocol
         if muxer_opt is not None:
             optional_kwargs["muxer_opt"] = muxer_opt
+        # Nodes on a memory network listen on it instead of a TCP port.
+        listen_maddr = LISTEN_MADDR
+        if memory_network is not None:
+            optional_kwargs["transports"] = TransportRegistry(
+                {MEMORY_PROTOCOL: MemoryTransport(memory_network)}
+            )
+            listen_maddr = MEMORY_LISTEN_MADDR
+            # RSA key generation would dominate the setup of large simulations.
+            optional_kwargs.setdefault("key_pair", create_ed25519_key_pair())
         swarm = cls(**optional_kwargs)
         async with background_trio_service(swarm):
-            await swarm.listen(LISTEN_MADDR)
+            await swarm.listen(listen_maddr)
             yield swarm
 
     @classmethod
@@ -316,12 +336,15 @@ class SwarmFactory(factory.Factory):
         number: int,
         security_protocol: TProtocol = None,
         muxer_opt: TMuxerOptions = None,
+        memory_network: MemoryNetwork = None,
     ) -> AsyncIterator[tuple[Swarm, ...]]:
         async with AsyncExitStack() as stack:
             ctx_mgrs = [
                 await stack.enter_async_context(
                     cls.create_and_listen(
-                        security_protocol=security_protocol, muxer_opt=muxer_opt
+                        security_protocol=security_protocol,
+                        muxer_opt=muxer_opt,
+                        memory_network=memory_network,
                     )
                 )
                 for _ in range(number)
@@ -351,9 +374,13 @@ class HostFactory(factory.Factory):
         number: int,
         security_protocol: TProtocol = None,
         muxer_opt: TMuxerOptions = None,
+        memory_network: MemoryNetwork = None,
     ) -> AsyncIterator[tuple[BasicHost, ...]]:
         async with SwarmFactory.create_batch_and_listen(
-            number, security_protocol=security_protocol, muxer_opt=muxer_opt
+            number,
+            security_protocol=security_protocol,
+            muxer_opt=muxer_opt,
+            memory_network=memory_network,
         ) as swarms:
             hosts = tuple(BasicHost(swarm) for swarm in swarms)
             yield hosts
@@ -368,7 +395,7 @@ class DummyRouter(IPeerRouting):
     def _add_peer(self, peer_id: ID, addrs: list[Multiaddr]) -> None:
         self._routing_table[peer_id] = PeerInfo(peer_id, addrs)
 
-    async def find_peer(self, peer_id: ID) -> PeerInfo:
+    async def find_peer(self, peer_id: ID) -> Optional[PeerInfo]:
         await trio.lowlevel.checkpoint()
         return self._routing_table.get(peer_id, None)
 
@@ -472,9 +499,13 @@ class PubsubFactory(factory.Factory):
         security_protocol: TProtocol = None,
         muxer_opt: TMuxerOptions = None,
         msg_id_constructor: Callable[[rpc_pb2.Message], bytes] = None,
+        memory_network: MemoryNetwork = None,
     ) -> AsyncIterator[tuple[Pubsub, ...]]:
         async with HostFactory.create_batch_and_listen(
-            number, security_protocol=security_protocol, muxer_opt=muxer_opt
+            number,
+            security_protocol=security_protocol,
+            muxer_opt=muxer_opt,
+            memory_network=memory_network,
         ) as hosts:
             # Pubsubs should exit before hosts
             async with AsyncExitStack() as stack:
@@ -501,6 +532,7 @@ class PubsubFactory(factory.Factory):
         msg_id_constructor: Callable[
             [rpc_pb2.Message], bytes
         ] = get_peer_and_seqno_msg_id,
+        memory_network: MemoryNetwork = None,
     ) -> AsyncIterator[tuple[Pubsub, ...]]:
         if protocols is not None:
             floodsubs = FloodsubFactory.create_batch(number, protocols=list(protocols))
@@ -514,6 +546,7 @@ class PubsubFactory(factory.Factory):
             security_protocol=security_protocol,
             muxer_opt=muxer_opt,
             msg_id_constructor=msg_id_constructor,
+            memory_network=memory_network,
         ) as pubsubs:
             yield pubsubs
 
@@ -539,6 +572,7 @@ class PubsubFactory(factory.Factory):
         msg_id_constructor: Callable[
             [rpc_pb2.Message], bytes
         ] = get_peer_and_seqno_msg_id,
+        memory_network: MemoryNetwork = None,
     ) -> AsyncIterator[tuple[Pubsub, ...]]:
         if protocols is not None:
             gossipsubs = GossipsubFactory.create_batch(
@@ -570,6 +604,7 @@ class PubsubFactory(factory.Factory):
             security_protocol=security_protocol,
             muxer_opt=muxer_opt,
             msg_id_constructor=msg_id_constructor,
+            memory_network=memory_network,
         ) as pubsubs:
             async with AsyncExitStack() as stack:
                 for router in gossipsubs:
@@ -0,0 +1,7 @@
+from libp2p.transport.exceptions import (
+    OpenConnectionError,
+)
+
+
+class DNSResolutionError(OpenConnectionError):
+    pass
@@ -0,0 +1,251 @@
+"""
+Resolution of ``/dns``, ``/dns4``, ``/dns6`` and ``/dnsaddr`` multiaddrs into
+the ``/ip4`` and ``/ip6`` ones transports can dial.
+
+reference: https://github.com/multiformats/multiaddr/blob/master/protocols/DNSADDR.md
+"""
+from abc import (
+    ABC,
+    abstractmethod,
+)
+import logging
+from typing import (
+    Any,
+    NamedTuple,
+    Optional,
+)
+
+from lru import (
+    LRU,
+)
+from multiaddr import (
+    Multiaddr,
+)
+import trio
+
+from .exceptions import (
+    DNSResolutionError,
+)
+
+logger = logging.getLogger("libp2p.transport.dns.resolver")
+
+# Record types looked up for each protocol, and the protocol of the results.
+DNS_PROTOCOLS: dict[str, tuple[tuple[str, str], ...]] = {
+    "dns": (("A", "ip4"), ("AAAA", "ip6")),
+    "dns4": (("A", "ip4"),),
+    "dns6": (("AAAA", "ip6"),),
+}
+DNSADDR_PROTOCOL = "dnsaddr"
+DNSADDR_PREFIX = "dnsaddr="
+# `/dnsaddr` records may point to other ones, same limit as go-libp2p.
+MAX_DNSADDR_DEPTH = 32
+
+DEFAULT_CACHE_SIZE = 1024
+# Seconds a lookup is cached when the backend does not know the TTL.
+DEFAULT_TTL = 60.0
+
+
+def is_dns_addr(maddr: Multiaddr) -> bool:
+    for protocol in maddr.protocols():
+        return protocol.name in DNS_PROTOCOLS or protocol.name == DNSADDR_PROTOCOL
+    return False
+
+
+class DNSRecord(NamedTuple):
+    value: str
+    # Seconds the record can be cached, `None` if unknown.
+    ttl: Optional[float] = None
+
+
+class DNSBackend(ABC):
+    @abstractmethod
+    async def lookup(self, name: str, record_type: str) -> list[DNSRecord]:
+        """
+        :param record_type: ``A``, ``AAAA`` or ``TXT``
+        :return: the records, the text of ``TXT`` ones
+        :raise DNSResolutionError: if the lookup fails
+        """
+        ...
+
+
+def _dnspython() -> Any:
+    # Imported here, as `dnspython` is an optional dependency.
+    try:
+        import dns.resolver
+    except ImportError:
+        return None
+    return dns
+
+
+class SystemDNSBackend(DNSBackend):
+    """
+    Looks up records with ``dnspython`` if it is installed, which gives their
+    TTL. Otherwise ``A`` and ``AAAA`` records come from ``getaddrinfo``, and
+    ``TXT`` ones, thus ``/dnsaddr``, are not supported. Both block, so they run
+    in a worker thread.
+    """
+
+    timeout: float
+
+    def __init__(self, timeout: float = 5.0) -> None:
+        """
+        :param timeout: seconds a lookup may take
+        """
+        self.timeout = timeout
+
+    async def lookup(self, name: str, record_type: str) -> list[DNSRecord]:
+        dns = _dnspython()
+        if dns is not None:
+            return await self._lookup_dnspython(dns, name, record_type)
+        if record_type == "TXT":
+            raise DNSResolutionError(
+                f"looking up TXT records of {name} needs dnspython"
+            )
+        return await self._lookup_getaddrinfo(name, record_type)
+
+    async def _lookup_dnspython(
+        self, dns: Any, name: str, record_type: str
+    ) -> list[DNSRecord]:
+        try:
+            answer = await trio.to_thread.run_sync(
+                lambda: dns.resolver.resolve(name, record_type, lifetime=self.timeout),
+                # `trio-typing` stubs predate this argument.
+                abandon_on_cancel=True,  # type: ignore[call-arg]
+            )
+        except dns.exception.DNSException as error:
+            raise DNSResolutionError(
+                f"failed to look up {record_type} records of {name}: {error}"
+            ) from error
+        ttl = answer.rrset.ttl
+        if record_type == "TXT":
+            return [
+                DNSRecord(b"".join(rdata.strings).decode(errors="replace"), ttl)
+                for rdata in answer
+            ]
+        return [DNSRecord(rdata.address, ttl) for rdata in answer]
+
+    async def _lookup_getaddrinfo(self, name: str, record_type: str) -> list[DNSRecord]:
+        family = trio.socket.AF_INET if record_type == "A" else trio.socket.AF_INET6
+        try:
+            with trio.fail_after(self.timeout):
+                infos = await trio.socket.getaddrinfo(
+                    name, None, family, trio.socket.SOCK_STREAM
+                )
+        except (OSError, trio.TooSlowError) as error:
+            raise DNSResolutionError(
+                f"failed to look up {record_type} records of {name}: {error}"
+            ) from error
+        # One entry per address, in the order of preference of the system.
+        addresses = dict.fromkeys(str(info[4][0]) for info in infos)
+        return [DNSRecord(address) for address in addresses]
+
+
+class DNSResolver:
+    """
+    Expand DNS multiaddrs, caching lookups for the TTL of their records. The
+    cache is bounded, the least recently used lookups are evicted first.
+    """
+
+    backend: DNSBackend
+    default_ttl: float
+    _cache: "LRU[tuple[str, str], tuple[float, list[str]]]"
+
+    def __init__(
+        self,
+        backend: DNSBackend = None,
+        cache_size: int = DEFAULT_CACHE_SIZE,
+        default_ttl: float = DEFAULT_TTL,
+    ) -> None:
+        """
+        :param backend: where records are looked up, the system resolver if
+            not given
+        :param cache_size: number of lookups kept in the cache
+        :param default_ttl: seconds a lookup is cached when its TTL is unknown
+        """
+        self.backend = backend or SystemDNSBackend()
+        self.default_ttl = default_ttl
+        self._cache = LRU(cache_size)
+
+    async def lookup(self, name: str, record_type: str) -> list[str]:
+        """
+        :return: the values of the ``record_type`` records of ``name``
+        :raise DNSResolutionError: if the lookup fails
+        """
+        key = (name, record_type)
+        now = trio.current_time()
+        cached = self._cache.get(key)
+        if cached is not None:
+            expires_at, values = cached
+            if now < expires_at:
+                return values
+            del self._cache[key]
+
+        records = await self.backend.lookup(name, record_type)
+        values = [record.value for record in records]
+        ttl = min(
+            (record.ttl for record in records if record.ttl is not None),
+            default=self.default_ttl,
+        )
+        if ttl > 0:
+            self._cache[key] = (now + ttl, values)
+        return values
+
+    async def resolve(self, maddr: Multiaddr) -> list[Multiaddr]:
+        """
+        :return: the addresses ``maddr`` resolves to, itself if it is not a
+            DNS multiaddr
+        :raise DNSResolutionError: if ``maddr`` does not resolve to anything
+        """
+        return await self._resolve(maddr, MAX_DNSADDR_DEPTH)
+
+    async def _resolve(self, maddr: Multiaddr, depth: int) -> list[Multiaddr]:
+        if not is_dns_addr(maddr):
+            return [maddr]
+        protocol, name = next(iter(maddr.items()))
+        # What follows the DNS component, e.g. `/tcp/4001/p2p/Qm...`.
+        rest = str(maddr)[len(f"/{protocol.name}/{name}") :]
+
+        if protocol.name == DNSADDR_PROTOCOL:
+            if depth == 0:
+                raise DNSResolutionError(f"too many nested /dnsaddr in {maddr}")
+            return await self._resolve_dnsaddr(maddr, name, rest, depth)
+
+        resolved: list[Multiaddr] = []
+        errors: list[DNSResolutionError] = []
+        for record_type, ip_protocol in DNS_PROTOCOLS[protocol.name]:
+            try:
+                addresses = await self.lookup(name, record_type)
+            except DNSResolutionError as error:
+                errors.append(error)
+                continue
+            resolved += [
+                Multiaddr(f"/{ip_protocol}/{address}{rest}") for address in addresses
+            ]
+        if not resolved:
+            if errors:
+                raise errors[0]
+            raise DNSResolutionError(f"{maddr} resolves to no address")
+        return resolved
+
+    async def _resolve_dnsaddr(
+        self, maddr: Multiaddr, name: str, rest: str, depth: int
+    ) -> list[Multiaddr]:
+        resolved: list[Multiaddr] = []
+        for text in await self.lookup(f"_dnsaddr.{name}", "TXT"):
+            if not text.startswith(DNSADDR_PREFIX):
+                continue
+            try:
+                record_maddr = Multiaddr(text[len(DNSADDR_PREFIX) :])
+            except ValueError:
+                logger.debug("invalid /dnsaddr record of %s: %s", name, text)
+                continue
+            # e.g. only the addresses of the peer of `/dnsaddr/<name>/p2p/<id>`
+            if not str(record_maddr).endswith(rest):
+                continue
+            try:
+                resolved += await self._resolve(record_maddr, depth - 1)
+            except DNSResolutionError as error:
+                logger.debug("failed to resolve %s: %s", record_maddr, error)
+        if not resolved:
+            raise DNSResolutionError(f"{maddr} resolves to no address")
+        return resolved
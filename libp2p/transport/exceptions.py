@@ -17,3 +17,15 @@ class SecurityUpgradeFailure(UpgradeFailure):
 
 class MuxerUpgradeFailure(UpgradeFailure):
     pass
+
+
+class SecurityUpgradeTimeout(SecurityUpgradeFailure):
+    pass
+
+
+class MuxerUpgradeTimeout(MuxerUpgradeFailure):
+    pass
+
+
+class UpgradeQueueFull(UpgradeFailure):
+    pass
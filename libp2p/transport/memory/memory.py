@@ -0,0 +1,266 @@
+import itertools
+import logging
+import math
+from typing import (
+    NamedTuple,
+    Optional,
+)
+
+from multiaddr import (
+    Multiaddr,
+)
+import trio
+
+from libp2p.abc import (
+    IListener,
+    IRawConnection,
+    ITransport,
+)
+from libp2p.custom_types import (
+    THandler,
+)
+from libp2p.io.abc import (
+    ReadWriteCloser,
+)
+from libp2p.io.exceptions import (
+    IOException,
+)
+from libp2p.io.trio import (
+    DEFAULT_READ_SIZE,
+)
+from libp2p.network.connection.raw_connection import (
+    RawConnection,
+)
+from libp2p.transport.exceptions import (
+    OpenConnectionError,
+)
+
+logger = logging.getLogger("libp2p.transport.memory")
+
+MEMORY_PROTOCOL = "memory"
+
+
+class LinkOptions(NamedTuple):
+    """Shaping of a simulated link, applied to each direction separately."""
+
+    # One-way delay in seconds.
+    latency: float = 0.0
+    # Bytes per second, or `None` for unlimited.
+    bandwidth: Optional[float] = None
+
+
+class _Chunk(NamedTuple):
+    deliver_at: float
+    data: bytes
+
+
+class MemoryStream(ReadWriteCloser):
+    """
+    One end of an in-memory connection. Writes never block on the reader, but
+    with a bandwidth limit they take as long as the data needs to go through
+    the link, and with a latency the reader only sees data once it arrived.
+    """
+
+    link: LinkOptions
+    read_size: int
+
+    _send_channel: "trio.MemorySendChannel[_Chunk]"
+    _receive_channel: "trio.MemoryReceiveChannel[_Chunk]"
+    _buffer: bytes
+    # When the outgoing link finishes transmitting what was written so far.
+    _link_free_at: float
+    _read_lock: trio.Lock
+    _write_lock: trio.Lock
+
+    def __init__(
+        self,
+        send_channel: "trio.MemorySendChannel[_Chunk]",
+        receive_channel: "trio.MemoryReceiveChannel[_Chunk]",
+        link: LinkOptions,
+        read_size: int = DEFAULT_READ_SIZE,
+    ) -> None:
+        self._send_channel = send_channel
+        self._receive_channel = receive_channel
+        self.link = link
+        self.read_size = read_size
+        self._buffer = b""
+        self._link_free_at = 0.0
+        self._read_lock = trio.Lock()
+        self._write_lock = trio.Lock()
+
+    async def write(self, data: bytes) -> None:
+        async with self._write_lock:
+            deliver_at = 0.0
+            if self.link.bandwidth is not None or self.link.latency:
+                now = trio.current_time()
+                self._link_free_at = max(now, self._link_free_at)
+                if self.link.bandwidth is not None:
+                    self._link_free_at += len(data) / self.link.bandwidth
+                deliver_at = self._link_free_at + self.link.latency
+            try:
+                self._send_channel.send_nowait(_Chunk(deliver_at, bytes(data)))
+            except (trio.ClosedResourceError, trio.BrokenResourceError) as error:
+                raise IOException from error
+            if self.link.bandwidth is not None:
+                await trio.sleep_until(self._link_free_at)
+            else:
+                await trio.lowlevel.checkpoint()
+
+    async def read(self, n: int = None) -> bytes:
+        async with self._read_lock:
+            if n is not None and n == 0:
+                return b""
+            if not self._buffer:
+                try:
+                    chunk = await self._receive_channel.receive()
+                except trio.EndOfChannel:
+                    # Same as a TCP stream at EOF.
+                    return b""
+                except trio.ClosedResourceError as error:
+                    raise IOException from error
+                if chunk.deliver_at > trio.current_time():
+                    await trio.sleep_until(chunk.deliver_at)
+                self._buffer = chunk.data
+            size = self.read_size if n is None else n
+            data, self._buffer = self._buffer[:size], self._buffer[size:]
+            return data
+
+    async def close(self) -> None:
+        await self._send_channel.aclose()
+        await self._receive_channel.aclose()
+
+
+def memory_stream_pair(
+    link: LinkOptions = None,
+) -> tuple[MemoryStream, MemoryStream]:
+    link = link or LinkOptions()
+    send_0, receive_0 = trio.open_memory_channel[_Chunk](math.inf)
+    send_1, receive_1 = trio.open_memory_channel[_Chunk](math.inf)
+    return MemoryStream(send_0, receive_1, link), MemoryStream(send_1, receive_0, link)
+
+
+class MemoryNetwork:
+    """
+    The address space shared by the memory transports of one process. Each
+    listener gets a ``/memory/<id>`` address, ``/memory/0`` picks a free one.
+    """
+
+    link: LinkOptions
+    listeners: dict[int, "MemoryListener"]
+
+    _links: dict[frozenset[int], LinkOptions]
+    _ids: "itertools.count[int]"
+
+    def __init__(self, link: LinkOptions = None) -> None:
+        """
+        :param link: shaping of every link without a specific one, none by
+            default
+        """
+        self.link = link or LinkOptions()
+        self.listeners = {}
+        self._links = {}
+        self._ids = itertools.count(1)
+
+    def set_link(self, id_0: int, id_1: int, link: LinkOptions) -> None:
+        """Shape the links between the listeners ``id_0`` and ``id_1``."""
+        self._links[frozenset((id_0, id_1))] = link
+
+    def get_link(self, id_0: Optional[int], id_1: int) -> LinkOptions:
+        if id_0 is None:
+            return self.link
+        return self._links.get(frozenset((id_0, id_1)), self.link)
+
+    def _register(self, memory_id: int, listener: "MemoryListener") -> int:
+        if memory_id == 0:
+            memory_id = next(self._ids)
+            while memory_id in self.listeners:
+                memory_id = next(self._ids)
+        elif memory_id in self.listeners:
+            raise OSError(f"/memory/{memory_id} is already in use")
+        self.listeners[memory_id] = listener
+        return memory_id
+
+    def _unregister(self, memory_id: int) -> None:
+        self.listeners.pop(memory_id, None)
+
+
+# Shared by every `MemoryTransport` created without an explicit network.
+default_memory_network = MemoryNetwork()
+
+
+class MemoryListener(IListener):
+    transport: "MemoryTransport"
+    ids: list[int]
+
+    _nursery: Optional[trio.Nursery]
+
+    def __init__(self, transport: "MemoryTransport", handler: THandler) -> None:
+        self.transport = transport
+        self.handler = handler
+        self.ids = []
+        self._nursery = None
+
+    async def listen(self, maddr: Multiaddr, nursery: trio.Nursery) -> None:
+        """
+        :param maddr: ``/memory/<id>`` address, ``/memory/0`` to pick a free id
+        :raise OSError: if the address is already in use
+        """
+        memory_id = self.transport.network._register(
+            int(maddr.value_for_protocol(MEMORY_PROTOCOL)), self
+        )
+        self.ids.append(memory_id)
+        self.transport.local_ids.append(memory_id)
+        self._nursery = nursery
+        await trio.lowlevel.checkpoint()
+
+    def _accept(self, stream: MemoryStream) -> None:
+        if self._nursery is None:
+            raise OpenConnectionError("listener is not listening")
+        self._nursery.start_soon(self.handler, stream)
+
+    def get_addrs(self) -> tuple[Multiaddr, ...]:
+        return tuple(
+            Multiaddr(f"/{MEMORY_PROTOCOL}/{memory_id}") for memory_id in self.ids
+        )
+
+    async def close(self) -> None:
+        for memory_id in self.ids:
+            self.transport.network._unregister(memory_id)
+        self.ids = []
+        await trio.lowlevel.checkpoint()
+
+
+class MemoryTransport(ITransport):
+    """
+    Transport between nodes of the same process over in-memory streams, to
+    simulate large networks without sockets. Links can be shaped with
+    ``LinkOptions`` on the ``MemoryNetwork``.
+    """
+
+    network: MemoryNetwork
+    # The ids this transport listens on. The first one identifies the dialing
+    # side when looking up the shaping of a link.
+    local_ids: list[int]
+
+    def __init__(self, network: MemoryNetwork = None) -> None:
+        self.network = network or default_memory_network
+        self.local_ids = []
+
+    async def dial(self, maddr: Multiaddr) -> IRawConnection:
+        """
+        :param maddr: ``/memory/<id>`` address of peer
+        :raise OpenConnectionError: if nothing listens on ``maddr``
+        """
+        memory_id = int(maddr.value_for_protocol(MEMORY_PROTOCOL))
+        listener = self.network.listeners.get(memory_id)
+        if listener is None:
+            raise OpenConnectionError(f"nothing listens on {maddr}")
+        link = self.network.get_link(
+            self.local_ids[0] if self.local_ids else None, memory_id
+        )
+        local_stream, remote_stream = memory_stream_pair(link)
+        listener._accept(remote_stream)
+        return RawConnection(local_stream, True)
+
+    def create_listener(self, handler_function: THandler) -> MemoryListener:
+        return MemoryListener(self, handler_function)
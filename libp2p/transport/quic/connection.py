@@ -0,0 +1,702 @@
+import logging
+import math
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Optional,
+)
+
+import aioquic
+from aioquic.quic import (
+    events,
+)
+from aioquic.quic.connection import (
+    NetworkAddress,
+    QuicConnection,
+)
+from aioquic.quic.packet import (
+    QuicErrorCode,
+)
+from aioquic.tls import (
+    AlertDescription,
+)
+import trio
+
+from libp2p.abc import (
+    IMuxedConn,
+    IMuxedStream,
+)
+from libp2p.peer.id import (
+    ID,
+)
+from libp2p.rcmgr.exceptions import (
+    ResourceLimitExceeded,
+)
+from libp2p.rcmgr.limits import (
+    Direction,
+)
+from libp2p.rcmgr.manager import (
+    ConnectionScope,
+    StreamScope,
+)
+from libp2p.stream_muxer.scheduler import (
+    StreamPriority,
+)
+from libp2p.stream_muxer.timer_wheel import (
+    deadline_from_ttl,
+    deadline_scope,
+)
+
+from .exceptions import (
+    QUICCertificateError,
+    QUICHandshakeFailure,
+    QUICStreamClosed,
+    QUICStreamEOF,
+    QUICStreamReset,
+    QUICStreamTimeout,
+    QUICUnavailable,
+    QUICUnsupportedAioquic,
+)
+from .tls import (
+    verify_certificate,
+)
+
+if TYPE_CHECKING:
+    from .transport import (
+        QUICEndpoint,
+    )
+
+logger = logging.getLogger("libp2p.transport.quic.connection")
+
+# Application error code of stream resets, libp2p does not define any.
+RESET_ERROR_CODE = 0
+# Bytes written to a stream but not sent yet, e.g. as the flow control window
+# of the remote is closed, beyond which writes wait.
+MAX_UNSENT_STREAM_DATA = 256 * 1024
+# The `aioquic` versions whose private attributes below are known.
+AIOQUIC_REQUIREMENT = "aioquic>=1.2.0,<1.7"
+
+
+def aioquic_private(obj: object, name: str) -> Any:
+    """
+    Read an attribute ``aioquic`` has no public equivalent of.
+
+    :raise QUICUnsupportedAioquic: if this version of ``aioquic`` lacks it
+    """
+    try:
+        return getattr(obj, name)
+    except AttributeError as error:
+        owner = obj if isinstance(obj, type) else type(obj)
+        raise QUICUnsupportedAioquic(
+            f"aioquic {aioquic.__version__} has no {owner.__name__}.{name}, "
+            f"the QUIC transport needs {AIOQUIC_REQUIREMENT}"
+        ) from error
+
+
+def _is_unidirectional(stream_id: int) -> bool:
+    return bool(stream_id & 2)
+
+
+def _is_client_initiated(stream_id: int) -> bool:
+    return not stream_id & 1
+
+
+class QUICStream(IMuxedStream):
+    """
+    A bidirectional QUIC stream. Streams are independent: data lost on one of
+    them is retransmitted without holding up the others.
+    """
+
+    stream_id: int
+    muxed_conn: "QUICConnection"
+    resource_scope: Optional[StreamScope]
+    # In `trio.current_time()` terms, `None` if there is none.
+    read_deadline: Optional[float]
+    write_deadline: Optional[float]
+    last_activity: float
+
+    incoming_data_channel: "trio.MemoryReceiveChannel[bytes]"
+
+    event_local_closed: trio.Event
+    event_remote_closed: trio.Event
+    event_reset: trio.Event
+
+    _buf: bytearray
+    # Bytes written since the stream was opened.
+    _bytes_written: int
+
+    def __init__(
+        self,
+        stream_id: int,
+        muxed_conn: "QUICConnection",
+        incoming_data_channel: "trio.MemoryReceiveChannel[bytes]",
+        resource_scope: StreamScope = None,
+    ) -> None:
+        """
+        :param stream_id: QUIC stream id
+        :param muxed_conn: connection the stream belongs to
+        :param resource_scope: optional scope in which the incoming data is
+            reserved until it is read
+        """
+        self.stream_id = stream_id
+        self.muxed_conn = muxed_conn
+        self.resource_scope = resource_scope
+        self.read_deadline = None
+        self.write_deadline = None
+        self.last_activity = trio.current_time()
+        self.incoming_data_channel = incoming_data_channel
+        self.event_local_closed = trio.Event()
+        self.event_remote_closed = trio.Event()
+        self.event_reset = trio.Event()
+        self._buf = bytearray()
+        self._bytes_written = 0
+
+    @property
+    def is_initiator(self) -> bool:
+        return _is_client_initiated(self.stream_id) == self.muxed_conn.is_initiator
+
+    def _release_memory(self, size: int) -> None:
+        if self.resource_scope is not None:
+            self.resource_scope.release_memory(size)
+
+    async def _read_until_eof(self) -> bytes:
+        try:
+            async for data in self.incoming_data_channel:
+                self._buf.extend(data)
+        except trio.ClosedResourceError:
+            raise QUICStreamReset
+        if self.event_reset.is_set():
+            raise QUICStreamReset
+        payload = bytes(self._buf)
+        self._buf.clear()
+        self._release_memory(len(payload))
+        return payload
+
+    async def read(self, n: int = None) -> bytes:
+        """
+        Read up to n bytes. Read possibly returns fewer than `n` bytes, if
+        there are not enough bytes buffered. If `n is None`, read until EOF.
+
+        :param n: number of bytes to read
+        :return: bytes actually read
+        :raise QUICStreamEOF: if the remote closed the stream and all its data
+            was read
+        :raise QUICStreamReset: if the stream was reset
+        :raise QUICStreamTimeout: if the read deadline passes first
+        """
+        if n is not None and n < 0:
+            raise ValueError(
+                "the number of bytes to read `n` must be non-negative or "
+                f"`None` to indicate read until EOF, got n={n}"
+            )
+        if self.event_reset.is_set():
+            raise QUICStreamReset
+        self.last_activity = trio.current_time()
+        with deadline_scope(self.read_deadline, QUICStreamTimeout):
+            return await self._read(n)
+
+    async def _read(self, n: Optional[int]) -> bytes:
+        if n is None:
+            return await self._read_until_eof()
+        if len(self._buf) == 0:
+            try:
+                self._buf.extend(await self.incoming_data_channel.receive())
+            except trio.EndOfChannel:
+                if self.event_reset.is_set():
+                    raise QUICStreamReset
+                raise QUICStreamEOF
+            except trio.ClosedResourceError:
+                # `reset` closed the channel while we were waiting.
+                raise QUICStreamReset
+        # Take whatever else is already there, without waiting for more.
+        while True:
+            try:
+                self._buf.extend(self.incoming_data_channel.receive_nowait())
+            except (trio.WouldBlock, trio.EndOfChannel, trio.ClosedResourceError):
+                break
+        payload = bytes(self._buf[:n])
+        del self._buf[:n]
+        self._release_memory(len(payload))
+        return payload
+
+    async def write(self, data: bytes) -> None:
+        """
+        :raise QUICStreamClosed: if the stream was closed for writing
+        :raise QUICStreamReset: if the stream was reset
+        :raise QUICStreamTimeout: if the write deadline passes first
+        """
+        if self.event_reset.is_set():
+            raise QUICStreamReset
+        if self.event_local_closed.is_set():
+            raise QUICStreamClosed(f"cannot write to closed stream: data={data!r}")
+        deadline = self.write_deadline
+        if deadline is not None and deadline <= trio.current_time():
+            raise QUICStreamTimeout("deadline exceeded")
+        self.last_activity = trio.current_time()
+        self._bytes_written += len(data)
+        # `aioquic` buffers the data at once, the wait for the remote to let
+        # it out bounds what a fast writer buffers.
+        await self.muxed_conn._send_stream_data(self.stream_id, data)
+        with deadline_scope(self.write_deadline, QUICStreamTimeout):
+            await self.muxed_conn._wait_send_window(self.stream_id, self._bytes_written)
+
+    async def close(self) -> None:
+        """
+        Closing a stream closes it for writing and closes the remote end for
+        reading but allows writing in the other direction.
+        """
+        if self.event_local_closed.is_set():
+            return
+        self.event_local_closed.set()
+        try:
+            await self.muxed_conn._send_stream_data(
+                self.stream_id, b"", end_stream=True
+            )
+        except (QUICUnavailable, QUICStreamReset):
+            pass
+        if self.event_remote_closed.is_set():
+            self.muxed_conn._remove_stream(self.stream_id)
+
+    async def reset(self) -> None:
+        """Close both ends of the stream tells this remote side to hang up."""
+        if self.event_reset.is_set() or (
+            self.event_local_closed.is_set() and self.event_remote_closed.is_set()
+        ):
+            return
+        self.event_reset.set()
+        self.event_local_closed.set()
+        self.event_remote_closed.set()
+        await self.incoming_data_channel.aclose()
+        await self.muxed_conn._reset_stream(self.stream_id)
+
+    def set_deadline(self, ttl: Optional[float]) -> bool:
+        """
+        Set deadline for muxed stream.
+
+        :param ttl: seconds from now until reads and writes time out, ``None``
+            to remove the deadline
+        :return: True if successful
+        """
+        self.read_deadline = self.write_deadline = deadline_from_ttl(ttl)
+        return True
+
+    def set_read_deadline(self, ttl: Optional[float]) -> bool:
+        self.read_deadline = deadline_from_ttl(ttl)
+        return True
+
+    def set_write_deadline(self, ttl: Optional[float]) -> bool:
+        self.write_deadline = deadline_from_ttl(ttl)
+        return True
+
+    def set_priority(self, priority: StreamPriority, weight: float = 1) -> None:
+        # QUIC streams are independent, `aioquic` shares the connection between
+        # them itself.
+        pass
+
+
+class QUICConnection(IMuxedConn):
+    """
+    A QUIC connection, secured with TLS 1.3 and multiplexed natively, so it
+    needs no upgrade by the ``TransportUpgrader``.
+
+    The connection state machine is ``aioquic``'s, this class feeds it with
+    the datagrams and the timer events, and sends what it produces.
+    """
+
+    peer_id: ID
+    resource_scope: Optional[ConnectionScope]
+    remote_address: NetworkAddress
+    streams: dict[int, QUICStream]
+    streams_msg_channels: dict[int, "trio.MemorySendChannel[bytes]"]
+    new_stream_send_channel: "trio.MemorySendChannel[IMuxedStream]"
+    new_stream_receive_channel: "trio.MemoryReceiveChannel[IMuxedStream]"
+
+    event_started: trio.Event
+    event_handshake_done: trio.Event
+    event_closed: trio.Event
+    # Set and replaced whenever datagrams are sent, which may have sent the
+    # data of streams.
+    _event_transmitted: trio.Event
+
+    _quic: QuicConnection
+    _endpoint: "QUICEndpoint"
+    # Whether the endpoint only serves this connection, as for dialed ones.
+    _owns_endpoint: bool
+    _timer_scope: Optional[trio.CancelScope]
+    _handshake_error: Optional[Exception]
+    # Id of the next stream the remote opens, and the lower ids not seen yet,
+    # as the first frames of streams may arrive out of order. They tell a new
+    # stream from a forgotten one.
+    _next_remote_stream_id: int
+    _skipped_remote_stream_ids: set[int]
+
+    def __init__(
+        self,
+        quic: QuicConnection,
+        endpoint: "QUICEndpoint",
+        remote_address: NetworkAddress,
+        peer_id: ID = None,
+        owns_endpoint: bool = False,
+        resource_scope: ConnectionScope = None,
+    ) -> None:
+        """
+        :param quic: the ``aioquic`` connection
+        :param endpoint: the endpoint whose socket the connection uses
+        :param remote_address: host and port of the remote
+        :param peer_id: peer expected on the other end, learnt from its
+            certificate if not given
+        :param owns_endpoint: if the endpoint is closed with the connection
+        :param resource_scope: optional scope that every stream of the connection
+            and its buffered data are reserved in
+        """
+        self._quic = quic
+        self._endpoint = endpoint
+        self._owns_endpoint = owns_endpoint
+        self.remote_address = remote_address
+        self.peer_id = peer_id if peer_id is not None else ID(b"")
+        self.resource_scope = resource_scope
+        self.streams = {}
+        self.streams_msg_channels = {}
+        channels = trio.open_memory_channel[IMuxedStream](math.inf)
+        self.new_stream_send_channel, self.new_stream_receive_channel = channels
+        self.event_started = trio.Event()
+        self.event_handshake_done = trio.Event()
+        self.event_closed = trio.Event()
+        self._event_transmitted = trio.Event()
+        self._timer_scope = None
+        self._handshake_error = None
+        # Bidirectional streams of the client have even ids, the server's odd ones.
+        self._next_remote_stream_id = 1 if self.is_initiator else 0
+        self._skipped_remote_stream_ids = set()
+
+    @property
+    def is_initiator(self) -> bool:
+        return self._quic.configuration.is_client
+
+    @property
+    def is_closed(self) -> bool:
+        return self.event_closed.is_set()
+
+    async def start(self) -> None:
+        self.event_started.set()
+        await self._drive(self.event_closed)
+
+    async def close(self) -> None:
+        if self.event_closed.is_set():
+            return
+        self._quic.close()
+        await self._transmit()
+        self._cleanup()
+
+    async def open_stream(self) -> IMuxedStream:
+        """
+        Create a new stream. The remote learns about it with its first data.
+
+        :return: a new ``QUICStream``
+        :raise QUICUnavailable: if the connection is closed
+        :raise ResourceLimitExceeded: if the resource limits forbid a new stream
+        """
+        if self.event_closed.is_set():
+            raise QUICUnavailable("connection is closed")
+        resource_scope = self._open_stream_scope(Direction.OUTBOUND)
+        stream_id = self._quic.get_next_available_stream_id()
+        # Make `aioquic` aware of the stream, so the id is not handed out again.
+        self._quic.send_stream_data(stream_id, b"")
+        return self._add_stream(stream_id, resource_scope)
+
+    async def accept_stream(self) -> IMuxedStream:
+        """
+        Accept a stream opened by the other end.
+
+        :raise QUICUnavailable: if the connection is closed
+        """
+        try:
+            return await self.new_stream_receive_channel.receive()
+        except (trio.EndOfChannel, trio.ClosedResourceError):
+            raise QUICUnavailable("connection is closed")
+
+    async def _handshake(self, timeout: float) -> None:
+        """
+        Drive the connection until the handshake completes.
+
+        :raise QUICHandshakeFailure: if it fails or takes longer than ``timeout``
+        :raise QUICCertificateError: if the remote has no valid certificate
+        """
+        with trio.move_on_after(timeout):
+            await self._drive(self.event_handshake_done)
+        if self._handshake_error is not None:
+            await self.close()
+            raise self._handshake_error
+        if not self.event_handshake_done.is_set():
+            await self.close()
+            raise QUICHandshakeFailure(
+                f"handshake with {self.remote_address} timed out"
+            )
+
+    async def _drive(self, event: trio.Event) -> None:
+        """Run the timer, and the endpoint if owned, until ``event`` is set."""
+        async with trio.open_nursery() as nursery:
+            if self._owns_endpoint:
+                nursery.start_soon(self._endpoint.receive_datagrams)
+            nursery.start_soon(self._handle_timer)
+            await event.wait()
+            nursery.cancel_scope.cancel()
+
+    def _timer_deadline(self) -> float:
+        timer = self._quic.get_timer()
+        return math.inf if timer is None else timer
+
+    async def _handle_timer(self) -> None:
+        while True:
+            # `_transmit` moves the deadline whenever the state machine does.
+            with trio.CancelScope(deadline=self._timer_deadline()) as scope:
+                self._timer_scope = scope
+                await trio.sleep_forever()
+            self._timer_scope = None
+            self._quic.handle_timer(trio.current_time())
+            self._process_events()
+            await self._transmit()
+
+    async def _receive_datagram(self, data: bytes, addr: NetworkAddress) -> None:
+        self._quic.receive_datagram(data, addr, trio.current_time())
+        self._process_events()
+        await self._transmit()
+
+    async def _transmit(self) -> None:
+        for data, addr in self._quic.datagrams_to_send(trio.current_time()):
+            await self._endpoint.send(data, addr)
+        if self._timer_scope is not None:
+            self._timer_scope.deadline = self._timer_deadline()
+        self._event_transmitted.set()
+        self._event_transmitted = trio.Event()
+
+    def _process_events(self) -> None:
+        while True:
+            event = self._quic.next_event()
+            if event is None:
+                return
+            if isinstance(event, events.HandshakeCompleted):
+                self._handle_handshake_completed()
+            elif isinstance(event, events.StreamDataReceived):
+                self._handle_stream_data(event)
+            elif isinstance(event, (events.StreamReset, events.StopSendingReceived)):
+                self._handle_stream_reset(event.stream_id)
+            elif isinstance(event, events.ConnectionIdIssued):
+                self._endpoint.connections[event.connection_id] = self
+            elif isinstance(event, events.ConnectionIdRetired):
+                self._endpoint.connections.pop(event.connection_id, None)
+            elif isinstance(event, events.ConnectionTerminated):
+                logger.debug(
+                    "connection to %s terminated: %s",
+                    self.remote_address,
+                    event.reason_phrase,
+                )
+                if not self.event_handshake_done.is_set():
+                    self._handshake_error = QUICHandshakeFailure(
+                        f"connection to {self.remote_address} terminated: "
+                        f"{event.reason_phrase}"
+                    )
+                self._cleanup()
+
+    def _handle_handshake_completed(self) -> None:
+        # NOTE: `aioquic` keeps the certificate of the remote private. It does
+        #   not verify it either, as libp2p certificates are self-signed.
+        certificate = aioquic_private(self._quic.tls, "_peer_certificate")
+        try:
+            if certificate is None:
+                raise QUICCertificateError("remote sent no certificate")
+            self.peer_id = ID.from_pubkey(verify_certificate(certificate))
+        except QUICCertificateError as error:
+            logger.debug("rejecting %s: %s", self.remote_address, error)
+            self._handshake_error = error
+            self._quic.close(
+                error_code=QuicErrorCode.CRYPTO_ERROR
+                + AlertDescription.bad_certificate,
+                reason_phrase=str(error),
+            )
+        self.event_handshake_done.set()
+
+    def _open_stream_scope(self, direction: Direction) -> Optional[StreamScope]:
+        """
+        :raise ResourceLimitExceeded: if the connection has no room for the stream
+        """
+        if self.resource_scope is None:
+            return None
+        return self.resource_scope.open_stream(direction)
+
+    def _add_stream(
+        self, stream_id: int, resource_scope: StreamScope = None
+    ) -> QUICStream:
+        # QUIC flow control bounds what the remote sends ahead of us.
+        send_channel, receive_channel = trio.open_memory_channel[bytes](math.inf)
+        stream = QUICStream(stream_id, self, receive_channel, resource_scope)
+        self.streams[stream_id] = stream
+        self.streams_msg_channels[stream_id] = send_channel
+        return stream
+
+    def _remove_stream(self, stream_id: int) -> None:
+        """Forget the stream ``stream_id`` and release its resources."""
+        stream = self.streams.pop(stream_id, None)
+        self.streams_msg_channels.pop(stream_id, None)
+        if stream is not None and stream.resource_scope is not None:
+            stream.resource_scope.done()
+
+    def _is_new_remote_stream(self, stream_id: int) -> bool:
+        if _is_client_initiated(stream_id) == self.is_initiator:
+            return False
+        if stream_id in self._skipped_remote_stream_ids:
+            self._skipped_remote_stream_ids.remove(stream_id)
+            return True
+        if stream_id < self._next_remote_stream_id:
+            return False
+        self._skipped_remote_stream_ids.update(
+            range(self._next_remote_stream_id, stream_id, 4)
+        )
+        self._next_remote_stream_id = stream_id + 4
+        return True
+
+    def _accept_remote_stream(self, stream_id: int) -> Optional[QUICStream]:
+        try:
+            resource_scope = self._open_stream_scope(Direction.INBOUND)
+        except ResourceLimitExceeded as error:
+            # Refuse the stream before allocating anything for it.
+            logger.debug("rejecting new stream %d: %s", stream_id, error)
+            self._quic.reset_stream(stream_id, RESET_ERROR_CODE)
+            self._quic.stop_stream(stream_id, RESET_ERROR_CODE)
+            return None
+        stream = self._add_stream(stream_id, resource_scope)
+        self.new_stream_send_channel.send_nowait(stream)
+        return stream
+
+    def _handle_stream_data(self, event: events.StreamDataReceived) -> None:
+        stream_id = event.stream_id
+        stream = self.streams.get(stream_id)
+        if stream is None:
+            if _is_unidirectional(stream_id):
+                # libp2p only uses bidirectional streams.
+                self._quic.stop_stream(stream_id, RESET_ERROR_CODE)
+                return
+            if not self._is_new_remote_stream(stream_id):
+                # Data of a stream we already forgot, e.g. after a reset.
+                return
+            stream = self._accept_remote_stream(stream_id)
+            if stream is None:
+                return
+        send_channel = self.streams_msg_channels[stream_id]
+        if event.data:
+            if stream.resource_scope is not None:
+                try:
+                    stream.resource_scope.reserve_memory(len(event.data))
+                except ResourceLimitExceeded as error:
+                    logger.warning(
+                        "cannot buffer data of stream %d: %s: stream is reset",
+                        stream_id,
+                        error,
+                    )
+                    self._reset_stream_nowait(stream)
+                    return
+            stream.last_activity = trio.current_time()
+            try:
+                send_channel.send_nowait(event.data)
+            except (trio.BrokenResourceError, trio.ClosedResourceError):
+                # The reader is gone after a local reset.
+                return
+        if event.end_stream:
+            stream.event_remote_closed.set()
+            send_channel.close()
+            if stream.event_local_closed.is_set():
+                self._remove_stream(stream_id)
+
+    def _handle_stream_reset(self, stream_id: int) -> None:
+        stream = self.streams.get(stream_id)
+        if stream is None:
+            return
+        stream.event_reset.set()
+        stream.event_remote_closed.set()
+        stream.event_local_closed.set()
+        self.streams_msg_channels[stream_id].close()
+        self._remove_stream(stream_id)
+
+    def _reset_stream_nowait(self, stream: QUICStream) -> None:
+        stream.event_reset.set()
+        stream.event_remote_closed.set()
+        stream.event_local_closed.set()
+        stream.incoming_data_channel.close()
+        self._quic.reset_stream(stream.stream_id, RESET_ERROR_CODE)
+        self._quic.stop_stream(stream.stream_id, RESET_ERROR_CODE)
+        self._remove_stream(stream.stream_id)
+
+    async def _reset_stream(self, stream_id: int) -> None:
+        stream = self.streams.get(stream_id)
+        if stream is None or self.event_closed.is_set():
+            return
+        self._reset_stream_nowait(stream)
+        await self._transmit()
+
+    async def _send_stream_data(
+        self, stream_id: int, data: bytes, end_stream: bool = False
+    ) -> None:
+        """
+        :raise QUICUnavailable: if the connection is closed
+        """
+        if self.event_closed.is_set():
+            raise QUICUnavailable("connection is closed")
+        try:
+            self._quic.send_stream_data(stream_id, data, end_stream)
+        except (ValueError, RuntimeError) as error:
+            # The stream was reset by the remote in the meantime.
+            raise QUICStreamReset from error
+        await self._transmit()
+
+    def _unsent(self, stream_id: int, written: int) -> int:
+        """
+        :return: how many of the first ``written`` bytes of the stream
+            ``aioquic`` has not sent yet
+        """
+        # NOTE: `aioquic` does not tell how much of a stream is sent publicly.
+        quic_stream = aioquic_private(self._quic, "_streams").get(stream_id)
+        if quic_stream is None:
+            return 0
+        return written - quic_stream.sender.highest_offset
+
+    async def _wait_send_window(self, stream_id: int, written: int) -> None:
+        """
+        Wait until at most ``MAX_UNSENT_STREAM_DATA`` of the first ``written``
+        bytes of the stream are left to send.
+
+        :raise QUICUnavailable: if the connection is closed meanwhile
+        :raise QUICStreamReset: if the stream is reset meanwhile
+        """
+        while self._unsent(stream_id, written) > MAX_UNSENT_STREAM_DATA:
+            if self.event_closed.is_set():
+                raise QUICUnavailable("connection is closed")
+            stream = self.streams.get(stream_id)
+            if stream is None or stream.event_reset.is_set():
+                raise QUICStreamReset
+            await self._event_transmitted.wait()
+
+    def _cleanup(self) -> None:
+        if self.event_closed.is_set():
+            return
+        for stream_id, stream in self.streams.items():
+            if not stream.event_remote_closed.is_set():
+                stream.event_reset.set()
+                stream.event_remote_closed.set()
+                stream.event_local_closed.set()
+            self.streams_msg_channels[stream_id].close()
+            if stream.resource_scope is not None:
+                stream.resource_scope.done()
+        self.streams = {}
+        self.streams_msg_channels = {}
+        if self.resource_scope is not None:
+            self.resource_scope.done()
+        self.new_stream_send_channel.close()
+        for connection_id, connection in list(self._endpoint.connections.items()):
+            if connection is self:
+                del self._endpoint.connections[connection_id]
+        if self._owns_endpoint:
+            self._endpoint.close()
+        self.event_closed.set()
+        # Also ends a pending handshake, and the waits for the send window.
+        self.event_handshake_done.set()
+        self._event_transmitted.set()
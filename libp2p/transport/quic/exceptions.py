@@ -0,0 +1,46 @@
+from libp2p.exceptions import (
+    BaseLibp2pError,
+)
+from libp2p.stream_muxer.exceptions import (
+    MuxedConnUnavailable,
+    MuxedStreamClosed,
+    MuxedStreamEOF,
+    MuxedStreamReset,
+    MuxedStreamTimeout,
+)
+from libp2p.transport.exceptions import (
+    OpenConnectionError,
+    SecurityUpgradeFailure,
+)
+
+
+class QUICHandshakeFailure(OpenConnectionError):
+    pass
+
+
+class QUICCertificateError(SecurityUpgradeFailure):
+    pass
+
+
+class QUICUnavailable(MuxedConnUnavailable):
+    pass
+
+
+class QUICStreamReset(MuxedStreamReset):
+    pass
+
+
+class QUICStreamEOF(MuxedStreamEOF):
+    pass
+
+
+class QUICStreamClosed(MuxedStreamClosed):
+    pass
+
+
+class QUICStreamTimeout(MuxedStreamTimeout):
+    pass
+
+
+class QUICUnsupportedAioquic(BaseLibp2pError):
+    pass
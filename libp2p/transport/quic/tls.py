@@ -0,0 +1,183 @@
+"""
+Certificates of the libp2p TLS handshake, which bind the ephemeral key of a
+TLS session to the identity key of a peer.
+
+reference: https://github.com/libp2p/specs/blob/master/tls/tls.md
+"""
+import datetime
+import os
+
+from cryptography import (
+    x509,
+)
+from cryptography.exceptions import (
+    InvalidSignature,
+)
+from cryptography.hazmat.primitives import (
+    hashes,
+    serialization,
+)
+from cryptography.hazmat.primitives.asymmetric import (
+    ec,
+)
+from cryptography.x509.oid import (
+    NameOID,
+)
+from google.protobuf.message import (
+    DecodeError,
+)
+
+from libp2p.crypto.exceptions import (
+    MissingDeserializerError,
+)
+from libp2p.crypto.keys import (
+    KeyPair,
+    PublicKey,
+)
+from libp2p.crypto.serialization import (
+    deserialize_public_key,
+)
+
+from .exceptions import (
+    QUICCertificateError,
+)
+
+ALPN_PROTOCOL = "libp2p"
+SIGNATURE_PREFIX = b"libp2p-tls-handshake:"
+EXTENSION_OID = x509.ObjectIdentifier("1.3.6.1.4.1.53594.1.1")
+# Same as go-libp2p.
+CERTIFICATE_VALIDITY = datetime.timedelta(days=100 * 365)
+
+_DER_OCTET_STRING = 0x04
+_DER_SEQUENCE = 0x30
+
+
+def _encode_der(tag: int, value: bytes) -> bytes:
+    length = len(value)
+    if length < 0x80:
+        return bytes([tag, length]) + value
+    length_bytes = length.to_bytes((length.bit_length() + 7) // 8, "big")
+    return bytes([tag, 0x80 | len(length_bytes)]) + length_bytes + value
+
+
+def _decode_der(data: bytes, tag: int) -> tuple[bytes, bytes]:
+    """
+    :return: the value of the element at the start of ``data``, and what follows
+    :raise ValueError: if ``data`` does not start with a ``tag`` element
+    """
+    if len(data) < 2 or data[0] != tag:
+        raise ValueError(f"expected DER tag {tag:#x}")
+    length, offset = data[1], 2
+    if length & 0x80:
+        size = length & 0x7F
+        if size == 0 or len(data) < offset + size:
+            raise ValueError("invalid DER length")
+        length = int.from_bytes(data[offset : offset + size], "big")
+        offset += size
+    if len(data) < offset + length:
+        raise ValueError("truncated DER element")
+    return data[offset : offset + length], data[offset + length :]
+
+
+def encode_signed_key(public_key: bytes, signature: bytes) -> bytes:
+    """``SignedKey ::= SEQUENCE { publicKey OCTET STRING, signature OCTET STRING }``"""
+    return _encode_der(
+        _DER_SEQUENCE,
+        _encode_der(_DER_OCTET_STRING, public_key)
+        + _encode_der(_DER_OCTET_STRING, signature),
+    )
+
+
+def decode_signed_key(data: bytes) -> tuple[bytes, bytes]:
+    """
+    :return: the serialized public key and the signature
+    :raise ValueError: if ``data`` is not a DER ``SignedKey``
+    """
+    sequence, rest = _decode_der(data, _DER_SEQUENCE)
+    if rest:
+        raise ValueError("trailing data after SignedKey")
+    public_key, rest = _decode_der(sequence, _DER_OCTET_STRING)
+    signature, rest = _decode_der(rest, _DER_OCTET_STRING)
+    if rest:
+        raise ValueError("trailing data in SignedKey")
+    return public_key, signature
+
+
+def _public_key_info(certificate: x509.Certificate) -> bytes:
+    return certificate.public_key().public_bytes(
+        serialization.Encoding.DER, serialization.PublicFormat.SubjectPublicKeyInfo
+    )
+
+
+def generate_certificate(
+    key_pair: KeyPair,
+) -> tuple[x509.Certificate, ec.EllipticCurvePrivateKey]:
+    """
+    Create a self-signed certificate for a fresh P-256 key, carrying the
+    identity public key of ``key_pair`` and its signature of the certificate
+    key in the libp2p extension.
+    """
+    certificate_key = ec.generate_private_key(ec.SECP256R1())
+    # The extension signs the certificate key, which is known before the
+    # certificate itself.
+    public_key_info = certificate_key.public_key().public_bytes(
+        serialization.Encoding.DER, serialization.PublicFormat.SubjectPublicKeyInfo
+    )
+    signature = key_pair.private_key.sign(SIGNATURE_PREFIX + public_key_info)
+    extension = encode_signed_key(key_pair.public_key.serialize(), signature)
+
+    name = x509.Name([x509.NameAttribute(NameOID.SERIAL_NUMBER, os.urandom(16).hex())])
+    now = datetime.datetime.now(datetime.timezone.utc)
+    certificate = (
+        x509.CertificateBuilder()
+        .subject_name(name)
+        .issuer_name(name)
+        .public_key(certificate_key.public_key())
+        .serial_number(x509.random_serial_number())
+        .not_valid_before(now - datetime.timedelta(hours=1))
+        .not_valid_after(now + CERTIFICATE_VALIDITY)
+        .add_extension(x509.UnrecognizedExtension(EXTENSION_OID, extension), False)
+        .sign(certificate_key, hashes.SHA256())
+    )
+    return certificate, certificate_key
+
+
+def verify_certificate(certificate: x509.Certificate) -> PublicKey:
+    """
+    Check that ``certificate`` is a valid libp2p certificate.
+
+    :return: the identity public key of the peer presenting it
+    :raise QUICCertificateError: if the certificate does not prove an identity
+    """
+    now = datetime.datetime.now(datetime.timezone.utc)
+    if not certificate.not_valid_before_utc <= now <= certificate.not_valid_after_utc:
+        raise QUICCertificateError("certificate is expired or not yet valid")
+    try:
+        certificate.verify_directly_issued_by(certificate)
+    except (ValueError, TypeError, InvalidSignature) as error:
+        raise QUICCertificateError("certificate is not self-signed") from error
+
+    try:
+        extension = certificate.extensions.get_extension_for_oid(EXTENSION_OID)
+    except x509.ExtensionNotFound as error:
+        raise QUICCertificateError("certificate has no libp2p extension") from error
+    if not isinstance(extension.value, x509.UnrecognizedExtension):
+        raise QUICCertificateError("malformed libp2p extension")
+    try:
+        serialized_key, signature = decode_signed_key(extension.value.value)
+        public_key = deserialize_public_key(serialized_key)
+    except (ValueError, DecodeError, MissingDeserializerError) as error:
+        raise QUICCertificateError("malformed libp2p extension") from error
+
+    try:
+        is_valid = public_key.verify(
+            SIGNATURE_PREFIX + _public_key_info(certificate), signature
+        )
+    except ValueError as error:
+        # e.g. a signature of the wrong size
+        raise QUICCertificateError(
+            "malformed signature of the certificate key"
+        ) from error
+    if not is_valid:
+        raise QUICCertificateError("invalid signature of the certificate key")
+    return public_key
@@ -0,0 +1,285 @@
+import logging
+import ssl
+from typing import (
+    Callable,
+    NamedTuple,
+)
+
+from aioquic.buffer import (
+    Buffer,
+)
+from aioquic.quic.configuration import (
+    SMALLEST_MAX_DATAGRAM_SIZE,
+    QuicConfiguration,
+)
+from aioquic.quic.connection import (
+    NetworkAddress,
+    QuicConnection,
+)
+from aioquic.quic.packet import (
+    QuicHeader,
+    QuicPacketType,
+    pull_quic_header,
+)
+from multiaddr import (
+    Multiaddr,
+)
+import trio
+
+from libp2p.abc import (
+    IListener,
+    IMuxedTransport,
+)
+from libp2p.crypto.keys import (
+    KeyPair,
+)
+from libp2p.custom_types import (
+    TMuxedConnHandler,
+)
+from libp2p.peer.id import (
+    ID,
+)
+from libp2p.transport.exceptions import (
+    OpenConnectionError,
+    SecurityUpgradeFailure,
+)
+
+from .connection import (
+    QUICConnection,
+    aioquic_private,
+)
+from .exceptions import (
+    QUICCertificateError,
+)
+from .tls import (
+    ALPN_PROTOCOL,
+    generate_certificate,
+)
+from .utils import (
+    QUIC_PROTOCOL,
+)
+
+logger = logging.getLogger("libp2p.transport.quic.transport")
+
+# Largest UDP payload, QUIC packets are far smaller.
+MAX_DATAGRAM_SIZE = 65535
+
+
+class QUICOptions(NamedTuple):
+    # Seconds to wait for the handshake to complete.
+    handshake_timeout: float = 10.0
+    # Seconds of inactivity after which a connection is closed.
+    idle_timeout: float = 30.0
+
+
+# Overridden below, an `aioquic` without it would never ask for the
+# certificate of clients.
+aioquic_private(QuicConnection, "_initialize")
+
+
+class _LibP2PQuicConnection(QuicConnection):
+    def _initialize(self, peer_cid: bytes) -> None:
+        super()._initialize(peer_cid)
+        if not self.configuration.is_client:
+            # NOTE: `aioquic` has no public way to ask for the certificate of
+            #   the client, which carries its peer id in libp2p.
+            aioquic_private(self.tls, "_request_client_certificate")
+            self.tls._request_client_certificate = True
+
+
+class QUICEndpoint:
+    """
+    A UDP socket, and the connections reached through it. Datagrams are routed
+    to their connection by destination connection id.
+    """
+
+    socket: trio.socket.SocketType
+    connection_id_length: int
+    connections: dict[bytes, QUICConnection]
+
+    def __init__(
+        self, socket: trio.socket.SocketType, connection_id_length: int
+    ) -> None:
+        self.socket = socket
+        self.connection_id_length = connection_id_length
+        self.connections = {}
+
+    async def send(self, data: bytes, addr: NetworkAddress) -> None:
+        try:
+            await self.socket.sendto(data, addr)
+        except (OSError, trio.ClosedResourceError) as error:
+            # Like a lost packet, QUIC retransmits it.
+            logger.debug("failed to send a datagram to %s: %s", addr, error)
+
+    async def receive_datagrams(
+        self,
+        accept: Callable[[QuicHeader, NetworkAddress], QUICConnection] = None,
+    ) -> None:
+        """
+        Dispatch the incoming datagrams until the socket is closed.
+
+        :param accept: called with the first packet of a new connection, to
+            create the connection. New connections are ignored without it.
+        """
+        while True:
+            try:
+                data, addr = await self.socket.recvfrom(MAX_DATAGRAM_SIZE)
+            except (OSError, trio.ClosedResourceError):
+                return
+            try:
+                header = pull_quic_header(
+                    Buffer(data=data), host_cid_length=self.connection_id_length
+                )
+            except ValueError:
+                continue
+            connection = self.connections.get(header.destination_cid)
+            if (
+                connection is None
+                and accept is not None
+                and header.packet_type == QuicPacketType.INITIAL
+                and len(data) >= SMALLEST_MAX_DATAGRAM_SIZE
+            ):
+                connection = accept(header, addr)
+            if connection is not None:
+                await connection._receive_datagram(data, addr)
+
+    def close(self) -> None:
+        self.socket.close()
+
+
+class QUICListener(IListener):
+    transport: "QUICTransport"
+    endpoints: list[QUICEndpoint]
+
+    def __init__(
+        self,
+        transport: "QUICTransport",
+        handler_function: TMuxedConnHandler,
+    ) -> None:
+        self.transport = transport
+        self.handler = handler_function
+        self.endpoints = []
+
+    async def listen(self, maddr: Multiaddr, nursery: trio.Nursery) -> None:
+        """
+        :param maddr: ``/ip4/<host>/udp/<port>/quic-v1`` address to listen on
+        :raise OSError: if the socket cannot be bound
+        """
+        host = maddr.value_for_protocol("ip4")
+        port = int(maddr.value_for_protocol("udp"))
+        logger.debug("serve_quic %s %s", host, port)
+        sock = trio.socket.socket(trio.socket.AF_INET, trio.socket.SOCK_DGRAM)
+        try:
+            await sock.bind((host, port))
+        except BaseException:
+            sock.close()
+            raise
+        endpoint = QUICEndpoint(sock, self.transport.connection_id_length)
+        self.endpoints.append(endpoint)
+
+        def accept(header: QuicHeader, addr: NetworkAddress) -> QUICConnection:
+            quic = _LibP2PQuicConnection(
+                configuration=self.transport._configuration(is_client=False),
+                original_destination_connection_id=header.destination_cid,
+            )
+            connection = QUICConnection(quic, endpoint, addr)
+            # The client keeps using the id it picked until it learns ours.
+            endpoint.connections[header.destination_cid] = connection
+            endpoint.connections[quic.host_cid] = connection
+            nursery.start_soon(self._handle_connection, connection)
+            return connection
+
+        nursery.start_soon(endpoint.receive_datagrams, accept)
+
+    async def _handle_connection(self, connection: QUICConnection) -> None:
+        try:
+            await connection._handshake(self.transport.options.handshake_timeout)
+        except (OpenConnectionError, SecurityUpgradeFailure) as error:
+            logger.debug(
+                "failed handshake with %s: %s", connection.remote_address, error
+            )
+            return
+        await self.handler(connection)
+
+    def get_addrs(self) -> tuple[Multiaddr, ...]:
+        addrs = []
+        for endpoint in self.endpoints:
+            host, port = endpoint.socket.getsockname()
+            addrs.append(Multiaddr(f"/ip4/{host}/udp/{port}/{QUIC_PROTOCOL}"))
+        return tuple(addrs)
+
+    async def close(self) -> None:
+        for endpoint in self.endpoints:
+            for connection in set(endpoint.connections.values()):
+                await connection.close()
+            endpoint.close()
+        self.endpoints = []
+
+
+class QUICTransport(IMuxedTransport):
+    """
+    QUIC transport, ``/quic-v1``. Connections are secured with TLS 1.3 and
+    multiplexed by QUIC itself, so they are ready after a single round trip.
+    """
+
+    key_pair: KeyPair
+    options: QUICOptions
+    connection_id_length: int
+
+    def __init__(self, key_pair: KeyPair, options: QUICOptions = None) -> None:
+        """
+        :param key_pair: identity of the local peer, proven in the handshake
+        """
+        self.key_pair = key_pair
+        self.options = options or QUICOptions()
+        self._certificate, self._private_key = generate_certificate(key_pair)
+        self.connection_id_length = QuicConfiguration().connection_id_length
+
+    def _configuration(self, is_client: bool) -> QuicConfiguration:
+        return QuicConfiguration(
+            is_client=is_client,
+            alpn_protocols=[ALPN_PROTOCOL],
+            certificate=self._certificate,
+            private_key=self._private_key,
+            idle_timeout=self.options.idle_timeout,
+            # libp2p certificates are self-signed, `QUICConnection` checks them.
+            verify_mode=ssl.CERT_NONE,
+        )
+
+    async def dial(self, maddr: Multiaddr, peer_id: ID) -> QUICConnection:
+        """
+        :param maddr: ``/ip4/<host>/udp/<port>/quic-v1`` address of the peer
+        :param peer_id: peer expected to be at ``maddr``
+        :raise OpenConnectionError: if the connection cannot be established
+        :raise SecurityUpgradeFailure: if the remote is not ``peer_id``
+        """
+        host = maddr.value_for_protocol("ip4")
+        port = int(maddr.value_for_protocol("udp"))
+        sock = trio.socket.socket(trio.socket.AF_INET, trio.socket.SOCK_DGRAM)
+        try:
+            await sock.bind(("0.0.0.0", 0))
+        except OSError as error:
+            sock.close()
+            raise OpenConnectionError from error
+        endpoint = QUICEndpoint(sock, self.connection_id_length)
+        quic = _LibP2PQuicConnection(configuration=self._configuration(is_client=True))
+        connection = QUICConnection(
+            quic, endpoint, (host, port), peer_id, owns_endpoint=True
+        )
+        endpoint.connections[quic.host_cid] = connection
+        quic.connect((host, port), trio.current_time())
+        try:
+            await connection._transmit()
+            await connection._handshake(self.options.handshake_timeout)
+        except BaseException:
+            connection._cleanup()
+            raise
+        if connection.peer_id != peer_id:
+            await connection.close()
+            raise QUICCertificateError(
+                f"expected peer {peer_id} at {maddr}, got {connection.peer_id}"
+            )
+        return connection
+
+    def create_listener(self, handler_function: TMuxedConnHandler) -> QUICListener:
+        return QUICListener(self, handler_function)
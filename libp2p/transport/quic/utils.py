@@ -0,0 +1,10 @@
+from multiaddr import (
+    Multiaddr,
+)
+
+# Kept apart from the rest of the package, which needs the optional `aioquic`.
+QUIC_PROTOCOL = "quic-v1"
+
+
+def is_quic_addr(maddr: Multiaddr) -> bool:
+    return any(protocol.name == QUIC_PROTOCOL for protocol in maddr.protocols())
@@ -0,0 +1,132 @@
+from collections.abc import (
+    Iterable,
+    Mapping,
+)
+from typing import (
+    Optional,
+    Union,
+)
+
+from multiaddr import (
+    Multiaddr,
+)
+from multiaddr.exceptions import (
+    ProtocolNotFoundError,
+)
+from multiaddr.protocols import (
+    Protocol,
+    protocol_with_code,
+    protocol_with_name,
+)
+
+from libp2p.abc import (
+    IMuxedTransport,
+    ITransport,
+)
+
+TTransport = Union[ITransport, IMuxedTransport]
+TProtocolName = Union[int, str]
+
+# Order in which addresses are dialed, lowest first: the cheaper the
+# connection setup, the better. Same-host transports skip the network, QUIC
+# needs one round trip, TCP three with the upgrade.
+DIAL_RANKS: dict[str, int] = {
+    "unix": 0,
+    "memory": 0,
+    "quic-v1": 10,
+    "tcp": 20,
+}
+DEFAULT_DIAL_RANK = 100
+
+
+def _protocol(protocol: TProtocolName) -> Protocol:
+    """
+    :param protocol: multiaddr protocol name or code
+    :raise ValueError: if the protocol is unknown
+    """
+    try:
+        if isinstance(protocol, int):
+            return protocol_with_code(protocol)
+        return protocol_with_name(protocol)
+    except ProtocolNotFoundError as error:
+        raise ValueError(f"unknown multiaddr protocol {protocol!r}") from error
+
+
+def protocol_code(protocol: TProtocolName) -> int:
+    """
+    :param protocol: multiaddr protocol name or code
+    :raise ValueError: if the protocol is unknown
+    """
+    return _protocol(protocol).code
+
+
+class TransportRegistry:
+    """
+    The transports of a swarm, keyed by the code of the multiaddr protocol
+    they handle, e.g. ``tcp`` or ``quic-v1``. An address is handled by the
+    transport of its innermost registered protocol, so that
+    ``/ip4/.../udp/.../quic-v1`` goes to QUIC even if ``udp`` has a transport.
+    """
+
+    _transports: dict[int, TTransport]
+    _ranks: dict[int, int]
+
+    def __init__(self, transports: Mapping[TProtocolName, TTransport] = None) -> None:
+        self._transports = {}
+        self._ranks = {}
+        for protocol, transport in (transports or {}).items():
+            self.register(protocol, transport)
+
+    def register(
+        self, protocol: TProtocolName, transport: TTransport, rank: int = None
+    ) -> None:
+        """
+        Handle the addresses of ``protocol`` with ``transport``, replacing the
+        transport registered before for it if any.
+
+        :param rank: dial order of the addresses of ``protocol``, lowest
+            first. Defaults to ``DIAL_RANKS``.
+        :raise ValueError: if the protocol is unknown
+        """
+        multiaddr_protocol = _protocol(protocol)
+        if rank is None:
+            rank = DIAL_RANKS.get(multiaddr_protocol.name, DEFAULT_DIAL_RANK)
+        self._transports[multiaddr_protocol.code] = transport
+        self._ranks[multiaddr_protocol.code] = rank
+
+    def unregister(self, protocol: TProtocolName) -> None:
+        code = protocol_code(protocol)
+        self._transports.pop(code, None)
+        self._ranks.pop(code, None)
+
+    def get(self, protocol: TProtocolName) -> Optional[TTransport]:
+        return self._transports.get(protocol_code(protocol))
+
+    def __contains__(self, protocol: TProtocolName) -> bool:
+        return protocol_code(protocol) in self._transports
+
+    def __len__(self) -> int:
+        return len(self._transports)
+
+    def transports(self) -> list[TTransport]:
+        return list(self._transports.values())
+
+    def _code_for(self, maddr: Multiaddr) -> Optional[int]:
+        for protocol in reversed(list(maddr.protocols())):
+            if protocol.code in self._transports:
+                return protocol.code
+        return None
+
+    def transport_for(self, maddr: Multiaddr) -> Optional[TTransport]:
+        """:return: the transport handling ``maddr``, ``None`` if none does"""
+        code = self._code_for(maddr)
+        return None if code is None else self._transports[code]
+
+    def dial_rank(self, maddr: Multiaddr) -> int:
+        """Addresses no transport handles come last."""
+        code = self._code_for(maddr)
+        return DEFAULT_DIAL_RANK + 1 if code is None else self._ranks[code]
+
+    def sort_for_dialing(self, addrs: Iterable[Multiaddr]) -> list[Multiaddr]:
+        """Order ``addrs`` by rank, keeping the order of equally ranked ones."""
+        return sorted(addrs, key=self.dial_rank)
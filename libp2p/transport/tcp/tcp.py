@@ -1,21 +1,17 @@
-from collections.abc import (
-    Awaitable,
-    Sequence,
-)
 import logging
 from typing import (
-    Callable,
+    Any,
+    NamedTuple,
+    Optional,
 )
 
 from multiaddr import (
     Multiaddr,
 )
 import trio
-from trio_typing import (
-    TaskStatus,
-)
 
 from libp2p.abc import (
+    IConnectionGater,
     IListener,
     IRawConnection,
     ITransport,
@@ -24,6 +20,7 @@ from libp2p.custom_types import (
     THandler,
 )
 from libp2p.io.trio import (
+    DEFAULT_READ_SIZE,
     TrioTCPStream,
 )
 from libp2p.network.connection.raw_connection import (
@@ -35,44 +32,154 @@ from libp2p.transport.exceptions import (
 
 logger = logging.getLogger("libp2p.transport.tcp")
 
+# The kernel caps it to `net.core.somaxconn`, same as `trio.serve_tcp` does.
+DEFAULT_BACKLOG = 0xFFFF
+
+
+class TCPOptions(NamedTuple):
+    """
+    Socket options applied to every connection of a ``TCP`` transport, both
+    dialed and accepted. ``None`` keeps the operating system default.
+    """
+
+    # Disable Nagle's algorithm, for latency over small writes.
+    nodelay: bool = True
+    # SO_SNDBUF and SO_RCVBUF. They are set before connecting or listening so
+    # that the TCP window scale is negotiated accordingly.
+    send_buffer_size: Optional[int] = None
+    receive_buffer_size: Optional[int] = None
+    backlog: int = DEFAULT_BACKLOG
+    keepalive: bool = False
+    # Seconds of idleness before the first probe, seconds between probes, and
+    # number of unanswered probes before the connection is dropped.
+    keepalive_idle: Optional[int] = None
+    keepalive_interval: Optional[int] = None
+    keepalive_count: Optional[int] = None
+    # Largest chunk read from the socket when the reader asks for "anything".
+    read_size: int = DEFAULT_READ_SIZE
+    # Set SO_REUSEPORT on listening sockets, allowing several processes to
+    # listen on the same address. See ``libp2p.sharding``.
+    reuse_port: bool = False
+
+
+def _set_buffer_sizes(sock: trio.socket.SocketType, options: TCPOptions) -> None:
+    if options.send_buffer_size is not None:
+        sock.setsockopt(
+            trio.socket.SOL_SOCKET, trio.socket.SO_SNDBUF, options.send_buffer_size
+        )
+    if options.receive_buffer_size is not None:
+        sock.setsockopt(
+            trio.socket.SOL_SOCKET, trio.socket.SO_RCVBUF, options.receive_buffer_size
+        )
+
+
+def _configure_stream(stream: trio.SocketStream, options: TCPOptions) -> None:
+    """Apply the per-connection options to a connected socket."""
+    # `trio.SocketStream` enables TCP_NODELAY by default.
+    if not options.nodelay:
+        stream.setsockopt(trio.socket.IPPROTO_TCP, trio.socket.TCP_NODELAY, False)
+    if options.keepalive:
+        stream.setsockopt(trio.socket.SOL_SOCKET, trio.socket.SO_KEEPALIVE, True)
+        for name, value in (
+            ("TCP_KEEPIDLE", options.keepalive_idle),
+            ("TCP_KEEPINTVL", options.keepalive_interval),
+            ("TCP_KEEPCNT", options.keepalive_count),
+        ):
+            # Not every platform exposes the keepalive timers.
+            if value is not None and hasattr(trio.socket, name):
+                stream.setsockopt(
+                    trio.socket.IPPROTO_TCP, getattr(trio.socket, name), value
+                )
+
+
+def _ip_address(maddr: Multiaddr) -> tuple[str, int]:
+    """
+    :return: the host of ``maddr`` and its address family
+    :raise ValueError: if ``maddr`` has no ``/ip4`` or ``/ip6`` host
+    """
+    for protocol in maddr.protocols():
+        if protocol.name == "ip4":
+            return maddr.value_for_protocol("ip4"), trio.socket.AF_INET
+        if protocol.name == "ip6":
+            return maddr.value_for_protocol("ip6"), trio.socket.AF_INET6
+    raise ValueError(f"no ip4 or ip6 host in {maddr}")
+
+
+async def _open_tcp_listener(
+    host: str, port: int, family: int, options: TCPOptions
+) -> trio.SocketListener:
+    sock = trio.socket.socket(family, trio.socket.SOCK_STREAM)
+    try:
+        sock.setsockopt(trio.socket.SOL_SOCKET, trio.socket.SO_REUSEADDR, 1)
+        if family == trio.socket.AF_INET6:
+            # `/ip6/::` is not `/ip4/0.0.0.0` too, which has its own listener.
+            sock.setsockopt(trio.socket.IPPROTO_IPV6, trio.socket.IPV6_V6ONLY, 1)
+        if options.reuse_port:
+            # Several processes can bind to the same address, and the kernel
+            # balances incoming connections between them.
+            sock.setsockopt(trio.socket.SOL_SOCKET, trio.socket.SO_REUSEPORT, 1)
+        # Accepted sockets inherit the buffer sizes of the listening socket.
+        _set_buffer_sizes(sock, options)
+        await sock.bind((host, port))
+        sock.listen(options.backlog)
+    except BaseException:
+        sock.close()
+        raise
+    return trio.SocketListener(sock)
+
 
 class TCPListener(IListener):
     listeners: list[trio.SocketListener]
+    options: TCPOptions
+    gater: Optional[IConnectionGater]
 
-    def __init__(self, handler_function: THandler) -> None:
+    def __init__(
+        self,
+        handler_function: THandler,
+        options: TCPOptions = None,
+        gater: IConnectionGater = None,
+    ) -> None:
         self.listeners = []
         self.handler = handler_function
+        self.options = options or TCPOptions()
+        self.gater = gater
+
+    def _intercept_accept(self, stream: trio.SocketStream) -> bool:
+        if self.gater is None:
+            return True
+        try:
+            remote_maddr = _multiaddr_from_sockaddr(
+                stream.socket.family, stream.socket.getpeername()
+            )
+        except OSError:
+            # Already disconnected.
+            return False
+        return self.gater.intercept_accept(remote_maddr)
 
     # TODO: Get rid of `nursery`?
     async def listen(self, maddr: Multiaddr, nursery: trio.Nursery) -> None:
         """
         Put listener in listening mode and wait for incoming connections.
 
-        :param maddr: maddr of peer
+        :param maddr: ``/ip4`` or ``/ip6`` maddr to listen on
         :return: return True if successful
         """
 
-        async def serve_tcp(
-            handler: Callable[[trio.SocketStream], Awaitable[None]],
-            port: int,
-            host: str,
-            task_status: TaskStatus[Sequence[trio.SocketListener]] = None,
-        ) -> None:
-            """Just a proxy function to add logging here."""
-            logger.debug("serve_tcp %s %s", host, port)
-            await trio.serve_tcp(handler, port, host=host, task_status=task_status)
-
         async def handler(stream: trio.SocketStream) -> None:
-            tcp_stream = TrioTCPStream(stream)
+            # Rejected connections cost nothing more than the accept.
+            if not self._intercept_accept(stream):
+                await stream.aclose()
+                return
+            _configure_stream(stream, self.options)
+            tcp_stream = TrioTCPStream(stream, self.options.read_size)
             await self.handler(tcp_stream)
 
-        listeners = await nursery.start(
-            serve_tcp,
-            handler,
-            int(maddr.value_for_protocol("tcp")),
-            maddr.value_for_protocol("ip4"),
-        )
-        self.listeners.extend(listeners)
+        port = int(maddr.value_for_protocol("tcp"))
+        host, family = _ip_address(maddr)
+        logger.debug("serve_tcp %s %s", host, port)
+        listener = await _open_tcp_listener(host, port, family, self.options)
+        await nursery.start(trio.serve_listeners, handler, [listener])
+        self.listeners.append(listener)
 
     def get_addrs(self) -> tuple[Multiaddr, ...]:
         """
@@ -91,6 +198,24 @@ class TCPListener(IListener):
 
 
 class TCP(ITransport):
+    options: TCPOptions
+    gater: Optional[IConnectionGater]
+
+    def __init__(
+        self, options: TCPOptions = None, gater: IConnectionGater = None
+    ) -> None:
+        """
+        :param options: socket options of the dialed and accepted connections
+        :param gater: consulted with the remote address of the accepted
+            connections, before anything is read from them
+        :raise ValueError: if ``options`` asks for ``reuse_port`` on a platform
+            without ``SO_REUSEPORT``
+        """
+        self.options = options or TCPOptions()
+        self.gater = gater
+        if self.options.reuse_port and not hasattr(trio.socket, "SO_REUSEPORT"):
+            raise ValueError("SO_REUSEPORT is not supported on this platform")
+
     async def dial(self, maddr: Multiaddr) -> IRawConnection:
         """
         Dial a transport to peer listening on multiaddr.
@@ -99,14 +224,25 @@ class TCP(ITransport):
         :return: `RawConnection` if successful
         :raise OpenConnectionError: raised when failed to open connection
         """
-        self.host = maddr.value_for_protocol("ip4")
+        try:
+            self.host, family = _ip_address(maddr)
+        except ValueError as error:
+            raise OpenConnectionError(str(error)) from error
         self.port = int(maddr.value_for_protocol("tcp"))
 
+        sock = trio.socket.socket(family, trio.socket.SOCK_STREAM)
         try:
-            stream = await trio.open_tcp_stream(self.host, self.port)
+            _set_buffer_sizes(sock, self.options)
+            await sock.connect((self.host, self.port))
         except OSError as error:
+            sock.close()
             raise OpenConnectionError from error
-        read_write_closer = TrioTCPStream(stream)
+        except BaseException:
+            sock.close()
+            raise
+        stream = trio.SocketStream(sock)
+        _configure_stream(stream, self.options)
+        read_write_closer = TrioTCPStream(stream, self.options.read_size)
 
         return RawConnection(read_write_closer, True)
 
@@ -118,9 +254,15 @@ class TCP(ITransport):
             that takes a connection as argument which implements interface-connection
         :return: a listener object that implements listener_interface.py
         """
-        return TCPListener(handler_function)
+        return TCPListener(handler_function, self.options, self.gater)
+
+
+def _multiaddr_from_sockaddr(family: int, sockaddr: tuple[Any, ...]) -> Multiaddr:
+    # IPv6 socket addresses also carry the flow info and scope id.
+    ip, port = sockaddr[:2]
+    ip_protocol = "ip6" if family == trio.socket.AF_INET6 else "ip4"
+    return Multiaddr(f"/{ip_protocol}/{ip}/tcp/{port}")
 
 
 def _multiaddr_from_socket(socket: trio.socket.SocketType) -> Multiaddr:
-    ip, port = socket.getsockname()
-    return Multiaddr(f"/ip4/{ip}/tcp/{port}")
+    return _multiaddr_from_sockaddr(socket.family, socket.getsockname())
@@ -0,0 +1,120 @@
+import logging
+import os
+
+from multiaddr import (
+    Multiaddr,
+)
+import trio
+
+from libp2p.abc import (
+    IListener,
+    IRawConnection,
+    ITransport,
+)
+from libp2p.custom_types import (
+    THandler,
+)
+from libp2p.io.trio import (
+    TrioTCPStream,
+)
+from libp2p.network.connection.raw_connection import (
+    RawConnection,
+)
+from libp2p.transport.exceptions import (
+    OpenConnectionError,
+)
+
+logger = logging.getLogger("libp2p.transport.unix")
+
+UNIX_PROTOCOL = "unix"
+
+
+def is_unix_addr(maddr: Multiaddr) -> bool:
+    return any(protocol.name == UNIX_PROTOCOL for protocol in maddr.protocols())
+
+
+class UnixListener(IListener):
+    listeners: list[trio.SocketListener]
+    paths: list[str]
+
+    def __init__(self, handler_function: THandler) -> None:
+        self.listeners = []
+        self.paths = []
+        self.handler = handler_function
+
+    async def listen(self, maddr: Multiaddr, nursery: trio.Nursery) -> None:
+        """
+        Put listener in listening mode and wait for incoming connections.
+
+        :param maddr: ``/unix/<path>`` address to listen on
+        :raise OSError: if the socket cannot be bound, e.g. the path exists
+        """
+
+        async def handler(stream: trio.SocketStream) -> None:
+            await self.handler(TrioTCPStream(stream))
+
+        path = maddr.value_for_protocol(UNIX_PROTOCOL)
+        logger.debug("serve_unix %s", path)
+        sock = trio.socket.socket(trio.socket.AF_UNIX, trio.socket.SOCK_STREAM)
+        try:
+            await sock.bind(path)
+            sock.listen(trio.socket.SOMAXCONN)
+        except BaseException:
+            sock.close()
+            raise
+        listener = trio.SocketListener(sock)
+        self.paths.append(path)
+        await nursery.start(trio.serve_listeners, handler, [listener])
+        self.listeners.append(listener)
+
+    def get_addrs(self) -> tuple[Multiaddr, ...]:
+        """
+        Retrieve list of addresses the listener is listening on.
+
+        :return: return list of addrs
+        """
+        return tuple(Multiaddr(f"/{UNIX_PROTOCOL}{path}") for path in self.paths)
+
+    async def close(self) -> None:
+        async with trio.open_nursery() as nursery:
+            for listener in self.listeners:
+                nursery.start_soon(listener.aclose)
+        # Unlike TCP ports, socket files outlive their listener.
+        for path in self.paths:
+            try:
+                os.unlink(path)
+            except FileNotFoundError:
+                pass
+
+
+class UnixTransport(ITransport):
+    """
+    Transport over Unix domain sockets, for peers on the same host. Addresses
+    look like ``/unix/run/libp2p.sock``.
+    """
+
+    async def dial(self, maddr: Multiaddr) -> IRawConnection:
+        """
+        Dial a transport to peer listening on multiaddr.
+
+        :param maddr: ``/unix/<path>`` address of peer
+        :return: `RawConnection` if successful
+        :raise OpenConnectionError: raised when failed to open connection
+        """
+        try:
+            stream = await trio.open_unix_socket(
+                maddr.value_for_protocol(UNIX_PROTOCOL)
+            )
+        except OSError as error:
+            raise OpenConnectionError from error
+        return RawConnection(TrioTCPStream(stream), True)
+
+    def create_listener(self, handler_function: THandler) -> UnixListener:
+        """
+        Create listener on transport.
+
+        :param handler_function: a function called when a new connection is received
+            that takes a connection as argument which implements interface-connection
+        :return: a listener object that implements listener_interface.py
+        """
+        return UnixListener(handler_function)
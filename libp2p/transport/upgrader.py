@@ -1,3 +1,15 @@
+from collections.abc import (
+    AsyncIterator,
+)
+from contextlib import (
+    asynccontextmanager,
+)
+from typing import (
+    NamedTuple,
+)
+
+import trio
+
 from libp2p.abc import (
     IListener,
     IMuxedConn,
@@ -16,6 +28,12 @@ from libp2p.protocol_muxer.exceptions import (
     MultiselectClientError,
     MultiselectError,
 )
+from libp2p.protocol_muxer.multiselect import (
+    DEFAULT_NEGOTIATE_TIMEOUT,
+)
+from libp2p.rcmgr.manager import (
+    ConnectionScope,
+)
 from libp2p.security.exceptions import (
     HandshakeFailure,
 )
@@ -27,36 +45,119 @@ from libp2p.stream_muxer.muxer_multistream import (
 )
 from libp2p.transport.exceptions import (
     MuxerUpgradeFailure,
+    MuxerUpgradeTimeout,
     SecurityUpgradeFailure,
+    SecurityUpgradeTimeout,
+    UpgradeQueueFull,
 )
 
 
+class UpgraderOptions(NamedTuple):
+    # Seconds the peers may take to agree on a security protocol or a
+    # multiplexer.
+    negotiate_timeout: float = DEFAULT_NEGOTIATE_TIMEOUT
+    # Seconds the whole security upgrade may take, negotiation included.
+    handshake_timeout: float = 30.0
+    # Inbound connections upgraded at once. Handshakes are CPU bound, more of
+    # them only slow each other down.
+    max_inbound_upgrades: int = 64
+    # Inbound connections waiting for an upgrade, more are closed.
+    max_queued_upgrades: int = 256
+
+
+class UpgraderStats(NamedTuple):
+    # Inbound upgrades running, and waiting for their turn.
+    inbound_upgrades: int
+    queued_upgrades: int
+    # Inbound connections closed as the queue was full.
+    rejected_upgrades: int
+    # Security upgrades which took longer than `handshake_timeout`, and
+    # security or multiplexer negotiations longer than `negotiate_timeout`.
+    security_timeouts: int
+    negotiate_timeouts: int
+
+
 class TransportUpgrader:
     security_multistream: SecurityMultistream
     muxer_multistream: MuxerMultistream
+    options: UpgraderOptions
 
     def __init__(
         self,
         secure_transports_by_protocol: TSecurityOptions,
         muxer_transports_by_protocol: TMuxerOptions,
+        options: UpgraderOptions = None,
     ):
-        self.security_multistream = SecurityMultistream(secure_transports_by_protocol)
-        self.muxer_multistream = MuxerMultistream(muxer_transports_by_protocol)
+        self.options = options or UpgraderOptions()
+        self.security_multistream = SecurityMultistream(
+            secure_transports_by_protocol, self.options.negotiate_timeout
+        )
+        self.muxer_multistream = MuxerMultistream(
+            muxer_transports_by_protocol, self.options.negotiate_timeout
+        )
+        self._inbound_limiter = trio.CapacityLimiter(self.options.max_inbound_upgrades)
+        self._queued_upgrades = 0
+        self._rejected_upgrades = 0
+        self._security_timeouts = 0
+        self._negotiate_timeouts = 0
 
     def upgrade_listener(self, transport: ITransport, listeners: IListener) -> None:
         """Upgrade multiaddr listeners to libp2p-transport listeners."""
         # TODO: Figure out what to do with this function.
 
+    def stats(self) -> UpgraderStats:
+        return UpgraderStats(
+            inbound_upgrades=self._inbound_limiter.borrowed_tokens,
+            queued_upgrades=self._queued_upgrades,
+            rejected_upgrades=self._rejected_upgrades,
+            security_timeouts=self._security_timeouts,
+            negotiate_timeouts=self._negotiate_timeouts,
+        )
+
+    @asynccontextmanager
+    async def inbound_upgrade_slot(self) -> AsyncIterator[None]:
+        """
+        Wait for the turn of an inbound connection to be upgraded, in the
+        order they were accepted.
+
+        :raise UpgradeQueueFull: if ``max_queued_upgrades`` connections
+            already wait
+        """
+        try:
+            self._inbound_limiter.acquire_nowait()
+        except trio.WouldBlock:
+            if self._queued_upgrades >= self.options.max_queued_upgrades:
+                self._rejected_upgrades += 1
+                raise UpgradeQueueFull(
+                    f"{self._queued_upgrades} inbound upgrades already wait"
+                )
+            self._queued_upgrades += 1
+            try:
+                await self._inbound_limiter.acquire()
+            finally:
+                self._queued_upgrades -= 1
+        try:
+            yield
+        finally:
+            self._inbound_limiter.release()
+
     async def upgrade_security(
         self, raw_conn: IRawConnection, peer_id: ID, is_initiator: bool
     ) -> ISecureConn:
-        """Upgrade conn to a secured connection."""
+        """
+        Upgrade conn to a secured connection.
+
+        :raise SecurityUpgradeTimeout: if it takes longer than
+            ``handshake_timeout``, or the negotiation longer than
+            ``negotiate_timeout``
+        """
         try:
-            if is_initiator:
-                return await self.security_multistream.secure_outbound(
-                    raw_conn, peer_id
-                )
-            return await self.security_multistream.secure_inbound(raw_conn)
+            with trio.move_on_after(self.options.handshake_timeout):
+                if is_initiator:
+                    return await self.security_multistream.secure_outbound(
+                        raw_conn, peer_id
+                    )
+                return await self.security_multistream.secure_inbound(raw_conn)
         except (MultiselectError, MultiselectClientError) as error:
             raise SecurityUpgradeFailure(
                 "failed to negotiate the secure protocol"
@@ -65,12 +166,35 @@ class TransportUpgrader:
             raise SecurityUpgradeFailure(
                 "handshake failed when upgrading to secure connection"
             ) from error
+        except trio.TooSlowError as error:
+            # Raised by the deadline of the negotiation, the one of the whole
+            # upgrade cancels it instead.
+            self._negotiate_timeouts += 1
+            raise SecurityUpgradeTimeout(
+                "timed out when negotiating the secure protocol"
+            ) from error
+        self._security_timeouts += 1
+        raise SecurityUpgradeTimeout("timed out when upgrading to secure connection")
 
-    async def upgrade_connection(self, conn: ISecureConn, peer_id: ID) -> IMuxedConn:
-        """Upgrade secured connection to a muxed connection."""
+    async def upgrade_connection(
+        self,
+        conn: ISecureConn,
+        peer_id: ID,
+        resource_scope: ConnectionScope = None,
+    ) -> IMuxedConn:
+        """
+        Upgrade secured connection to a muxed connection.
+
+        :raise MuxerUpgradeTimeout: if it takes longer than ``negotiate_timeout``
+        """
         try:
-            return await self.muxer_multistream.new_conn(conn, peer_id)
+            return await self.muxer_multistream.new_conn(conn, peer_id, resource_scope)
         except (MultiselectError, MultiselectClientError) as error:
             raise MuxerUpgradeFailure(
                 "failed to negotiate the multiplexer protocol"
             ) from error
+        except trio.TooSlowError as error:
+            self._negotiate_timeouts += 1
+            raise MuxerUpgradeTimeout(
+                "timed out when negotiating the multiplexer protocol"
+            ) from error
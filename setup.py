@@ -17,11 +17,18 @@ extras_require = {
         "twine",
         "wheel",
     ],
+    "dns": [
+        "dnspython>=2.0.0",
+    ],
     "docs": [
         "sphinx>=6.0.0",
         "sphinx_rtd_theme>=1.0.0",
         "towncrier>=24,<25",
     ],
+    "quic": [
+        # The transport relies on private attributes of these versions.
+        "aioquic>=1.2.0,<1.7",
+    ],
     "test": [
         "p2pclient==0.2.0",
         "pytest>=7.0.0",
@@ -32,7 +39,11 @@ extras_require = {
 }
 
 extras_require["dev"] = (
-    extras_require["dev"] + extras_require["docs"] + extras_require["test"]
+    extras_require["dev"]
+    + extras_require["dns"]
+    + extras_require["docs"]
+    + extras_require["quic"]
+    + extras_require["test"]
 )
 
 fastecdsa = [
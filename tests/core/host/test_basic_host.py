@@ -1,15 +1,33 @@
+import pytest
+import trio
+
 from libp2p import (
     new_swarm,
 )
 from libp2p.crypto.rsa import (
     create_new_key_pair,
 )
+from libp2p.custom_types import (
+    TProtocol,
+)
 from libp2p.host.basic_host import (
     BasicHost,
 )
 from libp2p.host.defaults import (
     get_default_protocols,
 )
+from libp2p.identity.identify.protocol import ID as IdentifyID
+from libp2p.stream_muxer.scheduler import (
+    StreamPriority,
+)
+from libp2p.tools.factories import (
+    HostFactory,
+)
+from libp2p.tools.utils import (
+    connect,
+)
+
+BULK_PROTOCOL = TProtocol("/bulk/1.0.0")
 
 
 def test_default_protocols():
@@ -22,3 +40,25 @@ def test_default_protocols():
     # NOTE: comparing keys for equality as handlers may be closures that do not compare
     # in the way this test is concerned with
     assert handlers.keys() == get_default_protocols(host).keys()
+
+
+@pytest.mark.trio
+async def test_stream_priorities():
+    async with HostFactory.create_batch_and_listen(2) as hosts:
+        accepted = trio.Event()
+        priorities = []
+
+        async def handler(stream):
+            priorities.append(stream.muxed_stream.priority)
+            accepted.set()
+
+        hosts[1].set_stream_handler(BULK_PROTOCOL, handler, StreamPriority.BULK)
+        await connect(hosts[0], hosts[1])
+        stream = await hosts[0].new_stream(
+            hosts[1].get_id(), [BULK_PROTOCOL], priority=StreamPriority.BULK
+        )
+        assert stream.muxed_stream.priority is StreamPriority.BULK
+        await accepted.wait()
+        assert priorities == [StreamPriority.BULK]
+        # Identify and ping are control protocols by default.
+        assert hosts[1].stream_priorities[IdentifyID] is StreamPriority.CONTROL
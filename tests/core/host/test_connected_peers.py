@@ -1,4 +1,5 @@
 import pytest
+import trio
 
 from libp2p.peer.peerinfo import (
     info_from_p2p_addr,
@@ -87,6 +88,10 @@ async def connect_and_disconnect(host_a, host_b, host_c):
 
     # Disconnecting hostB and hostA
     await host_b.disconnect(host_a.get_id())
+    # hostA notices the connection closed once it reads the close over the wire.
+    with trio.fail_after(5):
+        while host_a.get_connected_peers():
+            await trio.sleep(0.01)
 
     # Performing checks
     assert (len(host_a.get_connected_peers())) == 0
@@ -0,0 +1,147 @@
+import pytest
+from multiaddr import (
+    Multiaddr,
+)
+import trio
+
+from libp2p.abc import (
+    IPeerRouting,
+)
+from libp2p.host.routed_host import (
+    RoutedHost,
+)
+from libp2p.host.routing_cache import (
+    CachedPeerRouting,
+)
+from libp2p.network.exceptions import (
+    SwarmException,
+)
+from libp2p.peer.id import (
+    ID,
+)
+from libp2p.peer.peerinfo import (
+    PeerInfo,
+)
+from libp2p.tools.factories import (
+    HostFactory,
+)
+
+PEER_ID = ID(b"peer")
+
+
+class CountingRouter(IPeerRouting):
+    def __init__(self, peers=None, delay=1.0):
+        self.peers = peers or {}
+        self.delay = delay
+        self.lookups = 0
+        self.error = None
+
+    async def find_peer(self, peer_id):
+        self.lookups += 1
+        await trio.sleep(self.delay)
+        if self.error is not None:
+            error, self.error = self.error, None
+            raise error
+        return self.peers.get(peer_id)
+
+
+@pytest.mark.trio
+async def test_ttl(autojump_clock):
+    peer_info = PeerInfo(PEER_ID, [])
+    router = CountingRouter({PEER_ID: peer_info})
+    cache = CachedPeerRouting(router, ttl=10, negative_ttl=2, clock=trio.current_time)
+    assert await cache.find_peer(PEER_ID) is peer_info
+    assert await cache.find_peer(PEER_ID) is peer_info
+    assert router.lookups == 1
+    await trio.sleep(10)
+    assert await cache.find_peer(PEER_ID) is peer_info
+    assert router.lookups == 2
+    cache.invalidate(PEER_ID)
+    assert await cache.find_peer(PEER_ID) is peer_info
+    assert router.lookups == 3
+
+    # Peers not found are looked up again sooner.
+    other = ID(b"other")
+    assert await cache.find_peer(other) is None
+    assert await cache.find_peer(other) is None
+    assert router.lookups == 4
+    await trio.sleep(2)
+    assert await cache.find_peer(other) is None
+    assert router.lookups == 5
+
+
+@pytest.mark.trio
+async def test_single_flight(autojump_clock):
+    peer_info = PeerInfo(PEER_ID, [])
+    router = CountingRouter({PEER_ID: peer_info})
+    cache = CachedPeerRouting(router, clock=trio.current_time)
+    results = []
+
+    async def find_peer():
+        results.append(await cache.find_peer(PEER_ID))
+
+    async with trio.open_nursery() as nursery:
+        for _ in range(10):
+            nursery.start_soon(find_peer)
+    assert results == [peer_info] * 10
+    assert router.lookups == 1
+
+
+@pytest.mark.trio
+async def test_single_flight_failure(autojump_clock):
+    peer_info = PeerInfo(PEER_ID, [])
+    router = CountingRouter({PEER_ID: peer_info})
+    router.error = SwarmException("lookup failed")
+    cache = CachedPeerRouting(router, clock=trio.current_time)
+    results = []
+
+    async def find_peer():
+        try:
+            results.append(await cache.find_peer(PEER_ID))
+        except SwarmException:
+            results.append("failed")
+
+    async with trio.open_nursery() as nursery:
+        for _ in range(3):
+            nursery.start_soon(find_peer)
+    # The callers waiting for the failed lookup make their own, once.
+    assert sorted(results, key=str) == [peer_info, peer_info, "failed"]
+    assert router.lookups == 2
+
+    # Nor does a cancelled lookup leave them waiting.
+    cache.invalidate(PEER_ID)
+    async with trio.open_nursery() as nursery:
+        with trio.move_on_after(0.5):
+            nursery.start_soon(find_peer)
+            await trio.sleep(0.1)
+            await cache.find_peer(PEER_ID)
+    assert results[-1] == peer_info
+    assert router.lookups == 3
+
+
+@pytest.mark.trio
+async def test_routed_host_connect(autojump_clock):
+    async with HostFactory.create_batch_and_listen(2) as hosts:
+        target = hosts[1]
+        router = CountingRouter(
+            {target.get_id(): PeerInfo(target.get_id(), target.get_addrs())}
+        )
+        routed_host = RoutedHost(hosts[0].get_network(), router)
+
+        await routed_host.connect(PeerInfo(target.get_id(), []))
+        assert target.get_id() in routed_host.get_network().connections
+        await routed_host.connect(PeerInfo(target.get_id(), []))
+        await routed_host.disconnect(target.get_id())
+        await routed_host.connect(PeerInfo(target.get_id(), []))
+        assert target.get_id() in routed_host.get_network().connections
+        assert router.lookups == 1
+
+        # Addresses which cannot be dialed are routed to again.
+        unreachable = ID(b"unreachable")
+        router.peers[unreachable] = PeerInfo(
+            unreachable, [Multiaddr("/ip4/127.0.0.1/tcp/1")]
+        )
+        for lookups in (2, 3):
+            with pytest.raises(SwarmException):
+                await routed_host.connect(PeerInfo(unreachable, []))
+            assert router.lookups == lookups
@@ -0,0 +1,282 @@
+from contextlib import (
+    AsyncExitStack,
+)
+
+import pytest
+import trio
+
+from libp2p.host.routed_host import (
+    RoutedHost,
+)
+from libp2p.kademlia.dht import (
+    PROTOCOL_ID,
+    KadDHT,
+)
+from libp2p.kademlia.pb.kademlia_pb2 import (
+    Message,
+)
+from libp2p.kademlia.providers import (
+    PROVIDE_VALIDITY,
+    ProviderStore,
+)
+from libp2p.kademlia.routing_table import (
+    key_of,
+)
+from libp2p.network.stream.exceptions import (
+    StreamEOF,
+    StreamReset,
+)
+from libp2p.peer.peerinfo import (
+    PeerInfo,
+)
+from libp2p.tools.async_service import (
+    background_trio_service,
+)
+from libp2p.tools.factories import (
+    HostFactory,
+)
+from libp2p.tools.utils import (
+    connect,
+)
+from libp2p.transport.memory.memory import (
+    MemoryNetwork,
+)
+from libp2p.utils import (
+    encode_varint_prefixed,
+    read_varint_prefixed_bytes,
+)
+
+
+async def request(host, peer_id, message):
+    stream = await host.new_stream(peer_id, [PROTOCOL_ID])
+    await stream.write(encode_varint_prefixed(message.SerializeToString()))
+    return Message.FromString(await read_varint_prefixed_bytes(stream))
+
+
+@pytest.mark.trio
+async def test_find_peer(autojump_clock):
+    async with HostFactory.create_batch_and_listen(
+        16, memory_network=MemoryNetwork()
+    ) as hosts, AsyncExitStack() as stack:
+        dhts = [KadDHT(host, bucket_size=4) for host in hosts]
+        for dht in dhts:
+            await stack.enter_async_context(background_trio_service(dht))
+        # Every node joins through the first one.
+        entry = PeerInfo(hosts[0].get_id(), hosts[0].get_addrs())
+        for dht in dhts[1:]:
+            await dht.bootstrap([entry])
+        for dht in dhts:
+            assert 0 < len(dht.routing_table) < len(hosts)
+            assert hosts[0].get_id() in dht.routing_table or dht is dhts[0]
+
+        target = hosts[-1].get_id()
+        closest = await dhts[1].find_closest_peers(target.to_bytes())
+        assert (
+            closest
+            == sorted(
+                (host.get_id() for host in hosts if host is not hosts[1]),
+                key=lambda peer_id: peer_id.xor_id ^ target.xor_id,
+            )[:4]
+        )
+
+        hosts[1].get_peerstore().clear_addrs(target)
+        peer_info = await dhts[1].find_peer(target)
+        assert peer_info.addrs == hosts[-1].get_addrs()
+
+        # Routed through the DHT, a host dials a peer by its ID alone.
+        routed_host = RoutedHost(hosts[1].get_network(), dhts[1])
+        hosts[1].get_peerstore().clear_addrs(target)
+        await routed_host.connect(PeerInfo(target, []))
+        assert target in routed_host.get_network().connections
+
+
+@pytest.mark.trio
+async def test_unknown_peer(autojump_clock):
+    async with HostFactory.create_batch_and_listen(
+        3, memory_network=MemoryNetwork()
+    ) as hosts, AsyncExitStack() as stack:
+        dhts = [KadDHT(host) for host in hosts[:2]]
+        for dht in dhts:
+            await stack.enter_async_context(background_trio_service(dht))
+        await dhts[1].bootstrap([PeerInfo(hosts[0].get_id(), hosts[0].get_addrs())])
+        assert await dhts[1].find_peer(hosts[2].get_id()) is None
+
+
+@pytest.mark.trio
+async def test_unresponsive_peer_removed(autojump_clock):
+    async with HostFactory.create_batch_and_listen(
+        2, memory_network=MemoryNetwork()
+    ) as hosts:
+        # The second host does not speak the protocol.
+        dht = KadDHT(hosts[0])
+        async with background_trio_service(dht):
+            await dht.bootstrap([PeerInfo(hosts[1].get_id(), hosts[1].get_addrs())])
+            assert len(dht.routing_table) == 0
+            dht.routing_table.add_peer(hosts[1].get_id())
+            assert await dht.find_closest_peers(b"key") == []
+            assert len(dht.routing_table) == 0
+
+
+@pytest.mark.trio
+async def test_handler(autojump_clock):
+    async with HostFactory.create_batch_and_listen(
+        3, memory_network=MemoryNetwork()
+    ) as hosts:
+        dht = KadDHT(hosts[0])
+        async with background_trio_service(dht):
+            dht.routing_table.add_peer(hosts[2].get_id())
+            hosts[0].get_peerstore().add_addrs(
+                hosts[2].get_id(), hosts[2].get_addrs(), 100
+            )
+            await connect(hosts[1], hosts[0])
+
+            response = await request(
+                hosts[1], hosts[0].get_id(), Message(type=Message.FIND_NODE, key=b"k")
+            )
+            assert response.type == Message.FIND_NODE
+            assert [peer.id for peer in response.closerPeers] == [
+                hosts[2].get_id().to_bytes()
+            ]
+            assert list(response.closerPeers[0].addrs) == [
+                addr.to_bytes() for addr in hosts[2].get_addrs()
+            ]
+            assert response.closerPeers[0].connection == Message.NOT_CONNECTED
+            # The requester is never returned, but it is added.
+            await trio.sleep(0.1)
+            assert hosts[1].get_id() in dht.routing_table
+            response = await request(
+                hosts[1],
+                hosts[0].get_id(),
+                Message(type=Message.FIND_NODE, key=hosts[1].get_id().to_bytes()),
+            )
+            assert {peer.id for peer in response.closerPeers} == {
+                hosts[2].get_id().to_bytes()
+            }
+            assert PROTOCOL_ID in hosts[0].get_peerstore().get_protocols(
+                hosts[1].get_id()
+            )
+
+            response = await request(
+                hosts[1], hosts[0].get_id(), Message(type=Message.PING)
+            )
+            assert response.type == Message.PING
+
+            # Reset, which mplex may surface as the end of the stream.
+            with pytest.raises((StreamEOF, StreamReset)):
+                await request(
+                    hosts[1], hosts[0].get_id(), Message(type=Message.PUT_VALUE)
+                )
+
+
+@pytest.mark.trio
+async def test_routing_table_seeded_from_peerstore():
+    async with HostFactory.create_batch_and_listen(
+        2, memory_network=MemoryNetwork()
+    ) as hosts:
+        hosts[0].get_peerstore().add_protocols(hosts[1].get_id(), [PROTOCOL_ID])
+        dht = KadDHT(hosts[0])
+        async with background_trio_service(dht):
+            await trio.lowlevel.checkpoint()
+            assert hosts[1].get_id() in dht.routing_table
+            assert dht.routing_table.nearest(key_of(b"k"), 1) == [hosts[1].get_id()]
+
+
+@pytest.mark.trio
+async def test_providers(autojump_clock):
+    async with HostFactory.create_batch_and_listen(
+        8, memory_network=MemoryNetwork()
+    ) as hosts, AsyncExitStack() as stack:
+        dhts = [KadDHT(host, bucket_size=3) for host in hosts]
+        for dht in dhts:
+            await stack.enter_async_context(background_trio_service(dht))
+        entry = PeerInfo(hosts[0].get_id(), hosts[0].get_addrs())
+        for dht in dhts[1:]:
+            await dht.bootstrap([entry])
+
+        cid = b"content"
+        await dhts[3].provide(cid)
+        await dhts[4].provide(cid)
+        # Only kept locally.
+        await dhts[5].provide(cid, announce=False)
+        holders = [dht for dht in dhts if dht.providers.get_providers(cid)]
+        assert len(holders) >= 3
+
+        providers = {
+            peer_info.peer_id: peer_info.addrs
+            async for peer_info in dhts[6].find_provider_iter(cid, 10)
+        }
+        # The records of the third provider are only found if it is queried.
+        expected = {host.get_id(): host.get_addrs() for host in hosts[3:6]}
+        assert providers.items() <= expected.items()
+        assert hosts[3].get_id() in providers and hosts[4].get_id() in providers
+
+        # Iterations stop at `count`, or whenever the caller stops.
+        assert len([p async for p in dhts[6].find_provider_iter(cid, 1)]) == 1
+        async for _ in dhts[6].find_provider_iter(cid, 10):
+            break
+        # Served from the records held locally, which include our own.
+        local = [p.peer_id async for p in dhts[5].find_provider_iter(cid, 1)]
+        assert len(local) == 1
+        assert local[0] in dhts[5].providers.get_providers(cid)
+        assert hosts[5].get_id() in dhts[5].providers.get_providers(cid)
+        assert [p async for p in dhts[6].find_provider_iter(b"missing", 10)] == []
+
+
+@pytest.mark.trio
+async def test_providers_republished(autojump_clock):
+    async with HostFactory.create_batch_and_listen(
+        3, memory_network=MemoryNetwork()
+    ) as hosts, AsyncExitStack() as stack:
+        dhts = [
+            KadDHT(host, providers=ProviderStore(clock=trio.current_time))
+            for host in hosts
+        ]
+        for dht in dhts:
+            await stack.enter_async_context(background_trio_service(dht))
+        for dht in dhts[1:]:
+            await dht.bootstrap([PeerInfo(hosts[0].get_id(), hosts[0].get_addrs())])
+        await dhts[1].provide(b"cid")
+        assert dhts[2].providers.get_providers(b"cid") == [hosts[1].get_id()]
+
+        await trio.sleep(2 * PROVIDE_VALIDITY)
+        assert dhts[2].providers.get_providers(b"cid") == [hosts[1].get_id()]
+        # Expired records are swept.
+        dhts[1].manager.cancel()
+        await trio.sleep(PROVIDE_VALIDITY)
+        assert dhts[2].providers.get_providers(b"cid") == []
+        assert dhts[2].providers.count() == 0
+
+
+@pytest.mark.trio
+async def test_add_provider_of_other_peer_ignored(autojump_clock):
+    async with HostFactory.create_batch_and_listen(
+        3, memory_network=MemoryNetwork()
+    ) as hosts:
+        dht = KadDHT(hosts[0])
+        async with background_trio_service(dht):
+            await connect(hosts[1], hosts[0])
+            for provider in hosts[1:]:
+                stream = await hosts[1].new_stream(hosts[0].get_id(), [PROTOCOL_ID])
+                message = Message(
+                    type=Message.ADD_PROVIDER,
+                    key=b"cid",
+                    providerPeers=[
+                        Message.Peer(
+                            id=provider.get_id().to_bytes(),
+                            addrs=[addr.to_bytes() for addr in provider.get_addrs()],
+                        )
+                    ],
+                )
+                await stream.write(encode_varint_prefixed(message.SerializeToString()))
+                await stream.close()
+            await trio.sleep(1)
+            assert dht.providers.get_providers(b"cid") == [hosts[1].get_id()]
+
+            response = await request(
+                hosts[1],
+                hosts[0].get_id(),
+                Message(type=Message.GET_PROVIDERS, key=b"cid"),
+            )
+            assert [peer.id for peer in response.providerPeers] == [
+                hosts[1].get_id().to_bytes()
+            ]
@@ -0,0 +1,128 @@
+import bisect
+import math
+import random
+
+import pytest
+import trio
+
+from libp2p.kademlia.lookup import (
+    find_closest_peers,
+)
+from libp2p.kademlia.routing_table import (
+    KEY_BITS,
+    RoutingTable,
+    key_of,
+)
+from libp2p.peer.id import (
+    ID,
+)
+
+
+class SimulatedNetwork:
+    """
+    Nodes whose routing tables hold, for each bucket, random peers of those
+    which would fit in it, as they would once the network settled. Tables are
+    built when a node is first queried.
+    """
+
+    def __init__(self, size, bucket_size=20, seed=0):
+        self.bucket_size = bucket_size
+        self.random = random.Random(seed)
+        self.node_ids = sorted(
+            (ID(b"node%d" % i) for i in range(size)), key=lambda n: n.xor_id
+        )
+        self.keys = [node_id.xor_id for node_id in self.node_ids]
+        self.tables = {}
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.down = set()
+
+    def _prefix_range(self, key, cpl):
+        # Nodes sharing at least `cpl` leading bits with `key` are contiguous.
+        shift = KEY_BITS - cpl
+        low = (key >> shift) << shift
+        return (
+            bisect.bisect_left(self.keys, low),
+            bisect.bisect_left(self.keys, low + (1 << shift)),
+        )
+
+    def table(self, node_id):
+        table = self.tables.get(node_id)
+        if table is not None:
+            return table
+        table = self.tables[node_id] = RoutingTable(node_id, self.bucket_size)
+        for cpl in range(KEY_BITS):
+            start, end = self._prefix_range(node_id.xor_id, cpl)
+            if end - start <= 1:
+                break
+            inner_start, inner_end = self._prefix_range(node_id.xor_id, cpl + 1)
+            bucket = self.node_ids[start:inner_start] + self.node_ids[inner_end:end]
+            for peer_id in self.random.sample(
+                bucket, min(len(bucket), self.bucket_size)
+            ):
+                table.add_peer(peer_id)
+        return table
+
+    def closest(self, key, count):
+        return sorted(self.node_ids, key=lambda n: n.xor_id ^ key)[:count]
+
+    def query_fn(self, key):
+        async def query(node_id):
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+            try:
+                await trio.sleep(self.random.uniform(0.01, 0.2))
+            finally:
+                self.in_flight -= 1
+            if node_id in self.down:
+                return None
+            return self.table(node_id).nearest(key, self.bucket_size)
+
+        return query
+
+
+@pytest.mark.trio
+async def test_lookup_10k_nodes(autojump_clock):
+    size = 10_000
+    network = SimulatedNetwork(size)
+    origin = network.node_ids[0]
+    hops = []
+    for i in range(10):
+        key = key_of(b"key%d" % i)
+        seeds = network.table(origin).nearest(key, 20)
+        result = await find_closest_peers(
+            key, seeds, network.query_fn(key), count=20, alpha=3
+        )
+        assert result.peers == network.closest(key, 20)
+        hops.append(result.hops)
+        # Little more than the peers returned are queried.
+        assert result.queried <= 2 * 20
+    # Each hop gains several bits of prefix, about 3 hops are needed.
+    assert max(hops) <= math.log2(size) / 2
+    assert network.max_in_flight == 3
+
+
+@pytest.mark.trio
+async def test_lookup_unresponsive_peers(autojump_clock):
+    network = SimulatedNetwork(500, bucket_size=5)
+    key = key_of(b"key")
+    closest = network.closest(key, 10)
+    network.down = set(closest[:3])
+    result = await find_closest_peers(
+        key,
+        network.table(network.node_ids[0]).nearest(key, 5),
+        network.query_fn(key),
+        count=5,
+        alpha=1,
+    )
+    assert result.peers == closest[3:8]
+    assert network.max_in_flight == 1
+
+
+@pytest.mark.trio
+async def test_lookup_without_peers():
+    async def query(node_id):
+        raise AssertionError("no peer to query")
+
+    result = await find_closest_peers(0, [], query)
+    assert result == ([], 0, 0)
@@ -0,0 +1,106 @@
+import tracemalloc
+
+import pytest
+
+from libp2p.kademlia.providers import (
+    ProviderStore,
+)
+from libp2p.peer.id import (
+    ID,
+)
+
+PEER_1 = ID(b"peer1")
+PEER_2 = ID(b"peer2")
+
+
+def test_add_get():
+    now = [0.0]
+    store = ProviderStore(clock=lambda: now[0], validity=10)
+    assert store.get_providers(b"key") == []
+    store.add_provider(b"key", PEER_1)
+    store.add_provider(b"key", PEER_2)
+    store.add_provider(b"other", PEER_1)
+    assert set(store.get_providers(b"key")) == {PEER_1, PEER_2}
+    assert store.get_providers(b"other") == [PEER_1]
+
+    now[0] = 5
+    # Provided again, the record lasts longer.
+    store.add_provider(b"key", PEER_2)
+    now[0] = 10
+    assert store.get_providers(b"key") == [PEER_2]
+    assert store.get_providers(b"other") == []
+    assert store.count() == 3
+    assert store.remove_expired() == 2
+    assert store.count() == 1
+    now[0] = 15
+    assert store.get_providers(b"key") == []
+    store.close()
+
+
+def test_cache():
+    store = ProviderStore(cache_size=2)
+    store.add_provider(b"key1", PEER_1)
+    assert store.get_providers(b"key1") == [PEER_1]
+    # Served from memory, without reading the database again.
+    store._db.execute("DELETE FROM providers")
+    assert store.get_providers(b"key1") == [PEER_1]
+    # The cached keys are updated when written.
+    store.add_provider(b"key1", PEER_2)
+    assert store.get_providers(b"key1") == [PEER_1, PEER_2]
+    # And evicted the least recently used first.
+    store.get_providers(b"key2")
+    store.get_providers(b"key3")
+    assert store.get_providers(b"key1") == [PEER_2]
+    store.close()
+
+
+def test_limits():
+    now = [0.0]
+    store = ProviderStore(
+        clock=lambda: now[0], validity=10, max_providers_per_key=2, max_keys_per_peer=2
+    )
+    assert store.add_provider(b"key1", PEER_1)
+    assert store.add_provider(b"key1", PEER_2)
+    assert not store.add_provider(b"key1", ID(b"peer3"))
+    assert store.add_provider(b"key2", PEER_1)
+    assert not store.add_provider(b"key3", PEER_1)
+    # Records are renewed, and our own are not limited.
+    assert store.add_provider(b"key1", PEER_1)
+    assert store.add_provider(b"key3", PEER_1, limited=False)
+    assert set(store.get_providers(b"key1")) == {PEER_1, PEER_2}
+    # Expired records do not count.
+    now[0] = 10
+    assert store.add_provider(b"key1", ID(b"peer3"))
+    store.close()
+
+
+def test_reload(tmp_path):
+    path = str(tmp_path / "providers.db")
+    store = ProviderStore(path, batch_size=10)
+    store.add_provider(b"key", PEER_1)
+    store.close()
+
+    store = ProviderStore(path)
+    assert store.get_providers(b"key") == [PEER_1]
+    store.close()
+
+
+@pytest.mark.slow
+def test_memory_1m_records():
+    size = 1_000_000
+    # The default store, in a temporary file.
+    store = ProviderStore()
+    peer_ids = [ID(b"peer%d" % i) for i in range(1000)]
+    tracemalloc.start()
+    try:
+        for i in range(size):
+            assert store.add_provider(b"key%d" % (i // 10), peer_ids[i % 1000])
+            if i % 1000 == 0:
+                store.get_providers(b"key%d" % (i // 20))
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    assert store.count() == size
+    # Only the hot keys are kept in memory, not the records.
+    assert peak < 2 * 1024 * 1024
+    store.close()
@@ -0,0 +1,82 @@
+from libp2p.kademlia.routing_table import (
+    RoutingTable,
+    common_prefix_length,
+    key_of,
+)
+from libp2p.peer.id import (
+    ID,
+)
+
+LOCAL_ID = ID(b"local")
+
+
+def make_ids(number):
+    return [ID(b"peer%d" % i) for i in range(number)]
+
+
+def test_common_prefix_length():
+    assert common_prefix_length(0, 0) == 256
+    assert common_prefix_length(0, 1) == 255
+    assert common_prefix_length(0, 2**255) == 0
+    assert key_of(LOCAL_ID.to_bytes()) == LOCAL_ID.xor_id
+
+
+def test_add_peer():
+    table = RoutingTable(LOCAL_ID, bucket_size=2)
+    assert not table.add_peer(LOCAL_ID)
+    peer_ids = make_ids(200)
+    for peer_id in peer_ids:
+        added = table.add_peer(peer_id)
+        assert added == (peer_id in table)
+    # Half of the keys are in the first bucket, so it is full.
+    assert (
+        table.bucket(0)
+        == [
+            peer_id
+            for peer_id in peer_ids
+            if common_prefix_length(LOCAL_ID.xor_id, peer_id.xor_id) == 0
+        ][:2]
+    )
+    assert all(len(table.bucket(cpl)) <= 2 for cpl in range(256))
+    assert len(table) == len(table.peers())
+
+    first, second = table.bucket(0)
+    # Seen again, it becomes the most recently seen.
+    assert table.add_peer(first)
+    assert table.bucket(0) == [second, first]
+    table.remove_peer(second)
+    assert second not in table
+    assert table.bucket(0) == [first]
+
+
+def test_nearest():
+    table = RoutingTable(LOCAL_ID)
+    peer_ids = make_ids(50)
+    for peer_id in peer_ids:
+        table.add_peer(peer_id)
+    key = key_of(b"key")
+    expected = sorted(table.peers(), key=lambda peer_id: peer_id.xor_id ^ key)
+    assert table.nearest(key, 5) == expected[:5]
+    assert table.nearest(key, 1000) == expected
+
+
+def test_refresh():
+    now = [0.0]
+    table = RoutingTable(LOCAL_ID, clock=lambda: now[0])
+    for peer_id in make_ids(50):
+        table.add_peer(peer_id)
+    deepest = max(
+        common_prefix_length(LOCAL_ID.xor_id, peer_id.xor_id)
+        for peer_id in table.peers()
+    )
+    assert table.stale_buckets(10) == []
+
+    now[0] = 10
+    assert table.stale_buckets(10) == list(range(deepest + 1))
+    for cpl in (0, 3):
+        key = table.random_key(cpl)
+        assert common_prefix_length(LOCAL_ID.xor_id, key_of(key)) == cpl
+        table.mark_refreshed(key_of(key))
+    assert 0 not in table.stale_buckets(10)
+    assert 3 not in table.stale_buckets(10)
+    assert 1 in table.stale_buckets(10)
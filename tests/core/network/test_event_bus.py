@@ -0,0 +1,133 @@
+import pytest
+import trio
+
+from libp2p.abc import (
+    INotifee,
+)
+from libp2p.network.event_bus import (
+    NotifeeEventBus,
+    OverflowPolicy,
+)
+from libp2p.tools.async_service import (
+    background_trio_service,
+)
+from libp2p.tools.factories import (
+    SwarmFactory,
+)
+from libp2p.tools.utils import (
+    connect_swarm,
+)
+
+
+class BlockedNotifee(INotifee):
+    def __init__(self):
+        self.events = []
+        self.event_unblocked = trio.Event()
+
+    async def _record(self, event):
+        await self.event_unblocked.wait()
+        self.events.append(event)
+
+    async def opened_stream(self, network, stream):
+        await self._record("opened_stream")
+
+    async def closed_stream(self, network, stream):
+        pass
+
+    async def connected(self, network, conn):
+        await self._record("connected")
+
+    async def disconnected(self, network, conn):
+        await self._record("disconnected")
+
+    async def listen(self, network, multiaddr):
+        await self._record(multiaddr)
+
+    async def listen_close(self, network, multiaddr):
+        pass
+
+
+def listen_event(i):
+    return lambda notifee: notifee.listen(None, i)
+
+
+@pytest.mark.trio
+async def test_slow_notifee_does_not_block_swarm():
+    async with SwarmFactory.create_batch_and_listen(2) as swarms:
+        notifee = BlockedNotifee()
+        swarms[0].register_notifee(notifee)
+        with trio.fail_after(5):
+            await connect_swarm(swarms[0], swarms[1])
+            await swarms[0].new_stream(swarms[1].get_peer_id())
+        assert notifee.events == []
+
+        notifee.event_unblocked.set()
+        await trio.sleep(0.01)
+        assert notifee.events == ["connected", "opened_stream"]
+
+
+@pytest.mark.trio
+async def test_events_are_delivered_in_order():
+    bus = NotifeeEventBus()
+    notifee = BlockedNotifee()
+    notifee.event_unblocked.set()
+    # Events emitted before the bus runs are queued.
+    bus.subscribe(notifee)
+    await bus.emit(listen_event(0))
+    async with background_trio_service(bus):
+        for i in range(1, 10):
+            await bus.emit(listen_event(i))
+        await trio.sleep(0.01)
+        assert notifee.events == list(range(10))
+
+
+@pytest.mark.trio
+@pytest.mark.parametrize(
+    "overflow_policy, expected_events",
+    (
+        (OverflowPolicy.DROP_NEWEST, [0, 1, 2]),
+        (OverflowPolicy.DROP_OLDEST, [0, 3, 4]),
+    ),
+)
+async def test_overflow_policies(overflow_policy, expected_events):
+    bus = NotifeeEventBus(queue_size=2, overflow_policy=overflow_policy)
+    notifee = BlockedNotifee()
+    async with background_trio_service(bus):
+        subscription = bus.subscribe(notifee)
+        # The first event is taken by the dispatcher, which then blocks.
+        await bus.emit(listen_event(0))
+        await trio.sleep(0.01)
+        for i in range(1, 5):
+            await bus.emit(listen_event(i))
+        assert subscription.dropped == 2
+
+        notifee.event_unblocked.set()
+        await trio.sleep(0.01)
+        assert notifee.events == expected_events
+
+
+def test_drop_oldest_needs_a_queue():
+    assert NotifeeEventBus().overflow_policy is OverflowPolicy.BLOCK
+    bus = NotifeeEventBus(queue_size=0)
+    bus.subscribe(BlockedNotifee(), overflow_policy=OverflowPolicy.DROP_NEWEST)
+    with pytest.raises(ValueError):
+        bus.subscribe(BlockedNotifee(), overflow_policy=OverflowPolicy.DROP_OLDEST)
+
+
+@pytest.mark.trio
+async def test_block_policy_applies_backpressure():
+    bus = NotifeeEventBus(queue_size=1, overflow_policy=OverflowPolicy.BLOCK)
+    notifee = BlockedNotifee()
+    async with background_trio_service(bus):
+        bus.subscribe(notifee)
+        await bus.emit(listen_event(0))
+        await trio.sleep(0.01)
+        await bus.emit(listen_event(1))
+        with trio.move_on_after(0.05) as cancel_scope:
+            await bus.emit(listen_event(2))
+        assert cancel_scope.cancelled_caught
+
+        notifee.event_unblocked.set()
+        await bus.emit(listen_event(3))
+        await trio.sleep(0.01)
+        assert notifee.events == [0, 1, 3]
@@ -0,0 +1,158 @@
+import pytest
+from multiaddr import (
+    Multiaddr,
+)
+import trio
+
+from libp2p import (
+    new_swarm,
+)
+from libp2p.crypto.secp256k1 import (
+    create_new_key_pair,
+)
+from libp2p.network.exceptions import (
+    ConnectionGated,
+    SwarmException,
+)
+from libp2p.network.gater import (
+    ConnectionGater,
+)
+from libp2p.peer.id import (
+    ID,
+)
+from libp2p.rcmgr.limits import (
+    Direction,
+)
+from libp2p.tools.async_service import (
+    background_trio_service,
+)
+from libp2p.tools.constants import (
+    LISTEN_MADDR,
+)
+from libp2p.tools.factories import (
+    SwarmFactory,
+)
+from libp2p.transport.tcp.tcp import (
+    TCP,
+)
+
+PEER_ID = ID.from_base58("QmNnooDu7bfjPFoTZYxMNLWUQJyrVwtbZg5gBMjTezGAJN")
+
+
+class UpgradeRejectingGater(ConnectionGater):
+    def intercept_upgraded(self, muxed_conn):
+        return False
+
+
+def _addrs(swarm):
+    return [
+        addr for listener in swarm.listeners.values() for addr in listener.get_addrs()
+    ]
+
+
+@pytest.mark.trio
+async def test_connection_gater(autojump_clock):
+    gater = ConnectionGater()
+    addr = Multiaddr("/ip4/10.1.2.3/tcp/4001")
+    assert gater.intercept_accept(addr)
+
+    gater.block_subnet("10.0.0.0/8")
+    assert not gater.intercept_accept(addr)
+    assert not gater.intercept_addr_dial(PEER_ID, addr)
+    gater.unblock_subnet("10.0.0.0/8")
+    gater.block_addr("10.1.2.3")
+    assert not gater.intercept_accept(addr)
+    gater.unblock_addr("10.1.2.3")
+    assert gater.intercept_accept(Multiaddr("/ip6/::1/tcp/1"))
+
+    gater.block_peer(PEER_ID)
+    assert not gater.intercept_peer_dial(PEER_ID)
+    assert not gater.intercept_addr_dial(PEER_ID, addr)
+    assert not gater.intercept_secured(Direction.INBOUND, PEER_ID)
+    gater.unblock_peer(PEER_ID)
+    assert gater.intercept_secured(Direction.INBOUND, PEER_ID)
+
+
+@pytest.mark.trio
+async def test_connection_gater_accept_rate(autojump_clock):
+    gater = ConnectionGater(accept_rate=2, accept_burst=3)
+    addr = Multiaddr("/ip4/10.1.2.3/tcp/4001")
+    assert all(gater.intercept_accept(addr) for _ in range(3))
+    assert not gater.intercept_accept(addr)
+    # Other addresses have their own quota.
+    assert gater.intercept_accept(Multiaddr("/ip4/10.1.2.4/tcp/4001"))
+
+    await trio.sleep(0.5)
+    assert gater.intercept_accept(addr)
+    assert not gater.intercept_accept(addr)
+
+
+@pytest.mark.trio
+async def test_gated_at_accept(monkeypatch):
+    gater = ConnectionGater()
+    gater.block_addr("127.0.0.1")
+    swarm_0 = SwarmFactory()
+    swarm_1 = SwarmFactory(transport=TCP(gater=gater), gater=gater)
+    handshakes = []
+    upgrade_security = swarm_1.upgrader.upgrade_security
+
+    async def recording_upgrade_security(*args):
+        handshakes.append(args)
+        return await upgrade_security(*args)
+
+    monkeypatch.setattr(
+        swarm_1.upgrader, "upgrade_security", recording_upgrade_security
+    )
+    async with background_trio_service(swarm_0), background_trio_service(swarm_1):
+        await swarm_1.listen(LISTEN_MADDR)
+        swarm_0.peerstore.add_addrs(swarm_1.get_peer_id(), _addrs(swarm_1), 10)
+        with pytest.raises(SwarmException):
+            await swarm_0.dial_peer(swarm_1.get_peer_id())
+        # The connection was closed before any handshake.
+        assert handshakes == []
+        assert swarm_0.get_peer_id() not in swarm_1.connections
+
+
+def test_new_swarm_gates_given_tcp():
+    gater = ConnectionGater()
+    transport = TCP()
+    swarm = new_swarm(create_new_key_pair(), transport_opt=transport, gater_opt=gater)
+    assert swarm.transports.get("tcp") is transport
+    assert transport.gater is gater
+
+    with pytest.raises(ValueError):
+        new_swarm(transport_opt=TCP(gater=ConnectionGater()), gater_opt=gater)
+
+
+@pytest.mark.trio
+async def test_gated_peers():
+    async with SwarmFactory.create_and_listen() as swarm_1:
+        swarm_0 = SwarmFactory(gater=ConnectionGater())
+        async with background_trio_service(swarm_0):
+            swarm_0.peerstore.add_addrs(swarm_1.get_peer_id(), _addrs(swarm_1), 10)
+
+            swarm_0.gater.block_peer(swarm_1.get_peer_id())
+            with pytest.raises(ConnectionGated):
+                await swarm_0.dial_peer(swarm_1.get_peer_id())
+            swarm_0.gater.unblock_peer(swarm_1.get_peer_id())
+
+            # Inbound connections of blocked peers are dropped after the
+            # handshake authenticated them.
+            swarm_1.gater = ConnectionGater()
+            swarm_1.gater.block_peer(swarm_0.get_peer_id())
+            with pytest.raises(SwarmException):
+                await swarm_0.dial_peer(swarm_1.get_peer_id())
+            assert swarm_0.get_peer_id() not in swarm_1.connections
+
+
+@pytest.mark.trio
+async def test_gated_after_upgrade():
+    async with SwarmFactory.create_and_listen() as swarm_1:
+        swarm_0 = SwarmFactory(gater=UpgradeRejectingGater())
+        async with background_trio_service(swarm_0):
+            swarm_0.peerstore.add_addrs(swarm_1.get_peer_id(), _addrs(swarm_1), 10)
+            with pytest.raises(SwarmException) as excinfo:
+                await swarm_0.dial_peer(swarm_1.get_peer_id())
+            (error,) = excinfo.value.__cause__.args[0]
+            assert isinstance(error, ConnectionGated)
+            assert swarm_1.get_peer_id() not in swarm_0.connections
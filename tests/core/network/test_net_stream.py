@@ -5,6 +5,7 @@ from libp2p.network.stream.exceptions import (
     StreamClosed,
     StreamEOF,
     StreamReset,
+    StreamTimeout,
 )
 from libp2p.tools.constants import (
     MAX_READ_LEN,
@@ -118,3 +119,16 @@ async def test_net_stream_write_after_remote_reset(net_stream_pair):
     await trio.sleep(0.01)
     with pytest.raises(StreamClosed):
         await stream_0.write(DATA)
+
+
+@pytest.mark.trio
+async def test_net_stream_deadline(net_stream_pair):
+    stream_0, stream_1 = net_stream_pair
+    stream_1.set_deadline(0.1)
+    with pytest.raises(StreamTimeout):
+        await stream_1.read(MAX_READ_LEN)
+    with pytest.raises(StreamTimeout):
+        await stream_1.write(DATA)
+    stream_1.set_deadline(None)
+    await stream_0.write(DATA)
+    assert (await stream_1.read(MAX_READ_LEN)) == DATA
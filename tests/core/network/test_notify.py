@@ -64,6 +64,14 @@ class MyNotifee(INotifee):
         pass
 
 
+async def wait_for_events(events, count):
+    # Notifees are called from the event bus tasks, after the call which
+    # caused the event returns.
+    with trio.fail_after(5):
+        while len(events) < count:
+            await trio.sleep(0.01)
+
+
 @pytest.mark.trio
 async def test_notify(security_protocol):
     swarms = [SwarmFactory(security_protocol=security_protocol) for _ in range(2)]
@@ -100,7 +108,10 @@ async def test_notify(security_protocol):
 
         # Disconnected
         await swarms[0].close_peer(swarms[1].get_peer_id())
-        await trio.sleep(0.01)
+        # Until swarms[1] reads the close and notifies it.
+        with trio.fail_after(5):
+            while events_1_0.count(Event.Disconnected) < 1:
+                await trio.sleep(0.01)
 
         # Connected again, but different direction.
         await connect_swarm(swarms[1], swarms[0])
@@ -108,7 +119,10 @@ async def test_notify(security_protocol):
 
         # Disconnected again, but different direction.
         await swarms[1].close_peer(swarms[0].get_peer_id())
-        await trio.sleep(0.01)
+        # Until swarms[0] reads the close and notifies it.
+        with trio.fail_after(5):
+            while events_0_without_listen.count(Event.Disconnected) < 2:
+                await trio.sleep(0.01)
 
         expected_events_without_listen = [
             Event.Connected,
@@ -120,6 +134,11 @@ async def test_notify(security_protocol):
             Event.Disconnected,
         ]
         expected_events = [Event.Listen] + expected_events_without_listen
+        await wait_for_events(events_0_0, len(expected_events))
+        await wait_for_events(events_1_0, len(expected_events))
+        await wait_for_events(
+            events_0_without_listen, len(expected_events_without_listen)
+        )
 
         assert events_0_0 == expected_events
         assert events_1_0 == expected_events
@@ -0,0 +1,58 @@
+import pytest
+import trio
+
+from libp2p.custom_types import (
+    TProtocol,
+)
+from libp2p.network.reaper import (
+    IdleReaper,
+    IdleTimeouts,
+    ReaperStats,
+)
+from libp2p.tools.factories import (
+    SwarmFactory,
+)
+from libp2p.tools.utils import (
+    connect_swarm,
+)
+from libp2p.transport.memory.memory import (
+    MemoryNetwork,
+)
+
+FAST_PROTOCOL = TProtocol("/fast/1.0.0")
+
+
+@pytest.mark.trio
+async def test_idle_reaper(autojump_clock):
+    async with SwarmFactory.create_batch_and_listen(
+        2, memory_network=MemoryNetwork()
+    ) as swarms:
+        swarm_0, swarm_1 = swarms
+        reaper = IdleReaper(
+            swarm_0,
+            IdleTimeouts(stream=10, protocols={FAST_PROTOCOL: 1}, connection=5),
+        )
+        await connect_swarm(swarm_0, swarm_1)
+        conn = swarm_0.connections[swarm_1.get_peer_id()]
+        stream = await swarm_0.new_stream(swarm_1.get_peer_id())
+        fast_stream = await swarm_0.new_stream(swarm_1.get_peer_id())
+        fast_stream.set_protocol(FAST_PROTOCOL)
+
+        await trio.sleep(2)
+        # Activity postpones the timeout.
+        await stream.write(b"data")
+        assert await reaper.sweep() == ReaperStats(1, 0)
+        assert conn.get_streams() == (stream,)
+
+        await trio.sleep(9)
+        assert await reaper.sweep() == ReaperStats(0, 0)
+        await trio.sleep(1)
+        # The connection was just emptied, it is not idle yet.
+        assert await reaper.sweep() == ReaperStats(1, 0)
+        assert conn.get_streams() == ()
+        assert swarm_1.get_peer_id() in swarm_0.connections
+
+        await trio.sleep(5)
+        assert await reaper.sweep() == ReaperStats(0, 1)
+        assert not swarm_0.connections
+        assert reaper.stats() == ReaperStats(2, 1)
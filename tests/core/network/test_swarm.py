@@ -10,12 +10,24 @@ from trio.testing import (
 from libp2p.network.exceptions import (
     SwarmException,
 )
+from libp2p.peer.id import (
+    ID,
+)
+from libp2p.peer.persistent import (
+    SQLitePeerStore,
+)
+from libp2p.tools.async_service import (
+    background_trio_service,
+)
 from libp2p.tools.factories import (
     SwarmFactory,
 )
 from libp2p.tools.utils import (
     connect_swarm,
 )
+from libp2p.transport.tcp.tcp import (
+    TCP,
+)
 
 
 @pytest.mark.trio
@@ -60,7 +72,9 @@ async def test_swarm_close_peer(security_protocol):
 
         # peer 1 closes peer 0
         await swarms[1].close_peer(swarms[0].get_peer_id())
-        await trio.sleep(0.01)
+        with trio.fail_after(5):
+            while swarms[0].connections:
+                await trio.sleep(0.01)
         await wait_all_tasks_blocked()
         # 0  1 <> 2
         assert len(swarms[0].connections) == 0
@@ -71,7 +85,9 @@ async def test_swarm_close_peer(security_protocol):
 
         # peer 1 is closed by peer 2
         await swarms[2].close_peer(swarms[1].get_peer_id())
-        await trio.sleep(0.01)
+        with trio.fail_after(5):
+            while swarms[1].connections:
+                await trio.sleep(0.01)
         # 0  1  2
         assert len(swarms[1].connections) == 0 and len(swarms[2].connections) == 0
 
@@ -92,6 +108,44 @@ async def test_swarm_close_peer(security_protocol):
         assert len(swarms[1].connections) == 0 and len(swarms[2].connections) == 0
 
 
+def test_swarm_transport():
+    swarm = SwarmFactory()
+    assert swarm.transport is swarm.transports.get("tcp")
+    transport = TCP()
+    swarm.transport = transport
+    assert swarm.transports.get("tcp") is transport
+
+
+@pytest.mark.trio
+async def test_swarm_flushes_peerstore(tmp_path):
+    path = str(tmp_path / "peers.db")
+    peerstore = SQLitePeerStore(path, flush_interval=3600)
+    swarm = SwarmFactory(peerstore=peerstore)
+    async with background_trio_service(swarm):
+        peerstore.add_addr(ID(b"peer1"), Multiaddr("/ip4/127.0.0.1/tcp/4001"), 100)
+        await wait_all_tasks_blocked()
+
+    # Written once the swarm stopped, without closing the peerstore.
+    other = SQLitePeerStore(path)
+    assert other.peer_ids() == [ID(b"peer1")]
+    other.close()
+    peerstore.close()
+
+
+@pytest.mark.trio
+@pytest.mark.parametrize("gc_interval", (None, 0.01))
+async def test_swarm_peerstore_gc(gc_interval):
+    swarm = SwarmFactory(peerstore_gc_interval=gc_interval)
+    swarm.peerstore.add_protocols(ID(b"peer1"), ["/p1"])
+    async with background_trio_service(swarm):
+        await trio.sleep(0.05)
+    # Peers without addresses are only removed when asked for.
+    if gc_interval is None:
+        assert ID(b"peer1") in swarm.peerstore.peer_ids()
+    else:
+        assert ID(b"peer1") not in swarm.peerstore.peer_ids()
+
+
 @pytest.mark.trio
 async def test_swarm_remove_conn(swarm_pair):
     swarm_0, swarm_1 = swarm_pair
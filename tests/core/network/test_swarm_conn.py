@@ -4,6 +4,22 @@ from trio.testing import (
     wait_all_tasks_blocked,
 )
 
+from libp2p.network.connection.swarm_connection import (
+    STREAM_HANDLER_GRACE_PERIOD,
+)
+from libp2p.network.stream.exceptions import (
+    StreamReset,
+)
+from libp2p.tools.factories import (
+    SwarmFactory,
+)
+from libp2p.tools.utils import (
+    connect_swarm,
+)
+from libp2p.transport.memory.memory import (
+    MemoryNetwork,
+)
+
 
 @pytest.mark.trio
 async def test_swarm_conn_close(swarm_conn_pair):
@@ -46,3 +62,47 @@ async def test_swarm_conn_streams(swarm_conn_pair):
     assert len(conn_0.get_streams()) == 0
     # Nothing happen if `stream_0_1` is not present or already removed.
     conn_0.remove_stream(stream_0_1)
+
+
+@pytest.mark.trio
+async def test_swarm_mass_disconnect(autojump_clock):
+    number = 100
+
+    async def handler(stream):
+        try:
+            await stream.read()
+        except StreamReset:
+            pass
+
+    async def stuck_handler(stream):
+        await trio.sleep_forever()
+
+    async with SwarmFactory.create_batch_and_listen(
+        number + 1, memory_network=MemoryNetwork()
+    ) as swarms:
+        swarm_0, peers = swarms[0], swarms[1:]
+
+        async def disconnect_all():
+            # Each remote peer keeps a stream whose handler runs on `swarm_0`.
+            for swarm in peers:
+                await connect_swarm(swarm_0, swarm)
+                await swarm.new_stream(swarm_0.get_peer_id())
+            await trio.sleep(1)
+            for conn in swarm_0.connections.values():
+                assert len(conn.get_streams()) == 1
+            start = trio.current_time()
+            await swarm_0.close_peers(tuple(swarm_0.connections))
+            elapsed = trio.current_time() - start
+            assert not swarm_0.connections
+            # Let the remote peers notice the disconnection.
+            await trio.sleep(1)
+            return elapsed
+
+        # Handlers which return once their stream is reset are not waited for.
+        swarm_0.set_stream_handler(handler)
+        assert await disconnect_all() == pytest.approx(0)
+
+        # Stuck handlers delay the teardown once for all the connections.
+        swarm_0.set_stream_handler(stuck_handler)
+        elapsed = await disconnect_all()
+        assert elapsed == pytest.approx(STREAM_HANDLER_GRACE_PERIOD)
@@ -1,10 +1,30 @@
 import pytest
+from multiaddr import (
+    Multiaddr,
+)
 
 from libp2p.peer.peerstore import (
+    CONNECTED_ADDR_TTL,
+    PERMANENT_ADDR_TTL,
+    RECENTLY_CONNECTED_ADDR_TTL,
     PeerStore,
     PeerStoreError,
 )
 
+ADDR_1 = Multiaddr("/ip4/127.0.0.1/tcp/4001")
+ADDR_2 = Multiaddr("/ip4/127.0.0.1/tcp/4002")
+ADDR_3 = Multiaddr("/ip4/127.0.0.1/tcp/4003")
+ADDR_4 = Multiaddr("/ip4/127.0.0.1/tcp/4004")
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
 # Testing methods from IAddrBook base class.
 
 
@@ -17,45 +37,110 @@ def test_addrs_empty():
 
 def test_add_addr_single():
     store = PeerStore()
-    store.add_addr("peer1", "/foo", 10)
-    store.add_addr("peer1", "/bar", 10)
-    store.add_addr("peer2", "/baz", 10)
+    store.add_addr("peer1", ADDR_1, 10)
+    store.add_addr("peer1", ADDR_2, 10)
+    store.add_addr("peer2", ADDR_3, 10)
 
-    assert store.addrs("peer1") == ["/foo", "/bar"]
-    assert store.addrs("peer2") == ["/baz"]
+    assert store.addrs("peer1") == [ADDR_1, ADDR_2]
+    assert store.addrs("peer2") == [ADDR_3]
 
 
 def test_add_addrs_multiple():
     store = PeerStore()
-    store.add_addrs("peer1", ["/foo1", "/bar1"], 10)
-    store.add_addrs("peer2", ["/foo2"], 10)
+    store.add_addrs("peer1", [ADDR_1, ADDR_2], 10)
+    store.add_addrs("peer2", [ADDR_3], 10)
 
-    assert store.addrs("peer1") == ["/foo1", "/bar1"]
-    assert store.addrs("peer2") == ["/foo2"]
+    assert store.addrs("peer1") == [ADDR_1, ADDR_2]
+    assert store.addrs("peer2") == [ADDR_3]
 
 
 def test_clear_addrs():
     store = PeerStore()
-    store.add_addrs("peer1", ["/foo1", "/bar1"], 10)
-    store.add_addrs("peer2", ["/foo2"], 10)
+    store.add_addrs("peer1", [ADDR_1, ADDR_2], 10)
+    store.add_addrs("peer2", [ADDR_3], 10)
     store.clear_addrs("peer1")
 
     assert store.addrs("peer1") == []
-    assert store.addrs("peer2") == ["/foo2"]
+    assert store.addrs("peer2") == [ADDR_3]
 
-    store.add_addrs("peer1", ["/foo1", "/bar1"], 10)
+    store.add_addrs("peer1", [ADDR_1, ADDR_2], 10)
 
-    assert store.addrs("peer1") == ["/foo1", "/bar1"]
+    assert store.addrs("peer1") == [ADDR_1, ADDR_2]
 
 
 def test_peers_with_addrs():
     store = PeerStore()
     store.add_addrs("peer1", [], 10)
-    store.add_addrs("peer2", ["/foo"], 10)
-    store.add_addrs("peer3", ["/bar"], 10)
+    store.add_addrs("peer2", [ADDR_1], 10)
+    store.add_addrs("peer3", [ADDR_2], 10)
 
     assert set(store.peers_with_addrs()) == {"peer2", "peer3"}
 
     store.clear_addrs("peer2")
 
     assert set(store.peers_with_addrs()) == {"peer3"}
+
+
+def test_addrs_expire():
+    clock = FakeClock()
+    store = PeerStore(clock)
+    store.add_addrs("peer1", [ADDR_1, ADDR_2], 10)
+    store.add_addr("peer1", ADDR_2, 20)
+    store.add_addr("peer1", ADDR_3, PERMANENT_ADDR_TTL)
+    store.add_addr("peer2", ADDR_4, 10)
+
+    clock.now = 10
+    assert store.addrs("peer1") == [ADDR_2, ADDR_3]
+    assert set(store.peers_with_addrs()) == {"peer1"}
+    # Nothing else was known about peer2.
+    assert "peer2" not in store.peer_ids()
+
+    # A shorter ttl does not shorten an expiry.
+    store.add_addr("peer1", ADDR_2, 1)
+    clock.now = 19
+    assert store.addrs("peer1") == [ADDR_2, ADDR_3]
+    clock.now = 20
+    assert store.addrs("peer1") == [ADDR_3]
+
+
+def test_set_addrs():
+    clock = FakeClock()
+    store = PeerStore(clock)
+    store.add_addrs("peer1", [ADDR_1, ADDR_2], 20)
+    store.set_addrs("peer1", [ADDR_1], 5)
+    store.set_addrs("peer1", [ADDR_2], 0)
+
+    assert store.addrs("peer1") == [ADDR_1]
+    clock.now = 5
+    assert "peer1" not in store.peer_ids()
+
+
+def test_update_addrs_on_disconnect():
+    clock = FakeClock()
+    store = PeerStore(clock)
+    store.add_addr("peer1", ADDR_1, CONNECTED_ADDR_TTL)
+    store.add_addr("peer1", ADDR_2, PERMANENT_ADDR_TTL)
+
+    clock.now = 1000
+    assert store.addrs("peer1") == [ADDR_1, ADDR_2]
+    store.update_addrs("peer1", CONNECTED_ADDR_TTL, RECENTLY_CONNECTED_ADDR_TTL)
+    clock.now += RECENTLY_CONNECTED_ADDR_TTL - 1
+    assert store.addrs("peer1") == [ADDR_1, ADDR_2]
+
+    # Reconnecting keeps the address again.
+    store.update_addrs("peer1", RECENTLY_CONNECTED_ADDR_TTL, CONNECTED_ADDR_TTL)
+    clock.now += RECENTLY_CONNECTED_ADDR_TTL
+    assert store.addrs("peer1") == [ADDR_1, ADDR_2]
+
+
+def test_addr_expiries_compacted():
+    clock = FakeClock()
+    store = PeerStore(clock)
+    for ttl in range(1, 5000):
+        store.add_addr("peer1", ADDR_1, ttl)
+
+    assert len(store._addr_expiries) <= 2048
+    clock.now = 4998
+    assert store.addrs("peer1") == [ADDR_1]
+    clock.now = 4999
+    assert "peer1" not in store.peer_ids()
@@ -0,0 +1,65 @@
+import pytest
+from multiaddr import (
+    Multiaddr,
+)
+
+from libp2p.peer.metrics import (
+    PeerMetrics,
+)
+from libp2p.peer.peerstore import (
+    PeerStore,
+)
+
+
+def test_latency_ewma():
+    metrics = PeerMetrics()
+    assert metrics.latency_ewma("peer1") is None
+
+    metrics.record_latency("peer1", 1.0, "/foo")
+    metrics.record_latency("peer1", 2.0)
+
+    assert metrics.latency_ewma("peer1") == pytest.approx(1.1)
+    assert metrics.addr_latency_ewma("peer1", "/foo") == 1.0
+    assert metrics.addr_latency_ewma("peer1", "/bar") is None
+
+
+def test_dial_success_rate():
+    metrics = PeerMetrics()
+    metrics.record_dial("peer1", "/foo", True)
+    metrics.record_dial("peer1", "/bar", False)
+
+    assert metrics.dial_success_rate("peer1") == pytest.approx(0.8)
+    assert metrics.dial_success_rate("peer1", "/foo") == 1.0
+    assert metrics.dial_success_rate("peer1", "/bar") == 0.0
+    assert metrics.dial_success_rate("peer2") is None
+
+
+def test_rank_addrs():
+    metrics = PeerMetrics()
+    addrs = ["/slow", "/fast", "/failing", "/unknown"]
+    assert metrics.rank_addrs("peer1", addrs) == addrs
+
+    metrics.record_latency("peer1", 0.5, "/slow")
+    metrics.record_latency("peer1", 0.1, "/fast")
+    metrics.record_latency("peer1", 0.1, "/failing")
+    metrics.record_dial("peer1", "/failing", False)
+
+    # "/unknown" is expected to be as fast as the peer on average.
+    assert metrics.rank_addrs("peer1", addrs) == [
+        "/fast",
+        "/unknown",
+        "/slow",
+        "/failing",
+    ]
+
+
+def test_peerstore_forgets_metrics():
+    now = [0.0]
+    store = PeerStore(lambda: now[0])
+    store.add_addr("peer1", Multiaddr("/ip4/127.0.0.1/tcp/4001"), 10)
+    store.record_latency("peer1", 0.1)
+    assert store.latency_ewma("peer1") == 0.1
+
+    now[0] = 10
+    assert store.peer_ids() == []
+    assert store.latency_ewma("peer1") is None
@@ -1,4 +1,7 @@
 import pytest
+from multiaddr import (
+    Multiaddr,
+)
 
 from libp2p.crypto.secp256k1 import (
     create_new_key_pair,
@@ -8,7 +11,8 @@ from libp2p.peer.peerdata import (
     PeerDataError,
 )
 
-MOCK_ADDR = "/peer"
+MOCK_ADDR = Multiaddr("/ip4/127.0.0.1/tcp/4001")
+MOCK_ADDR_2 = Multiaddr("/ip4/127.0.0.1/tcp/4002")
 MOCK_KEYPAIR = create_new_key_pair()
 MOCK_PUBKEY = MOCK_KEYPAIR.public_key
 MOCK_PRIVKEY = MOCK_KEYPAIR.private_key
@@ -36,6 +40,44 @@ def test_set_protocols():
     assert peer_data.get_protocols() == protocols
 
 
+# Test case when adding the same protocols again
+def test_add_dup_protocols():
+    peer_data = PeerData()
+    peer_data.add_protocols(["protocol1", "protocol2"])
+    assert peer_data.add_protocols(["protocol2", "protocol3"]) == ["protocol3"]
+    assert peer_data.get_protocols() == ["protocol1", "protocol2", "protocol3"]
+
+
+# Test case for removing protocols
+def test_remove_protocols():
+    peer_data = PeerData()
+    peer_data.add_protocols(["protocol1", "protocol2"])
+    assert peer_data.remove_protocols(["protocol1", "protocol3"]) == ["protocol1"]
+    assert peer_data.get_protocols() == ["protocol2"]
+
+
+# Test case for the views following later changes
+def test_views():
+    peer_data = PeerData()
+    protocols = peer_data.get_protocols()
+    addrs = peer_data.get_addrs()
+    peer_data.set_protocols(["protocol1"])
+    peer_data.add_addrs([MOCK_ADDR, MOCK_ADDR_2])
+
+    assert protocols == ["protocol1"]
+    assert "protocol1" in protocols
+    assert addrs[1] == MOCK_ADDR_2
+    assert list(addrs) == [MOCK_ADDR, MOCK_ADDR_2]
+    assert MOCK_ADDR in addrs
+    with pytest.raises(TypeError):
+        addrs[0] = MOCK_ADDR
+
+    # Iterating over a view does not break when the peer changes meanwhile.
+    for addr in addrs:
+        peer_data.remove_addrs([addr])
+    assert addrs == []
+
+
 # Test case when adding addresses
 def test_add_addrs():
     peer_data = PeerData()
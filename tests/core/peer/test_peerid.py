@@ -1,4 +1,8 @@
+import gc
+import hashlib
+import pickle
 import random
+import weakref
 
 import base58
 import multihash
@@ -108,3 +112,51 @@ def test_id_from_public_key():
     actual = ID.from_pubkey(public_key)
 
     assert actual == expected
+
+
+def test_ids_interned():
+    peer_id = ID(b"abcd")
+
+    assert ID(b"abcd") is peer_id
+    assert ID.from_base58(peer_id.to_base58()) is peer_id
+    assert pickle.loads(pickle.dumps(peer_id)) is peer_id
+    assert hash(peer_id) == hash(b"abcd")
+
+
+def test_interned_ids_released():
+    peer_id = ID(b"released")
+    ref = weakref.ref(peer_id)
+    del peer_id
+    gc.collect()
+
+    assert ref() is None
+
+
+def test_dict_lookups_skip_eq(monkeypatch):
+    peers = {ID(b"peer%d" % i): i for i in range(100)}
+    # As pubsub's peers of a topic.
+    subscribers = set(peers)
+    eq_calls = []
+    eq = ID.__eq__
+
+    def counting_eq(self, other):
+        eq_calls.append(other)
+        return eq(self, other)
+
+    monkeypatch.setattr(ID, "__eq__", counting_eq)
+    # As when decoding the sender of a message.
+    assert all(ID(b"peer%d" % i) in peers for i in range(100))
+    assert all(ID(b"peer%d" % i) in subscribers for i in range(100))
+    assert eq_calls == []
+
+
+def test_xor_id():
+    peer_id = ID(b"abcd")
+
+    assert peer_id.xor_id == int(hashlib.sha256(b"abcd").hexdigest(), 16)
+
+
+def test_from_pubkey_memoized():
+    public_key = create_new_key_pair().public_key
+
+    assert ID.from_pubkey(public_key) is ID.from_pubkey(public_key)
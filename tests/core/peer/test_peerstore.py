@@ -1,10 +1,23 @@
+import tracemalloc
+
 import pytest
+from multiaddr import (
+    Multiaddr,
+)
 
+from libp2p.peer.id import (
+    ID,
+)
 from libp2p.peer.peerstore import (
+    TEMP_ADDR_TTL,
     PeerStore,
     PeerStoreError,
 )
 
+ADDR_1 = Multiaddr("/ip4/127.0.0.1/tcp/4001")
+ADDR_2 = Multiaddr("/ip4/127.0.0.1/tcp/4002")
+ADDR_3 = Multiaddr("/ip4/127.0.0.1/tcp/4003")
+
 # Testing methods from IPeerStore base class.
 
 
@@ -16,11 +29,11 @@ def test_peer_info_empty():
 
 def test_peer_info_basic():
     store = PeerStore()
-    store.add_addr("peer", "/foo", 10)
+    store.add_addr("peer", ADDR_1, 10)
     info = store.peer_info("peer")
 
     assert info.peer_id == "peer"
-    assert info.addrs == ["/foo"]
+    assert info.addrs == [ADDR_1]
 
 
 def test_add_get_protocols_basic():
@@ -52,11 +65,110 @@ def test_set_protocols():
     assert set(store.get_protocols("peer2")) == set()
 
 
+def test_remove_protocols():
+    store = PeerStore()
+    store.add_protocols("peer1", ["p1", "p2"])
+    store.remove_protocols("peer1", ["p1"])
+    store.remove_protocols("peer2", ["p1"])
+
+    assert store.get_protocols("peer1") == ["p2"]
+
+
+def test_bulk_add():
+    store = PeerStore()
+    store.bulk_add_addrs({"peer1": [ADDR_1, ADDR_2], "peer2": [ADDR_3]}, 10)
+    store.bulk_add_protocols({"peer1": ["p1", "p2"], "peer3": ["p1"]})
+    store.bulk_add_protocols({"peer1": ["p2", "p3"]})
+
+    assert store.addrs("peer1") == [ADDR_1, ADDR_2]
+    assert store.addrs("peer2") == [ADDR_3]
+    assert store.get_protocols("peer1") == ["p1", "p2", "p3"]
+    assert store.get_protocols("peer3") == ["p1"]
+
+
+def test_peers_supporting():
+    store = PeerStore()
+    store.add_protocols("peer1", ["p1", "p2"])
+    store.add_protocols("peer2", ["p2"])
+    store.bulk_add_protocols({"peer3": ["p2", "p3"]})
+
+    assert store.peers_supporting("p1") == ["peer1"]
+    assert set(store.peers_supporting("p2")) == {"peer1", "peer2", "peer3"}
+    assert store.peers_supporting("p4") == []
+
+    store.set_protocols("peer1", ["p3"])
+    store.remove_protocols("peer3", ["p2"])
+
+    assert store.peers_supporting("p1") == []
+    assert store.peers_supporting("p2") == ["peer2"]
+    assert set(store.peers_supporting("p3")) == {"peer1", "peer3"}
+
+
+def test_supports():
+    store = PeerStore()
+    store.add_protocols("peer1", ["p1", "p2"])
+
+    assert store.supports("peer1", ["p3", "p2", "p1"]) == ["p2", "p1"]
+    with pytest.raises(PeerStoreError):
+        store.supports("peer2", ["p1"])
+
+
 # Test with methods from other Peer interfaces.
 def test_peers():
     store = PeerStore()
     store.add_protocols("peer1", [])
     store.put("peer2", "key", "val")
-    store.add_addr("peer3", "/foo", 10)
+    store.add_addr("peer3", ADDR_1, 10)
 
     assert set(store.peer_ids()) == {"peer1", "peer2", "peer3"}
+
+
+def test_lookups_do_not_create_peers():
+    store = PeerStore()
+    with pytest.raises(PeerStoreError):
+        store.get("peer1", "key")
+    with pytest.raises(PeerStoreError):
+        store.pubkey("peer1")
+    store.remove_protocols("peer1", ["p1"])
+    store.clear_addrs("peer1")
+    store.update_addrs("peer1", 10, 20)
+
+    assert store.peer_ids() == []
+
+
+def test_gc_peers():
+    store = PeerStore()
+    store.add_protocols("peer1", ["p1"])
+    store.put("peer2", "key", "val")
+    store.add_addr("peer3", ADDR_1, 10)
+    store.add_protocols("peer4", ["p1"])
+    store.record_latency("peer1", 0.1)
+
+    assert set(store.gc_peers(keep={"peer4"})) == {"peer1", "peer2"}
+    assert set(store.peer_ids()) == {"peer3", "peer4"}
+    assert store.peers_supporting("p1") == ["peer4"]
+    assert store.latency_ewma("peer1") is None
+
+
+@pytest.mark.slow
+def test_memory_100k_peers():
+    peer_count = 100_000
+    peer_addrs = {
+        ID(b"peer%d" % i): [Multiaddr(f"/ip4/10.{i >> 16}.{i >> 8 & 255}.{i & 255}")]
+        for i in range(peer_count)
+    }
+    protocols = ["/ipfs/id/1.0.0", "/meshsub/1.1.0"]
+    peer_protocols = {peer_id: protocols for peer_id in peer_addrs}
+
+    tracemalloc.start()
+    try:
+        store = PeerStore()
+        store.bulk_add_addrs(peer_addrs, TEMP_ADDR_TTL)
+        store.bulk_add_protocols(peer_protocols)
+        size, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    assert len(store.peers_supporting("/meshsub/1.1.0")) == peer_count
+    # The entries, address expiries and protocol index included.
+    assert size / peer_count < 1024
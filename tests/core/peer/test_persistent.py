@@ -0,0 +1,206 @@
+import sqlite3
+import time
+
+import pytest
+from multiaddr import (
+    Multiaddr,
+)
+import trio
+from trio.testing import (
+    wait_all_tasks_blocked,
+)
+
+from libp2p.crypto.secp256k1 import (
+    create_new_key_pair,
+)
+from libp2p.peer.id import (
+    ID,
+)
+from libp2p.peer.peerstore import (
+    CONNECTED_ADDR_TTL,
+    PERMANENT_ADDR_TTL,
+    RECENTLY_CONNECTED_ADDR_TTL,
+    TEMP_ADDR_TTL,
+)
+from libp2p.peer.persistent import (
+    SQLitePeerStore,
+)
+
+ADDR_1 = Multiaddr("/ip4/127.0.0.1/tcp/4001")
+ADDR_2 = Multiaddr("/ip4/127.0.0.1/tcp/4002")
+ADDR_3 = Multiaddr("/ip4/127.0.0.1/tcp/4003")
+
+
+def test_reload(tmp_path):
+    path = str(tmp_path / "peers.db")
+    key_pair = create_new_key_pair()
+    peer_1 = ID.from_pubkey(key_pair.public_key)
+    peer_2 = ID(b"peer2")
+
+    store = SQLitePeerStore(path)
+    store.add_pubkey(peer_1, key_pair.public_key)
+    store.add_addr(peer_1, ADDR_1, PERMANENT_ADDR_TTL)
+    store.add_addr(peer_1, ADDR_2, CONNECTED_ADDR_TTL)
+    store.add_protocols(peer_1, ["/p1", "/p2"])
+    store.record_latency(peer_1, 0.05)
+    store.add_addrs(peer_2, [ADDR_3], 100)
+    store.close()
+
+    store = SQLitePeerStore(path)
+    assert set(store.peer_ids()) == {peer_1, peer_2}
+    assert store.pubkey(peer_1) == key_pair.public_key
+    assert store.addrs(peer_1) == [ADDR_1, ADDR_2]
+    assert store.addrs(peer_2) == [ADDR_3]
+    assert store.get_protocols(peer_1) == ["/p1", "/p2"]
+    assert store.peers_supporting("/p2") == [peer_1]
+    assert store.latency_ewma(peer_1) == 0.05
+    # Connections do not survive a restart.
+    _, ttl = store.peer_data_map[peer_1].addrs[ADDR_2.to_bytes()]
+    assert ttl == RECENTLY_CONNECTED_ADDR_TTL
+    store.close()
+
+
+@pytest.mark.trio
+async def test_write_behind(tmp_path):
+    path = str(tmp_path / "peers.db")
+    store = SQLitePeerStore(path, batch_size=2, flush_interval=3600)
+
+    def stored_peers():
+        other = SQLitePeerStore(path)
+        try:
+            return set(other.peer_ids())
+        finally:
+            other.close()
+
+    async with trio.open_nursery() as nursery:
+        nursery.start_soon(store.flush_periodically)
+        store.add_addr(ID(b"peer1"), ADDR_1, 100)
+        await trio.sleep(0.01)
+        assert stored_peers() == set()
+
+        # A full batch is written right away.
+        store.add_addr(ID(b"peer2"), ADDR_1, 100)
+        with trio.fail_after(5):
+            while stored_peers() != {ID(b"peer1"), ID(b"peer2")}:
+                await trio.sleep(0.01)
+        nursery.cancel_scope.cancel()
+
+    store.add_addr(ID(b"peer3"), ADDR_1, 100)
+    store.flush()
+    assert ID(b"peer3") in stored_peers()
+    store.close()
+
+
+@pytest.mark.trio
+async def test_cancelled_mid_flush(tmp_path):
+    path = str(tmp_path / "peers.db")
+    store = SQLitePeerStore(path, batch_size=1, flush_interval=3600)
+
+    async with trio.open_nursery() as nursery:
+        nursery.start_soon(store.flush_periodically)
+        await wait_all_tasks_blocked()
+        # The batch is taken, but the cancellation lands before it is written.
+        store.add_addr(ID(b"peer1"), ADDR_1, 100)
+        nursery.cancel_scope.cancel()
+
+    assert not store._db_lock.locked()
+    assert store._dirty == {ID(b"peer1")}
+    store.close()
+    store = SQLitePeerStore(path)
+    assert store.peer_ids() == [ID(b"peer1")]
+    store.close()
+
+
+@pytest.mark.trio
+async def test_flush_once_stopped(tmp_path):
+    path = str(tmp_path / "peers.db")
+    store = SQLitePeerStore(path, flush_interval=3600)
+
+    async with trio.open_nursery() as nursery:
+        nursery.start_soon(store.run_maintenance)
+        store.add_addr(ID(b"peer1"), ADDR_1, 100)
+        await wait_all_tasks_blocked()
+        nursery.cancel_scope.cancel()
+
+    other = SQLitePeerStore(path)
+    assert other.peer_ids() == [ID(b"peer1")]
+    other.close()
+    store.close()
+
+
+def test_expired_peers_dropped(tmp_path):
+    path = str(tmp_path / "peers.db")
+    now = [0.0]
+    store = SQLitePeerStore(path, clock=lambda: now[0], flush_interval=0)
+    store.add_addr(ID(b"peer1"), ADDR_1, 10)
+    now[0] = 10
+    assert store.peer_ids() == []
+    store.close()
+
+    store = SQLitePeerStore(path)
+    assert store.peer_ids() == []
+    store.close()
+
+
+def test_export_import(tmp_path):
+    store = SQLitePeerStore(str(tmp_path / "peers.db"))
+    store.bulk_add_addrs({ID(b"peer%d" % i): [ADDR_1] for i in range(100)}, 100)
+    store.export_to(str(tmp_path / "export.db"))
+    store.close()
+
+    other = SQLitePeerStore(str(tmp_path / "other.db"))
+    other.add_protocols(ID(b"peer0"), ["/p1"])
+    other.import_from(str(tmp_path / "export.db"))
+    assert len(other.peer_ids()) == 100
+    assert other.addrs(ID(b"peer99")) == [ADDR_1]
+    other.close()
+
+
+def test_migrate_without_latency(tmp_path):
+    path = str(tmp_path / "peers.db")
+    store = SQLitePeerStore(path)
+    store.add_addr(ID(b"peer1"), ADDR_1, PERMANENT_ADDR_TTL)
+    store.close()
+    # As written before latencies were stored.
+    db = sqlite3.connect(path)
+    db.execute("ALTER TABLE peers DROP COLUMN latency")
+    db.commit()
+    db.close()
+
+    other = SQLitePeerStore(str(tmp_path / "other.db"))
+    other.import_from(path)
+    assert other.addrs(ID(b"peer1")) == [ADDR_1]
+    other.close()
+
+    store = SQLitePeerStore(path)
+    assert store.addrs(ID(b"peer1")) == [ADDR_1]
+    store.record_latency(ID(b"peer1"), 0.05)
+    store.close()
+    store = SQLitePeerStore(path)
+    assert store.latency_ewma(ID(b"peer1")) == 0.05
+    store.close()
+
+
+@pytest.mark.slow
+def test_load_100k_peers(tmp_path):
+    path = str(tmp_path / "peers.db")
+    peer_count = 100_000
+    peer_addrs = {
+        ID(b"peer%d" % i): [Multiaddr(f"/ip4/10.{i >> 16}.{i >> 8 & 255}.{i & 255}")]
+        for i in range(peer_count)
+    }
+    protocols = ["/ipfs/id/1.0.0", "/meshsub/1.1.0"]
+    store = SQLitePeerStore(path)
+    store.bulk_add_addrs(peer_addrs, TEMP_ADDR_TTL)
+    store.bulk_add_protocols({peer_id: protocols for peer_id in peer_addrs})
+    store.close()
+
+    # The CPU time of the load, whatever else runs alongside.
+    started = time.process_time()
+    store = SQLitePeerStore(path)
+    elapsed = time.process_time() - started
+
+    assert len(store.peers_supporting("/meshsub/1.1.0")) == peer_count
+    assert store.addrs(ID(b"peer99999")) == peer_addrs[ID(b"peer99999")]
+    assert elapsed < 1
+    store.close()
@@ -412,6 +412,32 @@ async def test_mesh_heartbeat(initial_mesh_peer_count, monkeypatch):
             assert len(peers_to_prune) == 0 and len(peers_to_graft) == 0
 
 
+@pytest.mark.trio
+async def test_mesh_heartbeat_prefers_low_latency(monkeypatch):
+    async with PubsubFactory.create_batch_with_gossipsub(
+        1, degree=2, degree_low=1, heartbeat_initial_delay=100
+    ) as pubsubs_gsub:
+        router = pubsubs_gsub[0].router
+        topic = "TEST_MESH_LATENCY"
+        fast_peers = [IDFactory() for _ in range(2)]
+        slow_peers = [IDFactory() for _ in range(2)]
+        peerstore = pubsubs_gsub[0].host.get_peerstore()
+        for peer_id in fast_peers:
+            peerstore.record_latency(peer_id, 0.01)
+        for peer_id in slow_peers:
+            peerstore.record_latency(peer_id, 1.0)
+
+        all_peers = fast_peers + slow_peers
+        peer_protocol = {peer_id: PROTOCOL_ID for peer_id in all_peers}
+        monkeypatch.setattr(router, "peer_protocol", peer_protocol)
+        monkeypatch.setattr(pubsubs_gsub[0], "peer_topics", {topic: set(all_peers)})
+        monkeypatch.setattr(router, "mesh", {topic: set()})
+
+        # The sample of twice the degree holds every peer.
+        peers_to_graft, _ = router.mesh_heartbeat()
+        assert set(peers_to_graft) == set(fast_peers)
+
+
 @pytest.mark.parametrize("initial_peer_count", (1, 4, 7))
 @pytest.mark.trio
 async def test_gossip_heartbeat(initial_peer_count, monkeypatch):
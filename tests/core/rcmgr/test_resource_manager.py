@@ -0,0 +1,165 @@
+import pytest
+import trio
+
+from libp2p.custom_types import (
+    TProtocol,
+)
+from libp2p.network.exceptions import (
+    SwarmException,
+)
+from libp2p.peer.id import (
+    ID,
+)
+from libp2p.rcmgr.exceptions import (
+    ResourceLimitExceeded,
+    ResourceScopeClosed,
+)
+from libp2p.rcmgr.limits import (
+    BaseLimit,
+    Direction,
+    LimitConfig,
+    ScopeStat,
+)
+from libp2p.rcmgr.manager import (
+    ResourceManager,
+)
+from libp2p.tools.async_service import (
+    background_trio_service,
+)
+from libp2p.tools.constants import (
+    LISTEN_MADDR,
+)
+from libp2p.tools.factories import (
+    SwarmFactory,
+)
+from libp2p.tools.utils import (
+    connect_swarm,
+)
+
+PEER_A = ID(b"peer-a")
+PROTOCOL = TProtocol("/test/1.0.0")
+
+
+def test_connection_moves_from_transient_to_peer():
+    rcmgr = ResourceManager()
+    conn_scope = rcmgr.open_connection(Direction.INBOUND)
+    assert rcmgr.transient.stat.conns_inbound == 1
+    assert rcmgr.system.stat.conns_inbound == 1
+
+    conn_scope.set_peer(PEER_A)
+    assert rcmgr.transient.stat.conns_inbound == 0
+    assert rcmgr.peer_stat(PEER_A).conns_inbound == 1
+    assert rcmgr.system.stat.conns_inbound == 1
+
+    conn_scope.done()
+    assert rcmgr.system.stat == ScopeStat()
+    # Idle peer scopes are garbage collected.
+    assert PEER_A not in rcmgr.peer_scopes
+    # `done` is idempotent.
+    conn_scope.done()
+    assert rcmgr.system.stat == ScopeStat()
+
+
+def test_connection_limits():
+    rcmgr = ResourceManager(
+        LimitConfig(transient=BaseLimit(conns_inbound=1)),
+        peer_limits={PEER_A: BaseLimit(conns=1)},
+    )
+    conn_0 = rcmgr.open_connection(Direction.INBOUND)
+    with pytest.raises(ResourceLimitExceeded):
+        rcmgr.open_connection(Direction.INBOUND)
+    # Outbound connections are not bounded by the inbound limit.
+    conn_1 = rcmgr.open_connection(Direction.OUTBOUND)
+
+    conn_0.set_peer(PEER_A)
+    rcmgr.open_connection(Direction.INBOUND)
+    with pytest.raises(ResourceLimitExceeded):
+        conn_1.set_peer(PEER_A)
+    # A failed move leaves the scope where it was.
+    assert conn_1.peer_id is None
+    assert rcmgr.transient.stat.conns_outbound == 1
+    assert rcmgr.peer_stat(PEER_A).conns == 1
+
+
+def test_stream_and_memory_accounting():
+    rcmgr = ResourceManager(
+        LimitConfig(conn=BaseLimit(streams_inbound=2, memory=100)),
+        protocol_limits={PROTOCOL: BaseLimit(streams=1)},
+    )
+    conn_scope = rcmgr.open_connection(Direction.OUTBOUND)
+    conn_scope.set_peer(PEER_A)
+
+    stream_0 = conn_scope.open_stream(Direction.INBOUND)
+    stream_1 = conn_scope.open_stream(Direction.INBOUND)
+    with pytest.raises(ResourceLimitExceeded):
+        conn_scope.open_stream(Direction.INBOUND)
+    assert conn_scope.stat.streams_inbound == 2
+    assert rcmgr.peer_stat(PEER_A).streams_inbound == 2
+    assert rcmgr.transient.stat.streams_inbound == 2
+
+    stream_0.set_protocol(PROTOCOL)
+    assert rcmgr.transient.stat.streams_inbound == 1
+    assert rcmgr.protocol_stat(PROTOCOL).streams_inbound == 1
+    with pytest.raises(ResourceLimitExceeded):
+        stream_1.set_protocol(PROTOCOL)
+
+    stream_0.reserve_memory(60)
+    with pytest.raises(ResourceLimitExceeded):
+        stream_1.reserve_memory(60)
+    assert conn_scope.stat.memory == 60
+    assert rcmgr.protocol_stat(PROTOCOL).memory == 60
+    stream_0.release_memory(20)
+    assert rcmgr.system.stat.memory == 40
+
+    stream_0.done()
+    assert rcmgr.system.stat.memory == 0
+    assert PROTOCOL not in rcmgr.protocol_scopes
+    with pytest.raises(ResourceScopeClosed):
+        stream_0.reserve_memory(1)
+
+    stream_1.done()
+    conn_scope.done()
+    assert rcmgr.system.stat == ScopeStat()
+    with pytest.raises(ResourceScopeClosed):
+        conn_scope.open_stream(Direction.OUTBOUND)
+
+
+@pytest.mark.trio
+async def test_mplex_rejects_streams_over_limit():
+    rcmgr = ResourceManager(LimitConfig(conn=BaseLimit(streams_inbound=2)))
+    swarm_0 = SwarmFactory()
+    swarm_1 = SwarmFactory(resource_manager=rcmgr)
+    async with background_trio_service(swarm_0), background_trio_service(swarm_1):
+        await swarm_1.listen(LISTEN_MADDR)
+        await connect_swarm(swarm_0, swarm_1)
+        conn_0 = swarm_0.connections[swarm_1.get_peer_id()]
+        conn_1 = swarm_1.connections[swarm_0.get_peer_id()]
+
+        streams = [await conn_0.new_stream() for _ in range(4)]
+        await trio.sleep(0.1)
+        # Only two streams are accepted, the others are reset by the remote.
+        assert len(conn_1.muxed_conn.streams) == 2
+        assert rcmgr.system.stat.streams_inbound == 2
+        assert [s.muxed_stream.event_reset.is_set() for s in streams] == [
+            False,
+            False,
+            True,
+            True,
+        ]
+
+        await swarm_0.close_peer(swarm_1.get_peer_id())
+        await trio.sleep(0.1)
+        assert rcmgr.system.stat == ScopeStat()
+
+
+@pytest.mark.trio
+async def test_swarm_rejects_connections_over_limit():
+    rcmgr = ResourceManager(LimitConfig(system=BaseLimit(conns_inbound=1)))
+    async with SwarmFactory.create_batch_and_listen(2) as swarms:
+        swarm = SwarmFactory(resource_manager=rcmgr)
+        async with background_trio_service(swarm):
+            await swarm.listen(LISTEN_MADDR)
+            await connect_swarm(swarms[0], swarm)
+            with pytest.raises(SwarmException):
+                await connect_swarm(swarms[1], swarm)
+            assert rcmgr.system.stat.conns_inbound == 1
@@ -0,0 +1,181 @@
+import os
+import socket
+import time
+
+import pytest
+from multiaddr import (
+    Multiaddr,
+)
+import trio
+
+from libp2p.host.basic_host import (
+    BasicHost,
+)
+from libp2p.peer.id import (
+    ID,
+)
+from libp2p.pubsub.pubsub import (
+    get_peer_and_seqno_msg_id,
+)
+from libp2p.sharding.bridge import (
+    ShardBridge,
+)
+from libp2p.sharding.ipc import (
+    ShardMessageKind,
+)
+from libp2p.sharding.worker import (
+    ShardWorker,
+    shard_of,
+    spawn_shards,
+)
+from libp2p.tools.async_service import (
+    background_trio_service,
+)
+from libp2p.tools.factories import (
+    FloodsubFactory,
+    PubsubFactory,
+    SwarmFactory,
+    default_key_pair_factory,
+)
+from libp2p.tools.utils import (
+    connect,
+)
+from libp2p.transport.tcp.tcp import (
+    TCP,
+    TCPOptions,
+)
+
+TOPIC = "shards"
+
+
+def worker_pair():
+    sock_0, sock_1 = socket.socketpair()
+    return ShardWorker(0, 2, {1: sock_0}), ShardWorker(1, 2, {0: sock_1})
+
+
+def test_peers_are_partitioned_between_shards():
+    workers = [ShardWorker(i, 3, {}) for i in range(3)]
+    for _ in range(20):
+        peer_id = ID(os.urandom(32))
+        owners = [worker.index for worker in workers if worker.owns(peer_id)]
+        assert owners == [shard_of(peer_id, 3)]
+
+
+@pytest.mark.trio
+async def test_shard_link_frames():
+    worker_0, worker_1 = worker_pair()
+    (link_0,), (link_1,) = worker_0.links(), worker_1.links()
+    await link_0.send(ShardMessageKind.PEER_ADDRS, b"peer", b"", b"addr" * 100)
+    await link_0.send(ShardMessageKind.PUBSUB_MESSAGE, b"msg")
+    assert await link_1.receive() == (
+        ShardMessageKind.PEER_ADDRS,
+        (b"peer", b"", b"addr" * 100),
+    )
+    assert await link_1.receive() == (ShardMessageKind.PUBSUB_MESSAGE, (b"msg",))
+
+
+@pytest.mark.trio
+async def test_bridge_skips_malformed_frames():
+    worker_0, worker_1 = worker_pair()
+    (link_0,) = worker_0.links()
+    addr = Multiaddr("/ip4/127.0.0.1/tcp/4001")
+    async with SwarmFactory.create_and_listen() as swarm:
+        bridge = ShardBridge(BasicHost(swarm), worker_1)
+        async with background_trio_service(bridge):
+            await link_0.send(ShardMessageKind.PUBSUB_MESSAGE)
+            await link_0.send(ShardMessageKind.PEER_ADDRS)
+            await link_0.send(ShardMessageKind.PEER_ADDRS, b"peer", b"\xff\xff")
+            await link_0.send(ShardMessageKind.PEER_ADDRS, b"peer", addr.to_bytes())
+            # The link is still handled after the malformed frames.
+            with trio.fail_after(5):
+                while ID(b"peer") not in swarm.peerstore.peer_ids():
+                    await trio.sleep(0.01)
+            assert swarm.peerstore.addrs(ID(b"peer")) == [addr]
+
+
+@pytest.mark.trio
+async def test_bridge_relays_pubsub_between_shards():
+    key_pair = default_key_pair_factory()
+    workers = worker_pair()
+    async with SwarmFactory.create_and_listen(
+        key_pair=key_pair
+    ) as swarm_0, SwarmFactory.create_and_listen(
+        key_pair=key_pair
+    ) as swarm_1, PubsubFactory.create_batch_with_floodsub(
+        1
+    ) as (
+        remote,
+    ):
+        hosts = (BasicHost(swarm_0), BasicHost(swarm_1))
+        bridges = [ShardBridge(host, worker) for host, worker in zip(hosts, workers)]
+        async with background_trio_service(bridges[0]), background_trio_service(
+            bridges[1]
+        ), PubsubFactory.create_and_start(
+            hosts[0],
+            bridges[0].wrap_router(FloodsubFactory()),
+            None,
+            False,
+            get_peer_and_seqno_msg_id,
+        ) as pubsub_0, PubsubFactory.create_and_start(
+            hosts[1],
+            bridges[1].wrap_router(FloodsubFactory()),
+            None,
+            False,
+            get_peer_and_seqno_msg_id,
+        ) as pubsub_1:
+            # The remote peer is only connected to the first shard.
+            await connect(hosts[0], remote.host)
+            sub_remote = await remote.subscribe(TOPIC)
+            # Shards run the same application, hence subscribe to the same topics.
+            sub_0 = await pubsub_0.subscribe(TOPIC)
+            sub_1 = await pubsub_1.subscribe(TOPIC)
+            await trio.sleep(0.25)
+            # Its addresses are shared with the other shard.
+            assert swarm_1.peerstore.addrs(remote.my_id)
+
+            await remote.publish(TOPIC, b"from remote")
+            with trio.fail_after(5):
+                assert (await sub_remote.get()).data == b"from remote"
+                assert (await sub_0.get()).data == b"from remote"
+                assert (await sub_1.get()).data == b"from remote"
+
+            await pubsub_1.publish(TOPIC, b"from shard 1")
+            await pubsub_0.publish(TOPIC, b"from shard 0")
+            with trio.fail_after(5):
+                received = {(await sub_remote.get()).data for _ in range(2)}
+                assert received == {b"from shard 1", b"from shard 0"}
+                assert (await sub_1.get()).data == b"from shard 1"
+                assert (await sub_1.get()).data == b"from shard 0"
+
+
+async def serve_shard_index(worker, port):
+    async def handler(stream):
+        await stream.write(bytes((worker.index,)))
+        await stream.close()
+
+    listener = TCP(TCPOptions(reuse_port=True)).create_listener(handler)
+    async with trio.open_nursery() as nursery:
+        await listener.listen(Multiaddr(f"/ip4/127.0.0.1/tcp/{port}"), nursery)
+
+
+@pytest.mark.slow
+def test_shards_share_listening_port():
+    with socket.socket() as reserved:
+        reserved.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+        reserved.bind(("127.0.0.1", 0))
+        port = reserved.getsockname()[1]
+        processes = spawn_shards(serve_shard_index, 2, port)
+        indices = set()
+        try:
+            deadline = time.monotonic() + 30
+            while indices != {0, 1} and time.monotonic() < deadline:
+                try:
+                    with socket.create_connection(("127.0.0.1", port), 1) as conn:
+                        indices.update(conn.recv(1))
+                except OSError:
+                    time.sleep(0.05)
+        finally:
+            for process in processes:
+                process.terminate()
+                process.join()
+    assert indices == {0, 1}
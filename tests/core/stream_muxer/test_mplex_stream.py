@@ -8,6 +8,7 @@ from libp2p.stream_muxer.mplex.exceptions import (
     MplexStreamClosed,
     MplexStreamEOF,
     MplexStreamReset,
+    MplexStreamTimeout,
 )
 from libp2p.stream_muxer.mplex.mplex import (
     MPLEX_MESSAGE_CHANNEL_SIZE,
@@ -213,3 +214,33 @@ async def test_mplex_stream_reset(mplex_stream_pair):
     # `reset` should do nothing as well.
     await stream_0.reset()
     await stream_1.reset()
+
+
+@pytest.mark.trio
+async def test_mplex_stream_read_deadline(mplex_stream_pair):
+    stream_0, stream_1 = mplex_stream_pair
+    stream_1.set_read_deadline(0.1)
+    with pytest.raises(MplexStreamTimeout):
+        await stream_1.read(MAX_READ_LEN)
+    # The stream is still usable once the deadline is removed.
+    stream_1.set_read_deadline(None)
+    await stream_0.write(DATA)
+    assert (await stream_1.read(MAX_READ_LEN)) == DATA
+
+
+@pytest.mark.trio
+async def test_mplex_stream_write_deadline(mplex_stream_pair):
+    stream_0, stream_1 = mplex_stream_pair
+    stream_0.set_write_deadline(0.1)
+    scheduler = stream_0.muxed_conn.scheduler
+    await scheduler.acquire("other stream", len(DATA))
+    # The connection is busy with another message.
+    with pytest.raises(MplexStreamTimeout):
+        await stream_0.write(DATA)
+    scheduler.release()
+    stream_0.set_write_deadline(None)
+    await stream_0.write(DATA)
+    assert (await stream_1.read(MAX_READ_LEN)) == DATA
+    stream_0.set_deadline(0)
+    with pytest.raises(MplexStreamTimeout):
+        await stream_0.write(DATA)
@@ -0,0 +1,104 @@
+import pytest
+import trio
+from trio.testing import (
+    wait_all_tasks_blocked,
+)
+
+from libp2p.stream_muxer.scheduler import (
+    OutboundScheduler,
+    StreamPriority,
+)
+
+
+async def _send_in_turn(nursery, scheduler, messages):
+    """
+    Queue ``messages``, tuples of ``(key, size, priority, weight)``, while the
+    connection is busy.
+
+    :return: the keys in the order they were given the turn
+    """
+    sent = []
+
+    async def send(key, size, priority, weight):
+        await scheduler.acquire(key, size, priority, weight)
+        sent.append(key)
+        scheduler.release()
+
+    await scheduler.acquire("busy", 1)
+    for message in messages:
+        nursery.start_soon(send, *message)
+        await wait_all_tasks_blocked()
+    assert scheduler.queued == len(messages)
+    scheduler.release()
+    await wait_all_tasks_blocked()
+    return sent
+
+
+@pytest.mark.trio
+async def test_scheduler_priorities(nursery):
+    scheduler = OutboundScheduler()
+    sent = await _send_in_turn(
+        nursery,
+        scheduler,
+        [
+            ("bulk", 10, StreamPriority.BULK, 1),
+            ("default", 10_000, StreamPriority.DEFAULT, 1),
+            ("control", 10, StreamPriority.CONTROL, 1),
+        ],
+    )
+    assert sent == ["control", "default", "bulk"]
+
+
+@pytest.mark.trio
+async def test_scheduler_weighted_fair_queuing(nursery):
+    scheduler = OutboundScheduler()
+    messages = [("a", 100, StreamPriority.DEFAULT, 2.5)] * 4
+    messages += [("b", 100, StreamPriority.DEFAULT, 1)] * 4
+    sent = await _send_in_turn(nursery, scheduler, messages)
+    assert sent == ["a", "a", "b", "a", "a", "b", "b", "b"]
+
+    # Small messages are not held up by the large ones of another stream.
+    messages = [("bulk", 1_000_000, StreamPriority.DEFAULT, 1)] * 2
+    messages += [("small", 100, StreamPriority.DEFAULT, 1)] * 2
+    sent = await _send_in_turn(nursery, scheduler, messages)
+    assert sent == ["small", "small", "bulk", "bulk"]
+
+
+@pytest.mark.trio
+async def test_scheduler_cancelled_waiter():
+    scheduler = OutboundScheduler()
+    await scheduler.acquire("busy", 1)
+    with trio.move_on_after(0.01):
+        await scheduler.acquire("cancelled", 1)
+    assert scheduler.queued == 0
+    scheduler.release()
+    # The turn is free again.
+    with trio.fail_after(1):
+        await scheduler.acquire("next", 1)
+    scheduler.release()
+
+
+@pytest.mark.trio
+async def test_scheduler_classes_keep_own_finish_tags(nursery):
+    scheduler = OutboundScheduler()
+    # A large DEFAULT message does not carry over to the CONTROL frames of the
+    # same stream, which would delay those of the other streams.
+    await scheduler.acquire("a", 1_000_000)
+    scheduler.release()
+    sent = await _send_in_turn(
+        nursery,
+        scheduler,
+        [
+            ("a", 10, StreamPriority.CONTROL, 1),
+            ("b", 10, StreamPriority.CONTROL, 1),
+            ("b", 10, StreamPriority.CONTROL, 1),
+        ],
+    )
+    assert sent == ["a", "b", "b"]
+    assert scheduler._virtual_times[StreamPriority.CONTROL] == 20
+
+    scheduler.forget("a")
+    assert scheduler._finish_tags.keys() == {
+        (StreamPriority.DEFAULT, "busy"),
+        (StreamPriority.CONTROL, "b"),
+    }
@@ -0,0 +1,54 @@
+import pytest
+import trio
+
+from libp2p.stream_muxer.exceptions import (
+    MuxedStreamTimeout,
+)
+from libp2p.stream_muxer.timer_wheel import (
+    DEFAULT_SLOTS,
+    DEFAULT_TICK,
+    deadline_scope,
+    get_timer_wheel,
+)
+
+
+@pytest.mark.trio
+async def test_timer_wheel(autojump_clock):
+    wheel = get_timer_wheel()
+    assert get_timer_wheel() is wheel
+    fired = []
+    start = trio.current_time()
+    # One deadline goes around the wheel more than once.
+    far = DEFAULT_TICK * DEFAULT_SLOTS * 2.5
+    for delay in (0.5, 0.1, far):
+        wheel.schedule(start + delay, lambda delay=delay: fired.append(delay))
+    cancelled = wheel.schedule(start + 0.2, lambda: fired.append(0.2))
+    assert len(wheel) == 4
+    cancelled.cancel()
+    assert len(wheel) == 3
+
+    await trio.sleep(1)
+    assert fired == [0.1, 0.5]
+    await trio.sleep(far)
+    assert fired == [0.1, 0.5, far]
+    assert len(wheel) == 0
+
+
+@pytest.mark.trio
+async def test_deadline_scope(autojump_clock):
+    start = trio.current_time()
+    with pytest.raises(MuxedStreamTimeout):
+        with deadline_scope(start + 1):
+            await trio.sleep_forever()
+    assert trio.current_time() - start == pytest.approx(1, abs=DEFAULT_TICK)
+
+    with deadline_scope(trio.current_time() + 1):
+        await trio.sleep(0.5)
+    with deadline_scope(None):
+        await trio.sleep(2)
+    # The timer of the operation which finished in time is gone.
+    assert len(get_timer_wheel()) == 0
+
+    with pytest.raises(MuxedStreamTimeout):
+        with deadline_scope(trio.current_time()):
+            pass
@@ -0,0 +1,167 @@
+import pytest
+from multiaddr import (
+    Multiaddr,
+)
+import trio
+
+from libp2p.tools.async_service import (
+    background_trio_service,
+)
+from libp2p.tools.factories import (
+    SwarmFactory,
+)
+from libp2p.transport.dns.exceptions import (
+    DNSResolutionError,
+)
+from libp2p.transport.dns.resolver import (
+    DNSBackend,
+    DNSRecord,
+    DNSResolver,
+    is_dns_addr,
+)
+
+PEER_ID = "QmNnooDu7bfjPFoTZYxMNLWUQJyrVwtbZg5gBMjTezGAJN"
+OTHER_PEER_ID = "QmQCU2EcMqAqQPR2i9bChDtGNJchTbq5TbXJJ16u19uLTa"
+
+
+class StaticDNSBackend(DNSBackend):
+    """Answers from a fixed zone, counting the lookups."""
+
+    def __init__(self, records, ttl=None):
+        self.records = records
+        self.ttl = ttl
+        self.lookups = []
+
+    async def lookup(self, name, record_type):
+        self.lookups.append((name, record_type))
+        try:
+            values = self.records[(name, record_type)]
+        except KeyError:
+            raise DNSResolutionError(f"no {record_type} record for {name}")
+        return [DNSRecord(value, self.ttl) for value in values]
+
+
+def test_is_dns_addr():
+    assert is_dns_addr(Multiaddr("/dns4/example.com/tcp/1"))
+    assert is_dns_addr(Multiaddr(f"/dnsaddr/example.com/p2p/{PEER_ID}"))
+    assert not is_dns_addr(Multiaddr("/ip4/127.0.0.1/tcp/1"))
+
+
+@pytest.mark.trio
+async def test_resolve_dns():
+    resolver = DNSResolver(
+        StaticDNSBackend(
+            {
+                ("example.com", "A"): ["192.0.2.1", "192.0.2.2"],
+                ("example.com", "AAAA"): ["2001:db8::1"],
+                ("v4.example.com", "A"): ["192.0.2.3"],
+            }
+        )
+    )
+    assert await resolver.resolve(Multiaddr("/dns4/example.com/tcp/1")) == [
+        Multiaddr("/ip4/192.0.2.1/tcp/1"),
+        Multiaddr("/ip4/192.0.2.2/tcp/1"),
+    ]
+    assert await resolver.resolve(Multiaddr(f"/dns6/example.com/p2p/{PEER_ID}")) == [
+        Multiaddr(f"/ip6/2001:db8::1/p2p/{PEER_ID}")
+    ]
+    # `/dns` is both, and tolerates a missing record type.
+    assert await resolver.resolve(Multiaddr("/dns/example.com/tcp/1")) == [
+        Multiaddr("/ip4/192.0.2.1/tcp/1"),
+        Multiaddr("/ip4/192.0.2.2/tcp/1"),
+        Multiaddr("/ip6/2001:db8::1/tcp/1"),
+    ]
+    assert await resolver.resolve(Multiaddr("/dns/v4.example.com/tcp/1")) == [
+        Multiaddr("/ip4/192.0.2.3/tcp/1")
+    ]
+    ip_maddr = Multiaddr("/ip4/127.0.0.1/tcp/1")
+    assert await resolver.resolve(ip_maddr) == [ip_maddr]
+    with pytest.raises(DNSResolutionError):
+        await resolver.resolve(Multiaddr("/dns4/unknown.example.com/tcp/1"))
+
+
+@pytest.mark.trio
+async def test_resolve_dnsaddr():
+    resolver = DNSResolver(
+        StaticDNSBackend(
+            {
+                ("_dnsaddr.bootstrap.example.com", "TXT"): [
+                    f"dnsaddr=/dnsaddr/ams.example.com/p2p/{PEER_ID}",
+                    f"dnsaddr=/ip4/192.0.2.2/tcp/1/p2p/{OTHER_PEER_ID}",
+                    "not a dnsaddr record",
+                    "dnsaddr=/invalid",
+                ],
+                ("_dnsaddr.ams.example.com", "TXT"): [
+                    f"dnsaddr=/dns4/node.example.com/tcp/1/p2p/{PEER_ID}",
+                    f"dnsaddr=/ip6/2001:db8::1/tcp/1/p2p/{PEER_ID}",
+                ],
+                ("node.example.com", "A"): ["192.0.2.1"],
+                ("_dnsaddr.loop.example.com", "TXT"): [
+                    "dnsaddr=/dnsaddr/loop.example.com"
+                ],
+            }
+        )
+    )
+    assert await resolver.resolve(
+        Multiaddr(f"/dnsaddr/bootstrap.example.com/p2p/{PEER_ID}")
+    ) == [
+        Multiaddr(f"/ip4/192.0.2.1/tcp/1/p2p/{PEER_ID}"),
+        Multiaddr(f"/ip6/2001:db8::1/tcp/1/p2p/{PEER_ID}"),
+    ]
+    assert len(await resolver.resolve(Multiaddr("/dnsaddr/bootstrap.example.com"))) == 3
+    with pytest.raises(DNSResolutionError):
+        await resolver.resolve(Multiaddr("/dnsaddr/loop.example.com"))
+
+
+@pytest.mark.trio
+async def test_resolver_cache(autojump_clock):
+    backend = StaticDNSBackend(
+        {(f"{i}.example.com", "A"): [f"192.0.2.{i}"] for i in range(3)}, ttl=10
+    )
+    resolver = DNSResolver(backend, cache_size=2)
+    maddr = Multiaddr("/dns4/0.example.com/tcp/1")
+    await resolver.resolve(maddr)
+    await resolver.resolve(maddr)
+    assert len(backend.lookups) == 1
+
+    # The lookup expires with its TTL.
+    await trio.sleep(11)
+    await resolver.resolve(maddr)
+    assert len(backend.lookups) == 2
+
+    # The least recently used lookup is evicted past `cache_size`.
+    await resolver.resolve(Multiaddr("/dns4/1.example.com/tcp/1"))
+    await resolver.resolve(Multiaddr("/dns4/2.example.com/tcp/1"))
+    await resolver.resolve(maddr)
+    assert len(backend.lookups) == 5
+
+    # Lookups without a TTL are kept for `default_ttl`.
+    backend.ttl = None
+    resolver = DNSResolver(backend, default_ttl=5)
+    await resolver.resolve(maddr)
+    await trio.sleep(4)
+    await resolver.resolve(maddr)
+    assert len(backend.lookups) == 6
+    await trio.sleep(2)
+    await resolver.resolve(maddr)
+    assert len(backend.lookups) == 7
+
+
+@pytest.mark.trio
+async def test_swarm_dials_dns_addrs():
+    backend = StaticDNSBackend({("node.example.com", "A"): ["127.0.0.1"]})
+    async with SwarmFactory.create_and_listen() as swarm_0:
+        swarm_1 = SwarmFactory(resolver=DNSResolver(backend))
+        async with background_trio_service(swarm_1):
+            listener = next(iter(swarm_0.listeners.values()))
+            port = listener.get_addrs()[0].value_for_protocol("tcp")
+            swarm_1.peerstore.add_addrs(
+                swarm_0.get_peer_id(),
+                [
+                    Multiaddr(f"/dns4/unknown.example.com/tcp/{port}"),
+                    Multiaddr(f"/dns4/node.example.com/tcp/{port}"),
+                ],
+                10,
+            )
+            await swarm_1.dial_peer(swarm_0.get_peer_id())
+            assert swarm_1.get_peer_id() in swarm_0.connections
@@ -0,0 +1,114 @@
+import pytest
+from multiaddr import (
+    Multiaddr,
+)
+import trio
+
+from libp2p.tools.factories import (
+    PubsubFactory,
+    SwarmFactory,
+)
+from libp2p.tools.utils import (
+    connect,
+    connect_swarm,
+)
+from libp2p.transport.exceptions import (
+    OpenConnectionError,
+)
+from libp2p.transport.memory.memory import (
+    LinkOptions,
+    MemoryNetwork,
+    MemoryTransport,
+    memory_stream_pair,
+)
+
+
+@pytest.mark.trio
+async def test_memory_dial(nursery):
+    network = MemoryNetwork()
+    transport = MemoryTransport(network)
+    accepted = []
+
+    async def handler(stream):
+        accepted.append(stream)
+
+    with pytest.raises(OpenConnectionError):
+        await transport.dial(Multiaddr("/memory/1"))
+
+    listener = transport.create_listener(handler)
+    await listener.listen(Multiaddr("/memory/0"), nursery)
+    await listener.listen(Multiaddr("/memory/42"), nursery)
+    assert listener.get_addrs() == (Multiaddr("/memory/1"), Multiaddr("/memory/42"))
+    with pytest.raises(OSError):
+        await transport.create_listener(handler).listen(
+            Multiaddr("/memory/42"), nursery
+        )
+
+    raw_conn = await MemoryTransport(network).dial(Multiaddr("/memory/42"))
+    await trio.sleep(0)
+    await raw_conn.write(b"123")
+    assert await accepted[0].read(2) == b"12"
+    assert await accepted[0].read() == b"3"
+
+    await raw_conn.close()
+    assert await accepted[0].read() == b""
+
+    await listener.close()
+    with pytest.raises(OpenConnectionError):
+        await transport.dial(Multiaddr("/memory/42"))
+
+
+@pytest.mark.trio
+async def test_memory_link_shaping(autojump_clock):
+    stream_0, stream_1 = memory_stream_pair(LinkOptions(latency=0.5, bandwidth=1000))
+    start = trio.current_time()
+    # Writing takes as long as the link needs to transmit the data.
+    await stream_0.write(b"x" * 1000)
+    assert trio.current_time() - start == pytest.approx(1.0)
+    await stream_0.write(b"y" * 500)
+    assert trio.current_time() - start == pytest.approx(1.5)
+    # Data is received once it has gone through the link.
+    assert await stream_1.read() == b"x" * 1000
+    assert trio.current_time() - start == pytest.approx(1.5)
+    assert await stream_1.read() == b"y" * 500
+    assert trio.current_time() - start == pytest.approx(2.0)
+
+
+@pytest.mark.trio
+async def test_memory_network_per_link_shaping(autojump_clock):
+    network = MemoryNetwork(LinkOptions(latency=0.1))
+    network.set_link(1, 2, LinkOptions(latency=1.0))
+
+    async def echo(stream):
+        await stream.write(await stream.read(4))
+
+    async with SwarmFactory.create_batch_and_listen(
+        3, memory_network=network
+    ) as swarms:
+        for swarm in swarms[1:]:
+            swarm.set_stream_handler(echo)
+            await connect_swarm(swarms[0], swarm)
+        for swarm, expected_rtt in ((swarms[1], 2.0), (swarms[2], 0.2)):
+            stream = await swarms[0].new_stream(swarm.get_peer_id())
+            start = trio.current_time()
+            await stream.write(b"ping")
+            assert await stream.read(4) == b"ping"
+            assert trio.current_time() - start == pytest.approx(expected_rtt)
+
+
+@pytest.mark.slow
+@pytest.mark.trio
+async def test_memory_network_floodsub_many_nodes():
+    number = 1000
+    async with PubsubFactory.create_batch_with_floodsub(
+        number, memory_network=MemoryNetwork()
+    ) as pubsubs:
+        for i in range(number):
+            await connect(pubsubs[i].host, pubsubs[(i + 1) % number].host)
+        subscriptions = [await pubsub.subscribe("topic") for pubsub in pubsubs]
+        await trio.sleep(1)
+
+        await pubsubs[0].publish("topic", b"data")
+        with trio.fail_after(30):
+            for subscription in subscriptions:
+                assert (await subscription.get()).data == b"data"
@@ -0,0 +1,278 @@
+import pytest
+from cryptography import (
+    x509,
+)
+from cryptography.hazmat.primitives import (
+    hashes,
+)
+from cryptography.x509.oid import (
+    NameOID,
+)
+from multiaddr import (
+    Multiaddr,
+)
+import trio
+
+from libp2p import (
+    new_host,
+)
+from libp2p.crypto.secp256k1 import (
+    create_new_key_pair,
+)
+from libp2p.peer.id import (
+    ID,
+)
+from libp2p.peer.peerinfo import (
+    PeerInfo,
+)
+
+pytest.importorskip("aioquic")
+
+from libp2p.transport.quic.connection import (  # noqa: E402
+    MAX_UNSENT_STREAM_DATA,
+    QUICConnection,
+)
+from libp2p.transport.quic.exceptions import (  # noqa: E402
+    QUICCertificateError,
+    QUICStreamEOF,
+    QUICStreamReset,
+    QUICUnavailable,
+)
+from libp2p.transport.quic.tls import (  # noqa: E402
+    EXTENSION_OID,
+    decode_signed_key,
+    encode_signed_key,
+    generate_certificate,
+    verify_certificate,
+)
+from libp2p.transport.quic.transport import (  # noqa: E402
+    QUICEndpoint,
+    QUICTransport,
+)
+
+QUIC_LISTEN_MADDR = Multiaddr("/ip4/127.0.0.1/udp/0/quic-v1")
+
+
+def test_signed_key_round_trip():
+    public_key, signature = b"k" * 300, b"s" * 70
+    assert decode_signed_key(encode_signed_key(public_key, signature)) == (
+        public_key,
+        signature,
+    )
+    with pytest.raises(ValueError):
+        decode_signed_key(encode_signed_key(public_key, signature)[:-1])
+
+
+def test_certificate():
+    key_pair = create_new_key_pair()
+    certificate, _ = generate_certificate(key_pair)
+    assert verify_certificate(certificate) == key_pair.public_key
+
+    # The extension of `certificate` does not sign the key of another one.
+    _, other_key = generate_certificate(key_pair)
+    extension = certificate.extensions.get_extension_for_oid(EXTENSION_OID)
+    name = x509.Name([x509.NameAttribute(NameOID.SERIAL_NUMBER, "1")])
+    forged = (
+        x509.CertificateBuilder()
+        .subject_name(name)
+        .issuer_name(name)
+        .public_key(other_key.public_key())
+        .serial_number(1)
+        .not_valid_before(certificate.not_valid_before_utc)
+        .not_valid_after(certificate.not_valid_after_utc)
+        .add_extension(extension.value, False)
+        .sign(other_key, hashes.SHA256())
+    )
+    with pytest.raises(QUICCertificateError):
+        verify_certificate(forged)
+
+
+async def _echo_listener(transport, nursery, accepted):
+    async def echo(stream):
+        try:
+            while True:
+                await stream.write(await stream.read(1024))
+        except QUICStreamEOF:
+            await stream.close()
+
+    async def handler(conn):
+        accepted.append(conn)
+        nursery.start_soon(conn.start)
+        while True:
+            try:
+                stream = await conn.accept_stream()
+            except QUICUnavailable:
+                return
+            nursery.start_soon(echo, stream)
+
+    listener = transport.create_listener(handler)
+    await listener.listen(QUIC_LISTEN_MADDR, nursery)
+    return listener
+
+
+@pytest.mark.trio
+async def test_quic_dial_and_streams(nursery):
+    key_pair_0, key_pair_1 = create_new_key_pair(), create_new_key_pair()
+    transport_0, transport_1 = QUICTransport(key_pair_0), QUICTransport(key_pair_1)
+    accepted = []
+    listener = await _echo_listener(transport_1, nursery, accepted)
+    addr = listener.get_addrs()[0]
+    assert addr.value_for_protocol("udp") != "0"
+
+    conn = await transport_0.dial(addr, ID.from_pubkey(key_pair_1.public_key))
+    nursery.start_soon(conn.start)
+    assert conn.is_initiator
+    assert conn.peer_id == ID.from_pubkey(key_pair_1.public_key)
+
+    streams = [await conn.open_stream() for _ in range(3)]
+    assert len({stream.stream_id for stream in streams}) == 3
+    for i, stream in enumerate(streams):
+        await stream.write(b"data %d" % i)
+    for i, stream in enumerate(streams):
+        assert await stream.read(1024) == b"data %d" % i
+        await stream.close()
+        with pytest.raises(QUICStreamEOF):
+            await stream.read(1024)
+    # The listener learns the dialer's peer id from its certificate.
+    assert accepted[0].peer_id == ID.from_pubkey(key_pair_0.public_key)
+    assert not accepted[0].is_initiator
+
+    await conn.close()
+    assert conn.is_closed
+    with trio.fail_after(5):
+        await accepted[0].event_closed.wait()
+
+
+@pytest.mark.trio
+async def test_quic_dial_wrong_peer(nursery):
+    transport_0 = QUICTransport(create_new_key_pair())
+    transport_1 = QUICTransport(create_new_key_pair())
+    listener = await _echo_listener(transport_1, nursery, [])
+    with pytest.raises(QUICCertificateError):
+        await transport_0.dial(
+            listener.get_addrs()[0], ID.from_pubkey(create_new_key_pair().public_key)
+        )
+
+
+@pytest.mark.trio
+async def test_quic_stream_reset(nursery):
+    key_pair_1 = create_new_key_pair()
+    transport_0 = QUICTransport(create_new_key_pair())
+    transport_1 = QUICTransport(key_pair_1)
+    remote_streams = []
+    received = trio.Event()
+
+    async def handler(conn):
+        nursery.start_soon(conn.start)
+        stream = await conn.accept_stream()
+        remote_streams.append(stream)
+        received.set()
+
+    listener = transport_1.create_listener(handler)
+    await listener.listen(QUIC_LISTEN_MADDR, nursery)
+    conn = await transport_0.dial(
+        listener.get_addrs()[0], ID.from_pubkey(key_pair_1.public_key)
+    )
+    nursery.start_soon(conn.start)
+    stream = await conn.open_stream()
+    await stream.write(b"x")
+    await received.wait()
+    assert await remote_streams[0].read(1) == b"x"
+
+    await stream.reset()
+    with pytest.raises(QUICStreamReset):
+        await stream.read(1)
+    with trio.fail_after(5):
+        with pytest.raises(QUICStreamReset):
+            await remote_streams[0].read(1)
+    await conn.close()
+
+
+@pytest.mark.trio
+async def test_quic_packet_loss(nursery, monkeypatch):
+    # One datagram in five is lost after the handshake, QUIC recovers per stream.
+    sent = 0
+    send = QUICEndpoint.send
+
+    async def lossy_send(self, data, addr):
+        nonlocal sent
+        sent += 1
+        if sent > 8 and sent % 5 == 0:
+            return
+        await send(self, data, addr)
+
+    monkeypatch.setattr(QUICEndpoint, "send", lossy_send)
+
+    key_pair_1 = create_new_key_pair()
+    transport_0 = QUICTransport(create_new_key_pair())
+    transport_1 = QUICTransport(key_pair_1)
+    listener = await _echo_listener(transport_1, nursery, [])
+    conn = await transport_0.dial(
+        listener.get_addrs()[0], ID.from_pubkey(key_pair_1.public_key)
+    )
+    nursery.start_soon(conn.start)
+
+    payload = bytes(range(256)) * 64
+
+    async def transfer(stream):
+        await stream.write(payload)
+        received = b""
+        while len(received) < len(payload):
+            received += await stream.read(len(payload))
+        assert received == payload
+
+    with trio.fail_after(20):
+        async with trio.open_nursery() as transfers:
+            for _ in range(4):
+                transfers.start_soon(transfer, await conn.open_stream())
+    await conn.close()
+
+
+@pytest.mark.trio
+async def test_quic_write_backpressure(nursery, monkeypatch):
+    key_pair_1 = create_new_key_pair()
+    transport_0 = QUICTransport(create_new_key_pair())
+    transport_1 = QUICTransport(key_pair_1)
+    listener = await _echo_listener(transport_1, nursery, [])
+    conn = await transport_0.dial(
+        listener.get_addrs()[0], ID.from_pubkey(key_pair_1.public_key)
+    )
+    nursery.start_soon(conn.start)
+    stream = await conn.open_stream()
+
+    # Nothing gets through anymore, as over a stalled network.
+    async def drop(self, data, addr):
+        pass
+
+    monkeypatch.setattr(QUICEndpoint, "send", drop)
+    chunk = b"x" * 16384
+    written = 0
+    with trio.move_on_after(1) as cancel_scope:
+        while True:
+            await stream.write(chunk)
+            written += len(chunk)
+    assert cancel_scope.cancelled_caught
+    # The writer waits instead of buffering everything.
+    assert written < 2 * MAX_UNSENT_STREAM_DATA
+    assert conn._unsent(stream.stream_id, written) <= MAX_UNSENT_STREAM_DATA
+    await conn.close()
+
+
+@pytest.mark.trio
+async def test_hosts_over_quic():
+    host_0 = new_host(key_pair=create_new_key_pair(), enable_quic=True)
+    host_1 = new_host(key_pair=create_new_key_pair(), enable_quic=True)
+
+    async def echo(stream):
+        await stream.write(await stream.read(1024))
+        await stream.close()
+
+    host_1.set_stream_handler("/echo/1.0.0", echo)
+    async with host_0.run([QUIC_LISTEN_MADDR]), host_1.run([QUIC_LISTEN_MADDR]):
+        await host_0.connect(PeerInfo(host_1.get_id(), host_1.get_addrs()))
+        conn = host_0.get_network().connections[host_1.get_id()]
+        assert isinstance(conn.muxed_conn, QUICConnection)
+
+        stream = await host_0.new_stream(host_1.get_id(), ["/echo/1.0.0"])
+        await stream.write(b"hello")
+        assert await stream.read(1024) == b"hello"
@@ -0,0 +1,99 @@
+import pytest
+from multiaddr import (
+    Multiaddr,
+)
+
+from libp2p.network.exceptions import (
+    SwarmException,
+)
+from libp2p.tools.async_service import (
+    background_trio_service,
+)
+from libp2p.tools.factories import (
+    SwarmFactory,
+)
+from libp2p.transport.memory.memory import (
+    MEMORY_PROTOCOL,
+    MemoryNetwork,
+    MemoryTransport,
+)
+from libp2p.transport.registry import (
+    DEFAULT_DIAL_RANK,
+    TransportRegistry,
+)
+from libp2p.transport.tcp.tcp import (
+    TCP,
+)
+from libp2p.transport.unix.unix import (
+    UnixTransport,
+)
+
+TCP_MADDR = Multiaddr("/ip4/127.0.0.1/tcp/8000")
+QUIC_MADDR = Multiaddr("/ip4/127.0.0.1/udp/8000/quic-v1")
+UNIX_MADDR = Multiaddr("/unix/tmp/libp2p.sock")
+
+
+def test_transport_for():
+    tcp, udp, quic = TCP(), TCP(), TCP()
+    registry = TransportRegistry({"tcp": tcp, "udp": udp})
+    assert registry.transport_for(TCP_MADDR) is tcp
+    p2p_maddr = TCP_MADDR.encapsulate(
+        "/p2p/QmNnooDu7bfjPFoTZYxMNLWUQJyrVwtbZg5gBMjTezGAJN"
+    )
+    assert registry.transport_for(p2p_maddr) is tcp
+    assert registry.transport_for(QUIC_MADDR) is udp
+    # The innermost protocol with a transport wins.
+    registry.register("quic-v1", quic)
+    assert registry.transport_for(QUIC_MADDR) is quic
+    assert registry.transport_for(UNIX_MADDR) is None
+
+    registry.unregister("udp")
+    assert "udp" not in registry
+    assert len(registry) == 2
+    with pytest.raises(ValueError):
+        registry.register("no-such-protocol", tcp)
+
+
+def test_sort_for_dialing():
+    registry = TransportRegistry(
+        {"tcp": TCP(), "quic-v1": TCP(), "unix": UnixTransport()}
+    )
+    other_tcp_maddr = Multiaddr("/ip4/127.0.0.2/tcp/8000")
+    dns_maddr = Multiaddr("/dns4/example.com/udp/8000")
+    addrs = [dns_maddr, TCP_MADDR, QUIC_MADDR, other_tcp_maddr, UNIX_MADDR]
+    assert registry.sort_for_dialing(addrs) == [
+        UNIX_MADDR,
+        QUIC_MADDR,
+        TCP_MADDR,
+        other_tcp_maddr,
+        dns_maddr,
+    ]
+    assert registry.dial_rank(dns_maddr) > DEFAULT_DIAL_RANK
+
+    registry.register("tcp", TCP(), rank=0)
+    assert registry.sort_for_dialing([QUIC_MADDR, TCP_MADDR]) == [
+        TCP_MADDR,
+        QUIC_MADDR,
+    ]
+
+
+@pytest.mark.trio
+async def test_swarm_dials_with_registry():
+    network = MemoryNetwork()
+    async with SwarmFactory.create_and_listen(memory_network=network) as swarm_0:
+        swarm_1 = SwarmFactory(
+            transports=TransportRegistry({MEMORY_PROTOCOL: MemoryTransport(network)})
+        )
+        async with background_trio_service(swarm_1):
+            # The memory address is dialed before the TCP one.
+            addrs = [TCP_MADDR] + [
+                addr
+                for listener in swarm_0.listeners.values()
+                for addr in listener.get_addrs()
+            ]
+            swarm_1.peerstore.add_addrs(swarm_0.get_peer_id(), addrs, 10)
+            await swarm_1.dial_peer(swarm_0.get_peer_id())
+            assert swarm_1.get_peer_id() in swarm_0.connections
+
+            with pytest.raises(SwarmException):
+                await swarm_1.dial_addr(QUIC_MADDR, swarm_0.get_peer_id())
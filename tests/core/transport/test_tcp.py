@@ -1,3 +1,5 @@
+import socket
+
 import pytest
 from multiaddr import (
     Multiaddr,
@@ -15,6 +17,7 @@ from libp2p.transport.exceptions import (
 )
 from libp2p.transport.tcp.tcp import (
     TCP,
+    TCPOptions,
 )
 
 
@@ -61,3 +64,91 @@ async def test_tcp_dial(nursery):
     data = b"123"
     await raw_conn_other_side.write(data)
     assert (await raw_conn.read(len(data))) == data
+
+
+@pytest.mark.trio
+async def test_tcp_listener_reuse_port(nursery):
+    async def handler(tcp_stream):
+        pass
+
+    listener_0 = TCP(TCPOptions(reuse_port=True)).create_listener(handler)
+    await listener_0.listen(LISTEN_MADDR, nursery)
+    addr = listener_0.get_addrs()[0]
+
+    listener_1 = TCP(TCPOptions(reuse_port=True)).create_listener(handler)
+    await listener_1.listen(addr, nursery)
+    assert listener_1.get_addrs() == (addr,)
+    # Without `SO_REUSEPORT` the address is taken.
+    with pytest.raises(OSError):
+        await TCP().create_listener(handler).listen(addr, nursery)
+
+
+def test_tcp_reuse_port_unsupported(monkeypatch):
+    monkeypatch.delattr(trio.socket, "SO_REUSEPORT", raising=False)
+    with pytest.raises(ValueError):
+        TCP(TCPOptions(reuse_port=True))
+
+
+@pytest.mark.trio
+async def test_tcp_options(nursery):
+    options = TCPOptions(
+        nodelay=False,
+        receive_buffer_size=256 * 1024,
+        keepalive=True,
+        keepalive_idle=30,
+        read_size=16,
+    )
+    transport = TCP(options)
+    accepted = trio.Event()
+    streams = []
+
+    async def handler(tcp_stream):
+        streams.append(tcp_stream)
+        accepted.set()
+        await trio.sleep_forever()
+
+    listener = transport.create_listener(handler)
+    await listener.listen(LISTEN_MADDR, nursery)
+    raw_conn = await transport.dial(listener.get_addrs()[0])
+    await accepted.wait()
+
+    for tcp_stream in (raw_conn.stream, streams[0]):
+        sock = tcp_stream.stream.socket
+        assert not sock.getsockopt(trio.socket.IPPROTO_TCP, trio.socket.TCP_NODELAY)
+        assert sock.getsockopt(trio.socket.SOL_SOCKET, trio.socket.SO_KEEPALIVE)
+        # Linux doubles the requested size for bookkeeping overhead.
+        assert (
+            sock.getsockopt(trio.socket.SOL_SOCKET, trio.socket.SO_RCVBUF) >= 256 * 1024
+        )
+        assert tcp_stream.read_size == 16
+
+    await raw_conn.write(b"x" * 100)
+    await trio.sleep(0.01)
+    # Reads without a size return at most `read_size` bytes.
+    assert len(await streams[0].read()) == 16
+
+
+@pytest.mark.trio
+async def test_tcp_ip6(nursery):
+    if not socket.has_ipv6:
+        pytest.skip("IPv6 is not supported")
+    transport = TCP()
+    accepted = trio.Event()
+
+    async def handler(tcp_stream):
+        accepted.set()
+        await trio.sleep_forever()
+
+    listener = transport.create_listener(handler)
+    try:
+        await listener.listen(Multiaddr("/ip6/::1/tcp/0"), nursery)
+    except OSError:
+        pytest.skip("no IPv6 loopback")
+    listen_addr = listener.get_addrs()[0]
+    assert listen_addr.value_for_protocol("ip6") == "::1"
+    raw_conn = await transport.dial(listen_addr)
+    await accepted.wait()
+    await raw_conn.close()
+
+    with pytest.raises(OpenConnectionError):
+        await transport.dial(Multiaddr("/dns4/localhost/tcp/1"))
@@ -0,0 +1,92 @@
+import os
+
+import pytest
+from multiaddr import (
+    Multiaddr,
+)
+import trio
+
+from libp2p.network.connection.raw_connection import (
+    RawConnection,
+)
+from libp2p.tools.async_service import (
+    background_trio_service,
+)
+from libp2p.tools.constants import (
+    LISTEN_MADDR,
+)
+from libp2p.tools.factories import (
+    SwarmFactory,
+)
+from libp2p.transport.exceptions import (
+    OpenConnectionError,
+)
+from libp2p.transport.registry import (
+    TransportRegistry,
+)
+from libp2p.transport.unix.unix import (
+    UNIX_PROTOCOL,
+    UnixTransport,
+)
+
+
+class RecordingUnixTransport(UnixTransport):
+    def __init__(self):
+        self.dialed = []
+
+    async def dial(self, maddr):
+        self.dialed.append(maddr)
+        return await super().dial(maddr)
+
+
+@pytest.mark.trio
+async def test_unix_dial(nursery, tmp_path):
+    transport = UnixTransport()
+    maddr = Multiaddr(f"/unix{tmp_path}/libp2p.sock")
+    raw_conn_other_side = None
+    event = trio.Event()
+
+    async def handler(stream):
+        nonlocal raw_conn_other_side
+        raw_conn_other_side = RawConnection(stream, False)
+        event.set()
+        await trio.sleep_forever()
+
+    with pytest.raises(OpenConnectionError):
+        await transport.dial(maddr)
+
+    listener = transport.create_listener(handler)
+    await listener.listen(maddr, nursery)
+    assert listener.get_addrs() == (maddr,)
+    raw_conn = await transport.dial(maddr)
+    await event.wait()
+
+    data = b"123"
+    await raw_conn_other_side.write(data)
+    assert (await raw_conn.read(len(data))) == data
+
+
+@pytest.mark.trio
+async def test_swarm_prefers_unix_addrs(tmp_path):
+    unix_maddr = Multiaddr(f"/unix{tmp_path}/swarm.sock")
+    unix_transport = RecordingUnixTransport()
+    swarm_0 = SwarmFactory(
+        transports=TransportRegistry({UNIX_PROTOCOL: unix_transport})
+    )
+    swarm_1 = SwarmFactory()
+    async with background_trio_service(swarm_0), background_trio_service(swarm_1):
+        await swarm_1.listen(LISTEN_MADDR)
+        await swarm_1.listen(unix_maddr)
+        addrs = [
+            addr
+            for listener in swarm_1.listeners.values()
+            for addr in listener.get_addrs()
+        ]
+        assert addrs[-1] == unix_maddr
+        swarm_0.peerstore.add_addrs(swarm_1.get_peer_id(), addrs, 10)
+
+        await swarm_0.dial_peer(swarm_1.get_peer_id())
+        assert unix_transport.dialed == [unix_maddr]
+        assert swarm_0.get_peer_id() in swarm_1.connections
+    # The socket file is removed when the swarm stops.
+    assert not os.path.exists(f"{tmp_path}/swarm.sock")
@@ -0,0 +1,95 @@
+import pytest
+import trio
+from trio.testing import (
+    wait_all_tasks_blocked,
+)
+
+from libp2p.peer.id import (
+    ID,
+)
+from libp2p.tools.factories import (
+    default_key_pair_factory,
+    default_muxer_transport_factory,
+    raw_conn_factory,
+    security_options_factory_factory,
+)
+from libp2p.transport.exceptions import (
+    MuxerUpgradeTimeout,
+    SecurityUpgradeTimeout,
+    UpgradeQueueFull,
+)
+from libp2p.transport.upgrader import (
+    TransportUpgrader,
+    UpgraderOptions,
+)
+
+
+def _upgrader(**options):
+    return TransportUpgrader(
+        security_options_factory_factory()(default_key_pair_factory()),
+        default_muxer_transport_factory(),
+        UpgraderOptions(**options),
+    )
+
+
+@pytest.mark.trio
+async def test_inbound_upgrade_slot_queue():
+    upgrader = _upgrader(max_inbound_upgrades=1, max_queued_upgrades=1)
+    release = trio.Event()
+    upgraded = []
+
+    async def upgrade(index):
+        async with upgrader.inbound_upgrade_slot():
+            upgraded.append(index)
+            await release.wait()
+
+    async with trio.open_nursery() as nursery:
+        nursery.start_soon(upgrade, 0)
+        await wait_all_tasks_blocked()
+        nursery.start_soon(upgrade, 1)
+        await wait_all_tasks_blocked()
+        assert upgraded == [0]
+        stats = upgrader.stats()
+        assert stats.inbound_upgrades == 1
+        assert stats.queued_upgrades == 1
+
+        with pytest.raises(UpgradeQueueFull):
+            async with upgrader.inbound_upgrade_slot():
+                pass
+        assert upgrader.stats().rejected_upgrades == 1
+        release.set()
+
+    assert upgraded == [0, 1]
+    stats = upgrader.stats()
+    assert stats.inbound_upgrades == 0
+    assert stats.queued_upgrades == 0
+
+
+@pytest.mark.trio
+@pytest.mark.parametrize(
+    "options, security_timeouts, negotiate_timeouts",
+    (
+        ({"negotiate_timeout": 0.1}, 0, 1),
+        ({"negotiate_timeout": 10, "handshake_timeout": 0.1}, 1, 0),
+    ),
+)
+async def test_upgrade_security_timeout(
+    nursery, options, security_timeouts, negotiate_timeouts
+):
+    upgrader = _upgrader(**options)
+    async with raw_conn_factory(nursery) as (_, conn_1):
+        # The dialer never speaks, as a slowloris peer would.
+        with pytest.raises(SecurityUpgradeTimeout):
+            await upgrader.upgrade_security(conn_1, ID(b""), False)
+    stats = upgrader.stats()
+    assert stats.security_timeouts == security_timeouts
+    assert stats.negotiate_timeouts == negotiate_timeouts
+
+
+@pytest.mark.trio
+async def test_upgrade_connection_timeout(nursery):
+    upgrader = _upgrader(negotiate_timeout=0.1)
+    async with raw_conn_factory(nursery) as (_, conn_1):
+        with pytest.raises(MuxerUpgradeTimeout):
+            await upgrader.upgrade_connection(conn_1, ID(b""))
+    assert upgrader.stats().negotiate_timeouts == 1